@@ -0,0 +1,174 @@
+# app/api/async_reads.py
+"""
+Async variants of the hot read endpoints.
+
+Included in front of the sync routers when DB_ASYNC is enabled (see app/database/async_session.py):
+the routes below then shadow their sync counterparts, which remain the reference implementation.
+Permission checks and the serialization of lazy relationships run through `AsyncSession.run_sync`.
+"""
+from datetime import datetime
+from typing import Optional, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..api.auth import get_current_user_async
+from ..database.async_session import get_async_db
+from ..helper import permissions, response
+from ..models.environment import Environment
+from ..models.user import User
+from ..repositories import audit_log_repo, element_repo, environment_repo, physical_host_repo
+from ..schema.audit_log import AuditLogOut
+from ..schema.auth import BaseResponse, MeResponse
+from ..schema.element import ElementOut
+from ..schema.environment import EnvironmentOut
+from ..schema.physical_host import PhysicalHostOut
+from ..schema.user import UserOut
+
+router = APIRouter()
+
+
+@router.get("/me", summary="Connected user profile", description="Retrieves the profile information of the currently connected user", response_model=MeResponse, tags=["auth"], responses={
+    200: {"description": "Profile information retrieved successfully"},
+    401: {"description": "Not authenticated or invalid token"}
+})
+async def get_me(current_user: User = Depends(get_current_user_async)):
+    return response.success_response(UserOut.model_validate(current_user), "Profile information")
+
+
+@router.get(
+    "/environments",
+    response_model=BaseResponse[List[EnvironmentOut]],
+    tags=["environments"],
+    summary="List environments",
+    description="Lists environments filtered by name or organization (superadmins see everything, others only what they have permission to read).",
+    responses={
+        200: {"description": "Environment list retrieved successfully"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"}
+    }
+)
+async def list_environments(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    name: Optional[str] = None,
+    organization_name: Optional[str] = None
+):
+    readable = await db.run_sync(
+        permissions.permission_filter, current_user, "env:read",
+        organization_id=Environment.organization_id,
+        environment_id=Environment.id
+    )
+    environments = await environment_repo.list_environments_async(
+        db, readable, skip=skip, limit=limit, name=name, organization_name=organization_name
+    )
+    data = await db.run_sync(lambda _: [EnvironmentOut.model_validate(env) for env in environments])
+    return response.success_response(data, "Environment list retrieved")
+
+
+@router.get(
+    # Registered before the sync routes: the int convertor lets /environments/generate-name fall through
+    "/environments/{environment_id:int}",
+    response_model=BaseResponse[EnvironmentOut],
+    tags=["environments"],
+    summary="Environment details",
+    description="Returns environment details if the user has access.",
+    responses={
+        200: {"description": "Environment retrieved successfully"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Environment not found"}
+    }
+)
+async def get_environment(
+    environment_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    environment = await environment_repo.get_environment_async(db, environment_id)
+    if not environment:
+        raise HTTPException(status_code=404, detail="Environment not found")
+    if not await db.run_sync(permissions.check_permission, current_user, "env:read",
+                             organization_id=environment.organization_id, environment_id=environment.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission")
+    data = await db.run_sync(lambda _: EnvironmentOut.model_validate(environment))
+    return response.success_response(data, "Environment retrieved")
+
+
+@router.get(
+    "/elements/{element_id:int}",
+    response_model=BaseResponse[ElementOut],
+    tags=["elements"],
+    summary="Get an element",
+    description="Returns information about a specific element.",
+    responses={
+        200: {"description": "Element retrieved successfully"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Element not found"},
+    }
+)
+async def get_element(
+    element_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    element = await element_repo.get_element_async(db, element_id)
+    if not element:
+        raise HTTPException(status_code=404, detail="Element not found")
+
+    org_id = element.environment.organization_id
+    if not await db.run_sync(permissions.check_permission, current_user, "element:read", organization_id=org_id,
+                             environment_id=element.environment_id, element_id=element.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission to view this element")
+
+    def serialize(sync_db):
+        physical_hosts = physical_host_repo.list_physical_hosts_by_environment(sync_db, element.environment_id)
+        serializable_element = ElementOut.model_validate(element)
+        serializable_element.environment_physical_hosts = [PhysicalHostOut.model_validate(host) for host in physical_hosts]
+        return serializable_element
+
+    return response.success_response(await db.run_sync(serialize), "Element retrieved")
+
+
+@router.get(
+    "/audit-logs/",
+    response_model=BaseResponse[List[AuditLogOut]],
+    tags=["audit_logs"],
+    summary="List audit logs",
+    description="Lists audit logs, newest first, filtered by exact action or action prefix, user_id and time range (accessible only by superadmin). "
+                "When more logs are available, the cursor of the next page is returned in the X-Next-Cursor header.",
+    responses={
+        200: {"description": "Audit logs retrieved successfully"},
+        400: {"description": "Invalid cursor"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not authorized"}
+    }
+)
+async def list_audit_logs(
+    response_item: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page, from the X-Next-Cursor header"),
+    action: Optional[str] = Query(None, description="Exact action"),
+    action_prefix: Optional[str] = Query(None, description="Action prefix"),
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = Query(None, description="Only logs at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only logs before this time")
+):
+    if not current_user.is_superadmin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    try:
+        logs, next_cursor = await audit_log_repo.list_audit_logs_async(
+            db, limit=limit, skip=skip, cursor=cursor, action=action, action_prefix=action_prefix,
+            user_id=user_id, since=since, until=until
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response_item.headers["X-Next-Cursor"] = next_cursor
+    return response.success_response(logs, "Audit logs retrieved")
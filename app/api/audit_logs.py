@@ -1,49 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
 from ..schema.audit_log import AuditLogOut
 from ..schema.auth import BaseResponse
-from ..models.audit_log import AuditLog
-from ..database.session import SessionLocal
+from ..repositories import audit_log_repo
+from ..database.session import get_db
 from ..api.users import get_current_user
 from ..models.user import User
-from ..helper import response
+from ..helper import response, audit_retention, audit_export
 
 router = APIRouter(prefix="/audit-logs", tags=["audit_logs"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get(
     "/",
     response_model=BaseResponse[List[AuditLogOut]],
     summary="List audit logs",
-    description="Lists audit logs with pagination and filtering by action and user_id (accessible only by superadmin).",
+    description="Lists audit logs, newest first, filtered by exact action or action prefix, user_id and time range (accessible only by superadmin). "
+                "When more logs are available, the cursor of the next page is returned in the X-Next-Cursor header.",
     responses={
         200: {"description": "Audit logs retrieved successfully"},
+        400: {"description": "Invalid cursor"},
         401: {"description": "Not authenticated"},
         403: {"description": "Not authorized"}
     }
 )
 def list_audit_logs(
+    response_item: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100,
-    action: Optional[str] = None,
-    user_id: Optional[int] = None
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page, from the X-Next-Cursor header"),
+    action: Optional[str] = Query(None, description="Exact action"),
+    action_prefix: Optional[str] = Query(None, description="Action prefix"),
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = Query(None, description="Only logs at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only logs before this time")
 ):
     if not current_user.is_superadmin:
         raise HTTPException(status_code=403, detail="Not authorized")
-    query = db.query(AuditLog)
-    if action:
-        query = query.filter(AuditLog.action.ilike(f"%{action}%"))
-    if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
-    logs = query.order_by(AuditLog.timestamp.desc()).offset(skip).limit(limit).all()
+    try:
+        logs, next_cursor = audit_log_repo.list_audit_logs(
+            db, limit=limit, skip=skip, cursor=cursor, action=action, action_prefix=action_prefix,
+            user_id=user_id, since=since, until=until
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response_item.headers["X-Next-Cursor"] = next_cursor
     return response.success_response(logs, "Audit logs retrieved")
+
+
+@router.get(
+    "/archive",
+    response_model=BaseResponse[List[AuditLogOut]],
+    summary="Query archived audit logs",
+    description="Lists audit logs that left the hot table (monthly partition files and compressed archive), newest first, "
+                "for a required time range (accessible only by superadmin).",
+    responses={
+        200: {"description": "Archived audit logs retrieved successfully"},
+        400: {"description": "Invalid time range"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not authorized"}
+    }
+)
+def list_archived_audit_logs(
+    since: datetime,
+    until: datetime,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    limit: int = Query(1000, ge=1, le=10000),
+    action: Optional[str] = Query(None, description="Exact action"),
+    action_prefix: Optional[str] = Query(None, description="Action prefix"),
+    user_id: Optional[int] = None
+):
+    if not current_user.is_superadmin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    logs = audit_retention.read_archived(
+        db.get_bind(), since, until, action=action, action_prefix=action_prefix, user_id=user_id, limit=limit
+    )
+    return response.success_response(logs, "Archived audit logs retrieved")
+
+
+@router.get(
+    "/export",
+    summary="Export audit logs",
+    description="Streams audit logs, oldest first, as NDJSON or CSV, optionally gzip-compressed, "
+                "filtered by action, user_id and time range (accessible only by superadmin).",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Audit log export", "content": {"application/x-ndjson": {}, "text/csv": {}, "application/gzip": {}}},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Not authorized"}
+    }
+)
+def export_audit_logs(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    action: Optional[str] = Query(None, description="Exact action"),
+    action_prefix: Optional[str] = Query(None, description="Action prefix"),
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = Query(None, description="Only logs at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only logs before this time")
+):
+    if not current_user.is_superadmin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    rows = audit_log_repo.iter_audit_log_rows(
+        db.get_bind(), action=action, action_prefix=action_prefix, user_id=user_id, since=since, until=until
+    )
+    filename = f"audit_logs.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        audit_export.encode(rows, format, compress=gzip),
+        media_type="application/gzip" if gzip else audit_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict, cast, Any
 from datetime import timedelta
 from fastapi.security import OAuth2
@@ -12,8 +13,9 @@ from starlette.status import HTTP_401_UNAUTHORIZED
 
 from ..helper.security import create_password_reset_token
 from ..models.user import User
-from ..database.session import SessionLocal
-from ..helper import security, audit, email, response
+from ..database.session import get_db
+from ..database.async_session import get_async_db
+from ..helper import security, audit, email, response, auth_cache
 from ..repositories import user_repo
 from ..schema.password_reset import PasswordResetRequest, PasswordReset
 from ..core import auth
@@ -58,35 +60,61 @@ class OAuth2PasswordBearerOrKey(OAuth2):
 
 oauth2_scheme = OAuth2PasswordBearerOrKey(tokenUrl="/login")
 
-def get_db():
-    db = SessionLocal()
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached.user
     try:
-        yield db
-    finally:
-        db.close()
+        payload = auth.decode_token(token)
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        generation = auth_cache.generation()
+        # Detached snapshot with its relationships loaded, shared by the requests using this token
+        user = auth_cache.load_user_snapshot(db, int(user_id))
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    auth_cache.put(token, payload, user, generation)
+    return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    """Async variant of get_current_user, used by the async endpoints"""
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached.user
     try:
         payload = auth.decode_token(token)
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        user = user_repo.get_user(db, int(user_id))
+        generation = auth_cache.generation()
+        user = await db.run_sync(auth_cache.load_user_snapshot, int(user_id))
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-        return user
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    auth_cache.put(token, payload, user, generation)
+    return user
 
 @router.post("/login", response_model=LoginResponse, summary="Authenticate a user", description="Authenticates a user with their email and password and returns an access token", responses={
     200: {"description": "Login successful"},
-    400: {"description": "Incorrect email or password"}
+    400: {"description": "Incorrect email or password"},
+    429: {"description": "Too many password operations in progress"}
 })
 def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db), response_item: Response = None):
     ip = request.headers.get("x-forwarded-for", request.client.host if request.client else "unknown").split(",")[0]
     user = user_repo.get_user_by_email(db, form_data.username)
     if not user or not security.verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+    if security.needs_rehash(user.hashed_password):
+        # Mise à niveau transparente vers le facteur de coût courant
+        try:
+            user.hashed_password = security.get_password_hash(form_data.password)
+            db.commit()
+        except security.PasswordHashingBusy:
+            pass
     access_token = auth.create_token(data={"sub": str(user.id)}, expires_delta=timedelta(minutes=1), token_type="access")
     refresh_token = auth.create_token(data={"sub": str(user.id)}, expires_delta=timedelta(days=7), token_type="refresh")
     audit.log_action(db, user.id, "Login", f"Successful connection from IP {ip}")
@@ -141,7 +169,7 @@ def reset_password_request(reset_req: PasswordResetRequest, background_tasks: Ba
     if user:
         token = create_password_reset_token(user.id)
         background_tasks.add_task(email.send_reset_email, user.email, token)
-        audit.log_action(db, user.id, "Password reset", "Reset link sent by email")
+        audit.log_action(db, user.id, "Password reset", "Reset link sent by email", sync=True)
     return response.success_response(None, "If this email is registered, you will receive a reset link.")
 
 @router.post("/users/reset_password", response_model=PasswordResetResponse, summary="Reset password", description="Resets a user's password using a valid reset token", responses={
@@ -164,5 +192,5 @@ def reset_password(reset: PasswordReset, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     user.hashed_password = security.get_password_hash(reset.new_password)
     db.commit()
-    audit.log_action(db, user.id, "Password reset", "Password reset via email link")
+    audit.log_action(db, user.id, "Password reset", "Password reset via email link", sync=True)
     return response.success_response(None, "Password reset successfully")
@@ -1,29 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Optional, List
 
 from ..schema.element import ElementCreate, ElementUpdate, ElementOut
 from ..schema.tag import TagOut
+from ..schema.network import NetworkAttachmentOut
 from ..schema.auth import BaseResponse, EmptyData
 from ..models.element import Element
 from ..models.environment import Environment
 from ..models.user import User
-from ..database.session import SessionLocal
-from ..repositories import element_repo, tag_repo, physical_host_repo
+from ..database.session import get_db
+from ..repositories import element_repo, tag_repo, physical_host_repo, loader_profiles, network_attachment_repo
 from ..api.users import get_current_user
-from ..helper import permissions, audit, response
-from ..helper.animalname import generate_codename
+from ..helper import permissions, audit, response, codename_allocator
 from ..schema.physical_host import PhysicalHostOut
 
 router = APIRouter(prefix="/elements", tags=["elements"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # TODO Check toutes les permissions dans les API endpoints, ajouter les manquantes dans le seed
 
@@ -51,17 +45,18 @@ def create_element(
     if not env:
         raise HTTPException(status_code=404, detail="Environment not found")
 
+    if not permissions.check_permission(db, current_user, "element:create", organization_id=env.organization_id,
+                                        environment_id=env.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission to create an element")
+
     # Generate a codename if no name is provided or if name is empty
     if not element_in.name or element_in.name.strip() == "":
-        element_in.name = generate_codename()
-
-    # Check if an element with the same name already exists
-    existing_elem = db.query(Element).filter(Element.name == element_in.name).first()
-    if existing_elem:
-        raise HTTPException(status_code=400, detail="An element with this name already exists")
-
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:create"):
-        raise HTTPException(status_code=403, detail="Insufficient permission to create an element")
+        element_in.name = codename_allocator.elements.allocate_one(db)
+    else:
+        # Check if an element with the same name already exists
+        existing_elem = db.query(Element).filter(Element.name == element_in.name).first()
+        if existing_elem:
+            raise HTTPException(status_code=400, detail="An element with this name already exists")
 
     try:
         # Create the element with a sub-component
@@ -107,12 +102,13 @@ def get_element(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    element = element_repo.get_element(db, element_id)
+    element = element_repo.get_element(db, element_id, options=loader_profiles.element_out())
     if not element:
         raise HTTPException(status_code=404, detail="Element not found")
 
     org_id = element.environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=org_id,
+                                        environment_id=element.environment_id, element_id=element.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to view this element")
 
     # Get physical hosts associated with the element's environment
@@ -125,6 +121,46 @@ def get_element(
     return response.success_response(serializable_element, "Element retrieved")
 
 
+@router.get(
+    "/{element_id}/network/attachments",
+    response_model=BaseResponse[List[NetworkAttachmentOut]],
+    summary="List network attachments",
+    description="Lists the VMs, physical hosts, container nodes, applications and gateways attached to the network of an element, optionally restricted to one kind.",
+    responses={
+        200: {"description": "Attachments retrieved successfully"},
+        400: {"description": "Unknown attachment kind"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Element not found or not a network"},
+    }
+)
+def list_network_attachments(
+    element_id: int,
+    kind: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    element = element_repo.get_element(db, element_id)
+    if not element:
+        raise HTTPException(status_code=404, detail="Element not found")
+
+    org_id = element.environment.organization_id
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=org_id,
+                                        environment_id=element.environment_id, element_id=element.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission to view this element")
+
+    if element.network is None:
+        raise HTTPException(status_code=404, detail="Element is not a network")
+
+    try:
+        rows = network_attachment_repo.list_network_attachments(db, element.network.id, [kind] if kind else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    attachments = [NetworkAttachmentOut.model_validate(row) for row in rows]
+    return response.success_response(attachments, "Network attachments retrieved")
+
+
 @router.put(
     "/{element_id}",
     response_model=BaseResponse[ElementOut],
@@ -132,6 +168,7 @@ def get_element(
     description="Modifies the information of an element.",
     responses={
         200: {"description": "Element updated successfully"},
+        400: {"description": "Name already used by another element"},
         401: {"description": "Not authenticated"},
         403: {"description": "Insufficient permission"},
         404: {"description": "Element not found"},
@@ -148,7 +185,8 @@ def update_element(
         raise HTTPException(status_code=404, detail="Element not found")
 
     org_id = element.environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "element:update"):
+    if not permissions.check_permission(db, current_user, "element:update", organization_id=org_id,
+                                        environment_id=element.environment_id, element_id=element.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to modify this element")
 
     original_env_id = element.environment_id
@@ -161,10 +199,18 @@ def update_element(
             raise HTTPException(status_code=404, detail="New environment not found")
 
         # Check if user has permission to access the new environment's organization
-        if not permissions.has_permission(db, current_user, new_env.organization_id, "element:update"):
+        if not permissions.check_permission(db, current_user, "element:update", organization_id=new_env.organization_id,
+                                            environment_id=new_env.id):
             raise HTTPException(status_code=403, detail="Insufficient permission to move element to new environment")
 
-    updated = element_repo.update_element(db, element, name=element_in.name, description=element_in.description, environment_id=element_in.environment_id)
+    try:
+        updated = element_repo.update_element(db, element, name=element_in.name, description=element_in.description, environment_id=element_in.environment_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        # Name taken by a concurrent request since the check
+        db.rollback()
+        raise HTTPException(status_code=400, detail="An element with this name already exists")
 
     # Get physical hosts associated with the element's environment
     environment_id = updated.environment_id
@@ -208,12 +254,13 @@ def delete_element(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    element = element_repo.get_element(db, element_id)
+    element = element_repo.get_element(db, element_id, options=loader_profiles.element_subcomponents())
     if not element:
         raise HTTPException(status_code=404, detail="Element not found")
 
     org_id = element.environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "element:delete"):
+    if not permissions.check_permission(db, current_user, "element:delete", organization_id=org_id,
+                                        environment_id=element.environment_id, element_id=element.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to delete this element")
 
     # Check if the element has at least one sub-component
@@ -253,7 +300,8 @@ def list_element_tags(
 
     # Check permissions on the element's environment organization
     org_id = element.environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=org_id,
+                                        environment_id=element.environment_id, element_id=element.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to access this element")
 
     # Convert Tag objects to TagOut for proper serialization
@@ -287,7 +335,8 @@ def add_tag_to_element(
 
     # Check permissions on the element's environment organization
     org_id = element.environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "element:update"):
+    if not permissions.check_permission(db, current_user, "element:update", organization_id=org_id,
+                                        environment_id=element.environment_id, element_id=element.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to modify this element")
 
     # Check that the tag exists
@@ -332,7 +381,8 @@ def remove_tag_from_element(
 
     # Check permissions on the element's environment organization
     org_id = element.environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "element:update"):
+    if not permissions.check_permission(db, current_user, "element:update", organization_id=org_id,
+                                        environment_id=element.environment_id, element_id=element.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to modify this element")
 
     # Check that the tag exists
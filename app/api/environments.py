@@ -1,14 +1,15 @@
 # app/api/environments.py
 
-from typing import Optional, List
+from typing import Literal, Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ..api.users import get_current_user
-from ..database.session import SessionLocal
-from ..helper import permissions, audit, response
-from ..helper.animalname import generate_codename
+from ..database.session import get_db
+from ..helper import permissions, audit, response, codename_allocator, placement, topology
 from ..models import Element
 from ..models.application import Application
 from ..models.container_cluster import ContainerCluster
@@ -22,24 +23,19 @@ from ..models.storage_pool import StoragePool
 from ..models.user import User
 from ..models.vm import VM
 from ..models.volume import Volume
-from ..repositories import environment_repo, group_repo, function_repo, tag_repo, physical_host_repo
-from ..schema.element import ElementOut
+from ..repositories import element_repo, environment_repo, group_repo, function_repo, tag_repo, physical_host_repo, loader_profiles
+from ..schema.element import ElementOut, ElementBulkCreate, ElementBulkOut, ElementBulkResult
 from ..schema.environment import EnvironmentCreate, EnvironmentOut
 from ..schema.physical_host import PhysicalHostOut
+from ..schema.placement import PlacementAssignment, PlacementPlanOut, PlacementPlanRequest
 from ..schema.user import UserOut
 from ..schema.tag import TagOut
+from ..schema.topology import TopologyImpact, TopologyOut, TopologyReach
 from ..schema.auth import BaseResponse, EmptyData
 
 router = APIRouter(prefix="/environments", tags=["environments"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get(
     "",
     response_model=BaseResponse[List[EnvironmentOut]],
@@ -66,17 +62,83 @@ def list_environments(
     if organization_name:
         query = query.filter(Organization.name.ilike(f"%{organization_name}%"))
 
-    environments = query.offset(skip).limit(limit).all()
+    # Filter by permissions in the database so that pagination applies to readable environments only
+    query = query.filter(permissions.permission_filter(
+        db, current_user, "env:read",
+        organization_id=Environment.organization_id,
+        environment_id=Environment.id
+    ))
 
-    # Filter by permissions
-    if not current_user.is_superadmin:
-        environments = [
-            env for env in environments
-            if permissions.has_permission(db, current_user, env.organization_id, "env:read")
-        ]
+    environments = query.offset(skip).limit(limit).all()
 
     return response.success_response(environments, "Environment list retrieved")
 
+@router.get(
+    "/generate-name",
+    response_model=BaseResponse[str],
+    summary="Generate a random name",
+    description="Generates a name from an animal or an adjective, not used by any environment yet.",
+    responses={
+        200: {"description": "Name generated successfully"},
+        401: {"description": "Not authenticated"}
+    }
+)
+def generate_environment_codename(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    prefix_length: int = Query(0, ge=0, le=6),
+    use_adjective: bool = Query(True),
+    use_adverb: bool = Query(False),
+    suffix_length: int = Query(0, ge=0, le=6),
+    separator: str = Query("-", max_length=2),
+    style: Optional[str] = Query(None)
+):
+    name = codename_allocator.environments.allocate_one(
+        db,
+        prefix_length=prefix_length,
+        use_adjective=use_adjective,
+        use_adverb=use_adverb,
+        suffix_length=suffix_length,
+        separator=separator,
+        style=style
+    )
+    return response.success_response(name, "Name generated successfully")
+
+@router.get(
+    "/generate-names",
+    response_model=BaseResponse[List[str]],
+    summary="Generate names in bulk",
+    description="Generates `count` distinct names for environments, elements or organizations, none of them used yet. "
+                "Used for batch provisioning.",
+    responses={
+        200: {"description": "Names generated successfully"},
+        401: {"description": "Not authenticated"}
+    }
+)
+def generate_codenames(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    count: int = Query(10, ge=1, le=codename_allocator.MAX_BULK),
+    kind: Literal["environment", "element", "organization"] = Query("environment"),
+    prefix_length: int = Query(0, ge=0, le=6),
+    use_adjective: bool = Query(True),
+    use_adverb: bool = Query(False),
+    suffix_length: int = Query(0, ge=0, le=6),
+    separator: str = Query("-", max_length=2),
+    style: Optional[str] = Query(None)
+):
+    names = codename_allocator.ALLOCATORS[kind].allocate(
+        db,
+        count,
+        prefix_length=prefix_length,
+        use_adjective=use_adjective,
+        use_adverb=use_adverb,
+        suffix_length=suffix_length,
+        separator=separator,
+        style=style
+    )
+    return response.success_response(names, "Names generated successfully")
+
 @router.get(
     "/{environment_id}",
     response_model=BaseResponse[EnvironmentOut],
@@ -97,7 +159,8 @@ def get_environment(
     environment = environment_repo.get_environment(db, environment_id)
     if not environment:
         raise HTTPException(status_code=404, detail="Environment not found")
-    if not permissions.has_permission(db, current_user, environment.organization_id, "env:read"):
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission")
     return response.success_response(environment, "Environment retrieved")
 
@@ -123,7 +186,8 @@ def get_environment_physical_hosts(
     environment = environment_repo.get_environment(db, environment_id)
     if not environment:
         raise HTTPException(status_code=404, detail="Environment not found")
-    if not permissions.has_permission(db, current_user, environment.organization_id, "env:read"):
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission")
 
     physical_hosts = physical_host_repo.list_physical_hosts_by_environment(db, environment_id, skip, limit)
@@ -132,6 +196,102 @@ def get_environment_physical_hosts(
         "Physical hosts list retrieved"
     )
 
+@router.get(
+    "/{environment_id}/topology",
+    response_model=BaseResponse[TopologyOut],
+    summary="Infrastructure topology of an environment",
+    description="Returns the hosts, VMs, container nodes, applications, networks and gateways of an environment, "
+                "with their network attachments and placements.",
+    responses={
+        200: {"description": "Topology retrieved successfully"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Environment not found"}
+    }
+)
+def get_environment_topology(
+    environment_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    environment = environment_repo.get_environment(db, environment_id)
+    if not environment:
+        raise HTTPException(status_code=404, detail="Environment not found")
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission")
+
+    graph = topology.get_topology(db, environment_id)
+    return response.success_response(TopologyOut(**graph.snapshot()), "Topology retrieved")
+
+@router.get(
+    "/{environment_id}/topology/reachability",
+    response_model=BaseResponse[List[TopologyReach]],
+    summary="Workloads reaching a network",
+    description="Lists the hosts, VMs, container nodes and applications that can reach a network of the environment, "
+                "with the network they are attached to and the gateways crossed.",
+    responses={
+        200: {"description": "Reachability computed successfully"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Environment or network not found"}
+    }
+)
+def get_topology_reachability(
+    environment_id: int,
+    network_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    environment = environment_repo.get_environment(db, environment_id)
+    if not environment:
+        raise HTTPException(status_code=404, detail="Environment not found")
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission")
+
+    try:
+        reached = topology.get_topology(db, environment_id).reachability(network_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Network not found in this environment")
+    return response.success_response([TopologyReach(**entry) for entry in reached], "Reachability computed")
+
+@router.get(
+    "/{environment_id}/topology/impact",
+    response_model=BaseResponse[TopologyImpact],
+    summary="Blast radius of a node",
+    description="Lists what fails with a node of the environment (what it hosts, transitively) and the networks "
+                "that lose routes through failed gateways or networks.",
+    responses={
+        200: {"description": "Impact computed successfully"},
+        400: {"description": "Unknown node kind"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Environment or node not found"}
+    }
+)
+def get_topology_impact(
+    environment_id: int,
+    kind: str,
+    node_id: int = Query(..., alias="id"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    environment = environment_repo.get_environment(db, environment_id)
+    if not environment:
+        raise HTTPException(status_code=404, detail="Environment not found")
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission")
+
+    try:
+        impact = topology.get_topology(db, environment_id).impact(kind, node_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Node not found in this environment")
+    return response.success_response(TopologyImpact(**impact), "Impact computed")
+
 @router.post(
     "",
     response_model=BaseResponse[EnvironmentOut],
@@ -149,10 +309,11 @@ def create_environment(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if not permissions.has_permission(db, current_user, env.organization_id, "env:create"):
+    if not permissions.check_permission(db, current_user, "env:create", organization_id=env.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permission to create an environment")
 
-    # TODO add generate codename here
+    if not env.name or env.name.strip() == "":
+        env.name = codename_allocator.environments.allocate_one(db)
     environment = environment_repo.create_environment(
         db,
         name=env.name,
@@ -176,7 +337,9 @@ def create_environment(
     group_repo.add_function_to_group(db, admin_group, admin_function)
 
     # Check: is the user already an environment admin via group/policy?
-    is_already_admin = permissions.has_permission(db, current_user, environment.id, "env:update")
+    is_already_admin = permissions.check_permission(
+        db, current_user, "env:update", organization_id=environment.organization_id, environment_id=environment.id
+    )
 
     if not is_already_admin:
         # Create a "creator" policy with `admin` rule on this env
@@ -234,7 +397,8 @@ def update_environment(
     if not environment:
         raise HTTPException(status_code=404, detail="Environment not found")
 
-    if not permissions.has_permission(db, current_user, environment.organization_id, "env:update"):
+    if not permissions.check_permission(db, current_user, "env:update", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission")
 
     environment.name = env.name
@@ -268,7 +432,8 @@ def delete_environment(
     if not environment:
         raise HTTPException(status_code=404, detail="Environment not found")
 
-    if not permissions.has_permission(db, current_user, environment.organization_id, "env:delete"):
+    if not permissions.check_permission(db, current_user, "env:delete", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission")
 
     environment_repo.delete_environment(db, environment)
@@ -276,35 +441,6 @@ def delete_environment(
     audit.log_action(db, current_user.id, "Environment deletion", f"Environment {environment.name} deleted")
     return response.success_response(None, "Environment deleted")
 
-@router.get(
-    "/generate-name",
-    response_model=BaseResponse[str],
-    summary="Generate a random name",
-    description="Generates a unique name from an animal or an adjective.",
-    responses={
-        200: {"description": "Name generated successfully"},
-        401: {"description": "Not authenticated"}
-    }
-)
-def generate_environment_codename(
-    current_user: User = Depends(get_current_user),
-    prefix_length: int = Query(0, ge=0, le=6),
-    use_adjective: bool = Query(True),
-    use_adverb: bool = Query(False),
-    suffix_length: int = Query(0, ge=0, le=6),
-    separator: str = Query("-", max_length=2),
-    style: Optional[str] = Query(None)
-):
-    name = generate_codename(
-        prefix_length=prefix_length,
-        use_adjective=use_adjective,
-        use_adverb=use_adverb,
-        suffix_length=suffix_length,
-        separator=separator,
-        style=style
-    )
-    return response.success_response(name, "Name generated successfully")
-
 @router.get(
     "/{environment_id}/users",
     response_model=BaseResponse[List[UserOut]],
@@ -326,7 +462,8 @@ def get_environment_users(
     if not environment:
         raise HTTPException(status_code=404, detail="Environment not found")
 
-    if not permissions.has_permission(db, current_user, environment.organization_id, "env:read"):
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission")
 
     return response.success_response(environment.users, "Users retrieved")
@@ -358,10 +495,11 @@ def list_elements(
     if not env:
         raise HTTPException(status_code=404, detail="Environment not found")
 
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list elements")
 
-    query = db.query(Element).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).filter(Element.environment_id == environment_id)
 
     # Filter by element type if specified
     if element_type:
@@ -398,6 +536,139 @@ def list_elements(
 
     return response.success_response(serializable_elements, "Elements list retrieved")
 
+@router.post(
+    "/{environment_id}/elements",
+    response_model=BaseResponse[ElementBulkOut],
+    summary="Create elements in bulk",
+    description="Creates many elements with their sub-components in one transaction. Every item is validated first; "
+                "invalid items are reported in the per-item results, and with `atomic` nothing is created if any item "
+                "is invalid. Items without a name get a generated codename.",
+    responses={
+        200: {"description": "Batch processed, see the per-item results"},
+        400: {"description": "The batch was rejected by the database"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Environment not found"},
+    }
+)
+def create_elements_bulk(
+    environment_id: int,
+    bulk: ElementBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    env = db.query(Environment).filter_by(id=environment_id).first()
+    if not env:
+        raise HTTPException(status_code=404, detail="Environment not found")
+
+    if not permissions.check_permission(db, current_user, "element:create", organization_id=env.organization_id,
+                                        environment_id=env.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission to create elements")
+
+    # Validation of every item before any write, names checked against the table in one query
+    names = [item.name.strip() if item.name and item.name.strip() else None for item in bulk.elements]
+    existing = set(db.execute(
+        select(Element.name).where(Element.name.in_([name for name in names if name]))
+    ).scalars())
+    parsed = []
+    for item in bulk.elements:
+        try:
+            parsed.append(element_repo.subcomponent_values(item.subcomponent_type, item.subcomponent_data))
+        except ValueError as e:
+            parsed.append(e)
+    # Foreign keys resolved with one query per referenced table, so that a bad one fails its item only
+    unresolved = iter(element_repo.unresolved_references(db, [entry for entry in parsed if not isinstance(entry, ValueError)]))
+    results: List[ElementBulkResult] = []
+    specs = []
+    for index, (item, name, entry) in enumerate(zip(bulk.elements, names, parsed)):
+        error = str(entry) if isinstance(entry, ValueError) else next(unresolved)
+        if error:
+            results.append(ElementBulkResult(index=index, status="error", name=name, error=error))
+            continue
+        model, values = entry
+        if name in existing:
+            results.append(ElementBulkResult(index=index, status="error", name=name,
+                                             error="An element with this name already exists"))
+            continue
+        if model is VM:
+            # Host recorded or chosen now, its capacity held by the session until the commit
+            try:
+                values["host_id"] = placement.host_for_vm(db, environment_id, values["vcpu"], values["ram_mb"],
+                                                          values["host_id"])
+            except ValueError as e:
+                results.append(ElementBulkResult(index=index, status="error", name=name, error=str(e)))
+                continue
+        if name:
+            existing.add(name)
+        result = ElementBulkResult(index=index, status="created", name=name)
+        results.append(result)
+        specs.append((result, {"name": name, "description": item.description, "model": model, "values": values}))
+
+    failed = len(results) - len(specs)
+    if failed and bulk.atomic:
+        for result, _ in specs:
+            result.status = "skipped"
+        return response.success_response(ElementBulkOut(created=0, failed=failed, results=results), "Batch rejected")
+
+    unnamed = [spec for _, spec in specs if spec["name"] is None]
+    if unnamed:
+        for spec, codename in zip(unnamed, codename_allocator.elements.allocate(db, len(unnamed))):
+            spec["name"] = codename
+
+    try:
+        created = element_repo.create_elements_bulk(db, environment_id, [spec for _, spec in specs])
+    except IntegrityError:
+        # Raced by a concurrent write since the validation; the driver message stays server-side
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Batch rejected by the database, retry it")
+    for (result, _), (element_id, element_name) in zip(specs, created):
+        result.id = element_id
+        result.name = element_name
+
+    audit.log_action(db, current_user.id, "Element bulk creation",
+                     f"{len(created)} elements created in env {environment_id}, {failed} rejected")
+    return response.success_response(ElementBulkOut(created=len(created), failed=failed, results=results),
+                                     "Elements created")
+
+@router.post(
+    "/{environment_id}/placement/plan",
+    response_model=BaseResponse[PlacementPlanOut],
+    summary="Plan the placement of VMs",
+    description="Dry run: returns the physical host each VM would be placed on, largest VMs first, with the "
+                "environment's dedicated hosts tried before the shared ones. Nothing is created or reserved.",
+    responses={
+        200: {"description": "Placement planned successfully"},
+        400: {"description": "More VMs than a plan covers"},
+        401: {"description": "Not authenticated"},
+        403: {"description": "Insufficient permission"},
+        404: {"description": "Environment not found"}
+    }
+)
+def plan_placement(
+    environment_id: int,
+    request: PlacementPlanRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    environment = environment_repo.get_environment(db, environment_id)
+    if not environment:
+        raise HTTPException(status_code=404, detail="Environment not found")
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=environment.organization_id,
+                                        environment_id=environment.id):
+        raise HTTPException(status_code=403, detail="Insufficient permission")
+
+    total = sum(shape.count for shape in request.vms)
+    if total > placement.MAX_PLAN_VMS:
+        raise HTTPException(status_code=400, detail=f"A plan covers at most {placement.MAX_PLAN_VMS} VMs, not {total}")
+    shapes = [(shape.vcpu, shape.ram_mb) for shape in request.vms for _ in range(shape.count)]
+    hosts = placement.engine.plan(db, environment_id, shapes, request.strategy)
+    assignments = [PlacementAssignment(index=index, vcpu=vcpu, ram_mb=ram_mb, host_id=host_id)
+                   for index, ((vcpu, ram_mb), host_id) in enumerate(zip(shapes, hosts))]
+    placed = sum(host_id is not None for host_id in hosts)
+    return response.success_response(
+        PlacementPlanOut(placed=placed, unplaced=len(hosts) - placed, assignments=assignments), "Placement planned"
+    )
+
 @router.get(
     "/{environment_id}/tags",
     response_model=BaseResponse[List[TagOut]],
@@ -422,7 +693,8 @@ def list_environment_tags(
 
     # Check permissions on the environment's organization
     org_id = environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "env:read"):
+    if not permissions.check_permission(db, current_user, "env:read", organization_id=org_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to access this environment")
 
     # Convert Tag objects to TagOut for proper serialization
@@ -457,7 +729,8 @@ def add_tag_to_environment(
 
     # Check permissions on the environment's organization
     org_id = environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "env:update"):
+    if not permissions.check_permission(db, current_user, "env:update", organization_id=org_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to modify this environment")
 
     # Verify tag exists
@@ -501,7 +774,8 @@ def remove_tag_from_environment(
 
     # Check permissions on the environment's organization
     org_id = environment.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "env:update"):
+    if not permissions.check_permission(db, current_user, "env:update", organization_id=org_id,
+                                        environment_id=environment.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to modify this environment")
 
     # Verify tag exists
@@ -546,11 +820,12 @@ def list_networks(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list networks")
 
     # Build query for network-type elements
-    query = db.query(Element).join(Network, Element.id == Network.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(Network, Element.id == Network.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -590,11 +865,12 @@ def list_vms(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list virtual machines")
 
     # Build query for VM-type elements
-    query = db.query(Element).join(VM, Element.id == VM.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(VM, Element.id == VM.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -634,11 +910,12 @@ def list_storage_pools(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list storage pools")
 
     # Build query for StoragePool-type elements
-    query = db.query(Element).join(StoragePool, Element.id == StoragePool.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(StoragePool, Element.id == StoragePool.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -678,11 +955,12 @@ def list_volumes(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list volumes")
 
     # Build query for Volume-type elements
-    query = db.query(Element).join(Volume, Element.id == Volume.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(Volume, Element.id == Volume.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -722,11 +1000,12 @@ def list_domains(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list domains")
 
     # Build query for Domain-type elements
-    query = db.query(Element).join(Domain, Element.id == Domain.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(Domain, Element.id == Domain.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -766,11 +1045,12 @@ def list_container_nodes(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list container nodes")
 
     # Build query for ContainerNode-type elements
-    query = db.query(Element).join(ContainerNode, Element.id == ContainerNode.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(ContainerNode, Element.id == ContainerNode.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -810,11 +1090,12 @@ def list_container_clusters(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list container clusters")
 
     # Build query for ContainerCluster-type elements
-    query = db.query(Element).join(ContainerCluster, Element.id == ContainerCluster.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(ContainerCluster, Element.id == ContainerCluster.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -854,11 +1135,12 @@ def list_stacks(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list stacks")
 
     # Build query for Stack-type elements
-    query = db.query(Element).join(Stack, Element.id == Stack.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(Stack, Element.id == Stack.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -898,11 +1180,12 @@ def list_applications(
         raise HTTPException(status_code=404, detail="Environment not found")
 
     # Check permissions
-    if not permissions.has_permission(db, current_user, env.organization_id, "element:read"):
+    if not permissions.check_permission(db, current_user, "element:read", organization_id=env.organization_id,
+                                        environment_id=env.id):
         raise HTTPException(status_code=403, detail="Insufficient permission to list applications")
 
     # Build query for Application-type elements
-    query = db.query(Element).join(Application, Element.id == Application.element_id).filter(Element.environment_id == environment_id)
+    query = db.query(Element).options(*loader_profiles.element_out()).join(Application, Element.id == Application.element_id).filter(Element.environment_id == environment_id)
 
     # Filter by name if specified
     if name:
@@ -6,7 +6,7 @@ from typing import List
 
 from ..models.function import Function
 from ..models.user import User
-from ..database.session import SessionLocal
+from ..database.session import get_db
 from ..api.users import get_current_user
 from ..helper import permissions, audit, response
 from ..repositories import function_repo
@@ -15,13 +15,6 @@ from ..schema.auth import BaseResponse
 
 router = APIRouter(prefix="/functions", tags=["functions"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get(
     "",
     response_model=BaseResponse[List[FunctionOut]],
@@ -35,7 +28,7 @@ def get_db():
 )
 def list_functions(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     # Here we assume global access to all functions
-    if not permissions.has_permission(db, current_user, None, "function:read"):
+    if not permissions.check_permission(db, current_user, "function:read"):
         raise HTTPException(status_code=403, detail="Insufficient permissions to list functions")
     functions = function_repo.list_functions(db)
     # Convert Function objects to FunctionOut objects for proper serialization
@@ -58,7 +51,7 @@ def get_function(function_id: int, current_user: User = Depends(get_current_user
     function = function_repo.get_function(db, function_id)
     if not function:
         raise HTTPException(status_code=404, detail="Function not found")
-    if not permissions.has_permission(db, current_user, None, "function:read"):
+    if not permissions.check_permission(db, current_user, "function:read"):
         raise HTTPException(status_code=403, detail="Insufficient permissions to read this function")
     # Convert Function object to FunctionOut object for proper serialization
     serializable_function = FunctionOut.model_validate(function)
@@ -10,7 +10,7 @@ from ..models.group import Group
 from ..models.user import User
 from ..models.policy import Policy
 from ..models.tag import Tag
-from ..database.session import SessionLocal
+from ..database.session import get_db
 from ..repositories import group_repo, user_repo, policy_repo, tag_repo
 from ..api.users import get_current_user
 from ..helper import permissions, audit, response
@@ -20,13 +20,6 @@ from ..schema.user import UserOut
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("", response_model=BaseResponse[List[GroupOut]], summary="List all groups", description="Retrieves the complete list of all groups in the system (reserved for superadmins)", responses={
     200: {"description": "List of all groups retrieved successfully"},
     401: {"description": "Not authenticated"},
@@ -48,7 +41,7 @@ def get_group(group_id: int, current_user: User = Depends(get_current_user), db:
     group = group_repo.get_group(db, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:read"):
+    if not permissions.check_permission(db, current_user, "group:read", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     return response.success_response(GroupOut.model_validate(group), "Group retrieved")
 
@@ -58,7 +51,7 @@ def get_group(group_id: int, current_user: User = Depends(get_current_user), db:
     403: {"description": "Insufficient permissions"}
 })
 def create_group(organization_id: int, group_in: GroupCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if not permissions.has_permission(db, current_user, organization_id, "group:create"):
+    if not permissions.check_permission(db, current_user, "group:create", organization_id=organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     group = group_repo.create_group(db, organization_id=organization_id, name=group_in.name, description=group_in.description)
     audit.log_action(db, current_user.id, "Group creation", f"Created group '{group.name}'")
@@ -74,7 +67,7 @@ def update_group(group_id: int, group_in: GroupUpdate, current_user: User = Depe
     group = group_repo.get_group(db, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:update"):
+    if not permissions.check_permission(db, current_user, "group:update", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     group = group_repo.update_group(db, group, name=group_in.name, description=group_in.description)
     audit.log_action(db, current_user.id, "Group update", f"Updated group '{group.name}'")
@@ -90,7 +83,7 @@ def delete_group(group_id: int, current_user: User = Depends(get_current_user),
     group = group_repo.get_group(db, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:delete"):
+    if not permissions.check_permission(db, current_user, "group:delete", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     # Prevent non-superadmin users from deleting 'admin' and 'editors' groups
@@ -111,7 +104,7 @@ def delete_group(group_id: int, current_user: User = Depends(get_current_user),
     403: {"description": "Insufficient permissions"}
 })
 def list_groups_by_org(org_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if not permissions.has_permission(db, current_user, org_id, "group:read"):
+    if not permissions.check_permission(db, current_user, "group:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     groups = db.query(Group).filter(Group.organization_id == org_id).all()
     return response.success_response([GroupOut.model_validate(group) for group in groups], "Groups retrieved")
@@ -126,7 +119,7 @@ def list_group_users(group_id: int, current_user: User = Depends(get_current_use
     group = group_repo.get_group(db, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:read"):
+    if not permissions.check_permission(db, current_user, "group:read", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     # Convert User objects to UserOut objects for proper serialization
@@ -144,7 +137,7 @@ def assign_user(group_id: int, user_id: int, current_user: User = Depends(get_cu
     user = user_repo.get_user(db, user_id)
     if not group or not user:
         raise HTTPException(status_code=404, detail="Group or user not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:assign_user"):
+    if not permissions.check_permission(db, current_user, "group:assign_user", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     # Check if user is already in the group
     if user in group.users:
@@ -167,7 +160,7 @@ def remove_user(group_id: int, user_id: int, current_user: User = Depends(get_cu
     user = user_repo.get_user(db, user_id)
     if not group or not user:
         raise HTTPException(status_code=404, detail="Group or user not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:assign_user"):
+    if not permissions.check_permission(db, current_user, "group:assign_user", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     # Check if user is in the group
     if user not in group.users:
@@ -187,7 +180,7 @@ def list_group_policies(group_id: int, current_user: User = Depends(get_current_
     group = group_repo.get_group(db, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:read"):
+    if not permissions.check_permission(db, current_user, "group:read", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     # Convert Policy objects to PolicyOut objects for proper serialization
     serializable_policies = [PolicyOut.model_validate(policy) for policy in group.policies]
@@ -204,7 +197,7 @@ def assign_policy(group_id: int, policy_id: int, current_user: User = Depends(ge
     policy = policy_repo.get_policy(db, policy_id)
     if not group or not policy:
         raise HTTPException(status_code=404, detail="Group or policy not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:assign_policy"):
+    if not permissions.check_permission(db, current_user, "group:assign_policy", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     group.policies.append(policy)
     db.commit()
@@ -221,7 +214,7 @@ def remove_policy(group_id: int, policy_id: int, current_user: User = Depends(ge
     policy = policy_repo.get_policy(db, policy_id)
     if not group or not policy:
         raise HTTPException(status_code=404, detail="Group or policy not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:assign_policy"):
+    if not permissions.check_permission(db, current_user, "group:assign_policy", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     if policy in group.policies:
         group.policies.remove(policy)
@@ -238,7 +231,7 @@ def list_group_tags(group_id: int, current_user: User = Depends(get_current_user
     group = group_repo.get_group(db, group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:read"):
+    if not permissions.check_permission(db, current_user, "group:read", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     # Convert Tag objects to TagOut objects for proper serialization
     serializable_tags = [TagOut.model_validate(tag) for tag in group.tags]
@@ -255,7 +248,7 @@ def add_tag_to_group(group_id: int, tag_id: int, current_user: User = Depends(ge
     tag = tag_repo.get_tag(db, tag_id)
     if not group or not tag:
         raise HTTPException(status_code=404, detail="Group or tag not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:assign_tag"):
+    if not permissions.check_permission(db, current_user, "group:assign_tag", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     group.tags.append(tag)
     db.commit()
@@ -272,7 +265,7 @@ def remove_tag_from_group(group_id: int, tag_id: int, current_user: User = Depen
     tag = tag_repo.get_tag(db, tag_id)
     if not group or not tag:
         raise HTTPException(status_code=404, detail="Group or tag not found")
-    if not permissions.has_permission(db, current_user, group.organization_id, "group:assign_tag"):
+    if not permissions.check_permission(db, current_user, "group:assign_tag", organization_id=group.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     if tag in group.tags:
         group.tags.remove(tag)
@@ -32,20 +32,13 @@
 from fastapi import APIRouter, status, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from ..helper import response
-from ..database.session import SessionLocal
+from ..helper import response, security
+from ..database.session import get_db, pool_stats
+from ..database import bootstrap
 from ..schema.health import HealthResponse
 
 router = APIRouter(prefix="/health", tags=["health"])
 
-def get_db():
-    """Database dependency provider"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get(
     "/",
     response_model=HealthResponse,
@@ -80,4 +73,11 @@ def health_check(db: Session = Depends(get_db)):
         health_status["components"]["database"]["details"] = str(e)
         return response.error_response("Service is unhealthy", status.HTTP_503_SERVICE_UNAVAILABLE, health_status)
 
+    health_status["components"]["database"]["pool"] = pool_stats()
+    hashing = security.hasher.stats()
+    health_status["components"]["password_hashing"] = {
+        "status": "saturated" if hashing["in_flight"] >= hashing["workers"] + hashing["queue_max"] else "up",
+        "hashing": hashing
+    }
+    health_status["startup"] = bootstrap.startup_metrics or None
     return response.success_response(health_status, "Service is healthy")
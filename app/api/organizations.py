@@ -1,16 +1,19 @@
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_
 from sqlalchemy.orm import Session, selectinload
 
 from ..api.users import get_current_user
-from ..database.session import SessionLocal
-from ..helper import response, permissions, audit
-from ..helper.cosmicname import generate_codename
+from ..database.session import get_db
+from ..helper import response, permissions, audit, codename_allocator
+from ..models.element import Element
 from ..models.environment import Environment
 from ..models.function import Function
 from ..models.group import Group
 from ..models.organization import Organization
+from ..models.policy import Policy
+from ..models.tag import Tag
 from ..models.user import User
 from ..repositories import tag_repo, policy_repo, rule_repo, group_repo
 from ..schema.auth import BaseResponse, EmptyData
@@ -24,13 +27,6 @@ from ..schema.user import UserOut
 
 router = APIRouter(prefix="/organizations", tags=["organizations"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("", response_model=BaseResponse[List[OrganizationOut]], summary="List organizations", description="Retrieve list of organizations accessible to the user", responses={
     200: {"description": "Organization list retrieved successfully"},
     401: {"description": "Unauthenticated"}
@@ -41,11 +37,11 @@ def list_organizations(current_user: User = Depends(get_current_user), db: Sessi
         selectinload(Organization.environments),
         selectinload(Organization.groups),
         selectinload(Organization.policies)
+    ).filter(
+        permissions.permission_filter(db, current_user, "organization:read", organization_id=Organization.id)
     ).all()
     # Convert Organization objects to OrganizationOut objects for proper serialization
-    serializable_orgs = [
-        OrganizationOut.model_validate(org) for org in orgs if permissions.has_permission(db, current_user, org.id, "organization:read")
-    ]
+    serializable_orgs = [OrganizationOut.model_validate(org) for org in orgs]
     return response.success_response(serializable_orgs, "Visible organizations retrieved")
 
 @router.get("/{org_id}", response_model=BaseResponse[OrganizationOut], summary="Organization details", description="Retrieve details of a specific organization", responses={
@@ -63,7 +59,7 @@ def get_organization(org_id: int, current_user: User = Depends(get_current_user)
     ).get(org_id)
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
-    if not permissions.has_permission(db, current_user, org.id, "organization:read"):
+    if not permissions.check_permission(db, current_user, "organization:read", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     # Convert Organization object to OrganizationOut object for proper serialization
     serializable_org = OrganizationOut.model_validate(org)
@@ -78,18 +74,19 @@ def get_organization(org_id: int, current_user: User = Depends(get_current_user)
 })
 def create_organization(org_in: OrganizationCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if org_in.name == '':
-        org_in.name = generate_codename()
-    # Check if an organization with the same name already exists
-    existing_org = db.query(Organization).filter(Organization.name == org_in.name).first()
-    if existing_org:
-        raise HTTPException(status_code=400, detail="An organization with this name already exists")
+        org_in.name = codename_allocator.organizations.allocate_one(db)
+    else:
+        # Check if an organization with the same name already exists
+        existing_org = db.query(Organization).filter(Organization.name == org_in.name).first()
+        if existing_org:
+            raise HTTPException(status_code=400, detail="An organization with this name already exists")
 
     # Check if user is already admin of another organization (unless superadmin)
     if not current_user.is_superadmin:
         # Query all admin groups to see if current user is already an admin somewhere
         admin_groups = db.query(Group).filter(Group.name == "admin").all()
         for admin_group in admin_groups:
-            if current_user in admin_group.users:
+            if any(user.id == current_user.id for user in admin_group.users):
                 raise HTTPException(
                     status_code=403,
                     detail="You are already administrator of another organization. A user can only be administrator of one organization."
@@ -170,7 +167,7 @@ def update_organization(org_id: int, org_in: OrganizationUpdate, current_user: U
     org = db.query(Organization).get(org_id)
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
-    if not permissions.has_permission(db, current_user, org.id, "organization:update"):
+    if not permissions.check_permission(db, current_user, "organization:update", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     # Check if another organization with the same name already exists
@@ -196,7 +193,7 @@ def delete_organization(org_id: int, current_user: User = Depends(get_current_us
     org = db.query(Organization).get(org_id)
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
-    if not permissions.has_permission(db, current_user, org.id, "organization:delete"):
+    if not permissions.check_permission(db, current_user, "organization:delete", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     # If the user is not a superadmin, check if any user in the organization belongs to other organizations
@@ -226,7 +223,7 @@ def add_user_to_organization(org_id: int, user_id: int, current_user: User = Dep
     user = db.query(User).get(user_id)
     if not org or not user:
         raise HTTPException(status_code=404, detail="Organization or user not found")
-    if not permissions.has_permission(db, current_user, org.id, "organization:update"):
+    if not permissions.check_permission(db, current_user, "organization:update", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     if user not in org.users:
         org.users.append(user)
@@ -248,7 +245,7 @@ def remove_user_from_organization(org_id: int, user_id: int, current_user: User
     user = db.query(User).get(user_id)
     if not org or not user:
         raise HTTPException(status_code=404, detail="Organization or user not found")
-    if not permissions.has_permission(db, current_user, org.id, "organization:update"):
+    if not permissions.check_permission(db, current_user, "organization:update", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     # Check if user is in the admin group
@@ -281,13 +278,12 @@ def remove_user_from_organization(org_id: int, user_id: int, current_user: User
     403: {"description": "Insufficient permissions"}
 })
 def list_organization_tags(org_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if not permissions.has_permission(db, current_user, org_id, "tag:read"):
+    if not permissions.check_permission(db, current_user, "tag:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    tags = [tag for tag in tag_repo.list_tags(db) if any(
-        p.organization_id == org_id for p in tag.policies
-    ) or any(
-        g.organization_id == org_id for g in tag.groups
-    )]
+    tags = db.query(Tag).filter(or_(
+        Tag.policies.any(Policy.organization_id == org_id),
+        Tag.groups.any(Group.organization_id == org_id)
+    )).all()
     # Convert Tag objects to TagOut objects for proper serialization
     serializable_tags = [TagOut.model_validate(tag) for tag in tags]
     return response.success_response(serializable_tags, "Organization tags retrieved")
@@ -304,7 +300,7 @@ def list_organization_policies(org_id: int, current_user: User = Depends(get_cur
     org = db.query(Organization).get(org_id)
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
-    if not permissions.has_permission(db, current_user, org.id, "policy:read"):
+    if not permissions.check_permission(db, current_user, "policy:read", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     # Convert Policy objects to PolicyOut objects for proper serialization
     serializable_policies = [PolicyOut.model_validate(policy) for policy in org.policies]
@@ -322,7 +318,7 @@ def list_organization_groups(org_id: int, current_user: User = Depends(get_curre
     org = db.query(Organization).get(org_id)
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
-    if not permissions.has_permission(db, current_user, org.id, "group:read"):
+    if not permissions.check_permission(db, current_user, "group:read", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     # Convert Group objects to GroupOut objects for proper serialization
     serializable_groups = [GroupOut.model_validate(group) for group in org.groups]
@@ -338,17 +334,16 @@ def list_organization_environments(org_id: int, current_user: User = Depends(get
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
 
-    # Query environments for this organization
-    query = db.query(Environment).filter(Environment.organization_id == org_id)
+    # Query readable environments for this organization
+    query = db.query(Environment).filter(Environment.organization_id == org_id).filter(
+        permissions.permission_filter(
+            db, current_user, "env:read",
+            organization_id=Environment.organization_id,
+            environment_id=Environment.id
+        )
+    )
     environments = query.all()
 
-    # Filter by permission
-    if not current_user.is_superadmin:
-        environments = [
-            env for env in environments
-            if permissions.has_permission(db, current_user, env.organization_id, "env:read")
-        ]
-
     # Convert Environment objects to EnvironmentOut objects for proper serialization
     serializable_environments = [EnvironmentOut.model_validate(env) for env in environments]
     return response.success_response(serializable_environments, "Organization environments retrieved")
@@ -363,7 +358,7 @@ def list_organization_users(org_id: int, current_user: User = Depends(get_curren
     org = db.query(Organization).get(org_id)
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
-    if not permissions.has_permission(db, current_user, org.id, "organization:read"):
+    if not permissions.check_permission(db, current_user, "organization:read", organization_id=org.id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     # Convert User objects to UserOut objects for proper serialization
@@ -387,21 +382,19 @@ def list_organization_elements(
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
 
-    # Get all elements from the organization
-    all_elements = org.elements
-
-    # Filter elements based on user permissions
-    accessible_elements = []
-    for element in all_elements:
-        # Check if user has permission to read this element
-        if permissions.has_permission(db, current_user, element.environment.organization_id, "element:read"):
-            # Filter by name if provided
-            if name and name.lower() not in element.name.lower():
-                continue
-            accessible_elements.append(element)
-
-    # Apply pagination
-    paginated_elements = accessible_elements[skip:skip + limit]
+    # Elements of the organization the user can read, filtered and paginated in the database
+    query = db.query(Element).options(*loader_profiles.element_out()).join(Environment, Element.environment_id == Environment.id).filter(
+        Environment.organization_id == org_id,
+        permissions.permission_filter(
+            db, current_user, "element:read",
+            organization_id=Environment.organization_id,
+            environment_id=Element.environment_id,
+            element_id=Element.id
+        )
+    )
+    if name:
+        query = query.filter(Element.name.ilike(f"%{name}%"))
+    paginated_elements = query.order_by(Element.id).offset(skip).limit(limit).all()
 
     # Convert Element objects to ElementOut objects for proper serialization
     serializable_elements = [ElementOut.model_validate(element) for element in paginated_elements]
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List
 
-from ..database.session import SessionLocal
+from ..database.session import get_db
 from ..models.user import User
 from ..repositories import policy_repo, user_repo, group_repo, tag_repo, rule_repo
 from ..schema.policy import PolicyCreate, PolicyUpdate, PolicyOut
@@ -15,13 +15,6 @@ from ..helper import permissions, audit, response
 
 router = APIRouter(prefix="/policies", tags=["policies"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("", response_model=BaseResponse[List[PolicyOut]],
     summary="List policies",
     description="Retrieves the list of policies for a given organization with pagination.",
@@ -37,7 +30,7 @@ def list_policies(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if not permissions.has_permission(db, current_user, organization_id, "policy:read"):
+    if not permissions.check_permission(db, current_user, "policy:read", organization_id=organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policies = policy_repo.list_policies(db, organization_id, skip, limit)
     return response.success_response(policies, "Policies retrieved")
@@ -55,7 +48,7 @@ def get_policy(policy_id: int, current_user: User = Depends(get_current_user), d
     policy = policy_repo.get_policy(db, policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:read"):
+    if not permissions.check_permission(db, current_user, "policy:read", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     return response.success_response(policy, "Policy retrieved")
 
@@ -68,7 +61,7 @@ def get_policy(policy_id: int, current_user: User = Depends(get_current_user), d
     403: {"description": "Insufficient permissions"}
 })
 def create_policy(policy_in: PolicyCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if not permissions.has_permission(db, current_user, policy_in.organization_id, "policy:create"):
+    if not permissions.check_permission(db, current_user, "policy:create", organization_id=policy_in.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy = policy_repo.create_policy(db, policy_in)
     audit.log_action(db, current_user.id, "Policy creation", f"Policy '{policy.name}' created")
@@ -87,7 +80,7 @@ def update_policy(policy_id: int, policy_in: PolicyUpdate, current_user: User =
     policy = policy_repo.get_policy(db, policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:update"):
+    if not permissions.check_permission(db, current_user, "policy:update", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy = policy_repo.update_policy(db, policy, policy_in)
     audit.log_action(db, current_user.id, "Policy update", f"Policy '{policy.name}' updated")
@@ -106,7 +99,7 @@ def delete_policy(policy_id: int, current_user: User = Depends(get_current_user)
     policy = policy_repo.get_policy(db, policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:delete"):
+    if not permissions.check_permission(db, current_user, "policy:delete", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy_repo.delete_policy(db, policy)
     audit.log_action(db, current_user.id, "Policy deletion", f"Policy '{policy.name}' deleted")
@@ -127,7 +120,7 @@ def list_policy_users(policy_id: int, current_user: User = Depends(get_current_u
     policy = policy_repo.get_policy(db, policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:read"):
+    if not permissions.check_permission(db, current_user, "policy:read", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     return response.success_response(policy.users, "Policy users retrieved")
 
@@ -145,7 +138,7 @@ def add_user(policy_id: int, user_id: int, current_user: User = Depends(get_curr
     user = user_repo.get_user(db, user_id)
     if not policy or not user:
         raise HTTPException(status_code=404, detail="Policy or user not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:update"):
+    if not permissions.check_permission(db, current_user, "policy:update", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy_repo.add_user(db, policy, user)
     return response.success_response(None, "User added to policy")
@@ -164,7 +157,7 @@ def remove_user(policy_id: int, user_id: int, current_user: User = Depends(get_c
     user = user_repo.get_user(db, user_id)
     if not policy or not user:
         raise HTTPException(status_code=404, detail="Policy or user not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:update"):
+    if not permissions.check_permission(db, current_user, "policy:update", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy_repo.remove_user(db, policy, user)
     return response.success_response(None, "User removed from policy")
@@ -182,7 +175,7 @@ def list_policy_groups(policy_id: int, current_user: User = Depends(get_current_
     policy = policy_repo.get_policy(db, policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:read"):
+    if not permissions.check_permission(db, current_user, "policy:read", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     return response.success_response(policy.groups, "Policy groups retrieved")
 
@@ -200,7 +193,7 @@ def add_group(policy_id: int, group_id: int, current_user: User = Depends(get_cu
     group = group_repo.get_group(db, group_id)
     if not policy or not group:
         raise HTTPException(status_code=404, detail="Policy or group not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:update"):
+    if not permissions.check_permission(db, current_user, "policy:update", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy_repo.add_group(db, policy, group)
     return response.success_response(None, "Group added to policy")
@@ -218,7 +211,7 @@ def list_rules(policy_id: int, current_user: User = Depends(get_current_user), d
     policy = policy_repo.get_policy(db, policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "rule:read"):
+    if not permissions.check_permission(db, current_user, "rule:read", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     rules = rule_repo.list_rules_for_policy(db, policy_id)
     return response.success_response(rules, "Rules retrieved")
@@ -237,7 +230,7 @@ def remove_group(policy_id: int, group_id: int, current_user: User = Depends(get
     group = group_repo.get_group(db, group_id)
     if not policy or not group:
         raise HTTPException(status_code=404, detail="Policy or group not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:update"):
+    if not permissions.check_permission(db, current_user, "policy:update", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy_repo.remove_group(db, policy, group)
     return response.success_response(None, "Group removed from policy")
@@ -256,7 +249,7 @@ def add_tag(policy_id: int, tag_id: int, current_user: User = Depends(get_curren
     tag = tag_repo.get_tag(db, tag_id)
     if not policy or not tag:
         raise HTTPException(status_code=404, detail="Policy or tag not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:update"):
+    if not permissions.check_permission(db, current_user, "policy:update", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy_repo.add_tag(db, policy, tag)
     return response.success_response(None, "Tag added to policy")
@@ -275,7 +268,7 @@ def remove_tag(policy_id: int, tag_id: int, current_user: User = Depends(get_cur
     tag = tag_repo.get_tag(db, tag_id)
     if not policy or not tag:
         raise HTTPException(status_code=404, detail="Policy or tag not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "policy:update"):
+    if not permissions.check_permission(db, current_user, "policy:update", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     policy_repo.remove_tag(db, policy, tag)
     return response.success_response(None, "Tag removed from policy")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from ..database.session import SessionLocal
+from ..database.session import get_db
 from ..repositories import rule_repo, policy_repo
 from ..schema.rule import RuleCreate, RuleUpdate, RuleOut
 from ..schema.auth import BaseResponse, EmptyData
@@ -11,13 +11,6 @@ from ..helper import permissions, audit, response
 
 router = APIRouter(prefix="/rules", tags=["rules"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("", response_model=BaseResponse[RuleOut], summary="Create a rule", description="Creates a new rule associated with a policy", responses={
     200: {"description": "Rule created successfully"},
     401: {"description": "Not authenticated"},
@@ -28,7 +21,7 @@ def create_rule(rule_in: RuleCreate, current_user: User = Depends(get_current_us
     policy = policy_repo.get_policy(db, rule_in.policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    if not permissions.has_permission(db, current_user, policy.organization_id, "rule:create"):
+    if not permissions.check_permission(db, current_user, "rule:create", organization_id=policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     rule = rule_repo.create_rule(db, **rule_in.dict())
     audit.log_action(db, current_user.id, "Rule creation", f"Rule for policy {rule.policy_id} created")
@@ -45,7 +38,7 @@ def get_rule(rule_id: int, current_user: User = Depends(get_current_user), db: S
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
     org_id = rule.policy.organization_id
-    if not permissions.has_permission(db, current_user, org_id, "rule:read"):
+    if not permissions.check_permission(db, current_user, "rule:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     return response.success_response(rule, "Rule retrieved")
 
@@ -59,7 +52,7 @@ def update_rule(rule_id: int, rule_in: RuleUpdate, current_user: User = Depends(
     rule = rule_repo.get_rule(db, rule_id)
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
-    if not permissions.has_permission(db, current_user, rule.policy.organization_id, "rule:update"):
+    if not permissions.check_permission(db, current_user, "rule:update", organization_id=rule.policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     rule = rule_repo.update_rule(db, rule, **rule_in.dict(exclude_unset=True))
     audit.log_action(db, current_user.id, "Rule update", f"Rule {rule.id} updated")
@@ -75,7 +68,7 @@ def delete_rule(rule_id: int, current_user: User = Depends(get_current_user), db
     rule = rule_repo.get_rule(db, rule_id)
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
-    if not permissions.has_permission(db, current_user, rule.policy.organization_id, "rule:delete"):
+    if not permissions.check_permission(db, current_user, "rule:delete", organization_id=rule.policy.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     rule_repo.delete_rule(db, rule)
     audit.log_action(db, current_user.id, "Rule deletion", f"Rule {rule.id} deleted")
@@ -1,13 +1,18 @@
 # app/api/tags.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, with_parent
 from typing import List
 from ..models.user import User
 from ..models.element import Element
 from ..models.environment import Environment
-from ..database.session import SessionLocal
-from ..repositories import tag_repo
+from ..models.group import Group
+from ..models.organization import Organization
+from ..models.policy import Policy
+from ..models.tag import Tag
+from ..database.session import get_db
+from ..repositories import tag_repo, loader_profiles
 from ..api.users import get_current_user
 from ..helper import permissions, audit, response
 from ..schema.tag import TagOut, TagCreate
@@ -20,13 +25,6 @@ from ..schema.environment import EnvironmentOut
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get(
     "",
     response_model=BaseResponse[List[TagOut]],
@@ -39,34 +37,17 @@ def get_db():
     }
 )
 def list_tags(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    all_tags = tag_repo.list_tags(db)
-    accessible_tags = []
-
-    for tag in all_tags:
-        # Check permissions through policies
-        if tag.policies and permissions.has_permission(db, current_user, tag.policies[0].organization_id, "tag:read"):
-            accessible_tags.append(tag)
-            continue
-
-        # Check permissions through groups
-        if tag.groups and permissions.has_permission(db, current_user, tag.groups[0].organization_id, "tag:read"):
-            accessible_tags.append(tag)
-            continue
-
-        # Check permissions through users
-        if tag.users and tag.users[0].organizations and permissions.has_permission(db, current_user, tag.users[0].organizations[0].id, "tag:read"):
-            accessible_tags.append(tag)
-            continue
-
-        # Check permissions through elements
-        if tag.elements and tag.elements[0].environment and permissions.has_permission(db, current_user, tag.elements[0].environment.organization_id, "tag:read"):
-            accessible_tags.append(tag)
-            continue
-
-        # Check permissions through environments
-        if tag.environments and permissions.has_permission(db, current_user, tag.environments[0].organization_id, "tag:read"):
-            accessible_tags.append(tag)
-            continue
+    def readable(organization_id):
+        return permissions.permission_filter(db, current_user, "tag:read", organization_id=organization_id)
+
+    # A tag is readable when one of its owners belongs to an organization where the user can read tags
+    accessible_tags = db.query(Tag).filter(or_(
+        Tag.policies.any(readable(Policy.organization_id)),
+        Tag.groups.any(readable(Group.organization_id)),
+        Tag.users.any(User.organizations.any(readable(Organization.id))),
+        Tag.elements.any(Element.environment.has(readable(Environment.organization_id))),
+        Tag.environments.any(readable(Environment.organization_id)),
+    )).all()
 
     return response.success_response(accessible_tags, "Accessible tag list retrieved")
 
@@ -100,7 +81,7 @@ def get_tag(tag_id: int, current_user: User = Depends(get_current_user), db: Ses
     elif tag.environments:
         org_id = tag.environments[0].organization_id
 
-    if not org_id or not permissions.has_permission(db, current_user, org_id, "tag:read"):
+    if not org_id or not permissions.check_permission(db, current_user, "tag:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to read this tag")
 
     return response.success_response(TagOut.model_validate(tag), "Tag retrieved successfully")
@@ -122,7 +103,7 @@ def create_tag(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if not permissions.has_permission(db, current_user, tag_in.organization_id, "tag:create"):
+    if not permissions.check_permission(db, current_user, "tag:create", organization_id=tag_in.organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to create a tag in this organization")
 
     existing = tag_repo.get_tag_by_value(db, tag_in.value)
@@ -163,7 +144,7 @@ def delete_tag(tag_id: int, current_user: User = Depends(get_current_user), db:
     elif tag.environments:
         org_id = tag.environments[0].organization_id
 
-    if not org_id or not permissions.has_permission(db, current_user, org_id, "tag:delete"):
+    if not org_id or not permissions.check_permission(db, current_user, "tag:delete", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to delete this tag")
 
     audit.log_action(db, current_user.id, "Tag deletion", f"Tag '{tag.value}' deleted (id={tag.id})")
@@ -187,7 +168,7 @@ def get_tag_groups(tag_id: int, current_user: User = Depends(get_current_user),
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     org_id = tag.groups[0].organization_id if tag.groups else None
-    if not org_id or not permissions.has_permission(db, current_user, org_id, "tag:read"):
+    if not org_id or not permissions.check_permission(db, current_user, "tag:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to read this tag")
     return response.success_response(tag.groups, "Groups retrieved")
 
@@ -208,7 +189,7 @@ def get_tag_users(tag_id: int, current_user: User = Depends(get_current_user), d
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     org_id = tag.users[0].organizations[0].id if tag.users and tag.users[0].organizations else None
-    if not org_id or not permissions.has_permission(db, current_user, org_id, "tag:read"):
+    if not org_id or not permissions.check_permission(db, current_user, "tag:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to read this tag")
     return response.success_response(tag.users, "Users retrieved")
 
@@ -229,7 +210,7 @@ def get_tag_policies(tag_id: int, current_user: User = Depends(get_current_user)
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     org_id = tag.policies[0].organization_id if tag.policies else None
-    if not org_id or not permissions.has_permission(db, current_user, org_id, "tag:read"):
+    if not org_id or not permissions.check_permission(db, current_user, "tag:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to read this tag")
     return response.success_response(tag.policies, "Policies retrieved")
 
@@ -256,10 +237,11 @@ def get_tag_elements(tag_id: int, current_user: User = Depends(get_current_user)
 
     # Check permissions on the environment organization of the first element
     org_id = tag.elements[0].environment.organization_id if tag.elements and tag.elements[0].environment else None
-    if not org_id or not permissions.has_permission(db, current_user, org_id, "tag:read"):
+    if not org_id or not permissions.check_permission(db, current_user, "tag:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to read this tag")
 
-    return response.success_response(tag.elements, "Elements retrieved")
+    elements = db.query(Element).options(*loader_profiles.element_out()).filter(with_parent(tag, Tag.elements)).all()
+    return response.success_response(elements, "Elements retrieved")
 
 @router.get(
     "/{tag_id}/environments",
@@ -284,7 +266,7 @@ def get_tag_environments(tag_id: int, current_user: User = Depends(get_current_u
 
     # Check permissions on the organization of the first environment
     org_id = tag.environments[0].organization_id if tag.environments else None
-    if not org_id or not permissions.has_permission(db, current_user, org_id, "tag:read"):
+    if not org_id or not permissions.check_permission(db, current_user, "tag:read", organization_id=org_id):
         raise HTTPException(status_code=403, detail="Insufficient permissions to read this tag")
 
     return response.success_response(tag.environments, "Environments retrieved")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from ..database.session import SessionLocal
+from ..database.session import get_db
 from ..schema.user import UserCreate, UserOut, UserUpdate, ChangePassword, ChangeSuperadmin
 from ..schema.auth import BaseResponse, EmptyData
 from ..schema.group import GroupOut
@@ -17,13 +17,6 @@ import secrets
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.post("", response_model=BaseResponse[UserOut],
     summary="Create a user in free mode",
@@ -53,7 +46,7 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
     403: {"description": "Insufficient permission"}
 })
 def create_user(organization_id: int, user_in: UserCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if not permissions.has_permission(db, current_user, organization_id, "user:create"):
+    if not permissions.check_permission(db, current_user, "user:create", organization_id=organization_id):
         raise HTTPException(status_code=403, detail="Insufficient permission")
     if user_repo.get_user_by_email(db, user_in.email):
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -83,7 +76,7 @@ def create_user(organization_id: int, user_in: UserCreate, current_user: User =
     403: {"description": "Insufficient permission"}
 })
 def list_users(current_user: User = Depends(get_current_user), db: Session = Depends(get_db), skip: int = 0, limit: int = 100, email: Optional[str] = None):
-    if not permissions.has_permission(db, current_user, None, "user:list"):
+    if not permissions.check_permission(db, current_user, "user:list"):
         raise HTTPException(status_code=403, detail="Insufficient permission")
     query = db.query(User)
     if email:
@@ -104,7 +97,7 @@ def get_user(user_id: int, current_user: User = Depends(get_current_user), db: S
     user = user_repo.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if current_user.id != user_id and  not permissions.has_permission(db, current_user, None, "user:read"):
+    if current_user.id != user_id and  not permissions.check_permission(db, current_user, "user:read"):
         raise HTTPException(status_code=403, detail="Insufficient permission")
     return response.success_response(UserOut.model_validate(user), "User retrieved successfully")
 
@@ -126,7 +119,7 @@ def update_user(user_id: int, user_in: UserUpdate, current_user: User = Depends(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if current_user.id != user_id:
-        if not permissions.has_permission(db, current_user, None, "user:update"):
+        if not permissions.check_permission(db, current_user, "user:update"):
             raise HTTPException(status_code=403, detail="Modification not authorized")
     try:
         user.first_name = user_in.first_name
@@ -155,14 +148,14 @@ def delete_user(user_id: int, current_user: User = Depends(get_current_user), db
     user = user_repo.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if not permissions.has_permission(db, current_user, None, "user:delete"):
+    if not permissions.check_permission(db, current_user, "user:delete"):
         raise HTTPException(status_code=403, detail="Not authorized")
     if user.is_superadmin:
         other_super = db.query(User).filter(User.is_superadmin == True, User.id != user.id).first()
         if not other_super:
             raise HTTPException(status_code=400, detail="Cannot delete the last superadmin")
     user_repo.delete_user(db, user)
-    audit.log_action(db, current_user.id, "User deletion", f"Deletion of user {user.email}")
+    audit.log_action(db, current_user.id, "User deletion", f"Deletion of user {user.email}", sync=True)
     return response.success_response(EmptyData(), "User deleted")
 
 @router.put("/{user_id}/password", response_model=BaseResponse[EmptyData],
@@ -179,7 +172,7 @@ def change_password(user_id: int, cp: ChangePassword, current_user: User = Depen
     user = user_repo.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if permissions.has_permission(db, current_user, None, "user:update_password") and current_user.id != user_id:
+    if permissions.check_permission(db, current_user, "user:update_password") and current_user.id != user_id:
         if cp.new_password and user.is_superadmin:
             user.hashed_password = security.get_password_hash(cp.new_password)
             db.commit()
@@ -233,7 +226,7 @@ def change_superadmin(user_id: int, change: ChangeSuperadmin, current_user: User
             raise HTTPException(status_code=400, detail="Cannot remove last superadmin")
     user.is_superadmin = change.is_superadmin
     db.commit()
-    audit.log_action(db, current_user.id, "Superadmin modification", f"Status changed for {user.email}")
+    audit.log_action(db, current_user.id, "Superadmin modification", f"Status changed for {user.email}", sync=True)
     return response.success_response(EmptyData(), "Superadmin status updated")
 
 @router.get("/{user_id}/groups", response_model=BaseResponse[List[GroupOut]],
@@ -246,7 +239,7 @@ def change_superadmin(user_id: int, change: ChangeSuperadmin, current_user: User
         404: {"description": "User not found"},
     })
 def list_user_groups(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.id != user_id and not permissions.has_permission(db, current_user, None, "user:read_groups"):
+    if current_user.id != user_id and not permissions.check_permission(db, current_user, "user:read_groups"):
         raise HTTPException(status_code=403, detail="Not authorized")
     user = user_repo.get_user(db, user_id)
     if not user:
@@ -263,7 +256,7 @@ def list_user_groups(user_id: int, current_user: User = Depends(get_current_user
         404: {"description": "User not found"},
     })
 def list_user_policies(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.id != user_id and not permissions.has_permission(db, current_user, None, "user:read_policies"):
+    if current_user.id != user_id and not permissions.check_permission(db, current_user, "user:read_policies"):
         raise HTTPException(status_code=403, detail="Not authorized")
     user = user_repo.get_user(db, user_id)
     if not user:
@@ -280,7 +273,7 @@ def list_user_policies(user_id: int, current_user: User = Depends(get_current_us
         404: {"description": "User not found"},
     })
 def list_user_organizations(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.id != user_id and not permissions.has_permission(db, current_user, None, "user:read_organizations"):
+    if current_user.id != user_id and not permissions.check_permission(db, current_user, "user:read_organizations"):
         raise HTTPException(status_code=403, detail="Not authorized")
     user = user_repo.get_user(db, user_id)
     if not user:
@@ -297,7 +290,7 @@ def list_user_organizations(user_id: int, current_user: User = Depends(get_curre
         404: {"description": "User not found"},
     })
 def list_user_tags(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.id != user_id and not permissions.has_permission(db, current_user, None, "user:read_tags"):
+    if current_user.id != user_id and not permissions.check_permission(db, current_user, "user:read_tags"):
         raise HTTPException(status_code=403, detail="Not authorized")
     user = user_repo.get_user(db, user_id)
     if not user:
@@ -314,7 +307,7 @@ def list_user_tags(user_id: int, current_user: User = Depends(get_current_user),
         404: {"description": "User not found"},
     })
 def add_tag_to_user(user_id: int, tag_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.id != user_id and not permissions.has_permission(db, current_user, None, "user:update_tags"):
+    if current_user.id != user_id and not permissions.check_permission(db, current_user, "user:update_tags"):
         raise HTTPException(status_code=403, detail="Not authorized")
     user = user_repo.get_user(db, user_id)
     tag = tag_repo.get_tag(db, tag_id)
@@ -333,7 +326,7 @@ def add_tag_to_user(user_id: int, tag_id: int, current_user: User = Depends(get_
         404: {"description": "User not found"},
     })
 def remove_tag_from_user(user_id: int, tag_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.id != user_id and not permissions.has_permission(db, current_user, None, "user:update_tags"):
+    if current_user.id != user_id and not permissions.check_permission(db, current_user, "user:update_tags"):
         raise HTTPException(status_code=403, detail="Not authorized")
     user = user_repo.get_user(db, user_id)
     tag = tag_repo.get_tag(db, tag_id)
@@ -1,13 +1,11 @@
-import os
 import datetime
-from dotenv import load_dotenv
 from authlib.jose import jwt, JoseError
 
-load_dotenv()
+from .settings import get_settings
 
-SECRET_KEY = os.getenv("SECRET_KEY")
+SECRET_KEY = get_settings().secret_key
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
+ACCESS_TOKEN_EXPIRE_MINUTES = get_settings().access_token_expire_minutes
 
 def create_token(data: dict, expires_delta: datetime.timedelta = None, token_type: str = "access") -> str:
     to_encode = data.copy()
@@ -0,0 +1,138 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/core/settings.py
+"""
+Application settings.
+
+The environment (and the `.env` file) is read once, into a frozen `Settings` object shared by the
+whole process through `get_settings()`. Modules that still read their own variables call
+`load_environment()` first, which loads the `.env` file only on its first call.
+"""
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Mapping, Optional, Tuple
+
+from dotenv import load_dotenv
+
+
+def _flag(value: Optional[str], default: bool = False) -> bool:
+    return default if value is None else value.strip().lower() == "true"
+
+
+@lru_cache(maxsize=None)
+def load_environment() -> None:
+    """Load the `.env` file into the environment, once per process."""
+    load_dotenv()
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Settings of the application, see env.example for the variables."""
+    database_url: str
+    secret_key: Optional[str] = None
+    access_token_expire_minutes: int = 60
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size: int = 268435456
+
+    smtp_server: Optional[str] = None
+    smtp_port: int = 25
+    smtp_use_tls: bool = False
+    smtp_use_ssl: bool = False
+    smtp_user: Optional[str] = None
+    smtp_password: Optional[str] = None
+    email_from: Optional[str] = None
+    frontend_base_url: Optional[str] = None
+
+    port: int = 8000
+    cors_origins: Tuple[str, ...] = field(default=(
+        "http://localhost:3001", "http://localhost:5173", "http://localhost:8080"
+    ))
+    # Create the schema and seed when the application starts
+    bootstrap_on_startup: bool = True
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = None) -> "Settings":
+        """
+        Build the settings from environment variables.
+
+        Args:
+            environ: Variables to read, defaults to os.environ
+
+        Returns:
+            The settings
+        """
+        env = os.environ if environ is None else environ
+        defaults = cls(database_url="")
+        cors_origins = env.get("CORS_ORIGINS")
+        return cls(
+            database_url=env.get("DATABASE_URL", defaults.database_url),
+            secret_key=env.get("SECRET_KEY"),
+            access_token_expire_minutes=int(env.get("ACCESS_TOKEN_EXPIRE_MINUTES", defaults.access_token_expire_minutes)),
+            db_pool_size=int(env.get("DB_POOL_SIZE", defaults.db_pool_size)),
+            db_max_overflow=int(env.get("DB_MAX_OVERFLOW", defaults.db_max_overflow)),
+            db_pool_timeout=float(env.get("DB_POOL_TIMEOUT", defaults.db_pool_timeout)),
+            db_pool_recycle=int(env.get("DB_POOL_RECYCLE", defaults.db_pool_recycle)),
+            db_pool_pre_ping=_flag(env.get("DB_POOL_PRE_PING"), defaults.db_pool_pre_ping),
+            sqlite_busy_timeout_ms=int(env.get("SQLITE_BUSY_TIMEOUT_MS", defaults.sqlite_busy_timeout_ms)),
+            sqlite_synchronous=env.get("SQLITE_SYNCHRONOUS", defaults.sqlite_synchronous),
+            sqlite_cache_size_kb=int(env.get("SQLITE_CACHE_SIZE_KB", defaults.sqlite_cache_size_kb)),
+            sqlite_mmap_size=int(env.get("SQLITE_MMAP_SIZE", defaults.sqlite_mmap_size)),
+            smtp_server=env.get("SMTP_SERVER"),
+            smtp_port=int(env.get("SMTP_PORT", defaults.smtp_port)),
+            smtp_use_tls=_flag(env.get("SMTP_USE_TLS")),
+            smtp_use_ssl=_flag(env.get("SMTP_USE_SSL")),
+            smtp_user=env.get("SMTP_USER"),
+            smtp_password=env.get("SMTP_PASSWORD"),
+            email_from=env.get("EMAIL_FROM"),
+            frontend_base_url=env.get("VITE_BASE_URL"),
+            port=int(env.get("PORT", defaults.port)),
+            cors_origins=tuple(origin.strip() for origin in cors_origins.split(",") if origin.strip())
+            if cors_origins else defaults.cors_origins,
+            bootstrap_on_startup=_flag(env.get("STARTUP_BOOTSTRAP"), defaults.bootstrap_on_startup),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """The settings of the process, read from the environment on the first call."""
+    load_environment()
+    return Settings.from_env()
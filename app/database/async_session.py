@@ -0,0 +1,83 @@
+# database/async_session.py
+"""
+Optional async database access.
+
+When DB_ASYNC is enabled the hot read endpoints are served by async handlers using an
+`AsyncSession`, so that requests idling on database I/O no longer hold a threadpool worker. The
+driver is derived from DATABASE_URL (aiosqlite for SQLite, asyncpg for PostgreSQL) unless
+ASYNC_DATABASE_URL is given; it is only imported when the async engine is first used.
+"""
+import os
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from .session import (DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_POOL_SIZE,
+                      DB_POOL_TIMEOUT, IS_SQLITE, SQLITE_BUSY_TIMEOUT_MS, configure_engine)
+from ..core.settings import load_environment
+
+load_environment()
+
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """
+    Return the async flavour of a database URL.
+
+    Args:
+        url: Sync database URL, e.g. postgresql://... or sqlite:///./app.db
+
+    Returns:
+        The URL with its driver replaced by aiosqlite or asyncpg
+    """
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the async engine, creating it on first use."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+        if IS_SQLITE:
+            options["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        else:
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL or async_database_url(), **options)
+        configure_engine(_async_engine.sync_engine)
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Open a new async session."""
+    get_async_engine()
+    return _async_sessionmaker()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async database dependency provider, one session per request"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Close the pooled connections of the async engine, if it was created."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
@@ -0,0 +1,224 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/database/bootstrap.py
+"""
+Idempotent database bootstrap run by every worker on startup.
+
+The schema DDL and the seed definition are hashed into a fingerprint stored in `schema_state`.
+When the stored fingerprint matches, startup costs one SELECT; otherwise the missing tables and
+indexes are created, the seed runs and the new fingerprint is stored. On PostgreSQL an advisory
+lock makes concurrent workers wait for the first one instead of repeating its work.
+
+A unique index declared on a table that already holds duplicate values is not created: the
+duplicates are logged, to be resolved before bootstrapping again (STARTUP_FORCE_BOOTSTRAP=true).
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import Index, bindparam, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable, DropIndex
+
+from .base import Base
+from . import seed as seed_module
+from ..models.schema_state import SchemaState
+from ..models import types
+from ..core.settings import load_environment
+
+load_environment()
+
+# Force the full bootstrap even when the fingerprint matches
+STARTUP_FORCE_BOOTSTRAP = os.getenv("STARTUP_FORCE_BOOTSTRAP", "false").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = "bootstrap"
+# Arbitrary key of the PostgreSQL advisory lock serializing the bootstrap
+_LOCK_KEY = 7311505
+
+# Filled by app.main once the worker is ready: seconds, bootstrap_seconds, bootstrap_applied
+startup_metrics: dict = {}
+
+
+def fingerprint(engine: Engine) -> str:
+    """Hash of the DDL of every declared table and index, and of the seed definition."""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode("utf-8"))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode("utf-8"))
+    digest.update(json.dumps(seed_module.seed_definition(), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stored_fingerprint(conn: Connection) -> Optional[str]:
+    """The fingerprint of the last bootstrap, or None on a database never bootstrapped."""
+    try:
+        return conn.execute(select(SchemaState.fingerprint).where(SchemaState.key == FINGERPRINT_KEY)).scalar()
+    except DBAPIError:
+        # Table absente
+        conn.rollback()
+        return None
+
+
+def _add_missing_columns(engine: Engine):
+    # create_all does not alter existing tables: add the nullable columns declared since.
+    # Inspected on the connection that alters, so that SQLite reads its current schema
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present and column.nullable and not column.primary_key:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}")
+
+
+def _backfill_ip_keys(engine: Engine):
+    # Rows written before the key columns existed, or by raw SQL
+    with engine.begin() as conn:
+        for table, sources in types.IP_KEY_COLUMNS.items():
+            if table.metadata is not Base.metadata:
+                continue
+            pk = table.primary_key.columns.values()[0]
+            for source, keys in sources:
+                rows = conn.execute(
+                    select(pk, table.c[source]).where(table.c[next(iter(keys))].is_(None), table.c[source].isnot(None))
+                ).all()
+                if not rows:
+                    continue
+                conn.execute(
+                    table.update().where(pk == bindparam("_pk")).values({name: bindparam(f"_{name}") for name in keys}),
+                    [{"_pk": row[0], **{f"_{name}": compute(row[1]) for name, compute in keys.items()}} for row in rows]
+                )
+
+
+def _duplicates(conn: Connection, index: Index) -> List[tuple]:
+    """A few values present more than once in the columns of a unique index."""
+    columns = list(index.columns)
+    return [tuple(row) for row in conn.execute(
+        select(*columns).where(*(column.isnot(None) for column in columns))
+        .group_by(*columns).having(func.count() > 1).limit(5)
+    )]
+
+
+def _casts_json_attribute(conn: Connection, index: Index) -> bool:
+    """Whether a JSON attribute index of PostgreSQL still holds the cast values it was first created with."""
+    if not any(isinstance(expression, types.JSONAttribute) for expression in index.expressions):
+        return False
+    definition = conn.execute(text("SELECT pg_get_indexdef(CAST(:name AS regclass))"), {"name": index.name}).scalar()
+    return "::" in definition.replace("::text", "")
+
+
+def _create_indexes(engine: Engine):
+    # create_all only creates missing tables: add the indexes declared since on existing tables.
+    # IF NOT EXISTS rather than checkfirst, which does not see expression indexes on SQLite
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {index["name"]: index for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.unique and not existing.get(index.name, {}).get("unique", False):
+                    duplicates = _duplicates(conn, index)
+                    if duplicates:
+                        logger.warning("Unique index %s not created: %s holds duplicate values, such as %s",
+                                       index.name, table.name, ", ".join(map(str, duplicates)))
+                        continue
+                    if index.name in existing:
+                        # Declared unique since it was created
+                        conn.execute(DropIndex(index))
+                elif conn.dialect.name == "postgresql" and index.name in existing and _casts_json_attribute(conn, index):
+                    # A value of another type than the declared one failed every write through the cast
+                    conn.execute(DropIndex(index))
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _apply(engine: Engine, session_factory: Callable[[], Session], current: str):
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    _backfill_ip_keys(engine)
+    _create_indexes(engine)
+    db = session_factory()
+    try:
+        seed_module.seed(db)
+        state = db.get(SchemaState, FINGERPRINT_KEY) or SchemaState(key=FINGERPRINT_KEY)
+        state.fingerprint = current
+        db.add(state)
+        db.commit()
+    finally:
+        db.close()
+
+
+def bootstrap(engine: Engine, session_factory: Callable[[], Session], force: bool = STARTUP_FORCE_BOOTSTRAP) -> dict:
+    """
+    Create the schema and seed the database unless the stored fingerprint is current.
+
+    Args:
+        engine: Engine of the application database
+        session_factory: Factory of the sessions used to seed
+        force: Run the bootstrap even if the fingerprint matches
+
+    Returns:
+        A report with whether the bootstrap was applied and its duration in seconds
+    """
+    started = time.perf_counter()
+    current = fingerprint(engine)
+    with engine.connect() as conn:
+        applied = force or stored_fingerprint(conn) != current
+    if applied:
+        with engine.connect() as lock_conn:
+            is_postgresql = engine.dialect.name == "postgresql"
+            if is_postgresql:
+                lock_conn.exec_driver_sql(f"SELECT pg_advisory_lock({_LOCK_KEY})")
+            try:
+                # Another worker may have completed the bootstrap while this one waited for the lock
+                if force or stored_fingerprint(lock_conn) != current:
+                    lock_conn.rollback()
+                    _apply(engine, session_factory, current)
+                else:
+                    applied = False
+            finally:
+                if is_postgresql:
+                    lock_conn.exec_driver_sql(f"SELECT pg_advisory_unlock({_LOCK_KEY})")
+                    lock_conn.commit()
+    return {"applied": applied, "fingerprint": current, "seconds": time.perf_counter() - started}
@@ -1,7 +1,7 @@
 import os
-from typing import Optional
+from typing import List, Optional
 
-from dotenv import load_dotenv
+from sqlalchemy import insert, select, tuple_
 from sqlalchemy.orm import Session
 
 from ..helper.security import get_password_hash
@@ -9,12 +9,14 @@ from ..models.user import User
 from ..models.function import Function
 from ..models.organization import Organization
 from ..models.group import Group
-from ..models.policy import Policy
-from ..repositories import group_repo, user_repo, policy_repo, rule_repo
-from ..schema.policy import PolicyCreate
+from ..models.group import user_groups
+from ..models.organization import user_organizations
+from ..models.policy import Policy, policy_groups
+from ..models.rule import Rule
+from ..core.settings import load_environment
 
 # Charger les variables d'environnement
-load_dotenv()
+load_environment()
 
 DEFAULT_FUNCTIONS = [
     # Permissions d'administration générale
@@ -79,12 +81,26 @@ DEFAULT_FUNCTIONS = [
     {"name": "organization:delete", "description": "Supprimer une organisation."},
 ]
 
+DEFAULT_ORGANIZATION = {"name": "Default Org", "description": "Organisation par défaut pour initialisation."}
+
 DEFAULT_GROUPS = [
     {"name": "Administrators", "description": "Groupe des administrateurs avec tous les privilèges."},
     {"name": "Users", "description": "Groupe des utilisateurs standard."},
     {"name": "Viewers", "description": "Groupe avec accès en lecture seule."},
 ]
 
+# Policies par défaut : nom (suffixé par l'organisation), groupe associé et fonctions des règles
+DEFAULT_POLICIES = [
+    {"name": "Admin Policy", "description": "Policy complète pour les administrateurs",
+     "group": "Administrators", "functions": ["admin"]},
+    {"name": "Users Policy", "description": "Policy standard pour les utilisateurs",
+     "group": "Users", "functions": ["env:read", "element:read", "user:read_groups", "user:read_policies",
+                                     "user:read_organizations", "user:read_tags"]},
+    {"name": "Viewers Policy", "description": "Policy en lecture seule pour les viewers",
+     "group": "Viewers", "functions": ["env:read", "element:read", "user:read", "group:read", "policy:read",
+                                       "tag:read", "organization:read"]},
+]
+
 def get_env_var(name: str) -> Optional[str]:
     """Helper pour récupérer une variable d'environnement avec vérification"""
     value = os.environ.get(name)
@@ -92,141 +108,106 @@ def get_env_var(name: str) -> Optional[str]:
         return None
     return value.strip()
 
+def seed_definition() -> dict:
+    """Everything the seed depends on, used in the startup fingerprint"""
+    return {
+        "functions": DEFAULT_FUNCTIONS,
+        "organization": DEFAULT_ORGANIZATION,
+        "groups": DEFAULT_GROUPS,
+        "policies": DEFAULT_POLICIES,
+        "superadmin": get_env_var("SUPERADMIN_EMAIL"),
+    }
+
+def _insert_missing(db: Session, table, rows: List[dict], keys: List[str]) -> List[dict]:
+    """
+    Insert the rows whose key is not in the table yet, with one SELECT and one multi-row INSERT.
+
+    Args:
+        db: The database session
+        table: The table to seed
+        rows: The rows to ensure, duplicates on the key are ignored
+        keys: The columns identifying a row
+
+    Returns:
+        The inserted rows
+    """
+    wanted = {}
+    for row in rows:
+        wanted.setdefault(tuple(row[key] for key in keys), row)
+    if not wanted:
+        return []
+    columns = [table.c[key] for key in keys]
+    if len(columns) == 1:
+        condition = columns[0].in_([key[0] for key in wanted])
+    else:
+        condition = tuple_(*columns).in_(list(wanted))
+    existing = {tuple(row) for row in db.execute(select(*columns).where(condition))}
+    missing = [row for key, row in wanted.items() if key not in existing]
+    if missing:
+        db.execute(insert(table), missing)
+    return missing
+
 def seed_functions(db: Session):
-    for func_data in DEFAULT_FUNCTIONS:
-        existing = db.query(Function).filter(Function.name == func_data["name"]).first()
-        if not existing:
-            db.add(Function(**func_data))
+    _insert_missing(db, Function.__table__, DEFAULT_FUNCTIONS, ["name"])
     db.commit()
 
 def seed_organization(db: Session) -> Organization:
     """Crée une organisation par défaut s'il n'en existe aucune"""
-    org = db.query(Organization).filter(Organization.name == "Default Org").first()
-    if not org:
-        org = Organization(name="Default Org", description="Organisation par défaut pour initialisation.")
-        db.add(org)
-        db.commit()
-        db.refresh(org)
-    return org
+    _insert_missing(db, Organization.__table__, [DEFAULT_ORGANIZATION], ["name"])
+    db.commit()
+    return db.query(Organization).filter(Organization.name == DEFAULT_ORGANIZATION["name"]).first()
 
 def seed_default_groups(db: Session, organization: Organization):
     """Crée les groupes par défaut pour l'organisation"""
-    for group_data in DEFAULT_GROUPS:
-        existing = db.query(Group).filter(
-            Group.name == group_data["name"],
-            Group.organization_id == organization.id
-        ).first()
-        if not existing:
-            group_repo.create_group(
-                db,
-                organization_id=organization.id,
-                name=group_data["name"],
-                description=group_data["description"]
-            )
-            print(f"✅ Groupe '{group_data['name']}' créé pour l'organisation '{organization.name}'")
+    created = _insert_missing(db, Group.__table__, [
+        {**group_data, "organization_id": organization.id} for group_data in DEFAULT_GROUPS
+    ], ["name", "organization_id"])
+    db.commit()
+    for group_data in created:
+        print(f"✅ Groupe '{group_data['name']}' créé pour l'organisation '{organization.name}'")
 
 def seed_default_policies_and_rules(db: Session, organization: Organization):
     """Crée les policies par défaut avec leurs règles pour chaque groupe"""
-
-    # Récupérer les groupes
-    admin_group = db.query(Group).filter(
-        Group.name == "Administrators",
-        Group.organization_id == organization.id
-    ).first()
-
-    users_group = db.query(Group).filter(
-        Group.name == "Users",
-        Group.organization_id == organization.id
-    ).first()
-
-    viewers_group = db.query(Group).filter(
-        Group.name == "Viewers",
-        Group.organization_id == organization.id
-    ).first()
-
-    if not admin_group or not users_group or not viewers_group:
+    groups = dict(db.execute(select(Group.name, Group.id).where(
+        Group.organization_id == organization.id,
+        Group.name.in_([policy_data["group"] for policy_data in DEFAULT_POLICIES])
+    )).all())
+    if len(groups) < len(DEFAULT_POLICIES):
         print("⚠️ Groupes par défaut non trouvés, impossible de créer les policies")
         return
-
-    # Récupérer les fonctions
-    admin_function = db.query(Function).filter(Function.name == "admin").first()
-
-    # Fonctions pour les utilisateurs standard
-    user_functions = db.query(Function).filter(Function.name.in_([
-        "env:read", "element:read", "user:read_groups", "user:read_policies",
-        "user:read_organizations", "user:read_tags"
-    ])).all()
-
-    # Fonctions pour les viewers (lecture seule)
-    viewer_functions = db.query(Function).filter(Function.name.in_([
-        "env:read", "element:read", "user:read", "group:read", "policy:read",
-        "tag:read", "organization:read"
-    ])).all()
-
-    # Créer la policy pour les Administrators
-    admin_policy_name = f"Admin Policy - {organization.name}"
-    existing_admin_policy = db.query(Policy).filter(
-        Policy.name == admin_policy_name,
-        Policy.organization_id == organization.id
-    ).first()
-
-    if not existing_admin_policy and admin_function:
-        admin_policy = policy_repo.create_policy(db, PolicyCreate(
-            name=admin_policy_name,
-            description="Policy complète pour les administrateurs",
-            organization_id=organization.id
-        ))
-
-        # Ajouter la règle admin (accès complet)
-        rule_repo.create_rule(db, admin_policy.id, admin_function.id)
-
-        # Associer la policy au groupe Administrators
-        policy_repo.add_group(db, admin_policy, admin_group)
-        print(f"✅ Policy '{admin_policy_name}' créée avec règle admin")
-
-    # Créer la policy pour les Users
-    users_policy_name = f"Users Policy - {organization.name}"
-    existing_users_policy = db.query(Policy).filter(
-        Policy.name == users_policy_name,
-        Policy.organization_id == organization.id
-    ).first()
-
-    if not existing_users_policy and user_functions:
-        users_policy = policy_repo.create_policy(db, PolicyCreate(
-            name=users_policy_name,
-            description="Policy standard pour les utilisateurs",
-            organization_id=organization.id
-        ))
-
-        # Ajouter les règles pour les utilisateurs
-        for func in user_functions:
-            rule_repo.create_rule(db, users_policy.id, func.id)
-
-        # Associer la policy au groupe Users
-        policy_repo.add_group(db, users_policy, users_group)
-        print(f"✅ Policy '{users_policy_name}' créée avec {len(user_functions)} règles")
-
-    # Créer la policy pour les Viewers
-    viewers_policy_name = f"Viewers Policy - {organization.name}"
-    existing_viewers_policy = db.query(Policy).filter(
-        Policy.name == viewers_policy_name,
-        Policy.organization_id == organization.id
-    ).first()
-
-    if not existing_viewers_policy and viewer_functions:
-        viewers_policy = policy_repo.create_policy(db, PolicyCreate(
-            name=viewers_policy_name,
-            description="Policy en lecture seule pour les viewers",
-            organization_id=organization.id
-        ))
-
-        # Ajouter les règles pour les viewers
-        for func in viewer_functions:
-            rule_repo.create_rule(db, viewers_policy.id, func.id)
-
-        # Associer la policy au groupe Viewers
-        policy_repo.add_group(db, viewers_policy, viewers_group)
-        print(f"✅ Policy '{viewers_policy_name}' créée avec {len(viewer_functions)} règles")
+    functions = dict(db.execute(select(Function.name, Function.id).where(
+        Function.name.in_([name for policy_data in DEFAULT_POLICIES for name in policy_data["functions"]])
+    )).all())
+
+    # Une policy sans aucune fonction existante n'est pas créée
+    definitions = {
+        f"{policy_data['name']} - {organization.name}": policy_data
+        for policy_data in DEFAULT_POLICIES
+        if any(name in functions for name in policy_data["functions"])
+    }
+    created = _insert_missing(db, Policy.__table__, [
+        {"name": name, "description": policy_data["description"], "organization_id": organization.id}
+        for name, policy_data in definitions.items()
+    ], ["name", "organization_id"])
+    if not created:
+        return
+    policy_ids = dict(db.execute(select(Policy.name, Policy.id).where(
+        Policy.organization_id == organization.id,
+        Policy.name.in_([row["name"] for row in created])
+    )).all())
+
+    # Règles et associations aux groupes des seules policies créées
+    rules, links = [], []
+    for name, policy_id in policy_ids.items():
+        policy_data = definitions[name]
+        rules.extend({"policy_id": policy_id, "function_id": functions[function_name]}
+                     for function_name in policy_data["functions"] if function_name in functions)
+        links.append({"policy_id": policy_id, "group_id": groups[policy_data["group"]]})
+    db.execute(insert(Rule.__table__), rules)
+    db.execute(insert(policy_groups), links)
+    db.commit()
+    for name in policy_ids:
+        print(f"✅ Policy '{name}' créée")
 
 def seed_superadmin(db: Session, organization: Organization):
     email = get_env_var("SUPERADMIN_EMAIL")
@@ -235,9 +216,9 @@ def seed_superadmin(db: Session, organization: Organization):
         print("⚠️ SUPERADMIN_EMAIL ou SUPERADMIN_PASSWORD non défini dans le .env")
         return
 
-    existing = db.query(User).filter(User.email == email, User.is_superadmin == True).first()
-    if not existing:
-        new_admin = User(
+    superadmin = db.query(User).filter(User.email == email, User.is_superadmin == True).first()
+    if not superadmin:
+        superadmin = User(
             username=email.split("@")[0],
             email=email,
             first_name="Super",
@@ -245,36 +226,24 @@ def seed_superadmin(db: Session, organization: Organization):
             hashed_password=get_password_hash(password),
             is_superadmin=True
         )
-        db.add(new_admin)
-        db.commit()
-        db.refresh(new_admin)
-
-        # Attacher le superadmin à l'organisation par défaut
-        user_repo.add_user_to_organization(db, new_admin, organization)
-        print(f"✅ Superadmin seedé et attaché à l'organisation '{organization.name}'")
-
-        # Ajouter le superadmin au groupe Administrators
-        admin_group = db.query(Group).filter(
-            Group.name == "Administrators",
-            Group.organization_id == organization.id
-        ).first()
-        if admin_group:
-            group_repo.add_user_to_group(db, admin_group, new_admin)
-            print(f"✅ Superadmin ajouté au groupe 'Administrators'")
-    else:
-        # Si le superadmin existe déjà, vérifier qu'il est bien attaché à l'organisation
-        if organization not in existing.organizations:
-            user_repo.add_user_to_organization(db, existing, organization)
-            print(f"✅ Superadmin existant attaché à l'organisation '{organization.name}'")
-
-        # Vérifier qu'il est dans le groupe Administrators
-        admin_group = db.query(Group).filter(
-            Group.name == "Administrators",
-            Group.organization_id == organization.id
-        ).first()
-        if admin_group and existing not in admin_group.users:
-            group_repo.add_user_to_group(db, admin_group, existing)
-            print(f"✅ Superadmin existant ajouté au groupe 'Administrators'")
+        db.add(superadmin)
+        db.flush()
+        print("✅ Superadmin seedé")
+
+    # Attacher le superadmin à l'organisation par défaut et au groupe Administrators
+    if _insert_missing(db, user_organizations, [
+        {"user_id": superadmin.id, "organization_id": organization.id}
+    ], ["user_id", "organization_id"]):
+        print(f"✅ Superadmin attaché à l'organisation '{organization.name}'")
+    admin_group_id = db.execute(select(Group.id).where(
+        Group.name == "Administrators",
+        Group.organization_id == organization.id
+    )).scalar()
+    if admin_group_id and _insert_missing(db, user_groups, [
+        {"user_id": superadmin.id, "group_id": admin_group_id}
+    ], ["user_id", "group_id"]):
+        print("✅ Superadmin ajouté au groupe 'Administrators'")
+    db.commit()
 
 def seed(db: Session):
     seed_functions(db)
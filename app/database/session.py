@@ -1,16 +1,121 @@
 # database/session.py
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+import threading
+import time
+from typing import Dict, Iterator
 
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from ..core.settings import get_settings
 
-# Pour SQLite, ajouter les arguments spécifiques
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+_settings = get_settings()
+DATABASE_URL = _settings.database_url
+
+# Réglages du pool de connexions (PostgreSQL et fichiers SQLite)
+DB_POOL_SIZE = _settings.db_pool_size
+DB_MAX_OVERFLOW = _settings.db_max_overflow
+DB_POOL_TIMEOUT = _settings.db_pool_timeout
+DB_POOL_RECYCLE = _settings.db_pool_recycle
+DB_POOL_PRE_PING = _settings.db_pool_pre_ping
+
+# Pragmas appliqués à chaque connexion SQLite
+SQLITE_BUSY_TIMEOUT_MS = _settings.sqlite_busy_timeout_ms
+SQLITE_SYNCHRONOUS = _settings.sqlite_synchronous
+SQLITE_CACHE_SIZE_KB = _settings.sqlite_cache_size_kb
+SQLITE_MMAP_SIZE = _settings.sqlite_mmap_size
+
+_url = make_url(DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+_SQLITE_IN_MEMORY = IS_SQLITE and _url.database in (None, "", ":memory:")
+
+_wait_lock = threading.Lock()
+_checkout_wait = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording the time spent waiting for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            with _wait_lock:
+                _checkout_wait["count"] += 1
+                _checkout_wait["total_seconds"] += waited
+                _checkout_wait["max_seconds"] = max(_checkout_wait["max_seconds"], waited)
+
+
+def engine_options() -> Dict:
+    """Return the pool and connection arguments of the configured database"""
+    if _SQLITE_IN_MEMORY:
+        # Base en mémoire : une seule connexion par thread, pas de pool à régler
+        return {"connect_args": {"check_same_thread": False}}
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if IS_SQLITE:
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        if not _SQLITE_IN_MEMORY:
+            # WAL : les lectures ne bloquent plus les écritures des autres workers
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+
+def configure_engine(target_engine):
+    """Register the per-connection settings on an engine (pragmas for SQLite)"""
+    if IS_SQLITE:
+        event.listen(target_engine, "connect", _set_sqlite_pragmas)
+
+
+engine = create_engine(DATABASE_URL, **engine_options())
+configure_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_db() -> Iterator[Session]:
+    """Database dependency provider, one session per request"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def pool_stats() -> Dict:
+    """
+    Return the connection pool metrics.
+
+    Returns:
+        Pool size, checked-out connections, current overflow and checkout wait statistics
+    """
+    pool = engine.pool
+    with _wait_lock:
+        wait = dict(_checkout_wait)
+    return {
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else None,
+        "checkout_wait_count": wait["count"],
+        "checkout_wait_total_seconds": wait["total_seconds"],
+        "checkout_wait_max_seconds": wait["max_seconds"],
+    }
@@ -1,4 +1,24 @@
+import os
+
+
 from ..repositories import audit_log_repo
+from . import audit_sink
+from ..core.settings import load_environment
+
+load_environment()
+
+# Ecrit chaque entrée immédiatement dans la transaction de la requête (désactive le writer par lots)
+AUDIT_SYNC = os.getenv("AUDIT_SYNC", "false").lower() == "true"
+
+def log_action(db, user_id: int, action: str, details: str = None, sync: bool = False):
+    """
+    Enregistre une action dans le journal d'audit.
 
-def log_action(db, user_id: int, action: str, details: str = None):
-    audit_log_repo.create_audit_log(db, user_id, action, details)
+    Par défaut l'entrée est mise en file et écrite par lot en arrière-plan (voir audit_sink).
+    `sync=True` l'écrit immédiatement, pour les actions dont la trace doit être garantie
+    avant de répondre.
+    """
+    if sync or AUDIT_SYNC:
+        audit_log_repo.create_audit_log(db, user_id, action, details)
+    else:
+        audit_sink.sink.enqueue(user_id, action, details)
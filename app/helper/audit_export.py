@@ -0,0 +1,124 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/helper/audit_export.py
+"""
+Encoders for the audit log export.
+
+Each encoder turns an iterator of audit rows (EXPORT_COLUMNS order) into an iterator of byte
+chunks, so the export is produced and sent while the rows are read.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from ..repositories.audit_log_repo import EXPORT_COLUMNS
+
+# Rows written to one chunk before it is handed to the response
+CHUNK_ROWS = 500
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _timestamp(value: datetime) -> str:
+    # Timestamps are stored in UTC, some drivers return them naive
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def iter_ndjson(rows: Iterable) -> Iterator[bytes]:
+    """One JSON object per line."""
+    lines = []
+    for row in rows:
+        entry = dict(zip(EXPORT_COLUMNS, row))
+        entry["timestamp"] = _timestamp(entry["timestamp"])
+        lines.append(json.dumps(entry, ensure_ascii=False))
+        if len(lines) >= CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(rows: Iterable) -> Iterator[bytes]:
+    """CSV with a header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow([*row[:-1], _timestamp(row[-1])])
+        count += 1
+        if count >= CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a stream of chunks into a single gzip stream."""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode(rows: Iterable, export_format: str, compress: bool = False) -> Iterator[bytes]:
+    """
+    Encode audit rows for an export.
+
+    Args:
+        rows: Audit rows in EXPORT_COLUMNS order
+        export_format: "ndjson" or "csv"
+        compress: Whether to gzip the output
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if export_format == "ndjson":
+        chunks = iter_ndjson(rows)
+    elif export_format == "csv":
+        chunks = iter_csv(rows)
+    else:
+        raise ValueError(f"Unknown export format: {export_format}")
+    return gzip_stream(chunks) if compress else chunks
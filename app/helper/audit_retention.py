@@ -0,0 +1,629 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/helper/audit_retention.py
+"""
+Audit log retention.
+
+Audit data is split by calendar month (UTC) and moves through three tiers:
+
+* hot: the `audit_logs` table, served by `/audit-logs`. On PostgreSQL the table is natively
+  partitioned by month (see `partition_audit_logs`), so the hot tier is every partition still
+  within the retention window. On SQLite only the last AUDIT_HOT_MONTHS months stay in the table,
+  older months are moved to one database file per month in AUDIT_PARTITION_DIR, which is attached
+  only while it is read or written.
+* cold: months older than AUDIT_RETENTION_MONTHS are written to append-only, gzip-compressed JSONL
+  files (one per month) in AUDIT_ARCHIVE_DIR, then dropped from the database. Each append is a
+  separate gzip member; `index.json` records the time range, id range and count of every member so
+  that a query only opens the files overlapping the requested range.
+
+Archived rows are first written to a pending chunk next to the archive; the chunk is appended to
+the archive only once their removal from the database is committed. A pass interrupted in between
+leaves the pending chunk, which the next pass appends if the rows are gone and drops otherwise, so
+no row is archived twice.
+
+`rotate()` runs one retention pass. It is idempotent, serialized across workers by a PostgreSQL
+advisory lock, and can be run from a scheduler with `python -m app.helper.audit_retention`, or on
+startup with AUDIT_RETENTION_ON_STARTUP=true.
+`read_archived()` queries the tiers that left the hot table.
+"""
+import glob
+import gzip
+import json
+import os
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import DateTime, bindparam, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from ..models.audit_log import AuditLog
+from ..core.settings import load_environment
+
+load_environment()
+
+AUDIT_HOT_MONTHS = int(os.getenv("AUDIT_HOT_MONTHS", 3))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", 12))
+AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", 2))
+AUDIT_PARTITION_DIR = os.getenv("AUDIT_PARTITION_DIR", "./audit_partitions")
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "./audit_archive")
+AUDIT_RETENTION_ON_STARTUP = os.getenv("AUDIT_RETENTION_ON_STARTUP", "false").lower() == "true"
+
+COLUMNS = ("id", "user_id", "action", "details", "timestamp")
+_COLUMN_LIST = ", ".join(COLUMNS)
+_TABLE = AuditLog.__tablename__
+_PARTITION_NAME = re.compile(rf"^{_TABLE}_(\d{{4}})_(\d{{2}})$")
+
+_PENDING_SUFFIX = ".pending.gz"
+# Arbitrary key of the PostgreSQL advisory lock serializing the retention passes
+_LOCK_KEY = 7311506
+
+_index_lock = threading.Lock()
+_rotate_lock = threading.Lock()
+
+
+# Months
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the UTC month containing `value` (naive values are taken as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def month_key(month: datetime) -> str:
+    return f"{month.year:04d}_{month.month:02d}"
+
+
+def _parse_month_key(key: str) -> datetime:
+    year, month = key.split("_")
+    return datetime(int(year), int(month), 1, tzinfo=timezone.utc)
+
+
+def _cutoffs(now: datetime = None):
+    current = month_start(now or datetime.now(timezone.utc))
+    archive_cutoff = add_months(current, -AUDIT_RETENTION_MONTHS)
+    hot_cutoff = max(add_months(current, -AUDIT_HOT_MONTHS), archive_cutoff)
+    return current, hot_cutoff, archive_cutoff
+
+
+def _range_params(start: datetime, end: datetime):
+    # Typed binds so that the timestamps are rendered like the ORM writes them
+    return [bindparam("start", start, type_=DateTime(timezone=True)),
+            bindparam("end", end, type_=DateTime(timezone=True))]
+
+
+def _row_to_entry(row) -> Dict:
+    entry = dict(zip(COLUMNS, row))
+    timestamp = entry["timestamp"]
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    entry["timestamp"] = timestamp
+    return entry
+
+
+# Cold archive
+
+def _archive_path(key: str) -> str:
+    return os.path.join(AUDIT_ARCHIVE_DIR, f"{_TABLE}_{key}.jsonl.gz")
+
+
+def _index_path() -> str:
+    return os.path.join(AUDIT_ARCHIVE_DIR, "index.json")
+
+
+def load_archive_index() -> Dict[str, List[Dict]]:
+    """Return the archive index: file name -> list of appended chunks with their ranges."""
+    try:
+        with open(_index_path(), "r", encoding="utf-8") as index_file:
+            return json.load(index_file)
+    except FileNotFoundError:
+        return {}
+
+
+def _entry_line(entry: Dict) -> str:
+    return json.dumps({**entry, "timestamp": entry["timestamp"].isoformat()}) + "\n"
+
+
+def _read_chunk(path: str) -> List[Dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as chunk:
+        entries = [json.loads(line) for line in chunk]
+    for entry in entries:
+        entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+    return entries
+
+
+def archive_entries(key: str, entries: List[Dict]) -> int:
+    """
+    Append entries of one month to its compressed archive and record the chunk in the index.
+
+    Args:
+        key: Month of the entries (YYYY_MM)
+        entries: Audit entries as dicts with the audit_logs columns
+
+    Returns:
+        The number of archived entries
+    """
+    if not entries:
+        return 0
+    os.makedirs(AUDIT_ARCHIVE_DIR, exist_ok=True)
+    path = _archive_path(key)
+    with _index_lock:
+        # Appending to a gzip file adds a new member; readers see one continuous stream
+        with gzip.open(path, "at", encoding="utf-8") as archive:
+            for entry in entries:
+                archive.write(_entry_line(entry))
+        index = load_archive_index()
+        index.setdefault(os.path.basename(path), []).append({
+            "start": min(entry["timestamp"] for entry in entries).isoformat(),
+            "end": max(entry["timestamp"] for entry in entries).isoformat(),
+            "min_id": min(entry["id"] for entry in entries),
+            "max_id": max(entry["id"] for entry in entries),
+            "count": len(entries),
+        })
+        tmp_path = _index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, _index_path())
+    return len(entries)
+
+
+def _stage(key: str, entries: List[Dict]) -> Optional[str]:
+    """Write entries of one month to a pending chunk, to be published once they are removed from the database."""
+    if not entries:
+        return None
+    os.makedirs(AUDIT_ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(AUDIT_ARCHIVE_DIR, f"{_TABLE}_{key}.{uuid.uuid4().hex}{_PENDING_SUFFIX}")
+    with gzip.open(path, "wt", encoding="utf-8") as chunk:
+        for entry in entries:
+            chunk.write(_entry_line(entry))
+    return path
+
+
+def _publish(key: str, entries: List[Dict], path: Optional[str]) -> int:
+    archived = archive_entries(key, entries)
+    if path is not None:
+        os.remove(path)
+    return archived
+
+
+def _unstage(paths: Iterable[Optional[str]]):
+    for path in paths:
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+def _still_stored(engine: Engine, key: str, entries: List[Dict]) -> bool:
+    # The rows of a chunk are removed together: any of them left means the removal was not committed
+    month = _parse_month_key(key)
+    where = "timestamp >= :start AND timestamp < :end AND id BETWEEN :min_id AND :max_id"
+    params = [*_range_params(month, add_months(month, 1)),
+              bindparam("min_id", min(entry["id"] for entry in entries)),
+              bindparam("max_id", max(entry["id"] for entry in entries))]
+    with engine.connect() as conn:
+        if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {_TABLE} WHERE {where})").bindparams(*params)).scalar():
+            return True
+        if engine.dialect.name != "sqlite" or not os.path.exists(_sqlite_month_path(key)):
+            return False
+        conn.commit()
+        alias = _attach(conn, key)
+        try:
+            stored = conn.execute(
+                text(f"SELECT EXISTS (SELECT 1 FROM {alias}.{_TABLE} WHERE {where})").bindparams(*params)
+            ).scalar()
+            conn.rollback()
+        finally:
+            _detach(conn, alias)
+    return bool(stored)
+
+
+def _recover_staged(engine: Engine) -> int:
+    """Publish the pending chunks of an interrupted pass whose rows were removed, drop the others."""
+    archived = 0
+    for path in sorted(glob.glob(os.path.join(AUDIT_ARCHIVE_DIR, f"{_TABLE}_*{_PENDING_SUFFIX}"))):
+        key = os.path.basename(path)[len(_TABLE) + 1:].split(".", 1)[0]
+        entries = _read_chunk(path)
+        if entries and not _still_stored(engine, key, entries):
+            archived += _publish(key, entries, path)
+        else:
+            os.remove(path)
+    return archived
+
+
+def _iter_archive(since: datetime, until: datetime) -> Iterator[Dict]:
+    for name, chunks in load_archive_index().items():
+        if not any(datetime.fromisoformat(chunk["start"]) < until and datetime.fromisoformat(chunk["end"]) >= since
+                   for chunk in chunks):
+            continue
+        with gzip.open(os.path.join(AUDIT_ARCHIVE_DIR, name), "rt", encoding="utf-8") as archive:
+            for line in archive:
+                entry = json.loads(line)
+                entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+                if since <= entry["timestamp"] < until:
+                    yield entry
+
+
+# SQLite month files
+
+def _sqlite_month_path(key: str) -> str:
+    return os.path.join(AUDIT_PARTITION_DIR, f"{_TABLE}_{key}.db")
+
+
+def _sqlite_month_keys() -> List[str]:
+    keys = []
+    for path in glob.glob(os.path.join(AUDIT_PARTITION_DIR, f"{_TABLE}_*.db")):
+        match = _PARTITION_NAME.match(os.path.basename(path)[:-3])
+        if match:
+            keys.append(f"{match.group(1)}_{match.group(2)}")
+    return sorted(keys)
+
+
+def _attach(conn: Connection, key: str) -> str:
+    alias = f"audit_{key}"
+    conn.exec_driver_sql(f"ATTACH DATABASE ? AS {alias}", (_sqlite_month_path(key),))
+    return alias
+
+
+def _detach(conn: Connection, alias: str):
+    conn.exec_driver_sql(f"DETACH DATABASE {alias}")
+
+
+def _sqlite_move_month_to_file(engine: Engine, month: datetime) -> int:
+    key = month_key(month)
+    os.makedirs(AUDIT_PARTITION_DIR, exist_ok=True)
+    params = _range_params(month, add_months(month, 1))
+    where = "timestamp >= :start AND timestamp < :end"
+    with engine.connect() as conn:
+        if not conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {_TABLE} WHERE {where})").bindparams(*params)).scalar():
+            return 0
+        # ATTACH is not allowed inside a transaction: attach before the first statement of the move
+        conn.commit()
+        alias = _attach(conn, key)
+        try:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {alias}.{_TABLE} (id INTEGER PRIMARY KEY, user_id INTEGER, "
+                f"action VARCHAR NOT NULL, details VARCHAR, timestamp DATETIME NOT NULL)"
+            ))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {alias}.ix_{_TABLE}_timestamp_id ON {_TABLE} (timestamp, id)"))
+            conn.execute(text(
+                f"INSERT OR IGNORE INTO {alias}.{_TABLE} ({_COLUMN_LIST}) "
+                f"SELECT {_COLUMN_LIST} FROM main.{_TABLE} WHERE {where}"
+            ).bindparams(*params))
+            moved = conn.execute(text(f"DELETE FROM main.{_TABLE} WHERE {where}").bindparams(*params)).rowcount
+            conn.commit()
+        finally:
+            conn.rollback()
+            _detach(conn, alias)
+    return moved
+
+
+def _sqlite_archive_month_file(engine: Engine, key: str) -> int:
+    with engine.connect() as conn:
+        conn.commit()
+        alias = _attach(conn, key)
+        try:
+            rows = conn.execute(text(f"SELECT {_COLUMN_LIST} FROM {alias}.{_TABLE} ORDER BY timestamp, id")).all()
+            conn.rollback()
+        finally:
+            _detach(conn, alias)
+    entries = [_row_to_entry(row) for row in rows]
+    path = _stage(key, entries)
+    try:
+        os.remove(_sqlite_month_path(key))
+    except BaseException:
+        _unstage([path])
+        raise
+    return _publish(key, entries, path)
+
+
+def _iter_sqlite_months(engine: Engine, since: datetime, until: datetime) -> Iterator[Dict]:
+    for key in _sqlite_month_keys():
+        month = _parse_month_key(key)
+        if month >= until or add_months(month, 1) <= since:
+            continue
+        with engine.connect() as conn:
+            conn.commit()
+            alias = _attach(conn, key)
+            try:
+                rows = conn.execute(text(
+                    f"SELECT {_COLUMN_LIST} FROM {alias}.{_TABLE} WHERE timestamp >= :start AND timestamp < :end"
+                ).bindparams(*_range_params(since, until))).all()
+                conn.rollback()
+            finally:
+                _detach(conn, alias)
+        for row in rows:
+            yield _row_to_entry(row)
+
+
+# PostgreSQL partitions
+
+def is_partitioned(conn: Connection) -> bool:
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+    ), {"table": _TABLE}).scalar()
+
+
+def _pg_partitions(conn: Connection) -> List[str]:
+    return sorted(conn.execute(text(
+        "SELECT child.relname FROM pg_inherits i JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid WHERE parent.relname = :table"
+    ), {"table": _TABLE}).scalars().all())
+
+
+def _pg_relation_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _pg_create_partition(conn: Connection, month: datetime):
+    name = f"{_TABLE}_{month_key(month)}"
+    if _pg_relation_exists(conn, name):
+        return
+    bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    default = f"{_TABLE}_default"
+    if not _pg_relation_exists(conn, default):
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {_TABLE} {bounds}"))
+        return
+    # PostgreSQL rejects a partition whose range matches rows of the default partition: they are
+    # moved into the new table before it is attached
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE timestamp >= :start AND timestamp < :end "
+        f"RETURNING {_COLUMN_LIST}) INSERT INTO {name} ({_COLUMN_LIST}) SELECT {_COLUMN_LIST} FROM moved"
+    ).bindparams(*_range_params(month, add_months(month, 1))))
+    conn.execute(text(f"ALTER TABLE {_TABLE} ATTACH PARTITION {name} {bounds}"))
+
+
+def ensure_partitions(conn: Connection, now: datetime = None):
+    """Create the partitions of the current month and of the next AUDIT_PARTITIONS_AHEAD months."""
+    current = month_start(now or datetime.now(timezone.utc))
+    for offset in range(AUDIT_PARTITIONS_AHEAD + 1):
+        _pg_create_partition(conn, add_months(current, offset))
+    # Rows outside the prepared months land here instead of failing the insert
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {_TABLE}_default PARTITION OF {_TABLE} DEFAULT"))
+
+
+def partition_audit_logs(engine: Engine, now: datetime = None):
+    """
+    Convert a plain PostgreSQL audit_logs table into a table partitioned by month.
+
+    The primary key becomes (id, timestamp), as required for partitioning; ids keep coming from
+    the existing sequence.
+    """
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            return
+        legacy = f"{_TABLE}_unpartitioned"
+        conn.execute(text(f"ALTER TABLE {_TABLE} RENAME TO {legacy}"))
+        for index in AuditLog.__table__.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        conn.execute(text(
+            f"CREATE TABLE {_TABLE} ("
+            f"id INTEGER NOT NULL DEFAULT nextval('{_TABLE}_id_seq'), "
+            f"user_id INTEGER REFERENCES users (id), "
+            f"action VARCHAR NOT NULL, details VARCHAR, "
+            f"timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+            f"PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)"
+        ))
+        conn.execute(text(f"ALTER SEQUENCE {_TABLE}_id_seq OWNED BY {_TABLE}.id"))
+        oldest = conn.execute(text(f"SELECT MIN(timestamp) FROM {legacy}")).scalar()
+        month = month_start(oldest) if oldest else month_start(now or datetime.now(timezone.utc))
+        while month <= month_start(now or datetime.now(timezone.utc)):
+            _pg_create_partition(conn, month)
+            month = add_months(month, 1)
+        ensure_partitions(conn, now)
+        conn.execute(text(f"INSERT INTO {_TABLE} ({_COLUMN_LIST}) SELECT {_COLUMN_LIST} FROM {legacy}"))
+        conn.execute(text(f"DROP TABLE {legacy}"))
+        for index in AuditLog.__table__.indexes:
+            index.create(bind=conn)
+
+
+def _pg_archive_partition(engine: Engine, name: str) -> int:
+    key = _PARTITION_NAME.match(name).group(1) + "_" + _PARTITION_NAME.match(name).group(2)
+    path = None
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {_TABLE} DETACH PARTITION {name}"))
+            rows = conn.execute(text(f"SELECT {_COLUMN_LIST} FROM {name} ORDER BY timestamp, id")).all()
+            entries = [_row_to_entry(row) for row in rows]
+            path = _stage(key, entries)
+            conn.execute(text(f"DROP TABLE {name}"))
+    except BaseException:
+        _unstage([path])
+        raise
+    return _publish(key, entries, path)
+
+
+# Generic
+
+def _archive_hot_range(engine: Engine, start: datetime, end: datetime) -> int:
+    """Archive and delete the hot rows in [start, end[ (non-partitioned tables)."""
+    params = _range_params(start, end)
+    staged = []
+    committed = False
+    with engine.connect() as conn:
+        try:
+            rows = conn.execute(text(
+                f"SELECT {_COLUMN_LIST} FROM {_TABLE} WHERE timestamp >= :start AND timestamp < :end ORDER BY timestamp, id"
+            ).bindparams(*params)).all()
+            by_month: Dict[str, List[Dict]] = {}
+            for row in rows:
+                entry = _row_to_entry(row)
+                by_month.setdefault(month_key(month_start(entry["timestamp"])), []).append(entry)
+            for key, entries in sorted(by_month.items()):
+                staged.append((key, entries, _stage(key, entries)))
+            deleted = conn.execute(
+                text(f"DELETE FROM {_TABLE} WHERE timestamp >= :start AND timestamp < :end").bindparams(*params)
+            ).rowcount
+            # Fewer rows deleted than read: another pass took part of the range, this one leaves it
+            if deleted == len(rows):
+                conn.commit()
+                committed = True
+        finally:
+            if not committed:
+                conn.rollback()
+                _unstage(path for _, _, path in staged)
+    return sum(_publish(key, entries, path) for key, entries, path in staged) if committed else 0
+
+
+def _oldest_hot(engine: Engine) -> Optional[datetime]:
+    with engine.connect() as conn:
+        return conn.execute(select(func.min(AuditLog.timestamp))).scalar()
+
+
+@contextmanager
+def _rotation_lock(engine: Engine):
+    # One pass at a time in this process, and across workers on PostgreSQL
+    with _rotate_lock:
+        if engine.dialect.name != "postgresql":
+            yield
+            return
+        with engine.connect() as lock_conn:
+            lock_conn.exec_driver_sql(f"SELECT pg_advisory_lock({_LOCK_KEY})")
+            lock_conn.commit()
+            try:
+                yield
+            finally:
+                lock_conn.exec_driver_sql(f"SELECT pg_advisory_unlock({_LOCK_KEY})")
+                lock_conn.commit()
+
+
+def rotate(engine: Engine, now: datetime = None) -> Dict[str, int]:
+    """
+    Run one retention pass.
+
+    Args:
+        engine: Engine of the application database
+        now: Reference time, defaults to the current time
+
+    Returns:
+        Counts of the rows moved to month files (`partitioned`) and to the cold archive (`archived`)
+    """
+    with _rotation_lock(engine):
+        return _rotate(engine, now)
+
+
+def _rotate(engine: Engine, now: datetime = None) -> Dict[str, int]:
+    current, hot_cutoff, archive_cutoff = _cutoffs(now)
+    stats = {"partitioned": 0, "archived": _recover_staged(engine)}
+    dialect = engine.dialect.name
+
+    if dialect == "postgresql":
+        with engine.begin() as conn:
+            partitioned = is_partitioned(conn)
+            if partitioned:
+                ensure_partitions(conn, now)
+                partitions = _pg_partitions(conn)
+        if partitioned:
+            for name in partitions:
+                match = _PARTITION_NAME.match(name)
+                if match and add_months(_parse_month_key(f"{match.group(1)}_{match.group(2)}"), 1) <= archive_cutoff:
+                    stats["archived"] += _pg_archive_partition(engine, name)
+        # The default partition, or the whole table when it is not partitioned
+        oldest = _oldest_hot(engine)
+        if oldest is not None and month_start(oldest) < archive_cutoff:
+            stats["archived"] += _archive_hot_range(engine, month_start(oldest), archive_cutoff)
+        return stats
+
+    oldest = _oldest_hot(engine)
+    if oldest is not None and month_start(oldest) < archive_cutoff:
+        stats["archived"] += _archive_hot_range(engine, month_start(oldest), archive_cutoff)
+    if dialect == "sqlite":
+        month = max(month_start(oldest), archive_cutoff) if oldest is not None else hot_cutoff
+        while month < hot_cutoff:
+            stats["partitioned"] += _sqlite_move_month_to_file(engine, month)
+            month = add_months(month, 1)
+        for key in _sqlite_month_keys():
+            if _parse_month_key(key) < archive_cutoff:
+                stats["archived"] += _sqlite_archive_month_file(engine, key)
+    return stats
+
+
+def read_archived(engine: Engine, since: datetime, until: datetime, action: str = None, action_prefix: str = None,
+                  user_id: int = None, limit: int = 1000) -> List[Dict]:
+    """
+    Query the audit entries that left the hot table: SQLite month files and the cold archive.
+
+    Args:
+        engine: Engine of the application database
+        since: Lower bound (inclusive) of the timestamp
+        until: Upper bound (exclusive) of the timestamp
+        action: Exact action
+        action_prefix: Action prefix
+        user_id: Author of the actions
+        limit: Maximum number of entries
+
+    Returns:
+        The matching entries, newest first
+    """
+    since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+    until = until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+    sources = [_iter_archive(since, until)]
+    if engine.dialect.name == "sqlite":
+        sources.append(_iter_sqlite_months(engine, since, until))
+    entries = []
+    for source in sources:
+        for entry in source:
+            if action and entry["action"] != action:
+                continue
+            if action_prefix and not entry["action"].startswith(action_prefix):
+                continue
+            if user_id and entry["user_id"] != user_id:
+                continue
+            entries.append(entry)
+    entries.sort(key=lambda entry: (entry["timestamp"], entry["id"]), reverse=True)
+    return entries[:limit]
+
+
+if __name__ == "__main__":
+    import argparse
+    from ..database.session import engine as app_engine
+
+    parser = argparse.ArgumentParser(description="Run the audit log retention")
+    parser.add_argument("--partition", action="store_true",
+                        help="Convert audit_logs into a partitioned table first (PostgreSQL only)")
+    arguments = parser.parse_args()
+    if arguments.partition and app_engine.dialect.name == "postgresql":
+        partition_audit_logs(app_engine)
+    print(rotate(app_engine))
@@ -0,0 +1,202 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/helper/audit_sink.py
+"""
+Batched audit log writer.
+
+Writing an audit entry used to cost a commit (and an fsync) plus a refresh on the request path of
+every mutation. Entries are now queued in memory and written by a background thread with one bulk
+INSERT per batch, whenever AUDIT_BATCH_SIZE entries are pending or AUDIT_FLUSH_INTERVAL seconds
+have elapsed. The timestamp is taken when the action is logged, not when the batch is written.
+
+Pending entries are flushed synchronously on application shutdown (and at interpreter exit).
+
+Logging never fails the request: when a batch is rejected its entries are written one by one and
+those rejected again are logged and dropped, while a lost connection keeps them queued for the next
+attempt. When the queue holds AUDIT_QUEUE_MAX entries, new entries are logged and dropped.
+"""
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+
+from ..database.session import SessionLocal
+from ..models.audit_log import AuditLog
+from ..core.settings import load_environment
+
+load_environment()
+
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 100))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", 10000))
+
+logger = logging.getLogger(__name__)
+
+
+class AuditSink:
+    """In-memory queue of audit entries flushed in batches by a daemon thread."""
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 max_pending: int = AUDIT_QUEUE_MAX, session_factory=SessionLocal):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        # Serializes the writes so that batches are inserted in order
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        # Entries dropped because the queue was full or the database rejected them
+        self.dropped = 0
+
+    def start(self):
+        """Start the background flusher if it is not running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, user_id: Optional[int], action: str, details: str = None):
+        """Queue an audit entry; it is written by the next batch, or dropped if the queue is full."""
+        entry = {"user_id": user_id, "action": action, "details": details,
+                 "timestamp": datetime.now(timezone.utc)}
+        with self._lock:
+            full = len(self._pending) >= self.max_pending
+            if full:
+                self.dropped += 1
+            else:
+                self._pending.append(entry)
+            pending = len(self._pending)
+        if full:
+            # The flusher cannot keep up: the request does not wait for it
+            logger.error("Audit queue full (%d entries), entry dropped: %s", pending, entry)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every pending entry with a bulk INSERT, one by one if the batch is rejected.
+
+        Returns:
+            The number of entries written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            db = self.session_factory()
+            try:
+                try:
+                    db.execute(insert(AuditLog), batch)
+                    db.commit()
+                    return len(batch)
+                except Exception:
+                    db.rollback()
+                    logger.warning("Audit batch of %d entries rejected, writing them one by one", len(batch))
+                return self._write_each(db, batch)
+            finally:
+                db.close()
+
+    def _write_each(self, db, batch: List[Dict]) -> int:
+        # Called with the flush lock held
+        written = 0
+        for position, entry in enumerate(batch):
+            try:
+                db.execute(insert(AuditLog), [entry])
+                db.commit()
+                written += 1
+            except Exception as error:
+                db.rollback()
+                if isinstance(error, DBAPIError) and error.connection_invalidated:
+                    # The database is unreachable, not the entry invalid: retry at the next flush
+                    self._requeue(batch[position:])
+                    logger.error("Audit database unreachable, %d entries kept for the next flush",
+                                 len(batch) - position)
+                    break
+                self.dropped += 1
+                logger.error("Audit entry rejected by the database and dropped: %s (%s)", entry, error)
+        return written
+
+    def _requeue(self, entries: List[Dict]):
+        # Ahead of the entries queued meanwhile, within max_pending
+        with self._lock:
+            self._pending[:0] = entries
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[-overflow:]
+                self.dropped += overflow
+        if overflow > 0:
+            logger.error("Audit queue full, %d entries dropped", overflow)
+
+    def stop(self):
+        """Stop the background flusher and write the pending entries synchronously."""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+            self._thread = None
+        self._wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=max(self.flush_interval, 1.0) * 5)
+        self.flush()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit log flush failed, retrying at the next interval")
+
+
+sink = AuditSink()
+atexit.register(sink.stop)
@@ -0,0 +1,181 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/helper/auth_cache.py
+"""
+Cache of authenticated requests.
+
+`get_current_user` used to verify the token signature and load the user on every request, the
+permission checks then lazy-loading groups, organizations and policies. This module keeps, per
+token hash, the validated claims together with a detached snapshot of the user whose
+relationships are eagerly loaded, for at most AUTH_CACHE_TTL seconds and never past the token
+`exp` claim.
+
+Entries are dropped whenever a transaction that touched users, groups, organizations, policies
+or tags commits (password changes and membership changes mark those objects dirty); a user
+loaded before the commit is not cached. The TTL bounds staleness across worker processes.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from .session_changes import track
+from ..models.group import Group
+from ..models.organization import Organization
+from ..models.policy import Policy
+from ..models.tag import Tag
+from ..models.user import User
+from ..core.settings import load_environment
+
+load_environment()
+
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", 30))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 4096))
+
+_USER_MODELS = (User, Group, Organization, Policy, Tag)
+
+
+class CachedAuth(NamedTuple):
+    claims: Dict[str, Any]
+    user: User
+    expires_at: float
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def load_user_snapshot(db: Session, user_id: int) -> Optional[User]:
+    """
+    Load a user with the relationships used by authentication and permission checks, then
+    detach it from the session so that it can be shared between requests.
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+
+    Returns:
+        The detached user, or None if it does not exist
+    """
+    user = (
+        db.query(User)
+        .options(
+            selectinload(User.tags),
+            selectinload(User.groups),
+            selectinload(User.organizations),
+            selectinload(User.policies),
+        )
+        .filter(User.id == user_id)
+        .first()
+    )
+    if user is not None:
+        # The request session is shared with the route: detach the related objects as well so
+        # that the cached snapshot never references instances the route may modify
+        for obj in (user, *user.tags, *user.groups, *user.organizations, *user.policies):
+            db.expunge(obj)
+    return user
+
+
+_lock = threading.Lock()
+_entries: Dict[str, CachedAuth] = {}
+# Incremented on every invalidation so that a user loaded concurrently is not cached stale
+_generation = 0
+
+
+def get(token: str) -> Optional[CachedAuth]:
+    """Return the cached authentication of a token, or None if missing or expired."""
+    key = _token_key(token)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.expires_at <= time.time():
+            del _entries[key]
+            entry = None
+    return entry
+
+
+def generation() -> int:
+    """Return the current invalidation counter, to be passed back to `put`."""
+    return _generation
+
+
+def put(token: str, claims: Dict[str, Any], user: User, since_generation: int):
+    """
+    Cache the validated claims of a token and the snapshot of its user.
+
+    Args:
+        token: The raw token
+        claims: The validated claims
+        user: The detached user snapshot
+        since_generation: Value of `generation()` taken before loading the user; the entry is not
+            cached if an invalidation happened in between
+    """
+    now = time.time()
+    expires_at = now + AUTH_CACHE_TTL
+    exp = claims.get("exp")
+    if exp is not None:
+        expires_at = min(expires_at, float(exp))
+    if expires_at <= now:
+        return
+    with _lock:
+        if since_generation != _generation:
+            return
+        if len(_entries) >= AUTH_CACHE_SIZE:
+            for key in [key for key, entry in _entries.items() if entry.expires_at <= now]:
+                del _entries[key]
+            while len(_entries) >= AUTH_CACHE_SIZE:
+                # Dicts keep insertion order: drop the oldest entry
+                del _entries[next(iter(_entries))]
+        _entries[_token_key(token)] = CachedAuth(dict(claims), user, expires_at)
+
+
+def invalidate(user_id: int = None):
+    """Drop the cached tokens of a user, or of every user when no ID is given."""
+    global _generation
+    with _lock:
+        _generation += 1
+        if user_id is None:
+            _entries.clear()
+        else:
+            for key in [key for key, entry in _entries.items() if entry.user.id == user_id]:
+                del _entries[key]
+
+
+def _record_changes(session):
+    changed = (*session.new, *session.dirty, *session.deleted)
+    return [True] if any(isinstance(obj, _USER_MODELS) for obj in changed) else []
+
+
+track("auth_cache_changes", _record_changes, lambda session, changes: invalidate())
@@ -0,0 +1,189 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/helper/codename_allocator.py
+"""
+Collision-free codename allocation.
+
+Each allocator keeps the set of names already used by its table, warmed once from the database
+(at startup, or on first use) and kept current by a Session hook: names written are reserved as
+soon as they are flushed, names deleted or renamed away are released once the session commits. Candidates are drawn and
+checked against that set in memory; a name that keeps colliding gets a random suffix, longer at
+each round. Allocated names are reserved in the set right away, then checked against the table in
+one query per batch to catch names written by other workers since the warm-up. The unique index
+on the name column stays the final guard.
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import animalname, cosmicname
+from .session_changes import history, track
+from ..models.element import Element
+from ..models.environment import Environment
+from ..models.organization import Organization
+
+# Candidates drawn before a suffix is added, and suffix lengths tried in turn
+MAX_ATTEMPTS = 8
+SUFFIX_LENGTHS = (2, 3, 4, 6, 8)
+# Maximum number of names allocated in one call
+MAX_BULK = 1000
+
+
+class CodenameAllocator:
+    """
+    Allocates names unique within one column.
+
+    Args:
+        model: The model whose names must stay unique
+        generator: Codename generator, called with the allocation options
+    """
+
+    def __init__(self, model, generator: Callable[..., str]):
+        self.model = model
+        self.generator = generator
+        self._names: Set[str] = set()
+        self._warmed = False
+        self._lock = threading.Lock()
+
+    def warm(self, db: Session):
+        """Load every existing name of the table."""
+        names = set(db.execute(select(self.model.name)).scalars())
+        with self._lock:
+            self._names |= names
+            self._warmed = True
+
+    def add(self, names: Iterable[str]):
+        with self._lock:
+            self._names.update(names)
+
+    def discard(self, names: Iterable[str]):
+        with self._lock:
+            self._names.difference_update(names)
+
+    def is_known(self, name: str) -> bool:
+        return name in self._names
+
+    def _draw(self, options: Dict) -> str:
+        # Called with the lock held: every name returned is reserved at once
+        for _ in range(MAX_ATTEMPTS):
+            name = self.generator(**options)
+            if name not in self._names:
+                return name
+        separator = options.get("separator", "-")
+        for length in SUFFIX_LENGTHS:
+            for _ in range(MAX_ATTEMPTS):
+                name = f"{self.generator(**options)}{separator}{animalname.random_string(length)}"
+                if name not in self._names:
+                    return name
+        raise RuntimeError(f"No free codename left for {self.model.__tablename__}")
+
+    def allocate(self, db: Session, count: int = 1, **options) -> List[str]:
+        """
+        Allocate names that are neither in the table nor handed out before by this process.
+
+        Args:
+            db: The database session
+            count: Number of names to allocate
+            **options: Options of the generator (prefix_length, use_adjective, suffix_length, separator, style...)
+
+        Returns:
+            The allocated names
+        """
+        if not 1 <= count <= MAX_BULK:
+            raise ValueError(f"count must be between 1 and {MAX_BULK}")
+        if not self._warmed:
+            self.warm(db)
+        allocated: List[str] = []
+        while len(allocated) < count:
+            with self._lock:
+                batch = []
+                for _ in range(count - len(allocated)):
+                    name = self._draw(options)
+                    self._names.add(name)
+                    batch.append(name)
+            # Names created by other workers since the warm-up: keep them known and draw again
+            taken = set(db.execute(select(self.model.name).where(self.model.name.in_(batch))).scalars())
+            allocated.extend(name for name in batch if name not in taken)
+        return allocated
+
+    def allocate_one(self, db: Session, **options) -> str:
+        return self.allocate(db, 1, **options)[0]
+
+
+elements = CodenameAllocator(Element, animalname.generate_codename)
+environments = CodenameAllocator(Environment, animalname.generate_codename)
+organizations = CodenameAllocator(Organization, cosmicname.generate_codename)
+
+ALLOCATORS = {"element": elements, "environment": environments, "organization": organizations}
+_BY_MODEL = {allocator.model: allocator for allocator in ALLOCATORS.values()}
+
+
+def warm_all(db: Session):
+    """Load the existing names of every allocator, usually at startup."""
+    for allocator in ALLOCATORS.values():
+        allocator.warm(db)
+
+
+def _record_changes(session) -> list:
+    # Names written by this process are reserved at once, a rolled back insert only leaves a name
+    # reserved. Names freed are returned, to be released when the commit makes them free
+    released = []
+    for obj in session.new:
+        allocator = _BY_MODEL.get(type(obj))
+        if allocator is not None and obj.name:
+            allocator.add([obj.name])
+    for obj in session.dirty:
+        allocator = _BY_MODEL.get(type(obj))
+        if allocator is None:
+            continue
+        old, new = history(obj, "name")
+        if new:
+            allocator.add([new])
+        # An old name never loaded is unknown here and stays reserved
+        if old and old != new:
+            released.append((allocator, old))
+    for obj in session.deleted:
+        allocator = _BY_MODEL.get(type(obj))
+        if allocator is not None and obj.name:
+            released.append((allocator, obj.name))
+    return released
+
+
+def _release(session, released: list):
+    for allocator, name in released:
+        allocator.discard([name])
+
+
+track("codename_changes", _record_changes, _release)
@@ -1349,3 +1349,175 @@ class HashExpander:
 
 
 EXPANDERS = {"hash": HashExpander}
+
+
+def _bitmask(values, low, high):
+    if values[0] == "*":
+        values = range(low, high + 1)
+    mask = 0
+    for value in values:
+        if isinstance(value, int):
+            mask |= 1 << value
+    return mask
+
+
+class CronMask:
+    """
+    Bitmask form of a 5-field cron expression.
+
+    Each field of the expanded expression becomes an integer whose bit `n` is set when value `n`
+    is allowed, so matching a date is a handful of bit tests instead of the iterative `_calc`
+    search. Day of month / day of week are combined like croniter does (union when both are
+    restricted and `day_or` is True, intersection otherwise), including `l` and `#` syntaxes.
+    """
+
+    __slots__ = ("expr_format", "minute", "hour", "day", "month", "dow",
+                 "day_star", "dow_star", "last_day", "nth_weekday_of_month", "day_or")
+
+    def __init__(self, expr_format, day_or=True):
+        expanded, nth_weekday_of_month = croniter.expand(expr_format)
+        if len(expanded) != UNIX_CRON_LEN:
+            raise CroniterUnsupportedSyntaxError(
+                f"Only 5-field expressions can be compiled to bitmasks. Cron: '{expr_format}'"
+            )
+        self.expr_format = expr_format
+        self.day_or = day_or
+        self.minute = _bitmask(expanded[MINUTE_FIELD], 0, 59)
+        self.hour = _bitmask(expanded[HOUR_FIELD], 0, 23)
+        self.day = _bitmask(expanded[DAY_FIELD], 1, 31)
+        self.month = _bitmask(expanded[MONTH_FIELD], 1, 12)
+        self.dow = _bitmask(expanded[DOW_FIELD], 0, 6)
+        self.day_star = expanded[DAY_FIELD][0] == "*"
+        self.dow_star = expanded[DOW_FIELD][0] == "*"
+        self.last_day = "l" in expanded[DAY_FIELD]
+        nth = {wday: set(values) for wday, values in nth_weekday_of_month.items()}
+        if "*" in nth:
+            every = nth.pop("*")
+            for wday in range(7):
+                nth.setdefault(wday, set()).update(every)
+        self.nth_weekday_of_month = nth
+
+    def match_day(self, d) -> bool:
+        """Whether the date `d` (a date or datetime) satisfies the month and day fields."""
+        if not self.month >> d.month & 1:
+            return False
+        if self.day_star:
+            day_ok = True
+        else:
+            day_ok = bool(self.day >> d.day & 1) or (
+                self.last_day and d.day == _last_day_of_month(d.year, d.month)
+            )
+        wday = d.isoweekday() % 7
+        if self.nth_weekday_of_month:
+            nth = self.nth_weekday_of_month.get(wday, ())
+            dow_ok = (d.day - 1) // 7 + 1 in nth or (
+                "l" in nth and d.day + 7 > _last_day_of_month(d.year, d.month)
+            )
+        else:
+            dow_ok = self.dow_star or bool(self.dow >> wday & 1)
+        if self.day_or and not self.day_star and not self.dow_star:
+            return day_ok or dow_ok
+        return day_ok and dow_ok
+
+    def match(self, d: datetime.datetime) -> bool:
+        """Whether the minute holding `d` is an occurrence of the expression."""
+        return bool(self.minute >> d.minute & 1) and bool(self.hour >> d.hour & 1) and self.match_day(d)
+
+
+class CronWindowMask:
+    """
+    Bitmask form of a recurring window [start, end[ defined by two cron expressions.
+
+    A time `t` is inside the window when the last start occurrence at or before `t` is not followed
+    by an end occurrence at or before `t`, which is the decision made by
+    `permissions.is_in_cron_interval`. It is found by scanning backwards from `t`, skipping whole
+    days and hours whose bits match neither expression.
+    """
+
+    __slots__ = ("start", "end", "max_days")
+
+    def __init__(self, start_format, end_format, day_or=True, max_days=3660):
+        self.start = CronMask(start_format, day_or=day_or)
+        self.end = CronMask(end_format, day_or=day_or)
+        self.max_days = max_days
+
+    def contains(self, at: datetime.datetime) -> bool:
+        start, end = self.start, self.end
+        day = at.date()
+        hour_limit, minute_limit = at.hour, at.minute
+        one_day = datetime.timedelta(days=1)
+        for _ in range(self.max_days):
+            start_day = start.match_day(day)
+            end_day = end.match_day(day)
+            if start_day or end_day:
+                for hour in range(hour_limit, -1, -1):
+                    start_hour = start_day and start.hour >> hour & 1
+                    end_hour = end_day and end.hour >> hour & 1
+                    if start_hour or end_hour:
+                        allowed = (1 << (minute_limit + 1)) - 1
+                        start_minute = (start.minute & allowed).bit_length() - 1 if start_hour else -1
+                        end_minute = (end.minute & allowed).bit_length() - 1 if end_hour else -1
+                        if start_minute >= 0 or end_minute >= 0:
+                            # An end at the very minute of a start does not close that window
+                            return start_minute >= end_minute
+                    minute_limit = 59
+            day -= one_day
+            hour_limit, minute_limit = 23, 59
+        return False
+
+
+_MASKS: dict[tuple[str, bool], CronMask] = {}
+
+
+def _cron_mask(expr_format, day_or=True) -> CronMask:
+    key = (expr_format, day_or)
+    mask = _MASKS.get(key)
+    if mask is None:
+        mask = _MASKS[key] = CronMask(expr_format, day_or=day_or)
+    return mask
+
+
+def _as_datetime(value) -> datetime.datetime:
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.fromtimestamp(value, tzutc()).replace(tzinfo=None)
+
+
+def croniter_match_batch(expr_formats, at, day_or=True) -> list[bool]:
+    """
+    Match many cron expressions against one time (a datetime or a UTC timestamp).
+
+    Expressions are compiled once to bitmasks and memoized, so a batch costs a few bit tests
+    per expression.
+    """
+    at = _as_datetime(at)
+    return [_cron_mask(expr_format, day_or).match(at) for expr_format in expr_formats]
+
+
+def croniter_match_times(expr_format, times, day_or=True) -> list[bool]:
+    """Match one cron expression against many times (datetimes or UTC timestamps)."""
+    mask = _cron_mask(expr_format, day_or)
+    return [mask.match(_as_datetime(t)) for t in times]
+
+
+def croniter_window_batch(windows, at, day_or=True) -> list[bool]:
+    """
+    Tell, for many (start, end) cron windows, whether one time falls inside each of them.
+
+    Windows that cannot be compiled raise, like `croniter` does for invalid expressions.
+    """
+    at = _as_datetime(at)
+    compiled = {}
+    result = []
+    for start_format, end_format in windows:
+        window = compiled.get((start_format, end_format))
+        if window is None:
+            window = compiled[(start_format, end_format)] = CronWindowMask(start_format, end_format, day_or=day_or)
+        result.append(window.contains(at))
+    return result
+
+
+def croniter_window_times(start_format, end_format, times, day_or=True) -> list[bool]:
+    """Tell, for one (start, end) cron window, which of many times fall inside it."""
+    window = CronWindowMask(start_format, end_format, day_or=day_or)
+    return [window.contains(_as_datetime(t)) for t in times]
@@ -1,19 +1,17 @@
-import os
 import smtplib
 from email.mime.text import MIMEText
-from dotenv import load_dotenv
-
-load_dotenv()
+from ..core.settings import get_settings
 
 # Configuration SMTP
-SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = int(os.getenv("SMTP_PORT", 25))
-SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "false").lower() == "true"
-SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "false").lower() == "true"
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-EMAIL_FROM = os.getenv("EMAIL_FROM")
-VITE_BASE_URL = os.getenv("VITE_BASE_URL")
+_settings = get_settings()
+SMTP_SERVER = _settings.smtp_server
+SMTP_PORT = _settings.smtp_port
+SMTP_USE_TLS = _settings.smtp_use_tls
+SMTP_USE_SSL = _settings.smtp_use_ssl
+SMTP_USER = _settings.smtp_user
+SMTP_PASSWORD = _settings.smtp_password
+EMAIL_FROM = _settings.email_from
+VITE_BASE_URL = _settings.frontend_base_url
 
 
 def send_email(to_email: str, subject: str, body: str, subtype: str = "plain"):
@@ -0,0 +1,189 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/helper/gateway_topology.py
+"""
+Cached gateway ↔ network adjacency of a stack or an environment.
+
+A gateway connects its upstream networks to its downstream networks through `network_gateways`.
+Walking `Gateway.upstream_networks`/`downstream_networks` gateway by gateway costs a query per
+gateway; this module reads every attachment of the gateways in scope with one query and indexes
+them both ways. A gateway is in the scope of an environment when one of its networks belongs to
+the environment or when its stack does; its networks outside the environment are kept.
+
+Topologies are cached per scope and dropped whenever a flush touches gateways, their attachments,
+networks, elements or stacks, then again when that transaction ends, dropping what was built
+from its uncommitted rows. A TTL bounds staleness across worker processes.
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from .session_changes import track
+from ..models.element import Element
+from ..models.gateway import Gateway
+from ..models.network import Network
+from ..models.network_gateway import NetworkDirection, NetworkGateway
+from ..models.stack import Stack
+from ..core.settings import load_environment
+
+load_environment()
+
+GATEWAY_TOPOLOGY_TTL = int(os.getenv("GATEWAY_TOPOLOGY_TTL", 300))
+
+# Models whose changes may alter the adjacency or the scope of a gateway
+_TOPOLOGY_MODELS = (Gateway, NetworkGateway, Network, Element, Stack)
+
+
+class GatewayTopology:
+    """Networks of each gateway by direction, and gateways of each network."""
+
+    def __init__(self, rows: Iterable[Tuple[int, int, NetworkDirection]]):
+        self.built_at = time.monotonic()
+        self.upstream: Dict[int, List[int]] = {}
+        self.downstream: Dict[int, List[int]] = {}
+        self._by_network: Dict[int, List[Tuple[int, NetworkDirection]]] = {}
+        for gateway_id, network_id, direction in rows:
+            side = self.upstream if direction == NetworkDirection.UPSTREAM else self.downstream
+            side.setdefault(gateway_id, []).append(network_id)
+            self._by_network.setdefault(network_id, []).append((gateway_id, direction))
+
+    def is_expired(self) -> bool:
+        return time.monotonic() - self.built_at > GATEWAY_TOPOLOGY_TTL
+
+    @property
+    def gateway_ids(self) -> List[int]:
+        return sorted(self.upstream.keys() | self.downstream.keys())
+
+    def upstream_networks(self, gateway_id: int) -> List[int]:
+        return self.upstream.get(gateway_id, [])
+
+    def downstream_networks(self, gateway_id: int) -> List[int]:
+        return self.downstream.get(gateway_id, [])
+
+    def gateways_of(self, network_id: int, direction: Optional[NetworkDirection] = None) -> List[int]:
+        """Gateways attached to a network, on one side only if a direction is given."""
+        return [gateway_id for gateway_id, side in self._by_network.get(network_id, ())
+                if direction is None or side == direction]
+
+    def routes(self) -> List[Tuple[int, int, int]]:
+        """(upstream network, gateway, downstream network) of every path through one gateway."""
+        return [(upstream, gateway_id, downstream)
+                for gateway_id in self.gateway_ids
+                for upstream in self.upstream_networks(gateway_id)
+                for downstream in self.downstream_networks(gateway_id)]
+
+
+def _adjacency(db: Session, condition) -> GatewayTopology:
+    query = (
+        select(NetworkGateway.gateway_id, NetworkGateway.network_id, NetworkGateway.direction)
+        .where(condition)
+        .order_by(NetworkGateway.gateway_id, NetworkGateway.network_id)
+    )
+    return GatewayTopology(db.execute(query).all())
+
+
+def build_stack_topology(db: Session, stack_id: int) -> GatewayTopology:
+    """Adjacency of the gateways of a stack, with one query."""
+    return _adjacency(db, NetworkGateway.gateway_id.in_(select(Gateway.id).where(Gateway.stack_id == stack_id)))
+
+
+def build_environment_topology(db: Session, environment_id: int) -> GatewayTopology:
+    """Adjacency of the gateways of an environment, with one query."""
+    through_networks = (
+        select(NetworkGateway.gateway_id)
+        .join(Network, Network.id == NetworkGateway.network_id)
+        .join(Element, Element.id == Network.element_id)
+        .where(Element.environment_id == environment_id)
+    )
+    through_stacks = (
+        select(Gateway.id)
+        .join(Stack, Stack.id == Gateway.stack_id)
+        .join(Element, Element.id == Stack.element_id)
+        .where(Element.environment_id == environment_id)
+    )
+    return _adjacency(db, or_(NetworkGateway.gateway_id.in_(through_networks),
+                              NetworkGateway.gateway_id.in_(through_stacks)))
+
+
+_BUILDERS = {"stack": build_stack_topology, "environment": build_environment_topology}
+
+_lock = threading.Lock()
+_topologies: Dict[Tuple[str, int], GatewayTopology] = {}
+# Incremented on every invalidation so that a topology built concurrently is not cached stale
+_generation = 0
+
+
+def _get(db: Session, scope: str, scope_id: int) -> GatewayTopology:
+    key = (scope, scope_id)
+    with _lock:
+        topology = _topologies.get(key)
+        generation = _generation
+    if topology is not None and not topology.is_expired():
+        return topology
+    topology = _BUILDERS[scope](db, scope_id)
+    with _lock:
+        if generation == _generation:
+            _topologies[key] = topology
+    return topology
+
+
+def for_stack(db: Session, stack_id: int) -> GatewayTopology:
+    """Return the cached topology of a stack, building it if missing or expired."""
+    return _get(db, "stack", stack_id)
+
+
+def for_environment(db: Session, environment_id: int) -> GatewayTopology:
+    """Return the cached topology of an environment, building it if missing or expired."""
+    return _get(db, "environment", environment_id)
+
+
+def invalidate():
+    """Drop every cached topology."""
+    global _generation
+    with _lock:
+        _generation += 1
+        _topologies.clear()
+
+
+def _record_changes(session):
+    if any(isinstance(obj, _TOPOLOGY_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        invalidate()
+        return [True]
+    return []
+
+
+track("gateway_topology_changes", _record_changes, lambda session, changes: invalidate(),
+      lambda session, changes: invalidate())
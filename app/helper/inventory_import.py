@@ -0,0 +1,624 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/helper/inventory_import.py
+"""
+Streaming inventory import.
+
+Loads an existing site (physical hosts, networks, VMs, domains and DNS records) from a YAML, JSON or
+NDJSON file. Every record is a mapping with a `kind`:
+
+    {"kind": "host", "fqdn": "hv01.dc1", "ip_mgmt": "10.0.0.11", "cpu_threads": 64, "ram_mb": 262144,
+     "hypervisor_type": "libvirt", "networks": [{"cidr": "10.0.0.0/24", "ip": "10.0.0.11"}]}
+    {"kind": "network", "cidr": "10.0.0.0/24", "vlan": 10, "type": "physical"}
+    {"kind": "vm", "name": "web01", "host": "hv01.dc1", "vcpu": 2, "ram_mb": 4096, "disk_gb": 40,
+     "os_image": "debian-12", "networks": [{"cidr": "10.0.0.0/24", "ip": "10.0.0.50"}]}
+    {"kind": "domain", "fqdn": "example.org"}
+    {"kind": "dns_record", "domain": "example.org", "type": "A", "name": "www", "value": "10.0.0.50"}
+
+A document may also be a mapping of sections (`hosts`, `networks`, `vms`, `domains`, `dns_records`)
+holding such records without their `kind`. NDJSON files and JSON arrays are read incrementally;
+YAML files are read one document at a time.
+
+The file is read twice: hosts, networks and domains first, then VMs, DNS records and network
+attachments, which reference them by host fqdn, network cidr and domain fqdn. References are
+resolved through in-memory maps loaded once, and records already in the database (same natural key)
+are skipped, so an import can be run again safely. Rows are written in chunks of `chunk_size`
+records, each chunk in its own transaction: with COPY on PostgreSQL and executemany on SQLite. Ids
+are reserved upfront so that a chunk never reads back what it wrote.
+
+After each chunk the position in the file is saved in a checkpoint next to it; an interrupted
+import resumes from there. Run it with `python -m app.helper.inventory_import FILE --environment-id N`.
+"""
+import io
+import ipaddress
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from . import codename_allocator, ipam, placement, topology
+from ..models.dns_record import DNSRecord, DNSRecordType
+from ..models.domain import Domain
+from ..models.element import Element
+from ..models.environment import Environment
+from ..models.network import Network
+from ..models import types
+from ..models.network_physical_host import NetworkPhysicalHost
+from ..models.network_vm import NetworkVM
+from ..models.physical_host import AllocationMode, HypervisorType, PhysicalHost
+from ..models.vm import VM
+from ..repositories import element_repo
+from ..core.settings import load_environment
+
+load_environment()
+
+# Records written per transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 2000))
+# Errors kept in the report, the others are only counted
+MAX_REPORTED_ERRORS = 100
+
+KINDS = ("host", "network", "vm", "domain", "dns_record")
+SECTIONS = {"hosts": "host", "networks": "network", "vms": "vm", "domains": "domain", "dns_records": "dns_record"}
+# Kinds handled by each pass over the file
+PHASES = (("host", "network", "domain"), ("host", "vm", "dns_record"))
+
+_READ_SIZE = 1 << 16
+
+
+class InventoryError(ValueError):
+    """A record that cannot be imported."""
+
+
+# Reading
+
+def _records_from_document(document: Any) -> Iterator[Dict[str, Any]]:
+    if document is None:
+        return
+    if isinstance(document, list):
+        for record in document:
+            yield record
+    elif isinstance(document, dict) and "kind" in document:
+        yield document
+    elif isinstance(document, dict):
+        for section, records in document.items():
+            kind = SECTIONS.get(section)
+            if kind is None:
+                raise InventoryError(f"Unknown section: {section}")
+            for record in records or ():
+                yield {**record, "kind": kind}
+    else:
+        raise InventoryError("An inventory document must be a list or a mapping")
+
+
+def _iter_ndjson(handle) -> Iterator[Dict[str, Any]]:
+    for line in handle:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_json(handle) -> Iterator[Dict[str, Any]]:
+    """Decode a top-level JSON array item by item; any other document is loaded at once."""
+    decoder = json.JSONDecoder()
+    buffer, position, started = "", 0, False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            buffer, position = handle.read(_READ_SIZE), 0
+            if not buffer:
+                if started:
+                    raise InventoryError("Unterminated JSON array")
+                return
+            continue
+        if not started:
+            if buffer[position] != "[":
+                yield from _records_from_document(json.loads(buffer[position:] + handle.read()))
+                return
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The item continues in the next block
+            more = handle.read(_READ_SIZE)
+            if not more:
+                raise
+            buffer, position = buffer[position:] + more, 0
+            continue
+        yield record
+
+
+def _iter_yaml(handle) -> Iterator[Dict[str, Any]]:
+    try:
+        import yaml  # Only needed for YAML inventories: the "import" extra
+    except ImportError as error:
+        raise InventoryError("YAML inventories require PyYAML: install the 'import' extra (pip install pyyaml)") from error
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    for document in yaml.load_all(handle, Loader=loader):
+        yield from _records_from_document(document)
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of an inventory file, detecting the format from its extension.
+
+    Args:
+        path: A .yaml/.yml, .json or .ndjson/.jsonl file
+
+    Returns:
+        An iterator over the records, in file order
+    """
+    extension = os.path.splitext(path)[1].lower()
+    readers = {".ndjson": _iter_ndjson, ".jsonl": _iter_ndjson, ".json": _iter_json,
+               ".yaml": _iter_yaml, ".yml": _iter_yaml}
+    if extension not in readers:
+        raise InventoryError(f"Unsupported inventory format: {extension or path}")
+    with open(path, "r", encoding="utf-8") as handle:
+        yield from readers[extension](handle)
+
+
+# Checkpoint
+
+def checkpoint_path(path: str) -> str:
+    return f"{path}.import-state"
+
+
+def _source_stamp(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_checkpoint(path: str) -> Tuple[int, int]:
+    """Return the (phase, record) to resume from, (0, 0) if there is no checkpoint for this file."""
+    try:
+        with open(checkpoint_path(path), "r", encoding="utf-8") as handle:
+            state = json.load(handle)
+    except (OSError, ValueError):
+        return 0, 0
+    if state.get("source") != _source_stamp(path):
+        # The file changed since: start over, the records already imported are skipped anyway
+        return 0, 0
+    return int(state["phase"]), int(state["record"])
+
+
+def _save_checkpoint(path: str, phase: int, record: int):
+    target = checkpoint_path(path)
+    with open(f"{target}.tmp", "w", encoding="utf-8") as handle:
+        json.dump({"source": _source_stamp(path), "phase": phase, "record": record}, handle)
+    os.replace(f"{target}.tmp", target)
+
+
+# Writing
+
+def _reserve_ids(db: Session, table, count: int, floor: int) -> List[int]:
+    """
+    Reserve `count` primary keys of `table`, all above `floor` (the last id reserved before).
+
+    Without sequences the ids follow max(id), so the database write lock is taken first and held until the
+    chunk commits: a concurrent writer waits instead of inserting the ids reserved here.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return list(db.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {"table": table.name, "count": count}
+        ).scalars())
+    connection = db.connection()
+    if connection.dialect.name == "sqlite" and not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    start = max(db.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one(), floor) + 1
+    return list(range(start, start + count))
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bytes):
+        # bytea hex format, its backslash escaped for the text format of COPY
+        return "\\\\x" + value.hex()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_rows(db: Session, table, rows: List[Dict[str, Any]]):
+    dialect = db.get_bind().dialect
+    # COPY bypasses the column defaults that fill the numeric keys of the IP columns
+    rows = [{**row, **types.ip_key_values(table, row)} for row in rows]
+    columns = list(rows[0])
+    # Bind processors turn the values into what the driver would send (enum names, ...)
+    processors = [table.c[column].type.dialect_impl(dialect).bind_processor(dialect) for column in columns]
+    buffer = io.StringIO()
+    for row in rows:
+        values = []
+        for column, processor in zip(columns, processors):
+            value = row[column]
+            if processor and value is not None and not isinstance(value, bytes):
+                value = processor(value)
+            values.append(_copy_value(value))
+        buffer.write("\t".join(values))
+        buffer.write("\n")
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def write_rows(db: Session, table, rows: List[Dict[str, Any]]):
+    """Insert rows sharing the same columns: COPY on PostgreSQL, executemany elsewhere."""
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, table, rows)
+    else:
+        db.execute(table.insert(), rows)
+
+
+def _network_key(cidr: Any) -> str:
+    try:
+        return str(ipaddress.ip_network(str(cidr), strict=False))
+    except ValueError as error:
+        raise InventoryError(f"Invalid cidr: {cidr}") from error
+
+
+def _required(record: Dict[str, Any], *fields: str):
+    missing = [field for field in fields if record.get(field) in (None, "")]
+    if missing:
+        raise InventoryError(f"{record.get('kind')} requires {', '.join(repr(field) for field in missing)}")
+
+
+class InventoryImporter:
+    """
+    Imports inventory files into the database.
+
+    Args:
+        db: The database session, committed after every chunk
+        environment_id: Environment of the elements (networks, VMs, domains) whose record has no environment_id
+        chunk_size: Records written per transaction
+        progress: Called with the report after every chunk
+    """
+
+    def __init__(self, db: Session, environment_id: Optional[int] = None, chunk_size: int = IMPORT_CHUNK_SIZE,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.db = db
+        self.environment_id = environment_id
+        self.chunk_size = max(1, chunk_size)
+        self.progress = progress
+        self.report: Dict[str, Any] = {}
+        self._loaded = False
+        self._last_ids: Dict[str, int] = {}
+        self._free_ids: Dict[str, List[int]] = {}
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._element_names: Set[str] = set()
+        self._tables = {model.__table__.name: model.__table__ for model in
+                        (Element, PhysicalHost, Network, VM, Domain, DNSRecord, NetworkPhysicalHost, NetworkVM)}
+
+    # Maps of what the database already holds
+
+    def _load(self):
+        db = self.db
+        self.environments: Set[int] = set(db.execute(select(Environment.id)).scalars())
+        self.hosts: Dict[str, int] = dict(db.execute(select(PhysicalHost.fqdn, PhysicalHost.id)).all())
+        self.networks: Dict[str, int] = {}
+        for network_id, cidr in db.execute(select(Network.id, Network.cidr).order_by(Network.id)):
+            self.networks.setdefault(_network_key(cidr), network_id)
+        self.domains: Dict[str, int] = {}
+        for domain_id, fqdn in db.execute(select(Domain.id, Domain.fqdn).order_by(Domain.id)):
+            self.domains.setdefault(fqdn, domain_id)
+        self.vms: Dict[Tuple[int, str], int] = {
+            (host_id, name): vm_id for vm_id, host_id, name in db.execute(select(VM.id, VM.host_id, VM.name))
+        }
+        self.dns_records: Set[Tuple[int, str, str, str]] = {
+            (domain_id, record_type.value, name, value)
+            for domain_id, record_type, name, value in
+            db.execute(select(DNSRecord.domain_id, DNSRecord.type, DNSRecord.name, DNSRecord.value))
+        }
+        self.host_attachments: Set[Tuple[int, int]] = set(
+            db.execute(select(NetworkPhysicalHost.network_id, NetworkPhysicalHost.physical_host_id)).all()
+        )
+        self.vm_attachments: Set[Tuple[int, int]] = set(
+            db.execute(select(NetworkVM.network_id, NetworkVM.vm_id)).all()
+        )
+        codename_allocator.elements.warm(db)
+        self._loaded = True
+
+    # Staging
+
+    def _next_id(self, table: str) -> int:
+        free = self._free_ids.get(table)
+        if not free:
+            free = _reserve_ids(self.db, self._tables[table], self.chunk_size, self._last_ids.get(table, 0))
+            free.reverse()
+            self._free_ids[table] = free
+        self._last_ids[table] = max(self._last_ids.get(table, 0), free[-1])
+        return free.pop()
+
+    def _stage(self, table: str, row: Dict[str, Any]) -> int:
+        row["id"] = self._next_id(table)
+        self._rows.setdefault(table, []).append(row)
+        return row["id"]
+
+    def _stage_element(self, record: Dict[str, Any]) -> int:
+        environment_id = record.get("environment_id", self.environment_id)
+        if environment_id not in self.environments:
+            raise InventoryError(f"Unknown environment: {environment_id}")
+        name = record.get("element")
+        if name is not None:
+            if codename_allocator.elements.is_known(name) or name in self._element_names:
+                raise InventoryError(f"Element name already used: {name}")
+            self._element_names.add(name)
+        return self._stage("elements", {"name": name, "description": record.get("description"),
+                                        "environment_id": environment_id})
+
+    def _resolve_attachments(self, record: Dict[str, Any]) -> List[Tuple[int, str]]:
+        attachments = []
+        for attachment in record.get("networks") or ():
+            _required(attachment, "cidr", "ip")
+            key = _network_key(attachment["cidr"])
+            if key not in self.networks:
+                raise InventoryError(f"Unknown network: {key}")
+            try:
+                ip = str(ipaddress.ip_address(attachment["ip"]))
+            except ValueError as error:
+                raise InventoryError(f"Invalid ip: {attachment['ip']}") from error
+            attachments.append((self.networks[key], ip))
+        return attachments
+
+    def _import_host(self, record: Dict[str, Any], phase: int) -> str:
+        _required(record, "fqdn")
+        if phase == 0:
+            if record["fqdn"] in self.hosts:
+                return "skipped"
+            _required(record, "ip_mgmt", "cpu_threads", "ram_mb")
+            dedicated_environment_id = record.get("dedicated_environment_id")
+            if dedicated_environment_id is not None and dedicated_environment_id not in self.environments:
+                raise InventoryError(f"Unknown environment: {dedicated_environment_id}")
+            try:
+                row = {
+                    "fqdn": record["fqdn"],
+                    "ip_mgmt": record["ip_mgmt"],
+                    "cpu_threads": int(record["cpu_threads"]),
+                    "ram_mb": int(record["ram_mb"]),
+                    "hypervisor_type": HypervisorType(record.get("hypervisor_type", "none")),
+                    "is_schedulable": bool(record.get("is_schedulable", True)),
+                    "allocation_mode": AllocationMode(record.get("allocation_mode", "shared")),
+                    "dedicated_environment_id": dedicated_environment_id,
+                }
+            except (TypeError, ValueError) as error:
+                raise InventoryError(str(error)) from error
+            self.hosts[record["fqdn"]] = self._stage("physical_hosts", row)
+            return "created"
+        # Second pass: network attachments, once every network is known
+        host_id = self.hosts.get(record["fqdn"])
+        if host_id is None:
+            return ""  # Rejected in the first pass, the error is already reported
+        for network_id, ip in self._resolve_attachments(record):
+            if (network_id, host_id) not in self.host_attachments:
+                self.host_attachments.add((network_id, host_id))
+                self._stage("network_physical_hosts",
+                            {"network_id": network_id, "physical_host_id": host_id, "ip_address": ip})
+                self._count("created", "host_attachment")
+        return ""
+
+    def _import_network(self, record: Dict[str, Any], phase: int) -> str:
+        _required(record, "cidr")
+        key = _network_key(record["cidr"])
+        if key in self.networks:
+            return "skipped"
+        _, values = element_repo.subcomponent_values("network", {**record, "cidr": key})
+        element_id = self._stage_element(record)
+        self.networks[key] = self._stage("networks", {**values, "element_id": element_id})
+        return "created"
+
+    def _import_domain(self, record: Dict[str, Any], phase: int) -> str:
+        _required(record, "fqdn")
+        if record["fqdn"] in self.domains:
+            return "skipped"
+        _, values = element_repo.subcomponent_values("domain", record)
+        element_id = self._stage_element(record)
+        self.domains[record["fqdn"]] = self._stage("domains", {**values, "element_id": element_id})
+        return "created"
+
+    def _import_vm(self, record: Dict[str, Any], phase: int) -> str:
+        _required(record, "name", "host")
+        host_id = self.hosts.get(record["host"])
+        if host_id is None:
+            raise InventoryError(f"Unknown host: {record['host']}")
+        attachments = self._resolve_attachments(record)
+        vm_id = self.vms.get((host_id, record["name"]))
+        status = "skipped"
+        if vm_id is None:
+            _, values = element_repo.subcomponent_values("vm", {**record, "host_id": host_id})
+            element_id = self._stage_element(record)
+            vm_id = self.vms[(host_id, record["name"])] = self._stage("vms", {**values, "element_id": element_id})
+            status = "created"
+        for network_id, ip in attachments:
+            if (network_id, vm_id) not in self.vm_attachments:
+                self.vm_attachments.add((network_id, vm_id))
+                self._stage("network_vms", {"network_id": network_id, "vm_id": vm_id, "ip_address": ip})
+                self._count("created", "vm_attachment")
+        return status
+
+    def _import_dns_record(self, record: Dict[str, Any], phase: int) -> str:
+        _required(record, "domain", "type", "name", "value")
+        domain_id = self.domains.get(record["domain"])
+        if domain_id is None:
+            raise InventoryError(f"Unknown domain: {record['domain']}")
+        try:
+            record_type = DNSRecordType(str(record["type"]).upper())
+            ttl = int(record.get("ttl", 3600))
+        except ValueError as error:
+            raise InventoryError(str(error)) from error
+        key = (domain_id, record_type.value, str(record["name"]), str(record["value"]))
+        if key in self.dns_records:
+            return "skipped"
+        self.dns_records.add(key)
+        self._stage("dns_records", {"domain_id": domain_id, "type": record_type, "name": key[2],
+                                    "value": key[3], "ttl": ttl})
+        return "created"
+
+    # Chunks
+
+    def _count(self, status: str, kind: str):
+        counts = self.report[status]
+        counts[kind] = counts.get(kind, 0) + 1
+
+    def _flush(self, path: str, phase: int, record: int):
+        rows = self._rows
+        unnamed = [row for row in rows.get("elements", ()) if row["name"] is None]
+        for start in range(0, len(unnamed), codename_allocator.MAX_BULK):
+            batch = unnamed[start:start + codename_allocator.MAX_BULK]
+            for row, name in zip(batch, codename_allocator.elements.allocate(self.db, len(batch))):
+                row["name"] = name
+        for table in ("physical_hosts", "elements", "networks", "domains", "vms", "dns_records",
+                      "network_physical_hosts", "network_vms"):
+            write_rows(self.db, self._tables[table], rows.get(table, []))
+        self.db.commit()
+        for row in rows.get("networks", ()):
+            ipam.registry.add_network(row["id"], row["cidr"])
+        attached = rows.get("network_physical_hosts", []) + rows.get("network_vms", [])
+        ipam.registry.invalidate({row["network_id"] for row in attached})
+        if any(rows.values()):
+            topology.invalidate()
+        if rows.get("physical_hosts") or rows.get("vms"):
+            placement.engine.reset()
+        codename_allocator.elements.add(self._element_names | {row["name"] for row in unnamed})
+        self._rows = {}
+        self._element_names = set()
+        _save_checkpoint(path, phase, record)
+        elapsed = time.monotonic() - self._started
+        self.report["seconds"] = round(elapsed, 3)
+        self.report["records_per_second"] = round(self.report["records"] / elapsed, 1) if elapsed else None
+        if self.progress:
+            self.progress(self.report)
+
+    def run(self, path: str, resume: bool = True) -> Dict[str, Any]:
+        """
+        Import an inventory file.
+
+        Args:
+            path: The inventory file
+            resume: Continue from the checkpoint of an interrupted import of the same file
+
+        Returns:
+            The report: records read, created and skipped counts per kind, and errors
+        """
+        if not self._loaded:
+            self._load()
+        start_phase, start_record = load_checkpoint(path) if resume else (0, 0)
+        self.report = {"phase": start_phase + 1, "records": 0, "created": {}, "skipped": {}, "errors": 0,
+                       "error_samples": [], "resumed_from": {"phase": start_phase + 1, "record": start_record}}
+        self._started = time.monotonic()
+        self._rows, self._element_names = {}, set()
+        handlers = {"host": self._import_host, "network": self._import_network, "vm": self._import_vm,
+                    "domain": self._import_domain, "dns_record": self._import_dns_record}
+        try:
+            for phase in range(start_phase, len(PHASES)):
+                kinds = PHASES[phase]
+                self.report["phase"] = phase + 1
+                staged = 0
+                for position, record in enumerate(iter_records(path), start=1):
+                    if phase == start_phase and position <= start_record:
+                        continue
+                    kind = record.get("kind") if isinstance(record, dict) else None
+                    if kind not in KINDS:
+                        if phase == 0:
+                            self._error(position, record, f"Unknown kind: {kind}")
+                        continue
+                    if kind not in kinds:
+                        continue
+                    if kind != "host" or phase == 0:
+                        self.report["records"] += 1
+                    try:
+                        status = handlers[kind](record, phase)
+                    except ValueError as error:
+                        self._error(position, record, str(error))
+                        continue
+                    if status:
+                        self._count(status, kind)
+                    staged += 1
+                    if staged >= self.chunk_size:
+                        self._flush(path, phase, position)
+                        staged = 0
+                # The next run starts with the next pass
+                self._flush(path, phase + 1, 0)
+        except BaseException:
+            self.db.rollback()
+            raise
+        os.remove(checkpoint_path(path))
+        self.report["phase"] = None
+        return self.report
+
+    def _error(self, position: int, record: Any, message: str):
+        self.report["errors"] += 1
+        if len(self.report["error_samples"]) < MAX_REPORTED_ERRORS:
+            kind = record.get("kind") if isinstance(record, dict) else None
+            self.report["error_samples"].append({"record": position, "kind": kind, "error": message})
+
+
+def import_inventory(db: Session, path: str, environment_id: Optional[int] = None, chunk_size: int = IMPORT_CHUNK_SIZE,
+                     resume: bool = True, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Import an inventory file, see InventoryImporter."""
+    return InventoryImporter(db, environment_id, chunk_size, progress).run(path, resume=resume)
+
+
+if __name__ == "__main__":
+    import argparse
+    from ..database.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import an inventory of hosts, networks, VMs and domains")
+    parser.add_argument("path", help="YAML, JSON or NDJSON inventory file")
+    parser.add_argument("--environment-id", type=int, help="Environment of the records without environment_id")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Records written per transaction")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of a previous run")
+    arguments = parser.parse_args()
+
+    def _print_progress(report: Dict[str, Any]):
+        print(f"phase {report['phase']}: {report['records']} records, {report['errors']} errors, "
+              f"{report['records_per_second']} records/s", file=sys.stderr)
+
+    with SessionLocal() as session:
+        print(json.dumps(import_inventory(session, arguments.path, arguments.environment_id, arguments.chunk_size,
+                                          resume=not arguments.restart, progress=_print_progress), indent=2))
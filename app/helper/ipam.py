@@ -0,0 +1,606 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/helper/ipam.py
+"""
+IP address management.
+
+The registry keeps every network in a binary radix trie per IP version, keyed on the prefix bits.
+Overlap and containment checks walk one path of the trie. Each node also records the largest free
+aligned block below it, so the next free subnet of a given size is found by one descent:
+O(prefix length) whatever the number of networks.
+
+Addresses in use are tracked per network in a hierarchical bitmap (64-bit words, one summary bit per
+full word at the level above), stored sparsely so that an IPv6 /64 costs only what is allocated. The
+lowest free address is found in one descent as well. A network's bitmap is built on first use from
+the attachment repositories, then kept current: changes flushed by a Session are applied when it
+commits and dropped when it does not. Writers that bypass the ORM call `add_network()` and
+`invalidate()`.
+
+The registry lives in one process. Addresses are checked against the database before they are
+handed out, which catches those attached by other workers since the bitmap was loaded.
+"""
+import ipaddress
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+
+from .session_changes import history, track
+from ..models.network import Network
+from ..models.network_application import NetworkApplication
+from ..models.network_container_node import NetworkContainerNode
+from ..models.network_gateway import NetworkGateway
+from ..models.network_physical_host import NetworkPhysicalHost
+from ..models.network_vm import NetworkVM
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+ATTACHMENT_MODELS = (NetworkPhysicalHost, NetworkVM, NetworkContainerNode, NetworkApplication, NetworkGateway)
+
+_WORD = 64
+_FULL = (1 << _WORD) - 1
+_NO_BLOCK = 1 << 16
+
+
+def parse_network(cidr: str) -> IPNetwork:
+    """Parse a CIDR, host bits set included (10.0.0.1/24 is 10.0.0.0/24)."""
+    try:
+        return ipaddress.ip_network(str(cidr).strip(), strict=False)
+    except ValueError as error:
+        raise ValueError(f"Invalid CIDR: {cidr}") from error
+
+
+def parse_address(ip: str) -> IPAddress:
+    """Parse an IP address, tolerating a prefix length (INET values may carry one)."""
+    try:
+        return ipaddress.ip_interface(str(ip).strip()).ip
+    except ValueError as error:
+        raise ValueError(f"Invalid IP address: {ip}") from error
+
+
+def reserved_offsets(network: IPNetwork) -> Tuple[int, ...]:
+    """Offsets that are never handed out: network and broadcast addresses, the IPv6 subnet-router anycast."""
+    if network.version == 4 and network.prefixlen <= 30:
+        return 0, network.num_addresses - 1
+    if network.version == 6 and network.prefixlen <= 126:
+        return (0,)
+    return ()
+
+
+class AddressBitmap:
+    """
+    Set of offsets in [0, size), with the lowest free offset found in O(log size).
+
+    Level 0 holds one bit per offset; a bit of level n + 1 is set when the word it stands for in
+    level n is full. Words are kept in dicts, absent words being empty.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        depth = 1
+        while (1 << (6 * depth)) < size:
+            depth += 1
+        self._levels: List[Dict[int, int]] = [{} for _ in range(depth)]
+
+    def __contains__(self, offset: int) -> bool:
+        return bool(self._levels[0].get(offset >> 6, 0) >> (offset & 63) & 1)
+
+    def add(self, offset: int):
+        if not 0 <= offset < self.size:
+            raise ValueError(f"Offset {offset} out of range")
+        if offset in self:
+            return
+        self.count += 1
+        for level in self._levels:
+            index, bit = offset >> 6, offset & 63
+            word = level.get(index, 0) | (1 << bit)
+            level[index] = word
+            if word != _FULL:
+                break
+            offset = index
+
+    def discard(self, offset: int):
+        if not 0 <= offset < self.size or offset not in self:
+            return
+        self.count -= 1
+        for level in self._levels:
+            index, bit = offset >> 6, offset & 63
+            word = level[index]
+            was_full = word == _FULL
+            word &= ~(1 << bit)
+            if word:
+                level[index] = word
+            else:
+                del level[index]
+            if not was_full:
+                break
+            offset = index
+
+    def first_free(self) -> Optional[int]:
+        offset = 0
+        for level in reversed(self._levels):
+            word = level.get(offset, 0)
+            if word == _FULL:
+                return None
+            offset = (offset << 6) | ((~word & (word + 1)).bit_length() - 1)
+        return offset if offset < self.size else None
+
+
+class _Node:
+    __slots__ = ("children", "networks", "free")
+
+    def __init__(self, depth: int):
+        self.children: List[Optional["_Node"]] = [None, None]
+        self.networks: Set[int] = set()
+        # Smallest depth of a completely free aligned block below this node
+        self.free = depth + 1
+
+
+class PrefixTrie:
+    """Binary radix trie of the networks of one IP version."""
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self.root = _Node(0)
+
+    def _bit(self, address: int, depth: int) -> int:
+        return (address >> (self.bits - 1 - depth)) & 1
+
+    def _child_free(self, child: Optional[_Node], depth: int) -> int:
+        # depth is the depth of the child
+        if child is None:
+            return depth
+        if child.networks:
+            return _NO_BLOCK
+        return child.free
+
+    def _update(self, path: List[_Node]):
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if depth == self.bits:
+                node.free = _NO_BLOCK
+            else:
+                node.free = min(self._child_free(child, depth + 1) for child in node.children)
+
+    def _path(self, network: IPNetwork, create: bool) -> List[_Node]:
+        address, node, path = int(network.network_address), self.root, [self.root]
+        for depth in range(network.prefixlen):
+            bit = self._bit(address, depth)
+            child = node.children[bit]
+            if child is None:
+                if not create:
+                    break
+                child = node.children[bit] = _Node(depth + 1)
+            node = child
+            path.append(node)
+        return path
+
+    def add(self, network: IPNetwork, network_id: int):
+        path = self._path(network, create=True)
+        path[-1].networks.add(network_id)
+        self._update(path)
+
+    def discard(self, network: IPNetwork, network_id: int):
+        path = self._path(network, create=False)
+        if len(path) != network.prefixlen + 1:
+            return
+        path[-1].networks.discard(network_id)
+        # Prune the nodes left without networks nor children
+        address = int(network.network_address)
+        for depth in range(len(path) - 1, 0, -1):
+            node = path[depth]
+            if node.networks or node.children[0] or node.children[1]:
+                break
+            path[depth - 1].children[self._bit(address, depth - 1)] = None
+            path.pop()
+        self._update(path)
+
+    def containing(self, network: IPNetwork) -> List[int]:
+        """Networks equal to or containing `network`, the widest first."""
+        found: List[int] = []
+        path = self._path(network, create=False)
+        for node in path:
+            found.extend(sorted(node.networks))
+        return found
+
+    def overlapping(self, network: IPNetwork) -> List[int]:
+        """Networks containing `network` or contained in it."""
+        path = self._path(network, create=False)
+        found = [network_id for node in path[:-1] for network_id in sorted(node.networks)]
+        if len(path) == network.prefixlen + 1:
+            stack = [path[-1]]
+            while stack:
+                node = stack.pop()
+                found.extend(sorted(node.networks))
+                stack.extend(child for child in reversed(node.children) if child is not None)
+        else:
+            found.extend(sorted(path[-1].networks))
+        return found
+
+    def first_free(self, parent: IPNetwork, prefixlen: int) -> Optional[IPNetwork]:
+        """The lowest block of length `prefixlen` inside `parent` overlapping no network below it."""
+        if not parent.prefixlen < prefixlen <= self.bits:
+            raise ValueError(f"Prefix length must be between {parent.prefixlen + 1} and {self.bits}")
+        address = int(parent.network_address)
+        path = self._path(parent, create=False)
+        node, depth = path[-1], len(path) - 1
+        if depth < parent.prefixlen:
+            # Nothing registered inside parent
+            return ipaddress.ip_network((address, prefixlen))
+        if node.free > prefixlen:
+            return None
+        while True:
+            for bit in (0, 1):
+                child = node.children[bit]
+                child_address = address | (bit << (self.bits - 1 - depth))
+                if child is None:
+                    return ipaddress.ip_network((child_address, prefixlen))
+                if not child.networks and depth + 1 < prefixlen and child.free <= prefixlen:
+                    node, depth, address = child, depth + 1, child_address
+                    break
+            else:
+                return None
+
+
+class IPAMRegistry:
+    """Networks and addresses in use, see the module documentation."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._warmed = False
+        self._networks: Dict[int, IPNetwork] = {}
+        self._tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self._bitmaps: Dict[int, AddressBitmap] = {}
+        # Addresses used by more than one attachment: extra count by (network_id, offset)
+        self._shared: Dict[Tuple[int, int], int] = {}
+
+    # Networks
+
+    def warm(self, db: Session):
+        """Load every network; bitmaps are loaded per network on first use."""
+        rows = db.execute(select(Network.id, Network.cidr)).all()
+        with self._lock:
+            self._networks.clear()
+            self._tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+            self._bitmaps.clear()
+            self._shared.clear()
+            for network_id, cidr in rows:
+                self._add_network(network_id, cidr)
+            self._warmed = True
+
+    def _ensure(self, db: Session):
+        if not self._warmed:
+            self.warm(db)
+
+    def _add_network(self, network_id: int, cidr: str):
+        try:
+            network = parse_network(cidr)
+        except ValueError:
+            return  # Rows written before validation: not managed
+        self._discard_network(network_id)
+        self._networks[network_id] = network
+        self._tries[network.version].add(network, network_id)
+
+    def _discard_network(self, network_id: int):
+        network = self._networks.pop(network_id, None)
+        if network is not None:
+            self._tries[network.version].discard(network, network_id)
+        self._bitmaps.pop(network_id, None)
+        for key in [key for key in self._shared if key[0] == network_id]:
+            del self._shared[key]
+
+    def add_network(self, network_id: int, cidr: str):
+        """Register a network written without the ORM (ignored until the registry is warmed)."""
+        with self._lock:
+            if self._warmed:
+                self._add_network(network_id, cidr)
+
+    def reset(self):
+        """Forget everything, to be reloaded on next use (after networks were written without the ORM)."""
+        with self._lock:
+            self._warmed = False
+
+    def invalidate(self, network_ids: Iterable[int]):
+        """Forget the addresses of networks whose attachments were written without the ORM."""
+        with self._lock:
+            for network_id in network_ids:
+                self._bitmaps.pop(network_id, None)
+                for key in [key for key in self._shared if key[0] == network_id]:
+                    del self._shared[key]
+
+    def network(self, db: Session, network_id: int) -> IPNetwork:
+        self._ensure(db)
+        network = self._networks.get(network_id)
+        if network is None:
+            raise ValueError(f"Unknown network: {network_id}")
+        return network
+
+    def overlapping(self, db: Session, cidr: str) -> List[int]:
+        """Ids of the networks containing `cidr` or contained in it."""
+        self._ensure(db)
+        network = parse_network(cidr)
+        with self._lock:
+            return self._tries[network.version].overlapping(network)
+
+    def containing(self, db: Session, ip: str) -> List[int]:
+        """Ids of the networks containing the address `ip`, the widest first."""
+        self._ensure(db)
+        address = parse_address(ip)
+        with self._lock:
+            return self._tries[address.version].containing(ipaddress.ip_network(address))
+
+    def allocate_subnet(self, db: Session, parent_cidr: str, prefixlen: int) -> str:
+        """
+        Find the lowest subnet of `parent_cidr` overlapping no registered network.
+
+        Args:
+            db: The database session
+            parent_cidr: The range to carve the subnet from, usually an existing network
+            prefixlen: Prefix length of the subnet
+
+        Returns:
+            The subnet CIDR (not reserved: it is taken once a network is created with it)
+
+        Raises:
+            ValueError: If the prefix length does not fit in the parent or no subnet is free
+        """
+        self._ensure(db)
+        parent = parse_network(parent_cidr)
+        with self._lock:
+            subnet = self._tries[parent.version].first_free(parent, prefixlen)
+        if subnet is None:
+            raise ValueError(f"No free /{prefixlen} left in {parent}")
+        return str(subnet)
+
+    # Addresses
+
+    def _bitmap(self, db: Session, network_id: int) -> AddressBitmap:
+        # Called with the lock held
+        bitmap = self._bitmaps.get(network_id)
+        if bitmap is not None:
+            return bitmap
+        network = self.network(db, network_id)
+        bitmap = AddressBitmap(network.num_addresses)
+        for offset in reserved_offsets(network):
+            bitmap.add(offset)
+        from ..repositories import network_attachment_repo
+        attachments = network_attachment_repo.list_network_attachments(db, network_id)
+        self._bitmaps[network_id] = bitmap
+        for attachment in attachments:
+            self._use(network_id, attachment.ip_address)
+        return bitmap
+
+    def _offset(self, network_id: int, ip: str) -> Optional[int]:
+        network = self._networks.get(network_id)
+        try:
+            address = parse_address(ip)
+        except ValueError:
+            return None
+        if network is None or address not in network:
+            return None
+        return int(address) - int(network.network_address)
+
+    def _use(self, network_id: int, ip: str):
+        # Called with the lock held, for a network whose bitmap is loaded
+        offset = self._offset(network_id, ip)
+        if offset is None:
+            return
+        bitmap = self._bitmaps[network_id]
+        if offset in bitmap:
+            key = (network_id, offset)
+            self._shared[key] = self._shared.get(key, 0) + 1
+        else:
+            bitmap.add(offset)
+
+    def _release(self, network_id: int, ip: str):
+        offset = self._offset(network_id, ip)
+        bitmap = self._bitmaps.get(network_id)
+        if offset is None or bitmap is None or offset in reserved_offsets(self._networks[network_id]):
+            return
+        key = (network_id, offset)
+        if key in self._shared:
+            self._shared[key] -= 1
+            if not self._shared[key]:
+                del self._shared[key]
+        else:
+            bitmap.discard(offset)
+
+    def _taken_in_database(self, db: Session, network_id: int, ips: List[str]) -> Set[str]:
+        query = union_all(*[
+            select(model.ip_address).where(model.network_id == network_id, model.ip_address.in_(ips))
+            for model in ATTACHMENT_MODELS
+        ])
+        return {str(parse_address(ip)) for ip in db.execute(query).scalars()}
+
+    def check_address(self, db: Session, network_id: int, ip: str) -> str:
+        """
+        Validate an address to attach to a network.
+
+        Args:
+            db: The database session
+            network_id: The network of the attachment
+            ip: The requested address
+
+        Returns:
+            The normalized address
+
+        Raises:
+            ValueError: If the address is invalid, outside the network, reserved or already in use
+        """
+        network = self.network(db, network_id)
+        address = parse_address(ip)
+        if address not in network:
+            raise ValueError(f"{address} is not in network {network}")
+        offset = int(address) - int(network.network_address)
+        if offset in reserved_offsets(network):
+            raise ValueError(f"{address} is reserved in network {network}")
+        with self._lock:
+            in_use = offset in self._bitmap(db, network_id)
+        if in_use or self._taken_in_database(db, network_id, [str(address)]):
+            raise ValueError(f"{address} is already in use in network {network}")
+        self._reserve(db, network_id, offset)
+        return str(address)
+
+    def _reserve(self, db: Session, network_id: int, offset: int):
+        # Held by the session until it commits the attachment, or rolls back
+        with self._lock:
+            self._bitmap(db, network_id).add(offset)
+        db.info.setdefault("ipam_reserved", set()).add((network_id, offset))
+
+    def allocate_ip(self, db: Session, network_id: int) -> str:
+        """
+        Reserve the lowest free address of a network for the session's next attachment.
+
+        Raises:
+            ValueError: If the network is unknown or full
+        """
+        network = self.network(db, network_id)
+        while True:
+            with self._lock:
+                bitmap = self._bitmap(db, network_id)
+                offset = bitmap.first_free()
+                if offset is None:
+                    raise ValueError(f"No free address left in network {network}")
+                bitmap.add(offset)
+            address = str(network.network_address + offset)
+            if not self._taken_in_database(db, network_id, [address]):
+                db.info.setdefault("ipam_reserved", set()).add((network_id, offset))
+                return address
+            # Attached by another worker since the bitmap was loaded: keep it marked and go on
+
+    def usage(self, db: Session, network_id: int) -> Dict[str, int]:
+        """Size, used and free addresses of a network (reserved addresses excluded)."""
+        network = self.network(db, network_id)
+        reserved = len(reserved_offsets(network))
+        with self._lock:
+            used = self._bitmap(db, network_id).count - reserved
+        size = network.num_addresses - reserved
+        return {"size": size, "used": used, "free": size - used}
+
+    # Session changes
+
+    def _apply(self, session: Session, changes: List[Tuple[str, int, str]]):
+        reserved = session.info.pop("ipam_reserved", set())
+        with self._lock:
+            if not self._warmed:
+                return
+            for change, key, value in changes:
+                if change == "network+":
+                    self._add_network(key, value)
+                elif change == "network-":
+                    self._discard_network(key)
+                elif key in self._bitmaps:
+                    offset = self._offset(key, value)
+                    if change == "address+":
+                        if (key, offset) in reserved:
+                            reserved.discard((key, offset))  # Already marked when reserved
+                        else:
+                            self._use(key, value)
+                    else:
+                        self._release(key, value)
+            self._release_reserved(reserved)
+
+    def _release_reserved(self, reserved: Set[Tuple[int, int]]):
+        for network_id, offset in reserved:
+            bitmap = self._bitmaps.get(network_id)
+            if bitmap is not None and (network_id, offset) not in self._shared:
+                bitmap.discard(offset)
+
+    def _discard(self, session: Session, changes: List[Tuple[str, int, str]]):
+        reserved = session.info.pop("ipam_reserved", set())
+        with self._lock:
+            self._release_reserved(reserved)
+
+
+registry = IPAMRegistry()
+
+
+def attachment_address(db: Session, network_id: int, ip_address: Optional[str] = None,
+                       current: Optional[Tuple[int, str]] = None) -> str:
+    """
+    The address of an attachment to a network: `ip_address` once validated, or the lowest free one.
+
+    Args:
+        db: The database session
+        network_id: The network of the attachment
+        ip_address: The requested address, None to allocate one
+        current: (network_id, ip_address) of the attachment being updated, whose address is not in use by another
+
+    Returns:
+        The normalized address
+
+    Raises:
+        ValueError: If the address is invalid, outside the network, reserved or already in use
+    """
+    if ip_address is None:
+        return registry.allocate_ip(db, network_id)
+    if current is not None and current[0] == network_id:
+        try:
+            if parse_address(current[1]) == parse_address(ip_address):
+                return str(parse_address(ip_address))
+        except ValueError:
+            pass
+    return registry.check_address(db, network_id, ip_address)
+
+
+def _record_changes(session):
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Network):
+            changes.append(("network+", obj.id, obj.cidr))
+        elif isinstance(obj, ATTACHMENT_MODELS):
+            changes.append(("address+", obj.network_id, obj.ip_address))
+    for obj in session.dirty:
+        if isinstance(obj, Network):
+            old, new = history(obj, "cidr")
+            if old != new:
+                changes.append(("network-", obj.id, old))
+                changes.append(("network+", obj.id, new))
+        elif isinstance(obj, ATTACHMENT_MODELS):
+            old_network, new_network = history(obj, "network_id")
+            old_ip, new_ip = history(obj, "ip_address")
+            if (old_network, old_ip) != (new_network, new_ip):
+                changes.append(("address-", old_network, old_ip))
+                changes.append(("address+", new_network, new_ip))
+    for obj in session.deleted:
+        if isinstance(obj, Network):
+            changes.append(("network-", obj.id, obj.cidr))
+        elif isinstance(obj, ATTACHMENT_MODELS):
+            changes.append(("address-", obj.network_id, obj.ip_address))
+    return changes
+
+
+# Reservations are released when the transaction ends without a commit
+track("ipam_changes", _record_changes, registry._apply, registry._discard, held=("ipam_reserved",))
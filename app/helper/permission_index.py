@@ -0,0 +1,296 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/helper/permission_index.py
+"""
+Compiled per-user permission index.
+
+`has_permission` used to walk user.organizations × user.groups × group.policies × policy.rules on
+every call, lazy-loading each relationship. This module compiles the rules that apply to a user
+into a handful of dictionaries with a single bulk query, so that each permission check becomes a
+few O(1) lookups.
+
+Compiled indexes are cached per user and dropped whenever a flush touches users, groups,
+organizations, policies, rules or functions (membership changes mark the owning objects dirty,
+so they are caught as well), and again when that transaction commits or rolls back: an index
+compiled in between may hold rows that were rolled back, or miss the committed ones. A TTL bounds
+staleness across worker processes.
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from .session_changes import track
+from ..models.element import Element
+from ..models.environment import Environment
+from ..models.function import Function
+from ..models.group import Group, user_groups
+from ..models.organization import Organization, user_organizations
+from ..models.policy import Policy, policy_groups, policy_users
+from ..models.rule import Rule
+from ..models.user import User
+from ..core.settings import load_environment
+
+load_environment()
+
+PERMISSION_INDEX_TTL = int(os.getenv("PERMISSION_INDEX_TTL", 300))
+ADMIN_FUNCTION = "admin"
+
+# Models whose changes may alter the effective permissions of a user
+_PERMISSION_MODELS = (User, Group, Organization, Policy, Rule, Function)
+# Deleting these targets removes their rules through ON DELETE CASCADE
+_CASCADING_TARGETS = (Environment, Element)
+
+# A compiled entry is the access_schedule of a rule (None when the rule is always active)
+Schedules = List[Optional[str]]
+
+
+class PermissionIndex:
+    """
+    Effective permission set of a user.
+
+    Rules are stored under the key (function name, environment_id, element_id, organization_id)
+    and are additionally indexed by function name alone (rules that apply everywhere), by
+    (function name, environment_id) and by (function name, element_id), and per organization of
+    their policy by (function name, scope) for `allows_in`.
+    """
+
+    def __init__(self, user_id: int, rows: Iterable[Tuple[int, str, Optional[int], Optional[int], int, Optional[str]]]):
+        self.user_id = user_id
+        self.built_at = time.monotonic()
+        self.entries: Dict[Tuple[str, Optional[int], Optional[int], int], Schedules] = {}
+        # Rules restricted by an access_schedule, by rule ID
+        self.scheduled: Dict[int, str] = {}
+        self._global: Dict[str, Schedules] = {}
+        self._by_env: Dict[Tuple[str, int], Schedules] = {}
+        self._by_element: Dict[Tuple[str, int], Schedules] = {}
+        # (function name, None | "environment" | "element", target ID) -> organization ID -> schedules
+        self._scoped: Dict[Tuple[str, Optional[str], Optional[int]], Dict[int, Schedules]] = {}
+
+        for rule_id, function_name, environment_id, element_id, organization_id, access_schedule in rows:
+            if access_schedule:
+                self.scheduled[rule_id] = access_schedule
+            self.entries.setdefault((function_name, environment_id, element_id, organization_id), []).append(access_schedule)
+            for scope in self._scopes(function_name, environment_id, element_id):
+                self._scoped.setdefault(scope, {}).setdefault(organization_id, []).append(access_schedule)
+            if environment_id is None and element_id is None:
+                self._global.setdefault(function_name, []).append(access_schedule)
+                continue
+            if environment_id is not None:
+                self._by_env.setdefault((function_name, environment_id), []).append(access_schedule)
+            if element_id is not None:
+                self._by_element.setdefault((function_name, element_id), []).append(access_schedule)
+
+    def is_expired(self) -> bool:
+        return time.monotonic() - self.built_at > PERMISSION_INDEX_TTL
+
+    def active_scheduled_rule_ids(self) -> List[int]:
+        """IDs of the scheduled rules whose access window is open right now."""
+        from .permissions import is_schedule_accessible_now
+        return [rule_id for rule_id, schedule in self.scheduled.items() if is_schedule_accessible_now(schedule)]
+
+    @staticmethod
+    def _any_active(schedules: Optional[Schedules]) -> bool:
+        if not schedules:
+            return False
+        # Imported here: permissions imports this module
+        from .permissions import is_schedule_accessible_now
+        return any(schedule is None or is_schedule_accessible_now(schedule) for schedule in schedules)
+
+    @staticmethod
+    def _scopes(function_name: str, environment_id: Optional[int], element_id: Optional[int]):
+        if environment_id is None and element_id is None:
+            yield function_name, None, None
+        if environment_id is not None:
+            yield function_name, "environment", environment_id
+        if element_id is not None:
+            yield function_name, "element", element_id
+
+    def allows_in(self, function_names: Iterable[str], organization_id: int = None,
+                  environment_id: int = None, element_id: int = None) -> bool:
+        """
+        Same decision as `permissions.permission_filter`, for a single target.
+
+        Args:
+            function_names: Requested function names (the "admin" wildcard is always added)
+            organization_id: The policy of the rule must belong to this organization, if given
+            environment_id: Rules on this environment apply, if given
+            element_id: Rules on this element apply, if given
+
+        Returns:
+            bool: True if at least one active rule grants one of the functions on the target
+        """
+        names = set(function_names)
+        names.add(ADMIN_FUNCTION)
+        for name in names:
+            # Unscoped rules always apply, scoped ones when their target is the requested one
+            for scope in {*self._scopes(name, None, None), *self._scopes(name, environment_id, element_id)}:
+                by_organization = self._scoped.get(scope)
+                if not by_organization:
+                    continue
+                if organization_id is not None:
+                    if self._any_active(by_organization.get(organization_id)):
+                        return True
+                elif any(self._any_active(schedules) for schedules in by_organization.values()):
+                    return True
+        return False
+
+    def allows(self, function_names: Iterable[str], target_env: int = None, target_element=None) -> bool:
+        """
+        Same decision as the rule walk historically done in `permissions.has_permission`.
+
+        Args:
+            function_names: Requested function names (the "admin" wildcard is always added)
+            target_env: Target environment ID
+            target_element: Target element (an object with `id` and `environment_id`)
+
+        Returns:
+            bool: True if at least one active rule grants one of the functions on the target
+        """
+        names = set(function_names)
+        names.add(ADMIN_FUNCTION)
+        element_id = getattr(target_element, "id", None)
+        element_env_id = getattr(target_element, "environment_id", None)
+
+        for name in names:
+            # Rule without environment nor element: applies everywhere
+            if self._any_active(self._global.get(name)):
+                return True
+            if target_env is None and target_element is None:
+                continue
+            if target_element is None:
+                if self._any_active(self._by_env.get((name, target_env))):
+                    return True
+                continue
+            if self._any_active(self._by_element.get((name, element_id))):
+                return True
+            if self._any_active(self._by_env.get((name, element_env_id))):
+                return True
+            if target_env is not None and self._any_active(self._by_env.get((name, target_env))):
+                return True
+        return False
+
+
+def applicable_policy_clause(user_id, policy=Policy):
+    """
+    SQL condition selecting the policies that apply to a user.
+
+    A policy applies if it belongs to one of the user's organizations and is attached either
+    directly to the user or to one of the user's groups in that same organization.
+    `user_id` may be a literal or a column expression, `policy` may be an alias of Policy.
+    Every other table is aliased so the condition can be nested in queries over the same tables.
+    """
+    organizations = user_organizations.alias()
+    direct_policies = policy_users.alias()
+    memberships = user_groups.alias()
+    group_policies = policy_groups.alias()
+    group = aliased(Group)
+
+    in_organization = exists().where(
+        organizations.c.user_id == user_id,
+        organizations.c.organization_id == policy.organization_id,
+    )
+    direct = exists().where(
+        direct_policies.c.user_id == user_id,
+        direct_policies.c.policy_id == policy.id,
+    )
+    through_group = exists().where(
+        memberships.c.user_id == user_id,
+        memberships.c.group_id == group.id,
+        group.organization_id == policy.organization_id,
+        group_policies.c.group_id == group.id,
+        group_policies.c.policy_id == policy.id,
+    )
+    return and_(in_organization, or_(direct, through_group))
+
+
+def build_permission_index(db: Session, user_id: int) -> PermissionIndex:
+    """Compile the effective permission set of a user with one query."""
+    stmt = (
+        select(Rule.id, Function.name, Rule.environment_id, Rule.element_id, Policy.organization_id, Rule.access_schedule)
+        .join(Function, Function.id == Rule.function_id)
+        .join(Policy, Policy.id == Rule.policy_id)
+        .where(applicable_policy_clause(user_id))
+    )
+    return PermissionIndex(user_id, db.execute(stmt).all())
+
+
+_lock = threading.Lock()
+_indexes: Dict[int, PermissionIndex] = {}
+# Incremented on every invalidation so that an index compiled concurrently is not cached stale
+_generation = 0
+
+
+def get_permission_index(db: Session, user_id: int) -> PermissionIndex:
+    """Return the cached index of a user, compiling it if missing or expired."""
+    with _lock:
+        index = _indexes.get(user_id)
+        generation = _generation
+    if index is not None and not index.is_expired():
+        return index
+    index = build_permission_index(db, user_id)
+    with _lock:
+        if generation == _generation:
+            _indexes[user_id] = index
+    return index
+
+
+def invalidate(user_id: int = None):
+    """Drop the compiled index of a user, or of every user when no ID is given."""
+    global _generation
+    with _lock:
+        _generation += 1
+        if user_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(user_id, None)
+
+
+def _record_changes(session):
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, _PERMISSION_MODELS) for obj in changed) or \
+            any(isinstance(obj, _CASCADING_TARGETS) for obj in session.deleted):
+        # The flushing session must not check against the previous rules
+        invalidate()
+        return [True]
+    return []
+
+
+def _invalidate(session, changes):
+    invalidate()
+
+
+track("permission_index_changes", _record_changes, _invalidate, _invalidate)
@@ -1,6 +1,11 @@
 from datetime import datetime
+from sqlalchemy import and_, exists, or_, true
+from sqlalchemy.orm import aliased
 from .croniter import croniter
-import json
+from . import permission_index, schedule_cache
+from ..models.function import Function
+from ..models.policy import Policy
+from ..models.rule import Rule
 
 def is_in_cron_interval(test_dt, cron_start_expr, cron_end_expr):
     """
@@ -12,18 +17,31 @@ def is_in_cron_interval(test_dt, cron_start_expr, cron_end_expr):
     :return: bool - True si test_dt est dans l'intervalle [début, fin[
     """
     # Trouver la dernière occurrence de début <= test_dt
-    iter_start = croniter.croniter(cron_start_expr, test_dt)
+    iter_start = croniter(cron_start_expr, test_dt)
     prev_start = iter_start.get_prev(datetime)
     next_start = iter_start.get_next(datetime)
     start_occurrence = prev_start if next_start != test_dt else test_dt
 
     # Trouver la prochaine occurrence de fin après le début trouvé
-    iter_end = croniter.croniter(cron_end_expr, start_occurrence)
+    iter_end = croniter(cron_end_expr, start_occurrence)
     end_occurrence = iter_end.get_next(datetime)
 
     # Vérifier l'intervalle [début, fin[
     return start_occurrence <= test_dt < end_occurrence
 
+def is_schedule_accessible_now(access_schedule) -> bool:
+    """
+    Vérifie si l'heure actuelle est dans la fenêtre définie par un access_schedule.
+
+    Les plannings sont compilés une seule fois et la fenêtre courante est mise en cache
+    (voir `schedule_cache`) : la plupart des vérifications se réduisent à une comparaison.
+    Un planning absent, mal formé ou invalide autorise l'accès.
+
+    :param access_schedule: str | dict - Planning JSON {"start": <cron>, "end": <cron>}
+    :return: bool - True si l'accès est autorisé maintenant
+    """
+    return schedule_cache.is_open(access_schedule)
+
 def is_rule_accessible_now(rule):
     """
     Vérifie si une règle est accessible au moment actuel en fonction de son access_schedule.
@@ -31,28 +49,7 @@ def is_rule_accessible_now(rule):
     :param rule: Rule - La règle à vérifier
     :return: bool - True si la règle est accessible maintenant, False sinon
     """
-    # Si pas d'access_schedule défini, la règle est toujours accessible
-    if not rule.access_schedule:
-        return True
-
-    try:
-        # Parser le JSON de l'access_schedule
-        if isinstance(rule.access_schedule, str):
-            schedule = json.loads(rule.access_schedule)
-        else:
-            schedule = rule.access_schedule
-
-        # Vérifier que les clés 'start' et 'end' sont présentes
-        if 'start' not in schedule or 'end' not in schedule:
-            return True  # Si le format n'est pas correct, on autorise l'accès
-
-        # Vérifier si l'heure actuelle est dans l'intervalle
-        current_time = datetime.now()
-        return is_in_cron_interval(current_time, schedule['start'], schedule['end'])
-
-    except (json.JSONDecodeError, KeyError, Exception):
-        # En cas d'erreur de parsing ou autre, on autorise l'accès par défaut
-        return True
+    return is_schedule_accessible_now(rule.access_schedule)
 
 def has_permission(db, user, target_env: int= None, target_element:int =None, permission: (str or list[str]) = None ) -> bool:
     """
@@ -78,72 +75,107 @@ def has_permission(db, user, target_env: int= None, target_element:int =None, pe
     - si target_env est None on regardera les règles par rapport à target_element
     - si target_element est None on regardera les règles par rapport à target_env
     - si target_env et target_element sont None, on retournera faux sauf si les deux éléments des règles sont à None
+
+    Les règles applicables sont compilées une fois par utilisateur (voir `permission_index`),
+    chaque vérification se limite ensuite à quelques recherches dans des dictionnaires.
+    """
+    # Si l'utilisateur est superadmin, il a tous les droits
+    if user.is_superadmin:
+        return True
+
+    if isinstance(permission, list):
+        function_names = [str.lower(perm) for perm in permission]
+    elif permission is None:
+        function_names = []
+    else:
+        function_names = [str.lower(permission)]
+
+    index = permission_index.get_permission_index(db, user.id)
+    return index.allows(function_names, target_env, target_element)
+
+
+def check_permission(db, user, permission: (str or list[str]), organization_id: int = None,
+                     environment_id: int = None, element_id: int = None) -> bool:
+    """
+    Vérifie une permission sur une cible unique, avec la même sémantique que `permission_filter`.
+
+    Les routes de détail utilisent cette vérification et les routes de liste le prédicat SQL : un
+    objet visible dans une liste est lisible en détail, et inversement.
+
+    Sans organisation ni cible, la vérification est globale (gestion des utilisateurs, fonctions) :
+    comme pour `has_permission`, seule une règle admin sans environnement ni élément l'accorde. Une
+    règle portant sur la fonction demandée ne vaut que dans l'organisation de sa policy.
+
+    :param organization_id: int - La policy de la règle doit appartenir à cette organisation
+    :param environment_id: int - Les règles portant sur cet environnement s'appliquent
+    :param element_id: int - Les règles portant sur cet élément s'appliquent
+    :return: bool - True si une règle active accorde la permission sur la cible
     """
     # Si l'utilisateur est superadmin, il a tous les droits
     if user.is_superadmin:
         return True
 
-    # Récupérer toutes les policies applicables à l'utilisateur
-    applicable_policies = set()
-
-    # Pour chaque organisation de l'utilisateur
-    for organization in user.organizations:
-        # Policies des groupes de l'utilisateur dans cette organisation
-        for group in user.groups:
-            if group.organization_id == organization.id:
-                for policy in group.policies:
-                    if policy.organization_id == organization.id:
-                        applicable_policies.add(policy)
-
-        # Policies directement associées à l'utilisateur
-        for policy in user.policies:
-            if policy.organization_id == organization.id:
-                applicable_policies.add(policy)
-
-    # Vérifier les règles de chaque policy applicable
-    for policy in applicable_policies:
-        for rule in policy.rules:
-            # Vérifier que la fonction correspond à la permission demandée
-            if isinstance(permission, list):
-                check = any( str.lower(perm) == rule.function.name for perm in permission )
-            elif permission is None:
-                check = False
-            else:
-                check = str.lower(permission) == rule.function.name
-            if check or rule.function.name == "admin":
-                # Vérifier d'abord si la règle est accessible selon son horaire
-                if not is_rule_accessible_now(rule):
-                    continue  # Passer à la règle suivante si pas accessible maintenant
-
-                # Cas où les deux sont None: la règle s'applique à tous les environnements et éléments
-                if rule.environment_id is None and rule.element_id is None:
-                    return True
-
-                # Cas où target_env et target_element sont tous les deux None
-                if target_env is None and target_element is None:
-                    # On retourne True seulement si les deux éléments des règles sont à None
-                    if rule.environment_id is None and rule.element_id is None:
-                        return True
-
-                # Cas où target_element est None: on vérifie par rapport à target_env
-                elif target_element is None:
-                    if rule.environment_id == target_env:
-                        return True
-
-                # Cas où target_env est None: on vérifie par rapport à target_element
-                elif target_env is None:
-                    if rule.element_id == target_element.id:
-                        return True
-                    if rule.environment_id == target_element.environment_id:
-                        return True
-
-                # Cas où les deux sont spécifiés
-                else:
-                    # Si la règle s'applique directement à l'élément
-                    if rule.element_id == target_element.id:
-                        return True
-                    # Si la règle s'applique à l'environnement de l'élément ou à l'environnement cible
-                    if rule.environment_id == target_element.environment_id or rule.environment_id == target_env:
-                        return True
-
-    return False
+    if isinstance(permission, list):
+        function_names = [str.lower(perm) for perm in permission]
+    else:
+        function_names = [str.lower(permission)]
+
+    index = permission_index.get_permission_index(db, user.id)
+    if organization_id is None and environment_id is None and element_id is None:
+        return index.allows([], None, None)
+    return index.allows_in(function_names, organization_id, environment_id, element_id)
+
+
+def permission_filter(db, user, permission: (str or list[str]), organization_id=None, environment_id=None, element_id=None):
+    """
+    Construit un prédicat SQL équivalent à une vérification de permission, pour filtrer des listes en base.
+
+    Le prédicat est un EXISTS sur rules ⋈ functions ⋈ policies, restreint aux policies applicables à
+    l'utilisateur (directement ou via ses groupes, dans ses organisations). Filtrage, comptage et
+    pagination se font alors en base au lieu d'appeler `has_permission` pour chaque ligne.
+
+    Les cibles sont des expressions de colonnes de la requête englobante (ex: Environment.id) :
+    - organization_id : la policy doit appartenir à cette organisation
+    - environment_id : les règles portant sur cet environnement s'appliquent
+    - element_id : les règles portant sur cet élément s'appliquent
+    Les règles sans environnement ni élément s'appliquent toujours, la fonction "admin" vaut pour
+    toutes les permissions. Les règles avec access_schedule ne comptent que si leur fenêtre est ouverte.
+
+    :return: Expression booléenne SQL utilisable dans Query.filter()
+    """
+    # Si l'utilisateur est superadmin, il a tous les droits
+    if user.is_superadmin:
+        return true()
+
+    if isinstance(permission, list):
+        function_names = [str.lower(perm) for perm in permission]
+    elif permission is None:
+        function_names = []
+    else:
+        function_names = [str.lower(permission)]
+    function_names.append(permission_index.ADMIN_FUNCTION)
+
+    rule = aliased(Rule)
+    policy = aliased(Policy)
+    function = aliased(Function)
+
+    scopes = [and_(rule.environment_id.is_(None), rule.element_id.is_(None))]
+    if environment_id is not None:
+        scopes.append(rule.environment_id == environment_id)
+    if element_id is not None:
+        scopes.append(rule.element_id == element_id)
+
+    # Les horaires d'accès ne sont pas évaluables en SQL : on les résout depuis l'index compilé
+    active_scheduled = permission_index.get_permission_index(db, user.id).active_scheduled_rule_ids()
+
+    conditions = [
+        policy.id == rule.policy_id,
+        function.id == rule.function_id,
+        function.name.in_(function_names),
+        or_(*scopes),
+        or_(rule.access_schedule.is_(None), rule.access_schedule == "", rule.id.in_(active_scheduled)),
+        permission_index.applicable_policy_clause(user.id, policy),
+    ]
+    if organization_id is not None:
+        conditions.append(policy.organization_id == organization_id)
+    return exists().where(*conditions)
@@ -0,0 +1,503 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/helper/placement.py
+"""
+VM placement over the capacity of the physical hosts.
+
+Each schedulable host belongs to one pool: the pool of its environment when its allocation mode is
+dedicated, the shared pool otherwise. A pool keeps its hosts in a balanced search tree ordered by
+(free RAM, free CPU), each node holding the most free CPU of its subtree: a decision skips the
+subtrees short of CPU, so it costs O(log n) like adding or removing a host:
+
+- best_fit takes the host with the least free RAM that fits, packing hosts before opening new ones;
+- spread takes the host with the most free RAM, levelling the load.
+
+The dedicated hosts of the VM's environment are tried before the shared ones. CPU capacity is
+`cpu_threads` times PLACEMENT_CPU_OVERCOMMIT; RAM is not overcommitted by the engine. A host given
+by hand stays an override: it is only required to exist, and a host that is not schedulable,
+dedicated to another environment or short of capacity is logged and its usage recorded anyway.
+
+Capacity used by VMs is loaded with one aggregate query, then kept current: VM changes flushed by
+a Session are applied when it commits, and the capacity reserved by `place()` is held until the
+session commits or rolls back. Any host change reloads the engine on next use, as do the writers
+that bypass the ORM (`reset()`). Before a host is handed out its usage is checked against the
+database, which catches the VMs placed by other workers since it was loaded.
+"""
+import logging
+import os
+import random
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .session_changes import history, track
+from ..models.physical_host import AllocationMode, PhysicalHost
+from ..models.vm import VM
+from ..core.settings import load_environment
+
+load_environment()
+
+PLACEMENT_CPU_OVERCOMMIT = float(os.getenv("PLACEMENT_CPU_OVERCOMMIT", 1.0))
+STRATEGIES = ("best_fit", "spread")
+PLACEMENT_STRATEGY = os.getenv("PLACEMENT_STRATEGY", "best_fit")
+# VMs of a dry run, planned with the engine locked
+MAX_PLAN_VMS = 1000
+
+# Pool of the shared hosts; dedicated pools are keyed by environment ID
+SHARED = None
+
+logger = logging.getLogger(__name__)
+
+
+class HostCapacity:
+    """Capacity of a host: committed usage, and capacity reserved by open sessions."""
+
+    __slots__ = ("host_id", "pool", "cpu", "ram", "used_cpu", "used_ram", "reserved_cpu", "reserved_ram")
+
+    def __init__(self, host_id: int, pool: Optional[int], cpu: int, ram: int, used_cpu: int = 0, used_ram: int = 0):
+        self.host_id = host_id
+        self.pool = pool
+        self.cpu = cpu
+        self.ram = ram
+        self.used_cpu = used_cpu
+        self.used_ram = used_ram
+        self.reserved_cpu = 0
+        self.reserved_ram = 0
+
+    @property
+    def free_cpu(self) -> int:
+        return self.cpu - self.used_cpu - self.reserved_cpu
+
+    @property
+    def free_ram(self) -> int:
+        return self.ram - self.used_ram - self.reserved_ram
+
+    def key(self) -> Tuple[int, int, int]:
+        return self.free_ram, self.free_cpu, self.host_id
+
+
+class _Node:
+    """Node of a CapacityIndex, with the most free CPU of its subtree."""
+
+    __slots__ = ("key", "priority", "left", "right", "max_cpu")
+
+    def __init__(self, key: Tuple[int, int, int]):
+        self.key = key
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.max_cpu = key[1]
+
+    def update(self) -> "_Node":
+        self.max_cpu = max(self.key[1], _max_cpu(self.left), _max_cpu(self.right))
+        return self
+
+
+def _max_cpu(node: Optional[_Node]) -> int:
+    return node.max_cpu if node is not None else -1
+
+
+def _split(node: Optional[_Node], key: Tuple[int, int, int]) -> Tuple[Optional[_Node], Optional[_Node]]:
+    # The keys below `key`, and the others
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return node.update(), right
+    left, node.left = _split(node.left, key)
+    return left, node.update()
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    # Every key of `left` is below those of `right`
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return left.update()
+    right.left = _merge(left, right.left)
+    return right.update()
+
+
+def _first(node: Optional[_Node], low: Tuple[int, int], vcpu: int) -> Optional[_Node]:
+    # The smallest key from `low` with the CPU: one path down to `low`, plus one subtree known to hold it
+    while node is not None and node.max_cpu >= vcpu:
+        if node.key < low:
+            node = node.right
+            continue
+        found = _first(node.left, low, vcpu)
+        if found is not None:
+            return found
+        if node.key[1] >= vcpu:
+            return node
+        node = node.right
+        low = ()
+    return None
+
+
+def _last(node: Optional[_Node], vcpu: int) -> Optional[_Node]:
+    # The largest key with the CPU
+    while node is not None and node.max_cpu >= vcpu:
+        if _max_cpu(node.right) >= vcpu:
+            node = node.right
+        elif node.key[1] >= vcpu:
+            return node
+        else:
+            node = node.left
+    return None
+
+
+class CapacityIndex:
+    """
+    Hosts of a pool as (free RAM, free CPU, host ID), in a treap: a search tree kept balanced by
+    random priorities, so its depth and the cost of every operation are O(log n) expected.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: Tuple[int, int, int]):
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+        self._size += 1
+
+    def remove(self, key: Tuple[int, int, int]):
+        left, rest = _split(self._root, key)
+        middle, right = _split(rest, (key[0], key[1], key[2] + 1))
+        if middle is not None:
+            self._size -= 1
+        self._root = _merge(left, right)
+
+    def best_fit(self, vcpu: int, ram: int) -> Optional[int]:
+        """The host with the least free RAM that fits, ties broken on the least free CPU."""
+        node = _first(self._root, (ram, vcpu), vcpu)
+        return node.key[2] if node is not None else None
+
+    def spread(self, vcpu: int, ram: int) -> Optional[int]:
+        """The host with the most free RAM that fits."""
+        node = _last(self._root, vcpu)
+        return node.key[2] if node is not None and node.key[0] >= ram else None
+
+
+class PlacementEngine:
+    """Free capacity of every schedulable host, indexed per pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[int, HostCapacity] = {}
+        self._pools: Dict[Optional[int], CapacityIndex] = {}
+        self._warmed = False
+        # Incremented on every load, so that reservations taken before are not released twice
+        self._generation = 0
+
+    # Loading
+
+    def warm(self, db: Session):
+        """Load the schedulable hosts and the capacity used by their VMs."""
+        hosts = db.execute(select(
+            PhysicalHost.id, PhysicalHost.cpu_threads, PhysicalHost.ram_mb, PhysicalHost.is_schedulable,
+            PhysicalHost.allocation_mode, PhysicalHost.dedicated_environment_id
+        )).all()
+        usage = {host_id: (cpu or 0, ram or 0) for host_id, cpu, ram in db.execute(
+            select(VM.host_id, func.sum(VM.vcpu), func.sum(VM.ram_mb)).group_by(VM.host_id)
+        )}
+        with self._lock:
+            self._hosts.clear()
+            self._pools.clear()
+            self._generation += 1
+            for host_id, cpu_threads, ram_mb, is_schedulable, allocation_mode, environment_id in hosts:
+                if is_schedulable is False:
+                    continue
+                if allocation_mode == AllocationMode.DEDICATED:
+                    if environment_id is None:
+                        continue  # Dedicated to no environment yet
+                    pool = environment_id
+                else:
+                    pool = SHARED
+                host = HostCapacity(host_id, pool, int(cpu_threads * PLACEMENT_CPU_OVERCOMMIT), ram_mb,
+                                    *usage.get(host_id, (0, 0)))
+                self._hosts[host_id] = host
+                self._pools.setdefault(pool, CapacityIndex()).add(host.key())
+            self._warmed = True
+
+    def _ensure(self, db: Session):
+        if not self._warmed:
+            self.warm(db)
+
+    def reset(self):
+        """Forget everything, to be reloaded on next use (after VMs or hosts were written without the ORM)."""
+        with self._lock:
+            self._warmed = False
+
+    def _update(self, host: HostCapacity, cpu: int = 0, ram: int = 0, reserved: bool = False):
+        # Called with the lock held: moves the host to its new position in its pool
+        pool = self._pools[host.pool]
+        pool.remove(host.key())
+        if reserved:
+            host.reserved_cpu += cpu
+            host.reserved_ram += ram
+        else:
+            host.used_cpu += cpu
+            host.used_ram += ram
+        pool.add(host.key())
+
+    # Decisions
+
+    def _choose(self, environment_id: Optional[int], vcpu: int, ram: int, strategy: str) -> Optional[HostCapacity]:
+        # Called with the lock held
+        for pool in (environment_id, SHARED) if environment_id is not None else (SHARED,):
+            index = self._pools.get(pool)
+            host_id = getattr(index, strategy)(vcpu, ram) if index is not None else None
+            if host_id is not None:
+                return self._hosts[host_id]
+        return None
+
+    @staticmethod
+    def _check_strategy(strategy: str):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown placement strategy: {strategy}. Must be one of: {', '.join(STRATEGIES)}")
+
+    @staticmethod
+    def _check_shape(vcpu: int, ram_mb: int):
+        if vcpu < 1 or ram_mb < 1:
+            raise ValueError("A VM needs at least 1 vCPU and 1 MB of RAM")
+
+    def _used_in_database(self, db: Session, host_id: int) -> Tuple[int, int]:
+        cpu, ram = db.execute(
+            select(func.sum(VM.vcpu), func.sum(VM.ram_mb)).where(VM.host_id == host_id)
+        ).one()
+        return cpu or 0, ram or 0
+
+    def _reserve(self, db: Session, host: HostCapacity, vcpu: int, ram_mb: int, force: bool = False) -> bool:
+        # Reserve once the usage of the host is confirmed by the database; False to decide again.
+        # Forced, the capacity is reserved even beyond what is free
+        used = self._used_in_database(db, host.host_id)
+        with self._lock:
+            if self._hosts.get(host.host_id) is not host:
+                return False
+            if used != (host.used_cpu, host.used_ram):
+                # VMs placed by another worker since the host was loaded
+                self._update(host, used[0] - host.used_cpu, used[1] - host.used_ram)
+                return False
+            if not force and (host.free_cpu < vcpu or host.free_ram < ram_mb):
+                return False
+            self._update(host, vcpu, ram_mb, reserved=True)
+            generation = self._generation
+        db.info.setdefault("placement_reserved", []).append((generation, host.host_id, vcpu, ram_mb))
+        return True
+
+    def place(self, db: Session, environment_id: Optional[int], vcpu: int, ram_mb: int,
+              strategy: str = PLACEMENT_STRATEGY) -> int:
+        """
+        Choose a host for a VM and reserve its capacity for the session's next VM.
+
+        Args:
+            db: The database session
+            environment_id: The environment of the VM, whose dedicated hosts are tried first
+            vcpu: The vCPUs of the VM
+            ram_mb: The RAM of the VM
+            strategy: best_fit or spread
+
+        Returns:
+            The ID of the chosen host
+
+        Raises:
+            ValueError: If the request is invalid or no host has the capacity
+        """
+        self._check_strategy(strategy)
+        self._check_shape(vcpu, ram_mb)
+        self._ensure(db)
+        while True:
+            with self._lock:
+                host = self._choose(environment_id, vcpu, ram_mb, strategy)
+            if host is None:
+                raise ValueError(f"No schedulable host has {vcpu} vCPU and {ram_mb} MB of RAM free")
+            if self._reserve(db, host, vcpu, ram_mb):
+                return host.host_id
+
+    def check(self, db: Session, environment_id: Optional[int], host_id: int, vcpu: int, ram_mb: int) -> int:
+        """
+        Record a VM on a host chosen by hand, reserving its capacity for the session's next VM.
+
+        The choice overrides the engine: a host that is not schedulable, is dedicated to another
+        environment or lacks the capacity is accepted with a warning, and the over-commit counted.
+
+        Raises:
+            ValueError: If the request is invalid or the host does not exist
+        """
+        self._check_shape(vcpu, ram_mb)
+        self._ensure(db)
+        while True:
+            with self._lock:
+                host = self._hosts.get(host_id)
+            if host is None:
+                if db.get(PhysicalHost, host_id) is None:
+                    raise ValueError(f"Physical host {host_id} not found")
+                logger.warning("VM placed by hand on physical host %s, which is not schedulable", host_id)
+                return host_id
+            if host.pool is not SHARED and host.pool != environment_id:
+                logger.warning("VM of environment %s placed by hand on physical host %s, dedicated to environment %s",
+                               environment_id, host_id, host.pool)
+            if self._reserve(db, host, vcpu, ram_mb, force=True):
+                if host.free_cpu < 0 or host.free_ram < 0:
+                    logger.warning("Physical host %s over-committed by a VM placed by hand: %s vCPU and %s MB of RAM free",
+                                   host_id, host.free_cpu, host.free_ram)
+                return host_id
+
+    def plan(self, db: Session, environment_id: Optional[int], vms: Sequence[Tuple[int, int]],
+             strategy: str = PLACEMENT_STRATEGY) -> List[Optional[int]]:
+        """
+        Dry run: the host each VM of a batch would get, None for those that fit nowhere.
+
+        The VMs are placed largest first (first fit decreasing), each decision seeing the previous
+        ones; nothing is reserved.
+
+        Args:
+            db: The database session
+            environment_id: The environment of the VMs
+            vms: (vcpu, ram_mb) of each VM
+            strategy: best_fit or spread
+
+        Returns:
+            The host IDs, in the order of `vms`
+
+        Raises:
+            ValueError: If the strategy or a shape is invalid, or there are more than MAX_PLAN_VMS VMs
+        """
+        self._check_strategy(strategy)
+        if len(vms) > MAX_PLAN_VMS:
+            raise ValueError(f"A plan covers at most {MAX_PLAN_VMS} VMs")
+        for vcpu, ram_mb in vms:
+            self._check_shape(vcpu, ram_mb)
+        self._ensure(db)
+        placed: List[Optional[int]] = [None] * len(vms)
+        taken = []
+        with self._lock:
+            try:
+                for index in sorted(range(len(vms)), key=lambda index: (vms[index][1], vms[index][0]), reverse=True):
+                    vcpu, ram_mb = vms[index]
+                    host = self._choose(environment_id, vcpu, ram_mb, strategy)
+                    if host is not None:
+                        self._update(host, vcpu, ram_mb, reserved=True)
+                        taken.append((host, vcpu, ram_mb))
+                        placed[index] = host.host_id
+            finally:
+                for host, vcpu, ram_mb in taken:
+                    self._update(host, -vcpu, -ram_mb, reserved=True)
+        return placed
+
+    def capacity(self, db: Session, host_id: int) -> Optional[Dict[str, int]]:
+        """CPU and RAM of a schedulable host, total and free; None for other hosts."""
+        self._ensure(db)
+        with self._lock:
+            host = self._hosts.get(host_id)
+            if host is None:
+                return None
+            return {"cpu": host.cpu, "free_cpu": host.free_cpu, "ram_mb": host.ram, "free_ram_mb": host.free_ram}
+
+    # Session hooks
+
+    def _release(self, reserved: List[Tuple[int, int, int, int]]):
+        # Called with the lock held
+        for generation, host_id, vcpu, ram_mb in reserved:
+            host = self._hosts.get(host_id)
+            if generation == self._generation and host is not None:
+                self._update(host, -vcpu, -ram_mb, reserved=True)
+
+    def _apply(self, session: Session, changes: List[Optional[Tuple[int, int, int]]]):
+        reserved = session.info.pop("placement_reserved", [])
+        with self._lock:
+            if not self._warmed:
+                return
+            self._release(reserved)
+            if None in changes:
+                self._warmed = False
+                return
+            for host_id, vcpu, ram_mb in changes:
+                host = self._hosts.get(host_id)
+                if host is not None:
+                    self._update(host, vcpu, ram_mb)
+
+    def _discard(self, session: Session, changes: List[Optional[Tuple[int, int, int]]]):
+        reserved = session.info.pop("placement_reserved", [])
+        with self._lock:
+            self._release(reserved)
+
+
+engine = PlacementEngine()
+
+
+def host_for_vm(db: Session, environment_id: int, vcpu: int, ram_mb: int, host_id: Optional[int] = None) -> int:
+    """
+    The host of a new VM: `host_id` once checked against its capacity, or one chosen by the engine.
+
+    Raises:
+        ValueError: If the host cannot take the VM, or no host can
+    """
+    if host_id is not None:
+        return engine.check(db, environment_id, host_id, vcpu, ram_mb)
+    return engine.place(db, environment_id, vcpu, ram_mb)
+
+
+def _record_changes(session):
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, VM):
+            changes.append((obj.host_id, obj.vcpu, obj.ram_mb))
+        elif isinstance(obj, PhysicalHost):
+            changes.append(None)
+    for obj in session.dirty:
+        if isinstance(obj, VM):
+            (old_host, new_host), (old_cpu, new_cpu), (old_ram, new_ram) = (
+                history(obj, attribute) for attribute in ("host_id", "vcpu", "ram_mb")
+            )
+            if (old_host, old_cpu, old_ram) != (new_host, new_cpu, new_ram):
+                changes.append((old_host, -(old_cpu or 0), -(old_ram or 0)))
+                changes.append((new_host, new_cpu or 0, new_ram or 0))
+        elif isinstance(obj, PhysicalHost) and session.is_modified(obj, include_collections=False):
+            changes.append(None)
+    for obj in session.deleted:
+        if isinstance(obj, VM):
+            changes.append((obj.host_id, -obj.vcpu, -obj.ram_mb))
+        elif isinstance(obj, PhysicalHost):
+            changes.append(None)
+    return changes
+
+
+# Reservations are released when the transaction ends without a commit
+track("placement_changes", _record_changes, engine._apply, engine._discard, held=("placement_reserved",))
@@ -2,6 +2,7 @@ from fastapi.responses import JSONResponse
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from .security import PasswordHashingBusy
 
 def success_response(data, message="Success"):
     """
@@ -28,3 +29,11 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         status_code=422,
         content=error_response("Validation error", 422, detail=exc.errors())
     )
+
+# Pool de hashage des mots de passe saturé : rejet immédiat, le client peut réessayer
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=429,
+        content=error_response(str(exc), 429),
+        headers={"Retry-After": "1"}
+    )
@@ -0,0 +1,180 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/helper/schedule_cache.py
+"""
+Cache of compiled rule access schedules.
+
+An access_schedule is a JSON object {"start": <cron>, "end": <cron>} describing recurring access
+windows. Parsing the JSON and building two `croniter` objects (whose `_expand` is costly) on every
+rule check is wasteful: this module keeps a bounded LRU of compiled schedules keyed by the raw
+expression. Each entry keeps its expanded field sets and the window computed for the last check,
+together with the time range over which that decision stays valid, so most checks are a single
+comparison.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, FrozenSet, Optional, Tuple, Union
+
+
+from .croniter import croniter
+from ..core.settings import load_environment
+
+load_environment()
+
+SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", 1024))
+
+
+class CompiledSchedule:
+    """
+    An access schedule with its cron expressions expanded once.
+
+    The window is [start, end[ where start is the last occurrence of the start expression and end
+    the first occurrence of the end expression after it (see `permissions.is_in_cron_interval`).
+    The last decision is reused while the tested time stays in [valid_from, valid_until[.
+    """
+
+    def __init__(self, start_expr: str, end_expr: str):
+        self.start_expr = start_expr
+        self.end_expr = end_expr
+        self._start = croniter(start_expr)
+        self._end = croniter(end_expr)
+        self.start_fields: Tuple[FrozenSet, ...] = tuple(frozenset(field) for field in self._start.expanded)
+        self.end_fields: Tuple[FrozenSet, ...] = tuple(frozenset(field) for field in self._end.expanded)
+
+        self.window_start: Optional[datetime] = None
+        self.window_end: Optional[datetime] = None
+        self.accessible = False
+        self.valid_from: Optional[datetime] = None
+        self.valid_until: Optional[datetime] = None
+
+    def is_valid_at(self, at: datetime) -> bool:
+        return self.valid_from is not None and self.valid_from <= at < self.valid_until
+
+    def refresh(self, at: datetime):
+        """Compute the window around `at` and the range over which the decision holds."""
+        prev_start = self._start.get_prev(datetime, start_time=at)
+        next_start = self._start.get_next(datetime)
+        start_occurrence = prev_start if next_start != at else at
+        end_occurrence = self._end.get_next(datetime, start_time=start_occurrence)
+
+        self.window_start, self.window_end = start_occurrence, end_occurrence
+        if start_occurrence <= at < end_occurrence:
+            # Open until the end occurrence, later start occurrences do not move it
+            self.accessible = True
+            self.valid_from, self.valid_until = start_occurrence, end_occurrence
+        else:
+            # Closed until the next start occurrence
+            self.accessible = False
+            self.valid_from, self.valid_until = end_occurrence, next_start
+
+
+# Marker cached for schedules that cannot be parsed: access is allowed by default
+_ALWAYS_OPEN = object()
+
+_lock = threading.Lock()
+_schedules: "OrderedDict[Union[str, Tuple[str, str]], object]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "refreshes": 0}
+
+
+def _compile(access_schedule) -> object:
+    try:
+        schedule = json.loads(access_schedule) if isinstance(access_schedule, str) else access_schedule
+        if 'start' not in schedule or 'end' not in schedule:
+            return _ALWAYS_OPEN
+        return CompiledSchedule(schedule['start'], schedule['end'])
+    except Exception:
+        # Same policy as permissions.is_rule_accessible_now: a broken schedule does not block access
+        return _ALWAYS_OPEN
+
+
+def _cache_key(access_schedule) -> Union[str, Tuple[str, str]]:
+    if isinstance(access_schedule, str):
+        return access_schedule
+    return str(access_schedule.get('start')), str(access_schedule.get('end'))
+
+
+def is_open(access_schedule, at: datetime = None) -> bool:
+    """
+    Tell whether an access schedule grants access at a given time (now by default).
+
+    :param access_schedule: str | dict - Raw JSON string or already decoded schedule
+    :param at: datetime - Time to test
+    :return: bool - True if access is granted
+    """
+    if not access_schedule:
+        return True
+    if at is None:
+        at = datetime.now()
+    try:
+        key = _cache_key(access_schedule)
+    except AttributeError:
+        return True
+
+    with _lock:
+        compiled = _schedules.get(key)
+        if compiled is None:
+            _stats["misses"] += 1
+            compiled = _compile(access_schedule)
+            _schedules[key] = compiled
+            if len(_schedules) > SCHEDULE_CACHE_SIZE:
+                _schedules.popitem(last=False)
+        else:
+            _schedules.move_to_end(key)
+        if compiled is _ALWAYS_OPEN:
+            return True
+        if compiled.is_valid_at(at):
+            _stats["hits"] += 1
+            return compiled.accessible
+        # croniter objects are stateful: refresh under the lock
+        _stats["refreshes"] += 1
+        try:
+            compiled.refresh(at)
+        except Exception:
+            return True
+        return compiled.accessible
+
+
+def stats() -> Dict[str, int]:
+    """Hit/miss counters of the cache: hits reuse a window, refreshes recompute one, misses compile."""
+    with _lock:
+        return dict(_stats, size=len(_schedules), max_size=SCHEDULE_CACHE_SIZE)
+
+
+def clear():
+    with _lock:
+        _schedules.clear()
+        for key in _stats:
+            _stats[key] = 0
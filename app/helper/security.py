@@ -1,17 +1,117 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 from ..core import auth
+from ..core.settings import load_environment
+
+load_environment()
+
+# Facteur de coût bcrypt des nouveaux hashs ; les hashs plus faibles sont mis à niveau à la connexion
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Threads dédiés au hashage, et nombre de demandes pouvant attendre un thread libre
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", min(4, os.cpu_count() or 1)))
+BCRYPT_QUEUE_MAX = int(os.getenv("BCRYPT_QUEUE_MAX", 16))
+
+_ROUNDS = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when the password hashing pool and its queue are full."""
+
+
+class PasswordHasher:
+    """
+    Bounded executor for bcrypt.
+
+    At most `workers` hashes run at once, and at most `queue_max` more wait for a worker: beyond
+    that, requests are rejected immediately with PasswordHashingBusy instead of taking over the
+    request threads that serve the rest of the API.
+    """
+
+    def __init__(self, workers: int = BCRYPT_WORKERS, queue_max: int = BCRYPT_QUEUE_MAX):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + queue_max)
+        self._lock = threading.Lock()
+        self._stats = {
+            "workers": workers,
+            "queue_max": queue_max,
+            "in_flight": 0,
+            "rejected": 0,
+            "completed": 0,
+            "queue_wait_total_seconds": 0.0,
+            "queue_wait_max_seconds": 0.0,
+            "hash_total_seconds": 0.0,
+            "hash_max_seconds": 0.0,
+        }
+
+    def _record(self, queue_wait: float, duration: float):
+        with self._lock:
+            stats = self._stats
+            stats["completed"] += 1
+            stats["queue_wait_total_seconds"] += queue_wait
+            stats["queue_wait_max_seconds"] = max(stats["queue_wait_max_seconds"], queue_wait)
+            stats["hash_total_seconds"] += duration
+            stats["hash_max_seconds"] = max(stats["hash_max_seconds"], duration)
+
+    def run(self, function, *args):
+        """
+        Run a bcrypt function on the pool and wait for its result.
+
+        Raises:
+            PasswordHashingBusy: If every worker is busy and the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise PasswordHashingBusy("Too many password operations in progress")
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        with self._lock:
+            self._stats["in_flight"] += 1
+        try:
+            return self._executor.submit(timed).result()
+        finally:
+            with self._lock:
+                self._stats["in_flight"] -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Return a snapshot of the pool metrics."""
+        with self._lock:
+            return dict(self._stats)
+
+
+hasher = PasswordHasher()
 
 # Hashage
-def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def get_password_hash(password: str, rounds: int = None) -> str:
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    return hasher.run(bcrypt.hashpw, password.encode(), salt).decode()
 
 # Vérification
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
-        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
-    except (ValueError, bcrypt.exceptions.SaltValidationError):
+        return hasher.run(bcrypt.checkpw, plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Hash invalide (bcrypt >= 4 lève ValueError ; bcrypt.exceptions n'existe plus)
         return False
 
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made with fewer rounds than BCRYPT_ROUNDS."""
+    match = _ROUNDS.match(hashed_password or "")
+    return match is not None and int(match.group(1)) < BCRYPT_ROUNDS
+
 # Création d'un token de réinitialisation de mot de passe
 def create_password_reset_token(user_id: int) -> str:
     """
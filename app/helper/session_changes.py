@@ -0,0 +1,93 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/helper/session_changes.py
+"""
+Changes of a Session, applied to in-memory state once they are committed.
+
+The caches and registries of this package (IPAM, placement, topology, permission and auth caches)
+must not see data that is flushed but not yet committed, and may be rolled back. `track()` wires a
+hook that records what a flush changed in `session.info`, hands it over after the commit, and
+drops it when the transaction ends otherwise.
+"""
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+
+def history(obj, attribute: str) -> Tuple[Any, Any]:
+    """The value of an attribute before and after the pending change of an object."""
+    state = inspect(obj).attrs[attribute].history
+    old = (state.deleted or state.unchanged or [None])[0]
+    new = (state.added or state.unchanged or [None])[0]
+    return old, new
+
+
+def track(
+    key: str,
+    record: Callable[[Session], Iterable[Any]],
+    apply: Callable[[Session, List[Any]], None],
+    discard: Optional[Callable[[Session, List[Any]], None]] = None,
+    held: Sequence[str] = ()
+):
+    """
+    Buffer the changes of every Session until its transaction ends.
+
+    Args:
+        key: The `session.info` key under which the changes are buffered
+        record: Called after each flush, returns the changes of that flush
+        apply: Called after the commit with the buffered changes
+        discard: Called with the buffered changes when the transaction ends without a commit
+            (rollback or close)
+        held: Other `session.info` keys holding state until the transaction ends (reservations);
+            `apply` and `discard` are also called when one of them is set, and must pop it
+    """
+    def pending(session) -> bool:
+        return bool(session.info.get(key)) or any(session.info.get(name) for name in held)
+
+    @event.listens_for(Session, "after_flush")
+    def _record(session, flush_context):
+        changes = list(record(session))
+        if changes:
+            session.info.setdefault(key, []).extend(changes)
+
+    @event.listens_for(Session, "after_commit")
+    def _apply(session):
+        if pending(session):
+            apply(session, session.info.pop(key, []))
+
+    @event.listens_for(Session, "after_transaction_end")
+    def _discard(session, transaction):
+        if transaction.parent is None and pending(session):
+            changes = session.info.pop(key, [])
+            if discard is not None:
+                discard(session, changes)
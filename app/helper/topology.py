@@ -0,0 +1,472 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/helper/topology.py
+"""
+In-memory infrastructure graph of an environment.
+
+The graph holds the physical hosts, VMs, container nodes, applications, networks and gateways of
+an environment, loaded with a few bulk queries. Edges are either attachments (a node has an
+address on a network) or placements (a VM runs on a host, an application or a container node on
+a VM or a host, a gateway on the application that deploys it). Nodes are numbered and the edges
+stored in compressed sparse row arrays: the neighbours of node `u` are
+`targets[offsets[u]:offsets[u + 1]]`, with the relation of each edge in `relations`.
+
+Attachment changes are applied in place after each commit: added attachments go to a small
+overlay, removed ones to a tombstone set, and both are merged back into fresh arrays once they
+grow past a fraction of the graph. Any other change to the models of the graph drops the cached
+graphs, which are reloaded on next use. A TTL bounds staleness across worker processes.
+
+Queries: `bfs`, `reachability(network_id)` (which nodes reach a network, through which gateways)
+and `impact(kind, id)` (what fails with a node and which networks lose routes).
+"""
+import os
+import threading
+import time
+from array import array
+from collections import deque
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from .session_changes import history, track
+from ..models.application import Application
+from ..models.container_node import ContainerNode
+from ..models.element import Element
+from ..models.gateway import Gateway
+from ..models.network import Network
+from ..models.physical_host import PhysicalHost
+from ..models.stack import Stack
+from ..models.vm import VM
+from ..repositories import network_attachment_repo
+from ..core.settings import load_environment
+
+load_environment()
+
+TOPOLOGY_TTL = int(os.getenv("TOPOLOGY_TTL", 300))
+
+KINDS = ("physical_host", "vm", "container_node", "application", "network", "gateway")
+_CODES = {kind: code for code, kind in enumerate(KINDS)}
+_NETWORK, _GATEWAY = _CODES["network"], _CODES["gateway"]
+# Nodes whose reachability is reported: everything but networks and gateways
+_WORKLOADS = frozenset(_CODES[kind] for kind in ("physical_host", "vm", "container_node", "application"))
+
+# Relation of an edge u -> v: u is attached to v (both ways), u runs on v, u hosts v
+ATTACHED, RUNS_ON, HOSTS = 0, 1, 2
+RELATIONS = ("attached", "runs_on", "hosts")
+_REVERSE = {ATTACHED: ATTACHED, RUNS_ON: HOSTS, HOSTS: RUNS_ON}
+
+# Attachment model -> (kind of the attached node, attribute holding its ID)
+_ATTACHMENTS = {model: (kind, target.key) for kind, (model, target) in network_attachment_repo.ATTACHMENT_KINDS.items()}
+# Models whose other changes alter the nodes or the placements of a graph
+_STRUCTURAL_MODELS = (PhysicalHost, VM, ContainerNode, Application, Network, Gateway, Element, Stack)
+
+
+def _pair(u: int, v: int) -> Tuple[int, int]:
+    return (u, v) if u < v else (v, u)
+
+
+class TopologyGraph:
+    """Graph of one environment. Methods are thread-safe."""
+
+    def __init__(self, environment_id: int):
+        self.environment_id = environment_id
+        self.built_at = time.monotonic()
+        self._lock = threading.RLock()
+        self._kinds = array("b")
+        self._ids = array("q")
+        self._labels: List[Optional[str]] = []
+        self._index: Dict[Tuple[int, int], int] = {}
+        # Frozen arrays, covering the nodes that existed at the last merge
+        self._base_nodes = 0
+        self._offsets = array("q", [0])
+        self._targets = array("q")
+        self._relations = array("b")
+        # Attachment edges changed since: added pairs both ways, and removed pairs
+        self._extra: Dict[int, Set[int]] = {}
+        self._extra_pairs = 0
+        self._removed: Set[Tuple[int, int]] = set()
+        # Number of attachments behind each (node, network) edge: a node may have several addresses
+        self._links: Dict[Tuple[int, int], int] = {}
+
+    # Construction
+
+    def _node(self, kind: str, node_id: int, label: Optional[str] = None) -> int:
+        key = (_CODES[kind], node_id)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self._ids)
+            self._kinds.append(key[0])
+            self._ids.append(node_id)
+            self._labels.append(label)
+        elif label is not None:
+            self._labels[index] = label
+        return index
+
+    def _freeze(self, edges: List[Tuple[int, int, int]]):
+        # Rebuild the arrays from every directed edge, overlay and tombstones merged
+        count = len(self._ids)
+        degree = [0] * (count + 1)
+        for u, _, _ in edges:
+            degree[u + 1] += 1
+        self._offsets = array("q", accumulate(degree))
+        self._targets = array("q", bytes(8 * len(edges)))
+        self._relations = array("b", bytes(len(edges)))
+        fill = list(self._offsets[:-1])
+        for u, v, relation in edges:
+            self._targets[fill[u]] = v
+            self._relations[fill[u]] = relation
+            fill[u] += 1
+        self._base_nodes = count
+        self._extra.clear()
+        self._extra_pairs = 0
+        self._removed.clear()
+
+    def _neighbors(self, u: int) -> Iterator[Tuple[int, int]]:
+        if u < self._base_nodes:
+            for position in range(self._offsets[u], self._offsets[u + 1]):
+                v, relation = self._targets[position], self._relations[position]
+                if relation == ATTACHED and self._removed and _pair(u, v) in self._removed:
+                    continue
+                yield v, relation
+        for v in self._extra.get(u, ()):
+            yield v, ATTACHED
+
+    def _edges(self) -> List[Tuple[int, int, int]]:
+        return [(u, v, relation) for u in range(len(self._ids)) for v, relation in self._neighbors(u)]
+
+    def _link(self, node: int, network: int, delta: int):
+        key = (node, network)
+        before = self._links.get(key, 0)
+        after = max(before + delta, 0)
+        if after:
+            self._links[key] = after
+        else:
+            self._links.pop(key, None)
+        if bool(before) == bool(after):
+            return
+        pair = _pair(node, network)
+        if after:
+            if pair in self._removed:
+                self._removed.discard(pair)
+            else:
+                self._extra.setdefault(node, set()).add(network)
+                self._extra.setdefault(network, set()).add(node)
+                self._extra_pairs += 1
+        elif network in self._extra.get(node, ()):
+            self._extra[node].discard(network)
+            self._extra[network].discard(node)
+            self._extra_pairs -= 1
+        else:
+            self._removed.add(pair)
+        if self._extra_pairs + len(self._removed) > max(64, len(self._targets) // 16):
+            self._freeze(self._edges())
+
+    def apply_attachment(self, kind: str, target_id: int, network_id: int, delta: int):
+        """Count an attachment in (delta 1) or out (delta -1); ignored for networks of other environments."""
+        with self._lock:
+            network = self._index.get((_NETWORK, network_id))
+            if network is None or target_id is None:
+                return
+            if delta < 0 and (_CODES[kind], target_id) not in self._index:
+                return
+            self._link(self._node(kind, target_id), network, delta)
+
+    def is_expired(self) -> bool:
+        return time.monotonic() - self.built_at > TOPOLOGY_TTL
+
+    # Reading
+
+    def find(self, kind: str, node_id: int) -> Optional[int]:
+        """Index of a node, or None if it is not in the graph."""
+        if kind not in _CODES:
+            raise ValueError(f"Unknown node kind: {kind}. Must be one of: {', '.join(KINDS)}")
+        return self._index.get((_CODES[kind], node_id))
+
+    def describe(self, index: int) -> Dict:
+        kind, node_id = KINDS[self._kinds[index]], self._ids[index]
+        return {"key": f"{kind}:{node_id}", "kind": kind, "id": node_id, "label": self._labels[index]}
+
+    def snapshot(self) -> Dict:
+        """Every node, and every edge once (placements from the hosted node)."""
+        with self._lock:
+            nodes = [self.describe(index) for index in range(len(self._ids))]
+            edges = [{"source": nodes[u]["key"], "target": nodes[v]["key"], "relation": RELATIONS[relation]}
+                     for u, v, relation in self._edges()
+                     if relation == RUNS_ON or (relation == ATTACHED and self._kinds[v] == _NETWORK)]
+        return {"nodes": nodes, "edges": edges}
+
+    def bfs(self, start: int, max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(node, depth) of every node reachable from `start` over any edge, in breadth-first order."""
+        with self._lock:
+            depth = {start: 0}
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                if max_depth is not None and depth[u] >= max_depth:
+                    continue
+                for v, _ in self._neighbors(u):
+                    if v not in depth:
+                        depth[v] = depth[u] + 1
+                        queue.append(v)
+            return list(depth.items())
+
+    def _routed(self, start: int, down: Set[int] = frozenset()) -> Dict[int, Optional[Tuple[int, int]]]:
+        # Networks reachable from a network through gateways, with (gateway, previous network) of each
+        parent: Dict[int, Optional[Tuple[int, int]]] = {start: None}
+        queue = deque([start])
+        while queue:
+            network = queue.popleft()
+            for gateway, relation in self._neighbors(network):
+                if relation != ATTACHED or self._kinds[gateway] != _GATEWAY or gateway in down:
+                    continue
+                for other, other_relation in self._neighbors(gateway):
+                    if other_relation == ATTACHED and self._kinds[other] == _NETWORK \
+                            and other not in parent and other not in down:
+                        parent[other] = (gateway, network)
+                        queue.append(other)
+        return parent
+
+    def reachability(self, network_id: int) -> List[Dict]:
+        """
+        Workloads that can reach a network, directly or through gateways.
+
+        Gateways forward between all the networks they are attached to, whatever the direction.
+        Each workload is reported once, through the network with the fewest gateways to cross.
+
+        Returns:
+            Dicts with the node, the network it is attached to and the gateways crossed, in order
+
+        Raises:
+            KeyError: If the network is not in the graph
+        """
+        with self._lock:
+            start = self.find("network", network_id)
+            if start is None:
+                raise KeyError(network_id)
+            parent = self._routed(start)
+            reached, seen = [], set()
+            for network in parent:
+                via, step = [], parent[network]
+                while step is not None:
+                    via.append(self._ids[step[0]])
+                    step = parent[step[1]]
+                for node, relation in self._neighbors(network):
+                    if relation == ATTACHED and self._kinds[node] in _WORKLOADS and node not in seen:
+                        seen.add(node)
+                        reached.append({"node": self.describe(node), "network_id": self._ids[network], "via": via})
+            return reached
+
+    def impact(self, kind: str, node_id: int) -> Dict:
+        """
+        Blast radius of a node going down.
+
+        Everything hosted on the node fails with it, transitively (a host takes its VMs down, a VM
+        its applications, an application the gateway it deploys). Networks then lose the routes
+        that went through a failed gateway or network.
+
+        Returns:
+            The failed nodes, and for each other network whose routed set shrinks, the number of
+            networks it reached before and after
+
+        Raises:
+            KeyError: If the node is not in the graph
+        """
+        with self._lock:
+            start = self.find(kind, node_id)
+            if start is None:
+                raise KeyError(node_id)
+            failed = {start: None}
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                for v, relation in self._neighbors(u):
+                    if relation == HOSTS and v not in failed:
+                        failed[v] = None
+                        queue.append(v)
+            degraded = []
+            touched = {u for u in failed if self._kinds[u] in (_NETWORK, _GATEWAY)}
+            if touched:
+                networks = [u for u in range(len(self._ids)) if self._kinds[u] == _NETWORK and u not in failed]
+                before = self._component_sizes(networks, frozenset())
+                after = self._component_sizes(networks, frozenset(touched))
+                degraded = [{"network_id": self._ids[u], "reachable_before": before[u], "reachable_after": after[u]}
+                            for u in networks if after[u] < before[u]]
+            return {"failed": [self.describe(u) for u in failed], "degraded_networks": degraded}
+
+    def _component_sizes(self, networks: List[int], down: frozenset) -> Dict[int, int]:
+        # Number of other networks routed from each network, one traversal per component
+        sizes: Dict[int, int] = {}
+        for network in networks:
+            if network not in sizes:
+                component = list(self._routed(network, down))
+                for u in component:
+                    sizes[u] = len(component) - 1
+        return sizes
+
+
+def load_topology(db: Session, environment_id: int) -> TopologyGraph:
+    """Load the graph of an environment with seven bulk queries."""
+    graph = TopologyGraph(environment_id)
+    in_environment = Element.environment_id == environment_id
+    networks = db.execute(select(Network.id, Network.cidr).join(Element, Element.id == Network.element_id)
+                          .where(in_environment)).all()
+    vms = db.execute(select(VM.id, VM.name, VM.host_id).join(Element, Element.id == VM.element_id)
+                     .where(in_environment)).all()
+    nodes = db.execute(select(ContainerNode.id, ContainerNode.role, ContainerNode.vm_id, ContainerNode.host_id)
+                       .join(Element, Element.id == ContainerNode.element_id).where(in_environment)).all()
+    applications = db.execute(select(Application.id, Application.name, Application.vm_id, Application.physical_host_id)
+                              .join(Element, Element.id == Application.element_id).where(in_environment)).all()
+    attachments = network_attachment_repo.list_attachments_by_networks(db, [row.id for row in networks])
+    gateways = db.execute(
+        select(Gateway.id, Gateway.kind, Gateway.deployment_application_id).where(or_(
+            Gateway.id.in_({row.target_id for row in attachments if row.kind == "gateway"}),
+            Gateway.stack_id.in_(select(Stack.id).join(Element, Element.id == Stack.element_id).where(in_environment)),
+        ))
+    ).all()
+    referenced = {row.host_id for row in vms} | {row.host_id for row in nodes if row.host_id} \
+        | {row.physical_host_id for row in applications if row.physical_host_id} \
+        | {row.target_id for row in attachments if row.kind == "physical_host"}
+    hosts = db.execute(select(PhysicalHost.id, PhysicalHost.fqdn).where(or_(
+        PhysicalHost.dedicated_environment_id == environment_id, PhysicalHost.id.in_(referenced)
+    ))).all()
+
+    edges: List[Tuple[int, int, int]] = []
+
+    def place(child: int, kind: str, parent_id: Optional[int]):
+        if parent_id is None:
+            return
+        parent = graph._node(kind, parent_id)
+        edges.append((child, parent, RUNS_ON))
+        edges.append((parent, child, HOSTS))
+
+    for row in networks:
+        graph._node("network", row.id, row.cidr)
+    for row in hosts:
+        graph._node("physical_host", row.id, row.fqdn)
+    for row in vms:
+        place(graph._node("vm", row.id, row.name), "physical_host", row.host_id)
+    for row in nodes:
+        node = graph._node("container_node", row.id, f"{row.role.value} node")
+        if row.vm_id:
+            place(node, "vm", row.vm_id)
+        else:
+            place(node, "physical_host", row.host_id)
+    for row in applications:
+        application = graph._node("application", row.id, row.name)
+        if row.vm_id:
+            place(application, "vm", row.vm_id)
+        else:
+            place(application, "physical_host", row.physical_host_id)
+    for row in gateways:
+        gateway = graph._node("gateway", row.id, f"{row.kind.value} gateway")
+        if (_CODES["application"], row.deployment_application_id) in graph._index:
+            place(gateway, "application", row.deployment_application_id)
+    for row in attachments:
+        node, network = graph._node(row.kind, row.target_id), graph._node("network", row.network_id)
+        count = graph._links.get((node, network), 0)
+        graph._links[(node, network)] = count + 1
+        if not count:
+            edges.append((node, network, ATTACHED))
+            edges.append((network, node, ATTACHED))
+    graph._freeze(edges)
+    return graph
+
+
+_lock = threading.Lock()
+_graphs: Dict[int, TopologyGraph] = {}
+# Incremented on every invalidation so that a graph loaded concurrently is not cached stale
+_generation = 0
+
+
+def get_topology(db: Session, environment_id: int) -> TopologyGraph:
+    """Return the cached graph of an environment, loading it if missing or expired."""
+    with _lock:
+        graph = _graphs.get(environment_id)
+        generation = _generation
+    if graph is not None and not graph.is_expired():
+        return graph
+    graph = load_topology(db, environment_id)
+    with _lock:
+        if generation == _generation:
+            _graphs[environment_id] = graph
+    return graph
+
+
+def invalidate():
+    """Drop every cached graph."""
+    global _generation
+    with _lock:
+        _generation += 1
+        _graphs.clear()
+
+
+def _record_changes(session):
+    changes = []
+    for obj in session.new:
+        if type(obj) in _ATTACHMENTS:
+            kind, target = _ATTACHMENTS[type(obj)]
+            changes.append((kind, getattr(obj, target), obj.network_id, 1))
+        elif isinstance(obj, _STRUCTURAL_MODELS):
+            changes.append(None)
+    for obj in session.dirty:
+        if type(obj) in _ATTACHMENTS:
+            kind, target = _ATTACHMENTS[type(obj)]
+            old_target, new_target = history(obj, target)
+            old_network, new_network = history(obj, "network_id")
+            if (old_target, old_network) != (new_target, new_network):
+                changes.append((kind, old_target, old_network, -1))
+                changes.append((kind, new_target, new_network, 1))
+        elif isinstance(obj, _STRUCTURAL_MODELS) and session.is_modified(obj, include_collections=False):
+            changes.append(None)
+    for obj in session.deleted:
+        if type(obj) in _ATTACHMENTS:
+            kind, target = _ATTACHMENTS[type(obj)]
+            changes.append((kind, getattr(obj, target), obj.network_id, -1))
+        elif isinstance(obj, _STRUCTURAL_MODELS):
+            changes.append(None)
+    return changes
+
+
+def _apply_changes(session, changes):
+    if None in changes:
+        invalidate()
+        return
+    with _lock:
+        graphs = list(_graphs.values())
+    for graph in graphs:
+        for kind, target_id, network_id, delta in changes:
+            graph.apply_attachment(kind, target_id, network_id, delta)
+
+
+track("topology_changes", _record_changes, _apply_changes)
@@ -1,67 +1,134 @@
+import time
+from contextlib import asynccontextmanager
+from dataclasses import fields
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-# Importez les modules nécessaires
-from .helper.response import http_exception_handler, validation_exception_handler
-from fastapi.exceptions import RequestValidationError
-from starlette.exceptions import HTTPException as StarletteHTTPException
-
-# Charger les modèles et créer la base de données...
-from .models import user, environment, group, function,  element, audit_log, organization, policy, rule, tag
-from .database.session import engine
-from .database.base import Base
-
-Base.metadata.create_all(bind=engine)
-
-# Appel du seeding des fonctions
-from .database.seed import seed
-from .database.session import SessionLocal
-
-db = SessionLocal()
-seed(db)
-db.close()
-# Import des routeurs
-from .api import users, environments, groups, elements, audit_logs, auth, organizations, functions, policies, rules, \
-    tags, teapot, health
-
-app = FastAPI()
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3001", "http://localhost:5173", "http://localhost:8080"],  # Vue's origins
-    allow_credentials=True,
-    allow_methods=["*"],  # Allows all HTTP methods
-    allow_headers=["*"],  # Allows all headers
-)
-
-# Enregistrement des routeurs
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(organizations.router)
-app.include_router(environments.router)
-app.include_router(groups.router)
-app.include_router(elements.router)
-app.include_router(policies.router)
-app.include_router(rules.router)
-app.include_router(functions.router)
-app.include_router(tags.router)
-app.include_router(audit_logs.router)
-app.include_router(teapot.router)
-app.include_router(health.router)
-
-# Enregistrement des gestionnaires d'erreurs globales
-app.add_exception_handler(StarletteHTTPException, http_exception_handler)
-app.add_exception_handler(RequestValidationError, validation_exception_handler)
+
+from .core.settings import Settings, get_settings
+
+# Routeurs enregistrés par create_app, importés seulement à la création de l'application
+ROUTERS = ("auth", "users", "organizations", "environments", "groups", "elements", "policies", "rules",
+           "functions", "tags", "audit_logs", "teapot", "health")
+# Réglages propres à chaque application, les autres valent pour tout le processus
+APP_SETTINGS = ("cors_origins", "bootstrap_on_startup")
+
+
+def _lifespan(settings: Settings, started: float):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        from . import models  # noqa: F401  (toutes les tables dans les métadonnées)
+        from .database import async_session, bootstrap
+        from .database.session import engine, SessionLocal
+        from .helper import audit_retention, audit_sink, codename_allocator, ipam, placement
+
+        report = {"applied": False, "seconds": 0.0}
+        if settings.bootstrap_on_startup:
+            # Création du schéma et seeding, sautés quand l'empreinte enregistrée est à jour
+            report = bootstrap.bootstrap(engine, SessionLocal)
+        # Noms déjà utilisés, pour les codenames générés sans requête par tentative
+        db = SessionLocal()
+        try:
+            codename_allocator.warm_all(db)
+            # Arbre des réseaux pour l'IPAM (les adresses sont chargées par réseau à la demande)
+            ipam.registry.warm(db)
+            # Capacité libre des hôtes physiques pour le placement des VMs
+            placement.engine.warm(db)
+        finally:
+            db.close()
+        # Passe de rétention de l'audit (partitions mensuelles et archive compressée)
+        if audit_retention.AUDIT_RETENTION_ON_STARTUP:
+            audit_retention.rotate(engine)
+
+        # Temps de démarrage du worker, rapporté par /health
+        bootstrap.startup_metrics.update(
+            seconds=time.perf_counter() - started,
+            bootstrap_seconds=report["seconds"],
+            bootstrap_applied=report["applied"]
+        )
+        print(f"⏱️ Worker démarré en {bootstrap.startup_metrics['seconds']:.3f} s "
+              f"(bootstrap {'appliqué' if report['applied'] else 'à jour'}, {report['seconds']:.3f} s)")
+        yield
+        # Écriture des entrées d'audit encore en file à l'arrêt
+        audit_sink.sink.stop()
+        await async_session.dispose_async_engine()
+    return lifespan
+
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Build the FastAPI application.
+
+    Nothing touches the database here: the schema, the seed and the other startup tasks run in
+    the lifespan, when the server (or a TestClient used as a context manager) starts the app.
+    Tooling that only needs the routes, such as the OpenAPI generators, can call this directly.
+
+    Only the CORS origins and the startup bootstrap flag are taken from `settings`. The database
+    engines, the token signing key and the mailer are built once per process from `get_settings()`,
+    so settings that differ from it on anything else are rejected rather than silently ignored.
+
+    Args:
+        settings: Settings of the application, defaults to get_settings()
+
+    Returns:
+        The application
+
+    Raises:
+        ValueError: If `settings` differs from get_settings() on a process-wide setting
+    """
+    import importlib
+    from fastapi.exceptions import RequestValidationError
+    from starlette.exceptions import HTTPException as StarletteHTTPException
+    from .database import async_session
+    from .helper.response import http_exception_handler, validation_exception_handler, password_hashing_busy_handler
+    from .helper.security import PasswordHashingBusy
+
+    started = time.perf_counter()
+    process_settings = get_settings()
+    settings = settings or process_settings
+    overridden = [item.name for item in fields(Settings) if item.name not in APP_SETTINGS
+                  and getattr(settings, item.name) != getattr(process_settings, item.name)]
+    if overridden:
+        raise ValueError(f"Process-wide settings cannot be changed per application: {', '.join(overridden)}")
+    app = FastAPI(lifespan=_lifespan(settings, started))
+    app.state.settings = settings
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(settings.cors_origins),  # Vue's origins
+        allow_credentials=True,
+        allow_methods=["*"],  # Allows all HTTP methods
+        allow_headers=["*"],  # Allows all headers
+    )
+
+    # Enregistrement des routeurs
+    if async_session.DB_ASYNC:
+        # Les variantes async des lectures fréquentes sont enregistrées en premier pour masquer les routes sync
+        from .api import async_reads
+        app.include_router(async_reads.router)
+    for name in ROUTERS:
+        app.include_router(importlib.import_module(f".api.{name}", __package__).router)
+
+    # Enregistrement des gestionnaires d'erreurs globales
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(PasswordHashingBusy, password_hashing_busy_handler)
+    return app
+
+
+def __getattr__(name: str):
+    # `app.main:app` (uvicorn, docker-compose) : l'application n'est créée qu'au premier accès
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def main():
     import uvicorn
-    port = int(os.getenv("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    uvicorn.run("app.main:create_app", factory=True, host="0.0.0.0", port=get_settings().port, reload=True)
 
 if __name__ == "__main__":
     main()
@@ -4,6 +4,7 @@ from .group import Group
 from .function import Function
 from .element import Element
 from .audit_log import AuditLog
+from .schema_state import SchemaState
 from .stack import Stack
 from .vm import VM
 from .container_cluster import ContainerCluster, ClusterMode
@@ -28,7 +29,7 @@ from .network_application import NetworkApplication
 from .network_gateway import NetworkGateway
 
 __all__ = [
-    "User", "Environment", "Group", "Function", "Element", "AuditLog",
+    "User", "Environment", "Group", "Function", "Element", "AuditLog", "SchemaState",
     "Stack", "PhysicalHost", "HypervisorType", "AllocationMode",
     "VM", "ContainerCluster", "ClusterMode", "ContainerNode", "NodeRole",
     "Network", "NetworkType",
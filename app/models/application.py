@@ -51,9 +51,10 @@
 #
 
 # app/models/application.py
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, JSON, Boolean
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Boolean
+from sqlalchemy.orm import backref, relationship, foreign
 from ..database.base import Base
+from .types import JSONBType
 import enum
 from typing import Optional, Dict, Any
 
@@ -81,7 +82,8 @@ class Application(Base):
     plugin_version = Column(String(20), nullable=False)  # Version of the plugin template
     application_type = Column(Enum(ApplicationType), nullable=False)
     deployment_status = Column(Enum(DeploymentStatus), default=DeploymentStatus.PENDING)
-    config = Column(JSON, nullable=True)  # Configuration parameters for the application
+    # Configuration parameters for the application; server.host_port is the port published on the host
+    config = Column(JSONBType(indexed_keys={"server.host_port": Integer}), nullable=True)
     is_active = Column(Boolean, default=True)
     element_id = Column(Integer, ForeignKey("elements.id"), nullable=False)
 
@@ -94,7 +96,7 @@ class Application(Base):
     stack = relationship("Stack", back_populates="applications")
     vm = relationship("VM", back_populates="applications")
     physical_host = relationship("PhysicalHost", back_populates="applications")
-    element = relationship("Element", backref="application")
+    element = relationship("Element", backref=backref("application", uselist=False))
 
     # Relationship to volume attachments
     volume_attachments = relationship("VolumeApplication", back_populates="application")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from ..database.base import Base
 
@@ -8,4 +9,14 @@ class AuditLog(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Peut être nul pour les actions non authentifiées
     action = Column(String, nullable=False)
     details = Column(String, nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Valeur par défaut côté Python : même format (avec microsecondes) que les curseurs de pagination
+    timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Pagination par curseur (timestamp, id) et filtres par plage de dates
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_user_id_timestamp", "user_id", "timestamp", "id"),
+        # varchar_pattern_ops : le filtre par préfixe (LIKE 'x%') utilise l'index quelle que soit la collation
+        Index("ix_audit_logs_action_timestamp", "action", "timestamp", "id",
+              postgresql_ops={"action": "varchar_pattern_ops"}),
+    )
@@ -31,7 +31,7 @@
 
 # app/models/container_cluster.py
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from ..database.base import Base
 import enum
 
@@ -54,7 +54,7 @@ class ContainerCluster(Base):
     # Relationships
     stack = relationship("Stack", back_populates="container_clusters")
     nodes = relationship("ContainerNode", back_populates="cluster")
-    element = relationship("Element", backref="container_cluster")
+    element = relationship("Element", backref=backref("container_cluster", uselist=False))
 
     # Relationship to volume attachments
     volume_attachments = relationship("VolumeContainerCluster", back_populates="container_cluster")
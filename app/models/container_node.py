@@ -31,7 +31,7 @@
 
 # app/models/container_node.py
 from sqlalchemy import Column, Integer, ForeignKey, Enum
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy.orm import backref, relationship, foreign
 from ..database.base import Base
 import enum
 
@@ -54,7 +54,7 @@ class ContainerNode(Base):
     vm = relationship("VM", back_populates="container_nodes")
     host = relationship("PhysicalHost", back_populates="container_nodes")
     network_attachments = relationship("NetworkContainerNode", back_populates="container_node")
-    element = relationship("Element", backref="container_node")
+    element = relationship("Element", backref=backref("container_node", uselist=False))
 
     def __repr__(self):
         return f"<ContainerNode(id={self.id}, cluster_id={self.cluster_id}, role='{self.role}', element_id={self.element_id})>"
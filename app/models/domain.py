@@ -30,7 +30,7 @@
 #
 
 from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from ..database.base import Base
 import datetime
 
@@ -51,7 +51,7 @@ class Domain(Base):
     dnssec_digest_type = Column(Integer, nullable=True)  # Digest type for DS record
     dnssec_digest = Column(String(255), nullable=True)  # DS record digest
 
-    element = relationship("Element", backref="domain")
+    element = relationship("Element", backref=backref("domain", uselist=False))
     # provider = relationship("DNSProvider")
     dns_records = relationship("DNSRecord", back_populates="domain", cascade="all, delete-orphan")
     dnssec_keys = relationship("DNSSECKey", back_populates="domain", cascade="all, delete-orphan")
@@ -8,7 +8,7 @@ class Element(Base):
     __tablename__ = "elements"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(80), nullable=False)
+    name = Column(String(80), unique=True, index=True, nullable=False)
     description = Column(String(1024), nullable=True)
     environment_id = Column(Integer, ForeignKey("environments.id"), nullable=False)
 
@@ -30,10 +30,11 @@
 #
 
 # app/models/gateway.py
-from sqlalchemy import Column, Integer, ForeignKey, Enum
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, and_
+from sqlalchemy.orm import relationship
 from ..database.base import Base
-from .storage_pool import JSONBType
+from .network_gateway import NetworkGateway, NetworkDirection
+from .types import JSONBType
 import enum
 
 class GatewayKind(str, enum.Enum):
@@ -54,7 +55,8 @@ class Gateway(Base):
     deployment_application_id = Column(Integer, ForeignKey("applications.id", name="fk_gateway_service"), nullable=True)
     stack_id = Column(Integer, ForeignKey("stacks.id"), nullable=True)
     cert_strategy = Column(Enum(CertStrategy), nullable=False, default=CertStrategy.NONE)
-    entrypoints = Column(JSONBType, nullable=True)
+    # Entrypoint name -> listen address, e.g. {"web": ":80", "websecure": ":443"}
+    entrypoints = Column(JSONBType(indexed_keys={"web": String, "websecure": String}), nullable=True)
 
     # Relationships
     # Note: The Service model is not defined yet, so this relationship will be established later
@@ -64,29 +66,26 @@ class Gateway(Base):
     # Relationship to network attachments
     network_attachments = relationship("NetworkGateway", back_populates="gateway")
 
-    @property
-    def upstream_networks(self):
-        """
-        Get all upstream networks for this gateway.
-        A gateway connects upstream networks to downstream networks.
-        """
-        from ..repositories import network_gateway_repo
-        from sqlalchemy.orm import Session
-        from ..database.session import get_db
-        db = next(get_db())
-        return network_gateway_repo.get_upstream_networks_by_gateway(db, self.id)
-
-    @property
-    def downstream_networks(self):
-        """
-        Get all downstream networks for this gateway.
-        A gateway connects upstream networks to downstream networks.
-        """
-        from ..repositories import network_gateway_repo
-        from sqlalchemy.orm import Session
-        from ..database.session import get_db
-        db = next(get_db())
-        return network_gateway_repo.get_downstream_networks_by_gateway(db, self.id)
+    # Networks on each side of the gateway, read through the attachments. View-only: attach a
+    # network with network_gateway_repo. Batch-load them with loader_profiles.gateway_networks()
+    upstream_networks = relationship(
+        "Network",
+        secondary=NetworkGateway.__table__,
+        primaryjoin=lambda: and_(Gateway.id == NetworkGateway.gateway_id,
+                                 NetworkGateway.direction == NetworkDirection.UPSTREAM),
+        secondaryjoin="Network.id == NetworkGateway.network_id",
+        order_by="Network.id",
+        viewonly=True,
+    )
+    downstream_networks = relationship(
+        "Network",
+        secondary=NetworkGateway.__table__,
+        primaryjoin=lambda: and_(Gateway.id == NetworkGateway.gateway_id,
+                                 NetworkGateway.direction == NetworkDirection.DOWNSTREAM),
+        secondaryjoin="Network.id == NetworkGateway.network_id",
+        order_by="Network.id",
+        viewonly=True,
+    )
 
     def __repr__(self):
         return f"<Gateway(id={self.id}, kind='{self.kind}', cert_strategy='{self.cert_strategy}')>"
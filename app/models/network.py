@@ -31,23 +31,12 @@
 
 # app/models/network.py
 from sqlalchemy import Column, Integer, Boolean, Enum, String, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.types import TypeDecorator, String
+from sqlalchemy.orm import backref, relationship
 from ..database.base import Base
 from ..database.session import DATABASE_URL
+from .types import CIDRType
 import enum
 
-# Custom CIDR type that works with both PostgreSQL and SQLite
-class CIDRType(TypeDecorator):
-    impl = String
-
-    def load_dialect_impl(self, dialect):
-        if dialect.name == 'postgresql':
-            from sqlalchemy.dialects.postgresql import CIDR
-            return dialect.type_descriptor(CIDR())
-        else:
-            return dialect.type_descriptor(String())
-
 class NetworkType(str, enum.Enum):
     PHYSICAL = "physical"
     OVERLAY = "overlay"
@@ -63,7 +52,7 @@ class Network(Base):
     element_id = Column(Integer, ForeignKey("elements.id"), nullable=False)
 
     # Relationships
-    element = relationship("Element", backref="network")
+    element = relationship("Element", backref=backref("network", uselist=False))
 
     # Network attachments relationships
     physical_host_attachments = relationship("NetworkPhysicalHost", back_populates="network")
@@ -40,7 +40,7 @@ class NetworkApplication(Base):
     __tablename__ = "network_applications"
 
     id = Column(Integer, primary_key=True, index=True)
-    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False)
+    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False, index=True)
     application_id = Column(Integer, ForeignKey("applications.id"), nullable=False)
     ip_address = Column(INETType, nullable=False)
 
@@ -39,7 +39,7 @@ class NetworkContainerNode(Base):
     __tablename__ = "network_container_nodes"
 
     id = Column(Integer, primary_key=True, index=True)
-    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False)
+    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False, index=True)
     container_node_id = Column(Integer, ForeignKey("container_nodes.id"), nullable=False)
     ip_address = Column(INETType, nullable=False)
 
@@ -44,7 +44,7 @@ class NetworkGateway(Base):
     __tablename__ = "network_gateways"
 
     id = Column(Integer, primary_key=True, index=True)
-    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False)
+    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False, index=True)
     gateway_id = Column(Integer, ForeignKey("gateways.id"), nullable=False)
     ip_address = Column(INETType, nullable=False)
     direction = Column(Enum(NetworkDirection), nullable=False, default=NetworkDirection.UPSTREAM)
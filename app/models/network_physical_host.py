@@ -39,7 +39,7 @@ class NetworkPhysicalHost(Base):
     __tablename__ = "network_physical_hosts"
 
     id = Column(Integer, primary_key=True, index=True)
-    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False)
+    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False, index=True)
     physical_host_id = Column(Integer, ForeignKey("physical_hosts.id"), nullable=False)
     ip_address = Column(INETType, nullable=False)
 
@@ -39,7 +39,7 @@ class NetworkVM(Base):
     __tablename__ = "network_vms"
 
     id = Column(Integer, primary_key=True, index=True)
-    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False)
+    network_id = Column(Integer, ForeignKey("networks.id"), nullable=False, index=True)
     vm_id = Column(Integer, ForeignKey("vms.id"), nullable=False)
     ip_address = Column(INETType, nullable=False)
 
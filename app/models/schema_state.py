@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+class SchemaState(Base):
+    """Empreintes enregistrées au démarrage (schéma et données de seed)"""
+    __tablename__ = "schema_state"
+    key = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SchemaState(key='{self.key}', fingerprint='{self.fingerprint}')>"
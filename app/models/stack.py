@@ -31,7 +31,7 @@
 
 # app/models/stack.py
 from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from ..database.base import Base
 
 class Stack(Base):
@@ -43,7 +43,7 @@ class Stack(Base):
     element_id = Column(Integer, ForeignKey("elements.id"), nullable=False)
 
     # Relationships
-    element = relationship("Element", backref="stack")
+    element = relationship("Element", backref=backref("stack", uselist=False))
     vms = relationship("VM", back_populates="stack")
     container_clusters = relationship("ContainerCluster", back_populates="stack")
     gateways = relationship("Gateway", back_populates="stack")
@@ -30,24 +30,13 @@
 #
 
 # app/models/storage_pool.py
-from sqlalchemy import Column, Integer, Enum, ForeignKey, JSON
-from sqlalchemy.orm import relationship
-from sqlalchemy.types import TypeDecorator, JSON
+from sqlalchemy import Column, Integer, Enum, ForeignKey
+from sqlalchemy.orm import backref, relationship
 from ..database.base import Base
 from ..database.session import DATABASE_URL
+from .types import JSONBType
 import enum
 
-# Custom JSONB type that works with both PostgreSQL and SQLite
-class JSONBType(TypeDecorator):
-    impl = JSON
-
-    def load_dialect_impl(self, dialect):
-        if dialect.name == 'postgresql':
-            from sqlalchemy.dialects.postgresql import JSONB
-            return dialect.type_descriptor(JSONB())
-        else:
-            return dialect.type_descriptor(JSON())
-
 
 class StoragePoolType(str, enum.Enum):
     NFS = "nfs"
@@ -67,12 +56,13 @@ class StoragePool(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(Enum(StoragePoolType), nullable=False)
-    parameters = Column(JSONBType, nullable=True)
+    # host_id is set on host-local pools
+    parameters = Column(JSONBType(indexed_keys={"host_id": Integer}), nullable=True)
     scope = Column(Enum(StoragePoolScope), nullable=False)
     element_id = Column(Integer, ForeignKey("elements.id"), nullable=True)
 
     # Relationships
-    element = relationship("Element", backref="storage_pool")
+    element = relationship("Element", backref=backref("storage_pool", uselist=False))
     volumes = relationship("Volume", back_populates="storage_pool")
 
     @property
@@ -30,11 +30,25 @@
 #
 
 # app/models/types.py
-from sqlalchemy.types import TypeDecorator, String
+import ipaddress
+import json
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, LargeBinary, Table, and_, cast, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapper
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import JSON, TypeDecorator, String
+
+_JSON_PATH = re.compile(r"^\w+(\.\w+)*$")
+
 
 # Custom INET type that works with both PostgreSQL and SQLite
 class INETType(TypeDecorator):
     impl = String
+    cache_ok = True
 
     def load_dialect_impl(self, dialect):
         if dialect.name == 'postgresql':
@@ -42,3 +56,270 @@ class INETType(TypeDecorator):
             return dialect.type_descriptor(INET())
         else:
             return dialect.type_descriptor(String())
+
+
+# Custom CIDR type that works with both PostgreSQL and SQLite
+class CIDRType(TypeDecorator):
+    impl = String
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import CIDR
+            return dialect.type_descriptor(CIDR())
+        else:
+            return dialect.type_descriptor(String())
+
+
+# Numeric keys of the IP columns.
+#
+# Next to every INETType column `x` the table gets `x_key`, and next to every CIDRType column `x`
+# the pair `x_start`/`x_end`: 16-byte big-endian integers (IPv4 as IPv4-mapped IPv6), so that byte
+# order is numeric order for both versions. They are filled on insert by column defaults and on ORM
+# updates by a mapper event, and indexed with b-trees for the range queries of ip_within() and
+# ip_containing() on SQLite. On PostgreSQL those helpers use the native inet operators, served by a
+# GiST index declared on the display column.
+
+_IPV4_MAPPED = 0xFFFF << 32
+
+
+def ip_key(address) -> bytes:
+    """Sortable 16-byte key of an address."""
+    if isinstance(address, str):
+        address = ipaddress.ip_address(address)
+    value = int(address) | _IPV4_MAPPED if address.version == 4 else int(address)
+    return value.to_bytes(16, "big")
+
+
+def _inet_key(value) -> Optional[bytes]:
+    try:
+        return ip_key(ipaddress.ip_interface(str(value).strip()).ip) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _cidr_bounds(value) -> Tuple[Optional[bytes], Optional[bytes]]:
+    try:
+        network = ipaddress.ip_network(str(value).strip(), strict=False) if value is not None else None
+    except ValueError:
+        network = None
+    if network is None:
+        return None, None
+    return ip_key(network.network_address), ip_key(network.broadcast_address)
+
+
+_INET_KEYS: Dict[str, Callable] = {"key": _inet_key}
+_CIDR_KEYS: Dict[str, Callable] = {"start": lambda value: _cidr_bounds(value)[0],
+                                   "end": lambda value: _cidr_bounds(value)[1]}
+
+# Table -> [(IP column name, {key column name: function of the IP value})]
+IP_KEY_COLUMNS: Dict[Table, List[Tuple[str, Dict[str, Callable]]]] = {}
+
+
+def ip_key_values(table: Table, row: Dict) -> Dict[str, Optional[bytes]]:
+    """Values of the key columns of a row, for writers that bypass column defaults (COPY)."""
+    return {name: compute(row.get(source))
+            for source, keys in IP_KEY_COLUMNS.get(table, ()) for name, compute in keys.items()}
+
+
+def _key_default(source: str, compute: Callable):
+    def default(context):
+        return compute(context.get_current_parameters().get(source))
+    return default
+
+
+@event.listens_for(Column, "after_parent_attach")
+def _add_ip_keys(column, table):
+    if not isinstance(table, Table) or not isinstance(column.type, (INETType, CIDRType)):
+        return
+    suffixes = _CIDR_KEYS if isinstance(column.type, CIDRType) else _INET_KEYS
+    keys = {}
+    for suffix, compute in suffixes.items():
+        name = f"{column.name}_{suffix}"
+        keys[name] = compute
+        table.append_column(Column(name, LargeBinary(16), nullable=True, default=_key_default(column.name, compute)))
+    IP_KEY_COLUMNS.setdefault(table, []).append((column.name, keys))
+    Index(f"ix_{table.name}_{column.name}_{next(iter(suffixes))}", *(table.c[name] for name in keys))
+    Index(f"ix_{table.name}_{column.name}_inet", column,
+          postgresql_using="gist", postgresql_ops={column.name: "inet_ops"})
+
+
+@event.listens_for(Mapper, "before_update")
+def _update_ip_keys(mapper, connection, target):
+    for source, keys in IP_KEY_COLUMNS.get(mapper.local_table, ()):
+        value = getattr(target, mapper.get_property_by_column(mapper.local_table.c[source]).key)
+        for name, compute in keys.items():
+            key = compute(value)
+            if getattr(target, name) != key:
+                setattr(target, name, key)
+
+
+def _ip_keys(column) -> Dict[str, Column]:
+    column = getattr(column, "expression", column)
+    for source, keys in IP_KEY_COLUMNS.get(column.table, ()):
+        if source == column.name:
+            return {name[len(source) + 1:]: column.table.c[name] for name in keys}
+    raise ValueError(f"{column} is not an IP column")
+
+
+def ip_within(column, cidr: str, dialect: str):
+    """
+    Condition: the address (INETType column) or the network (CIDRType column) is inside `cidr`.
+
+    Args:
+        column: The IP column or model attribute
+        cidr: The enclosing range
+        dialect: Name of the database dialect, usually db.get_bind().dialect.name
+
+    Returns:
+        A condition served by the GiST index on PostgreSQL and by the key index elsewhere
+    """
+    network = ipaddress.ip_network(cidr, strict=False)
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import CIDR
+        return column.op("<<=")(cast(str(network), CIDR))
+    low, high = ip_key(network.network_address), ip_key(network.broadcast_address)
+    keys = _ip_keys(column)
+    if "key" in keys:
+        return keys["key"].between(low, high)
+    return and_(keys["start"].between(low, high), keys["end"] <= high)
+
+
+def ip_containing(column, ip: str, dialect: str):
+    """
+    Condition: the network (CIDRType column) contains the address `ip`.
+
+    On SQLite the network of `ip` at every prefix length is looked up in the (start, end) index:
+    at most 33 (IPv4) or 129 (IPv6) index seeks, whatever the number of networks.
+    """
+    address = ipaddress.ip_interface(ip).ip
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import INET
+        return column.op(">>=")(cast(str(address), INET))
+    starts = {ip_key(ipaddress.ip_network((address, prefixlen), strict=False).network_address)
+              for prefixlen in range(address.max_prefixlen + 1)}
+    keys = _ip_keys(column)
+    return and_(keys["start"].in_(starts), keys["end"] >= ip_key(address))
+
+
+# Custom JSONB type that works with both PostgreSQL and SQLite
+class JSONBType(TypeDecorator):
+    """
+    JSON column, stored as JSONB on PostgreSQL.
+
+    Args:
+        indexed_keys: Attributes looked up by value, with their SQL type; nested attributes are
+            given as dotted paths. Each one gets an expression index, used by json_attribute().
+            On PostgreSQL the index holds the text of the attribute: a value of another type than
+            the declared one is stored as is instead of failing a cast.
+    """
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, indexed_keys: Optional[Dict[str, type]] = None):
+        super().__init__()
+        for path in indexed_keys or ():
+            if not _JSON_PATH.match(path):
+                raise ValueError(f"Invalid JSON attribute path: {path}")
+        self.indexed_keys = tuple((indexed_keys or {}).items())
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import JSONB
+            return dialect.type_descriptor(JSONB())
+        else:
+            return dialect.type_descriptor(JSON())
+
+
+class JSONValue(TypeDecorator):
+    """
+    Declared type of a JSON attribute. PostgreSQL extracts and indexes its text, so values are
+    compared with their JSON text there; SQLite extracts the typed value.
+    """
+    impl = String
+    cache_ok = True
+
+    def __init__(self, declared=String):
+        super().__init__()
+        self.declared = declared() if isinstance(declared, type) else declared
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(self.declared)
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != 'postgresql' or value is None or isinstance(value, str):
+            return value
+        return json.dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if dialect.name != 'postgresql' or value is None or isinstance(self.declared, String):
+            return value
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+
+
+class JSONAttribute(ColumnElement):
+    """Typed value of an attribute of a JSON column, see json_attribute()."""
+    __visit_name__ = "json_attribute"
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("path", InternalTraversal.dp_string),
+        ("type", InternalTraversal.dp_type),
+    ]
+
+    def __init__(self, column, path: str, type_=String):
+        if not _JSON_PATH.match(path):
+            raise ValueError(f"Invalid JSON attribute path: {path}")
+        self.column = column
+        self.path = path
+        self.type = JSONValue(type_)
+
+
+def json_attribute(column, path: str) -> JSONAttribute:
+    """
+    Value of a JSON attribute, as the expression indexed for it when the key is declared in the
+    JSONBType of the column. Comparing it for equality with a value is then an index seek on both
+    dialects; on PostgreSQL the comparison is on the JSON text, so ordering is textual there.
+
+    Args:
+        column: A JSONBType column or model attribute, e.g. StoragePool.parameters
+        path: The attribute, dotted for nested ones
+
+    Returns:
+        The attribute expression, typed as declared (String for undeclared keys)
+    """
+    column = getattr(column, "expression", column)
+    declared = dict(getattr(column.type, "indexed_keys", ()))
+    return JSONAttribute(column, path, declared.get(path, String))
+
+
+# The path is rendered as a literal: an expression index is only used for identical expressions
+@compiles(JSONAttribute)
+def _compile_json_attribute(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return f"json_extract({column}, '$.{element.path}')"
+
+
+@compiles(JSONAttribute, "postgresql")
+def _compile_json_attribute_postgresql(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    keys = element.path.split(".")
+    if len(keys) == 1:
+        value = f"({column} ->> '{keys[0]}')"
+    else:
+        value = f"({column} #>> '{{{','.join(keys)}}}')"
+    # Not cast: a stored value of another type would make the index expression fail the write
+    return value
+
+
+@event.listens_for(Column, "after_parent_attach")
+def _index_json_attributes(column, table):
+    if not isinstance(table, Table) or not isinstance(column.type, JSONBType):
+        return
+    for path, type_ in column.type.indexed_keys:
+        Index(f"ix_{table.name}_{column.name}_{path.replace('.', '_')}", JSONAttribute(column, path, type_))
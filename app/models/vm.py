@@ -31,14 +31,14 @@
 
 # app/models/vm.py
 from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy.orm import backref, relationship, foreign
 from ..database.base import Base
 
 class VM(Base):
     __tablename__ = "vms"
 
     id = Column(Integer, primary_key=True, index=True)
-    host_id = Column(Integer, ForeignKey("physical_hosts.id"), nullable=False)
+    host_id = Column(Integer, ForeignKey("physical_hosts.id"), nullable=False, index=True)
     name = Column(String(80), nullable=False)
     vcpu = Column(Integer, nullable=False)
     ram_mb = Column(Integer, nullable=False)
@@ -52,7 +52,7 @@ class VM(Base):
     stack = relationship("Stack", back_populates="vms")
     container_nodes = relationship("ContainerNode", back_populates="vm")
     applications = relationship("Application", back_populates="vm")
-    element = relationship("Element", backref="vm")
+    element = relationship("Element", backref=backref("vm", uselist=False))
 
     # Relationship to network attachments
     network_attachments = relationship("NetworkVM", back_populates="vm")
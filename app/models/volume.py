@@ -31,7 +31,7 @@
 
 # app/models/volume.py
 from sqlalchemy import Column, Integer, ForeignKey, Enum, String
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from ..database.base import Base
 import enum
 
@@ -59,7 +59,7 @@ class Volume(Base):
 
     # Relationship to StoragePool and Element
     storage_pool = relationship("StoragePool", back_populates="volumes")
-    element = relationship("Element", backref="volume")
+    element = relationship("Element", backref=backref("volume", uselist=False))
 
     # Relationships to attachment tables
     vm_attachments = relationship("VolumeVM", back_populates="volume")
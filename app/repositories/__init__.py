@@ -5,7 +5,8 @@ from . import (
     domain_repo, dns_record_repo, dnssec_key_repo,
     network_physical_host_repo, network_vm_repo, network_container_node_repo,
     network_application_repo, network_gateway_repo,
-    volume_vm_repo, volume_container_cluster_repo, volume_application_repo
+    volume_vm_repo, volume_container_cluster_repo, volume_application_repo,
+    loader_profiles
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     "domain_repo", "dns_record_repo", "dnssec_key_repo",
     "network_physical_host_repo", "network_vm_repo", "network_container_node_repo",
     "network_application_repo", "network_gateway_repo",
-    "volume_vm_repo", "volume_container_cluster_repo", "volume_application_repo"
+    "volume_vm_repo", "volume_container_cluster_repo", "volume_application_repo",
+    "loader_profiles"
 ]
@@ -54,6 +54,7 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from ..models.application import Application, ApplicationType, DeploymentStatus
+from ..models.types import json_attribute
 
 def create_application(
     db: Session,
@@ -242,6 +243,19 @@ def list_applications_by_status(
     """
     return db.query(Application).filter(Application.deployment_status == status).offset(skip).limit(limit).all()
 
+def list_applications_by_host_port(db: Session, host_port: int) -> List[Application]:
+    """
+    List applications publishing a port on their host (config server.host_port).
+
+    Args:
+        db: Database session
+        host_port: Port published on the host
+
+    Returns:
+        List of applications publishing this port, found through the config index
+    """
+    return db.query(Application).filter(json_attribute(Application.config, "server.host_port") == host_port).all()
+
 def update_application(
     db: Session,
     application: Application,
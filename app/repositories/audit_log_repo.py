@@ -1,3 +1,9 @@
+import base64
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import Row, Select, select, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.audit_log import AuditLog
 
@@ -7,3 +13,132 @@ def create_audit_log(db: Session, user_id: int, action: str, details: str = None
     db.commit()
     db.refresh(log)
     return log
+
+def encode_cursor(log: AuditLog) -> str:
+    """Opaque cursor pointing after `log` in the (timestamp, id) descending order."""
+    raw = f"{log.timestamp.isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        timestamp, log_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def _prefix_filter(dialect_name: str, prefix: str):
+    if dialect_name == "sqlite":
+        # SQLite only uses an index for LIKE with case_sensitive_like: use the equivalent range instead
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return (AuditLog.action >= prefix) & (AuditLog.action < upper)
+    # PostgreSQL: the index on action uses varchar_pattern_ops, which serves LIKE 'prefix%'
+    return AuditLog.action.startswith(prefix, autoescape=True)
+
+def _filtered(stmt: Select, dialect_name: str, action: Optional[str], action_prefix: Optional[str],
+              user_id: Optional[int], since: Optional[datetime], until: Optional[datetime]) -> Select:
+    if action:
+        stmt = stmt.where(AuditLog.action == action)
+    elif action_prefix:
+        stmt = stmt.where(_prefix_filter(dialect_name, action_prefix))
+    if user_id:
+        stmt = stmt.where(AuditLog.user_id == user_id)
+    if since:
+        stmt = stmt.where(AuditLog.timestamp >= since)
+    if until:
+        stmt = stmt.where(AuditLog.timestamp < until)
+    return stmt
+
+def audit_logs_query(
+    dialect_name: str,
+    limit: int = 100,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    action: Optional[str] = None,
+    action_prefix: Optional[str] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Select:
+    """
+    Build the audit log listing, newest first.
+
+    Every filter is served by one of the (timestamp, id), (user_id, timestamp, id) or
+    (action, timestamp, id) indexes. One row more than `limit` is selected to detect the next page.
+
+    Args:
+        dialect_name: Name of the database dialect
+        limit: Maximum number of logs
+        skip: Offset, only for clients that do not use cursors
+        cursor: Cursor returned with the previous page
+        action: Exact action
+        action_prefix: Action prefix
+        user_id: Author of the actions
+        since: Lower bound (inclusive) of the timestamp
+        until: Upper bound (exclusive) of the timestamp
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    stmt = _filtered(select(AuditLog), dialect_name, action, action_prefix, user_id, since, until)
+    if cursor:
+        stmt = stmt.where(tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(*decode_cursor(cursor)))
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(limit + 1)
+
+def _page(logs: List[AuditLog], limit: int) -> Tuple[List[AuditLog], Optional[str]]:
+    if len(logs) > limit:
+        logs = logs[:limit]
+        return logs, encode_cursor(logs[-1])
+    return logs, None
+
+def list_audit_logs(db: Session, limit: int = 100, **filters) -> Tuple[List[AuditLog], Optional[str]]:
+    """Return a page of audit logs and the cursor of the next page (None on the last page)."""
+    stmt = audit_logs_query(db.get_bind().dialect.name, limit=limit, **filters)
+    return _page(list(db.execute(stmt).scalars().all()), limit)
+
+async def list_audit_logs_async(db: AsyncSession, limit: int = 100, **filters) -> Tuple[List[AuditLog], Optional[str]]:
+    stmt = audit_logs_query(db.get_bind().dialect.name, limit=limit, **filters)
+    result = await db.execute(stmt)
+    return _page(list(result.scalars().all()), limit)
+
+EXPORT_COLUMNS = ("id", "user_id", "action", "details", "timestamp")
+
+def iter_audit_log_rows(
+    engine: Engine,
+    batch_size: int = 1000,
+    action: Optional[str] = None,
+    action_prefix: Optional[str] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Iterator[Row]:
+    """
+    Stream audit log rows, oldest first, for exports.
+
+    Rows are plain tuples in EXPORT_COLUMNS order, fetched `batch_size` at a time through a
+    server-side cursor where the driver supports it: neither ORM objects nor the whole result are
+    held in memory. The generator owns its connection, so it can outlive the request session.
+
+    Args:
+        engine: Engine of the application database
+        batch_size: Number of rows fetched per round trip
+        action: Exact action
+        action_prefix: Action prefix
+        user_id: Author of the actions
+        since: Lower bound (inclusive) of the timestamp
+        until: Upper bound (exclusive) of the timestamp
+    """
+    columns = [getattr(AuditLog, name) for name in EXPORT_COLUMNS]
+    stmt = _filtered(select(*columns), engine.dialect.name, action, action_prefix, user_id, since, until)
+    stmt = stmt.order_by(AuditLog.timestamp, AuditLog.id)
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+        for partition in result.partitions():
+            yield from partition
@@ -1,10 +1,13 @@
 # app/repositories/element_repo.py
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, List, Sequence, Set, Tuple
 from ..models.element import Element
 from ..models.tag import Tag
 from ..models.network import Network, NetworkType
 from ..models.vm import VM
+from ..models.physical_host import PhysicalHost
 from ..models.storage_pool import StoragePool, StoragePoolType, StoragePoolScope
 from ..models.volume import Volume, VolumeMode
 from ..models.domain import Domain
@@ -12,6 +15,8 @@ from ..models.container_node import ContainerNode, NodeRole
 from ..models.container_cluster import ContainerCluster, ClusterMode
 from ..models.stack import Stack
 from ..models.application import Application, ApplicationType, DeploymentStatus
+from . import loader_profiles
+from ..helper import ipam, placement, topology
 
 
 def has_subcomponent(element: Element) -> bool:
@@ -62,11 +67,37 @@ def create_element(db: Session, environment_id: int, name: str, description: str
     db.refresh(element)
     return element
 
-def get_element(db: Session, element_id: int) -> Element:
-    return db.query(Element).filter(Element.id == element_id).first()
+def get_element(db: Session, element_id: int, options: Sequence = ()) -> Element:
+    """
+    Get an element by ID.
+
+    Args:
+        db: The database session
+        element_id: The ID of the element
+        options: Loader options to apply, usually a profile from loader_profiles
+
+    Returns:
+        The element, or None if it does not exist
+    """
+    return db.query(Element).options(*options).filter(Element.id == element_id).first()
+
+async def get_element_async(db: AsyncSession, element_id: int) -> Optional[Element]:
+    # Everything ElementOut reads is loaded upfront: lazy loads are not possible on an AsyncSession
+    result = await db.execute(
+        select(Element).options(*loader_profiles.element_out()).where(Element.id == element_id)
+    )
+    return result.scalars().first()
 
 def update_element(db: Session, element: Element, name: str = None, description: str = None, environment_id: int = None) -> Element:
-    if name is not None:
+    """
+    Update an element.
+
+    Raises:
+        ValueError: If another element already has the new name
+    """
+    if name is not None and name != element.name:
+        if db.query(Element.id).filter(Element.name == name, Element.id != element.id).first():
+            raise ValueError("An element with this name already exists")
         element.name = name
     if description is not None:
         element.description = description
@@ -76,196 +107,234 @@ def update_element(db: Session, element: Element, name: str = None, description:
     db.refresh(element)
     return element
 
-def create_element_with_subcomponent(
-    db: Session,
-    environment_id: int,
-    name: str,
-    description: Optional[str] = None,
-    subcomponent_type: str = None,
-    subcomponent_data: Dict[str, Any] = None
-) -> Element:
+SUBCOMPONENT_TYPES = ("network", "vm", "storage_pool", "volume", "domain", "container_node",
+                      "container_cluster", "stack", "application")
+
+
+def subcomponent_values(subcomponent_type: str, subcomponent_data: Optional[Dict[str, Any]]) -> Tuple[type, Dict[str, Any]]:
     """
-    Create a new element with a sub-component.
+    Validate the data of a sub-component and return its model and column values.
 
     Args:
-        db: The database session
-        environment_id: The ID of the environment to which the element belongs
-        name: The name of the element
-        description: An optional description of the element
-        subcomponent_type: The type of sub-component to create ('network', 'vm', 'storage_pool', etc.)
+        subcomponent_type: The type of sub-component ('network', 'vm', 'storage_pool', etc.)
         subcomponent_data: A dictionary of data for the sub-component
 
     Returns:
-        The created element with the sub-component
+        The sub-component model and its column values, without element_id
 
     Raises:
         ValueError: If subcomponent_type is not valid or if required data for the sub-component is missing
     """
-    # Create the element
-    element = Element(name=name, description=description, environment_id=environment_id)
-    db.add(element)
-    db.flush()  # Flush to get the element ID without committing the transaction
-
-    # Create the sub-component based on the type
+    data = subcomponent_data
     if subcomponent_type == 'network':
-        if not subcomponent_data or 'cidr' not in subcomponent_data or 'type' not in subcomponent_data:
+        if not data or 'cidr' not in data or 'type' not in data:
             raise ValueError("Network requires 'cidr' and 'type' data")
-
-        network_type = subcomponent_data['type']
+        network_type = data['type']
         if isinstance(network_type, str):
             network_type = NetworkType(network_type)
-
-        network = Network(
-            cidr=subcomponent_data['cidr'],
-            vlan=subcomponent_data.get('vlan'),
+        return Network, dict(
+            cidr=str(ipam.parse_network(data['cidr'])),
+            vlan=data.get('vlan'),
             type=network_type,
-            environment_scoped=subcomponent_data.get('environment_scoped', False),
-            element_id=element.id
+            environment_scoped=data.get('environment_scoped', False)
         )
-        db.add(network)
-
-    elif subcomponent_type == 'vm':
-        if not subcomponent_data or 'host_id' not in subcomponent_data or 'name' not in subcomponent_data:
-            raise ValueError("VM requires 'host_id' and 'name' data")
-
-        vm = VM(
-            host_id=subcomponent_data['host_id'],
-            name=subcomponent_data['name'],
-            vcpu=subcomponent_data.get('vcpu', 1),
-            ram_mb=subcomponent_data.get('ram_mb', 1024),
-            disk_gb=subcomponent_data.get('disk_gb', 10),
-            os_image=subcomponent_data.get('os_image', 'default'),
-            stack_id=subcomponent_data.get('stack_id'),
-            element_id=element.id
+
+    if subcomponent_type == 'vm':
+        if not data or 'name' not in data:
+            raise ValueError("VM requires 'name' data")
+        # Without host_id, the host is chosen by the placement engine
+        return VM, dict(
+            host_id=data.get('host_id'),
+            name=data['name'],
+            vcpu=data.get('vcpu', 1),
+            ram_mb=data.get('ram_mb', 1024),
+            disk_gb=data.get('disk_gb', 10),
+            os_image=data.get('os_image', 'default'),
+            stack_id=data.get('stack_id')
         )
-        db.add(vm)
 
-    elif subcomponent_type == 'storage_pool':
-        if not subcomponent_data or 'type' not in subcomponent_data or 'scope' not in subcomponent_data:
+    if subcomponent_type == 'storage_pool':
+        if not data or 'type' not in data or 'scope' not in data:
             raise ValueError("StoragePool requires 'type' and 'scope' data")
-
-        pool_type = subcomponent_data['type']
+        pool_type = data['type']
         if isinstance(pool_type, str):
             pool_type = StoragePoolType(pool_type)
-
-        pool_scope = subcomponent_data['scope']
+        pool_scope = data['scope']
         if isinstance(pool_scope, str):
             pool_scope = StoragePoolScope(pool_scope)
-
-        storage_pool = StoragePool(
+        return StoragePool, dict(
             type=pool_type,
-            parameters=subcomponent_data.get('parameters'),
-            scope=pool_scope,
-            element_id=element.id
+            parameters=data.get('parameters'),
+            scope=pool_scope
         )
-        db.add(storage_pool)
 
-    elif subcomponent_type == 'volume':
-        if not subcomponent_data or 'pool_id' not in subcomponent_data or 'size_gb' not in subcomponent_data or 'mode' not in subcomponent_data:
+    if subcomponent_type == 'volume':
+        if not data or 'pool_id' not in data or 'size_gb' not in data or 'mode' not in data:
             raise ValueError("Volume requires 'pool_id', 'size_gb', and 'mode' data")
-
-        volume_mode = subcomponent_data['mode']
+        volume_mode = data['mode']
         if isinstance(volume_mode, str):
             volume_mode = VolumeMode(volume_mode)
-
-        volume = Volume(
-            pool_id=subcomponent_data['pool_id'],
-            size_gb=subcomponent_data['size_gb'],
-            mode=volume_mode,
-            element_id=element.id
+        return Volume, dict(
+            pool_id=data['pool_id'],
+            size_gb=data['size_gb'],
+            mode=volume_mode
         )
-        db.add(volume)
 
-    elif subcomponent_type == 'domain':
-        if not subcomponent_data or 'fqdn' not in subcomponent_data:
+    if subcomponent_type == 'domain':
+        if not data or 'fqdn' not in data:
             raise ValueError("Domain requires 'fqdn' data")
-
-        domain = Domain(
-            fqdn=subcomponent_data['fqdn'],
-            dnssec_enabled=subcomponent_data.get('dnssec_enabled', False),
-            element_id=element.id
+        return Domain, dict(
+            fqdn=data['fqdn'],
+            dnssec_enabled=data.get('dnssec_enabled', False)
         )
-        db.add(domain)
 
-    elif subcomponent_type == 'container_node':
-        if not subcomponent_data or 'cluster_id' not in subcomponent_data or 'role' not in subcomponent_data:
+    if subcomponent_type == 'container_node':
+        if not data or 'cluster_id' not in data or 'role' not in data:
             raise ValueError("ContainerNode requires 'cluster_id' and 'role' data")
-
-        node_role = subcomponent_data['role']
+        node_role = data['role']
         if isinstance(node_role, str):
             node_role = NodeRole(node_role)
-
-        container_node = ContainerNode(
-            cluster_id=subcomponent_data['cluster_id'],
-            vm_id=subcomponent_data.get('vm_id'),
-            host_id=subcomponent_data.get('host_id'),
-            role=node_role,
-            element_id=element.id
+        return ContainerNode, dict(
+            cluster_id=data['cluster_id'],
+            vm_id=data.get('vm_id'),
+            host_id=data.get('host_id'),
+            role=node_role
         )
-        db.add(container_node)
 
-    elif subcomponent_type == 'container_cluster':
-        if not subcomponent_data or 'mode' not in subcomponent_data or 'version' not in subcomponent_data or 'endpoint' not in subcomponent_data:
+    if subcomponent_type == 'container_cluster':
+        if not data or 'mode' not in data or 'version' not in data or 'endpoint' not in data:
             raise ValueError("ContainerCluster requires 'mode', 'version', and 'endpoint' data")
-
-        cluster_mode = subcomponent_data['mode']
+        cluster_mode = data['mode']
         if isinstance(cluster_mode, str):
             cluster_mode = ClusterMode(cluster_mode)
-
-        container_cluster = ContainerCluster(
+        return ContainerCluster, dict(
             mode=cluster_mode,
-            version=subcomponent_data['version'],
-            ha_enabled=subcomponent_data.get('ha_enabled', False),
-            endpoint=subcomponent_data['endpoint'],
-            stack_id=subcomponent_data.get('stack_id'),
-            element_id=element.id
+            version=data['version'],
+            ha_enabled=data.get('ha_enabled', False),
+            endpoint=data['endpoint'],
+            stack_id=data.get('stack_id')
         )
-        db.add(container_cluster)
 
-    elif subcomponent_type == 'stack':
-        if not subcomponent_data or 'name' not in subcomponent_data:
+    if subcomponent_type == 'stack':
+        if not data or 'name' not in data:
             raise ValueError("Stack requires 'name' data")
-
-        stack = Stack(
-            name=subcomponent_data['name'],
-            description=subcomponent_data.get('description'),
-            element_id=element.id
+        return Stack, dict(
+            name=data['name'],
+            description=data.get('description')
         )
-        db.add(stack)
 
-    elif subcomponent_type == 'application':
-        if not subcomponent_data or 'name' not in subcomponent_data or 'plugin_name' not in subcomponent_data or 'plugin_version' not in subcomponent_data or 'application_type' not in subcomponent_data:
+    if subcomponent_type == 'application':
+        if not data or 'name' not in data or 'plugin_name' not in data or 'plugin_version' not in data or 'application_type' not in data:
             raise ValueError("Application requires 'name', 'plugin_name', 'plugin_version', and 'application_type' data")
-
-        app_type = subcomponent_data['application_type']
+        app_type = data['application_type']
         if isinstance(app_type, str):
             app_type = ApplicationType(app_type)
-
-        deployment_status = subcomponent_data.get('deployment_status', 'pending')
+        deployment_status = data.get('deployment_status', 'pending')
         if isinstance(deployment_status, str):
             deployment_status = DeploymentStatus(deployment_status)
-
-        application = Application(
-            name=subcomponent_data['name'],
-            description=subcomponent_data.get('description'),
-            plugin_name=subcomponent_data['plugin_name'],
-            plugin_version=subcomponent_data['plugin_version'],
+        return Application, dict(
+            name=data['name'],
+            description=data.get('description'),
+            plugin_name=data['plugin_name'],
+            plugin_version=data['plugin_version'],
             application_type=app_type,
             deployment_status=deployment_status,
-            config=subcomponent_data.get('config'),
-            is_active=subcomponent_data.get('is_active', True),
-            stack_id=subcomponent_data.get('stack_id'),
-            vm_id=subcomponent_data.get('vm_id'),
-            physical_host_id=subcomponent_data.get('physical_host_id'),
-            element_id=element.id
+            config=data.get('config'),
+            is_active=data.get('is_active', True),
+            stack_id=data.get('stack_id'),
+            vm_id=data.get('vm_id'),
+            physical_host_id=data.get('physical_host_id')
+        )
+
+    raise ValueError(f"Invalid sub-component type: {subcomponent_type}. Must be one of: {', '.join(SUBCOMPONENT_TYPES)}")
+
+
+# Foreign keys of the sub-components: column -> referenced model
+SUBCOMPONENT_REFERENCES: Dict[type, Dict[str, type]] = {
+    VM: {"host_id": PhysicalHost, "stack_id": Stack},
+    Volume: {"pool_id": StoragePool},
+    ContainerNode: {"cluster_id": ContainerCluster, "vm_id": VM, "host_id": PhysicalHost},
+    ContainerCluster: {"stack_id": Stack},
+    Application: {"stack_id": Stack, "vm_id": VM, "physical_host_id": PhysicalHost},
+}
+
+
+def unresolved_references(db: Session, subcomponents: Sequence[Tuple[type, Dict[str, Any]]]) -> List[Optional[str]]:
+    """
+    Check the foreign keys of many sub-components, with one query per referenced table.
+
+    Args:
+        db: The database session
+        subcomponents: The model and values of each sub-component, as returned by subcomponent_values
+
+    Returns:
+        For each sub-component, None if its references exist, otherwise an error naming the first missing one
+    """
+    wanted: Dict[type, Set[int]] = {}
+    for model, values in subcomponents:
+        for column, target in SUBCOMPONENT_REFERENCES.get(model, {}).items():
+            value = values.get(column)
+            if isinstance(value, int) and not isinstance(value, bool):
+                wanted.setdefault(target, set()).add(value)
+    found = {target: set(db.execute(select(target.id).where(target.id.in_(ids))).scalars())
+             for target, ids in wanted.items()}
+
+    errors: List[Optional[str]] = []
+    for model, values in subcomponents:
+        error = None
+        for column, target in SUBCOMPONENT_REFERENCES.get(model, {}).items():
+            value = values.get(column)
+            if value is None:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool):
+                error = f"'{column}' must be an integer"
+            elif value not in found[target]:
+                error = f"{target.__name__} {value} referenced by '{column}' not found"
+            if error:
+                break
+        errors.append(error)
+    return errors
+
+
+def create_element_with_subcomponent(
+    db: Session,
+    environment_id: int,
+    name: str,
+    description: Optional[str] = None,
+    subcomponent_type: str = None,
+    subcomponent_data: Dict[str, Any] = None
+) -> Element:
+    """
+    Create a new element with a sub-component.
+
+    Args:
+        db: The database session
+        environment_id: The ID of the environment to which the element belongs
+        name: The name of the element
+        description: An optional description of the element
+        subcomponent_type: The type of sub-component to create ('network', 'vm', 'storage_pool', etc.)
+        subcomponent_data: A dictionary of data for the sub-component
+
+    Returns:
+        The created element with the sub-component
+
+    Raises:
+        ValueError: If subcomponent_type is not valid or if required data for the sub-component is missing
+    """
+    # Validate the sub-component before creating anything
+    model, values = subcomponent_values(subcomponent_type, subcomponent_data)
+    if model is VM:
+        values["host_id"] = placement.host_for_vm(
+            db, environment_id, values["vcpu"], values["ram_mb"], values["host_id"]
         )
-        db.add(application)
 
-    else:
-        # If no valid sub-component type is provided, delete the element and raise an error
-        db.delete(element)
-        db.flush()
-        raise ValueError(f"Invalid sub-component type: {subcomponent_type}. Must be one of: network, vm, storage_pool, volume, domain, container_node, container_cluster, stack, application")
+    # Create the element
+    element = Element(name=name, description=description, environment_id=environment_id)
+    db.add(element)
+    db.flush()  # Flush to get the element ID without committing the transaction
+
+    # Create the sub-component
+    db.add(model(**values, element_id=element.id))
 
     # Commit the transaction
     db.commit()
@@ -274,6 +343,48 @@ def create_element_with_subcomponent(
     return element
 
 
+def create_elements_bulk(db: Session, environment_id: int, specs: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+    """
+    Create many elements with their sub-components in one transaction.
+
+    The elements are inserted with one multi-row INSERT, then the sub-components with one INSERT
+    per sub-component table. The specs must have been validated with subcomponent_values.
+
+    Args:
+        db: The database session
+        environment_id: The ID of the environment to which the elements belong
+        specs: Dicts with name, description, and the model and values returned by subcomponent_values
+
+    Returns:
+        The (id, name) of the created elements, in the order of the specs
+    """
+    if not specs:
+        return []
+    # RETURNING order is not guaranteed for a multi-row INSERT; names are unique, so map ids back by name
+    # rather than asking for parameter order, which degrades to one statement per row on SQLite
+    returned = db.execute(
+        insert(Element).returning(Element.id, Element.name),
+        [{"name": spec["name"], "description": spec.get("description"), "environment_id": environment_id}
+         for spec in specs]
+    ).all()
+    ids_by_name = {name: element_id for element_id, name in returned}
+    rows_by_model: Dict[type, List[Dict[str, Any]]] = {}
+    for spec in specs:
+        rows_by_model.setdefault(spec["model"], []).append(
+            {**spec["values"], "element_id": ids_by_name[spec["name"]]}
+        )
+    for model, rows in rows_by_model.items():
+        db.execute(insert(model), rows)
+    db.commit()
+    # Written without the ORM: the IPAM registry, the placement engine and the topology graphs reload on next use
+    if Network in rows_by_model:
+        ipam.registry.reset()
+    if VM in rows_by_model:
+        placement.engine.reset()
+    topology.invalidate()
+    return [(ids_by_name[spec["name"]], spec["name"]) for spec in specs]
+
+
 def delete_element(db: Session, element: Element):
     db.delete(element)
     db.commit()
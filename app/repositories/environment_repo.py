@@ -1,6 +1,10 @@
 # app/repositories/environment_repo.py
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.environment import Environment
+from ..models.organization import Organization
 from . import element_repo
 from ..models.tag import Tag
 
@@ -8,6 +12,41 @@ from ..models.tag import Tag
 def get_environment(db: Session, env_id: int) -> Environment:
     return db.query(Environment).filter(Environment.id == env_id).first()
 
+async def get_environment_async(db: AsyncSession, env_id: int) -> Optional[Environment]:
+    return await db.get(Environment, env_id)
+
+async def list_environments_async(
+    db: AsyncSession,
+    readable=None,
+    skip: int = 0,
+    limit: int = 100,
+    name: str = None,
+    organization_name: str = None
+) -> List[Environment]:
+    """
+    List environments with the filters of the environments endpoint.
+
+    Args:
+        db: Async database session
+        readable: Optional SQL clause restricting the environments (see permissions.permission_filter)
+        skip: Number of environments to skip
+        limit: Maximum number of environments to return
+        name: Filter on the environment name
+        organization_name: Filter on the organization name
+
+    Returns:
+        The matching environments
+    """
+    stmt = select(Environment).join(Organization)
+    if name:
+        stmt = stmt.where(Environment.name.ilike(f"%{name}%"))
+    if organization_name:
+        stmt = stmt.where(Organization.name.ilike(f"%{organization_name}%"))
+    if readable is not None:
+        stmt = stmt.where(readable)
+    result = await db.execute(stmt.offset(skip).limit(limit))
+    return list(result.scalars().all())
+
 def get_environment_by_name(db: Session, name: str) -> Environment:
     return db.query(Environment).filter(Environment.name == name).first()
 
@@ -32,7 +32,8 @@
 # app/repositories/gateway_repo.py
 from sqlalchemy.orm import Session
 from ..models.gateway import Gateway, GatewayKind, CertStrategy
-from typing import Optional, List, Dict, Any
+from ..models.types import json_attribute
+from typing import Optional, List, Dict, Any, Sequence
 
 def create_gateway(
     db: Session,
@@ -57,8 +58,8 @@ def create_gateway(
 def get_gateway(db: Session, gateway_id: int) -> Optional[Gateway]:
     return db.query(Gateway).filter(Gateway.id == gateway_id).first()
 
-def list_gateways(db: Session, skip: int = 0, limit: int = 100) -> List[Gateway]:
-    return db.query(Gateway).offset(skip).limit(limit).all()
+def list_gateways(db: Session, skip: int = 0, limit: int = 100, options: Sequence = ()) -> List[Gateway]:
+    return db.query(Gateway).options(*options).offset(skip).limit(limit).all()
 
 def list_gateways_by_kind(db: Session, kind: GatewayKind) -> List[Gateway]:
     return db.query(Gateway).filter(Gateway.kind == kind).all()
@@ -66,8 +67,12 @@ def list_gateways_by_kind(db: Session, kind: GatewayKind) -> List[Gateway]:
 def list_gateways_by_application(db: Session, application_id: int) -> List[Gateway]:
     return db.query(Gateway).filter(Gateway.deployment_application_id == application_id).all()
 
-def list_gateways_by_stack(db: Session, stack_id: int) -> List[Gateway]:
-    return db.query(Gateway).filter(Gateway.stack_id == stack_id).all()
+def list_gateways_by_stack(db: Session, stack_id: int, options: Sequence = ()) -> List[Gateway]:
+    return db.query(Gateway).options(*options).filter(Gateway.stack_id == stack_id).all()
+
+def list_gateways_by_entrypoint(db: Session, name: str, address: str) -> List[Gateway]:
+    """List the gateways listening on `address` with entrypoint `name`; indexed for web and websecure."""
+    return db.query(Gateway).filter(json_attribute(Gateway.entrypoints, name) == address).all()
 
 def update_gateway(
     db: Session,
@@ -0,0 +1,93 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+# app/repositories/loader_profiles.py
+"""
+Named eager-loading profiles.
+
+Serializing an element through `ElementOut` touches its environment, tags, rules (and through
+them the policies, groups and users of the `users`/`groups` properties) and its nine
+sub-components. Left to lazy loading this costs about ten queries per element. Each profile below
+returns the loader options covering exactly what a response model reads, so that list endpoints
+issue a fixed number of queries whatever the page size:
+
+    db.query(Element).options(*loader_profiles.element_out())
+"""
+from functools import lru_cache
+from typing import Tuple
+
+from sqlalchemy.orm import configure_mappers, joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from ..models.element import Element
+from ..models.gateway import Gateway
+from ..models.group import Group
+from ..models.policy import Policy
+from ..models.rule import Rule
+from ..models.user import User
+
+# One-to-one backrefs declared by the sub-component models
+ELEMENT_SUBCOMPONENTS = (
+    "network", "vm", "storage_pool", "volume", "domain",
+    "container_node", "container_cluster", "stack", "application",
+)
+
+
+@lru_cache(maxsize=None)
+def element_subcomponents() -> Tuple[LoaderOption, ...]:
+    """Sub-components only, enough for `element_repo.has_subcomponent`."""
+    # The backrefs only exist on Element once the mappers are configured
+    configure_mappers()
+    return tuple(selectinload(getattr(Element, name)) for name in ELEMENT_SUBCOMPONENTS)
+
+
+@lru_cache(maxsize=None)
+def element_out() -> Tuple[LoaderOption, ...]:
+    """Everything read by `ElementOut`."""
+    rule_policy = selectinload(Element.rules).selectinload(Rule.policy)
+    return (
+        joinedload(Element.environment),
+        selectinload(Element.tags),
+        rule_policy.selectinload(Policy.users).selectinload(User.tags),
+        rule_policy.selectinload(Policy.groups).selectinload(Group.tags),
+        rule_policy.selectinload(Policy.groups).selectinload(Group.users).selectinload(User.tags),
+        *element_subcomponents(),
+    )
+
+
+@lru_cache(maxsize=None)
+def gateway_networks() -> Tuple[LoaderOption, ...]:
+    """Upstream and downstream networks of gateways, one query each for a whole list."""
+    return (
+        selectinload(Gateway.upstream_networks),
+        selectinload(Gateway.downstream_networks),
+    )
@@ -31,6 +31,8 @@
 
 # app/repositories/network_application_repo.py
 from sqlalchemy.orm import Session
+from ..helper import ipam
+from ..models.types import ip_within
 from ..models.network_application import NetworkApplication
 from typing import Optional, List
 
@@ -38,8 +40,10 @@ def create_network_application(
     db: Session,
     network_id: int,
     application_id: int,
-    ip_address: str
+    ip_address: Optional[str] = None
 ) -> NetworkApplication:
+    # Validated against the network, or the lowest free address of the network when omitted
+    ip_address = ipam.attachment_address(db, network_id, ip_address)
     attachment = NetworkApplication(
         network_id=network_id,
         application_id=application_id,
@@ -59,6 +63,11 @@ def list_network_applications(db: Session, skip: int = 0, limit: int = 100) -> L
 def list_network_applications_by_network(db: Session, network_id: int) -> List[NetworkApplication]:
     return db.query(NetworkApplication).filter(NetworkApplication.network_id == network_id).all()
 
+def list_network_applications_in_range(db: Session, cidr: str) -> List[NetworkApplication]:
+    """Attachments whose address is inside `cidr`, in address order, found through the address index."""
+    condition = ip_within(NetworkApplication.ip_address, cidr, db.get_bind().dialect.name)
+    return db.query(NetworkApplication).filter(condition).order_by(NetworkApplication.ip_address_key).all()
+
 def list_network_applications_by_application(db: Session, application_id: int) -> List[NetworkApplication]:
     return db.query(NetworkApplication).filter(NetworkApplication.application_id == application_id).all()
 
@@ -69,6 +78,13 @@ def update_network_application(
     application_id: Optional[int] = None,
     ip_address: Optional[str] = None
 ) -> NetworkApplication:
+    if network_id is not None or ip_address is not None:
+        ip_address = ipam.attachment_address(
+            db,
+            network_id if network_id is not None else attachment.network_id,
+            ip_address if ip_address is not None else attachment.ip_address,
+            current=(attachment.network_id, attachment.ip_address)
+        )
     if network_id is not None:
         attachment.network_id = network_id
     if application_id is not None:
@@ -0,0 +1,115 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/repositories/network_attachment_repo.py
+"""
+Read model of the five network attachment tables.
+
+VMs, physical hosts, container nodes, applications and gateways are attached to networks through
+one table each. The query below reads them all with one UNION ALL, served by the `network_id`
+index of each table, as rows of (network_id, kind, attachment_id, target_id, ip_address,
+direction); `direction` is only set for gateways.
+"""
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Select, literal, select, union_all
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..models.network_application import NetworkApplication
+from ..models.network_container_node import NetworkContainerNode
+from ..models.network_gateway import NetworkGateway
+from ..models.network_physical_host import NetworkPhysicalHost
+from ..models.network_vm import NetworkVM
+
+# kind -> (attachment model, column of the attached object)
+ATTACHMENT_KINDS = {
+    "physical_host": (NetworkPhysicalHost, NetworkPhysicalHost.physical_host_id),
+    "vm": (NetworkVM, NetworkVM.vm_id),
+    "container_node": (NetworkContainerNode, NetworkContainerNode.container_node_id),
+    "application": (NetworkApplication, NetworkApplication.application_id),
+    "gateway": (NetworkGateway, NetworkGateway.gateway_id),
+}
+
+
+def attachments_query(network_ids: Iterable[int], kinds: Optional[Iterable[str]] = None) -> Select:
+    """
+    UNION ALL of the attachments of some networks.
+
+    Args:
+        network_ids: The networks whose attachments are read
+        kinds: Restrict to these kinds of attachment, all of them by default
+
+    Returns:
+        A select ordered by network, kind and address
+
+    Raises:
+        ValueError: If a kind is unknown
+    """
+    network_ids = list(network_ids)
+    kinds = list(ATTACHMENT_KINDS) if kinds is None else list(kinds)
+    unknown = [kind for kind in kinds if kind not in ATTACHMENT_KINDS]
+    if unknown:
+        raise ValueError(f"Unknown attachment kind: {', '.join(unknown)}. Must be one of: {', '.join(ATTACHMENT_KINDS)}")
+    # Typed NULL so that the gateway directions come back as NetworkDirection whichever branch is first
+    no_direction = literal(None, type_=NetworkGateway.__table__.c.direction.type)
+    branches = []
+    for kind in kinds:
+        model, target = ATTACHMENT_KINDS[kind]
+        branches.append(
+            select(
+                model.network_id.label("network_id"),
+                literal(kind).label("kind"),
+                model.id.label("attachment_id"),
+                target.label("target_id"),
+                model.ip_address.label("ip_address"),
+                (model.direction if model is NetworkGateway else no_direction).label("direction"),
+                model.ip_address_key.label("ip_address_key"),
+            ).where(model.network_id.in_(network_ids))
+        )
+    query = union_all(*branches).subquery()
+    return select(
+        query.c.network_id, query.c.kind, query.c.attachment_id, query.c.target_id,
+        query.c.ip_address, query.c.direction
+    ).order_by(query.c.network_id, query.c.kind, query.c.ip_address_key)
+
+
+def list_network_attachments(db: Session, network_id: int, kinds: Optional[Iterable[str]] = None) -> List[Row]:
+    """Everything attached to a network, in one round trip."""
+    return db.execute(attachments_query([network_id], kinds)).all()
+
+
+def list_attachments_by_networks(db: Session, network_ids: Iterable[int]) -> List[Row]:
+    """Everything attached to several networks, in one round trip."""
+    network_ids = list(network_ids)
+    if not network_ids:
+        return []
+    return db.execute(attachments_query(network_ids)).all()
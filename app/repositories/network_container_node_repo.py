@@ -31,6 +31,8 @@
 
 # app/repositories/network_container_node_repo.py
 from sqlalchemy.orm import Session
+from ..helper import ipam
+from ..models.types import ip_within
 from ..models.network_container_node import NetworkContainerNode
 from typing import Optional, List
 
@@ -38,8 +40,10 @@ def create_network_container_node(
     db: Session,
     network_id: int,
     container_node_id: int,
-    ip_address: str
+    ip_address: Optional[str] = None
 ) -> NetworkContainerNode:
+    # Validated against the network, or the lowest free address of the network when omitted
+    ip_address = ipam.attachment_address(db, network_id, ip_address)
     attachment = NetworkContainerNode(
         network_id=network_id,
         container_node_id=container_node_id,
@@ -59,6 +63,11 @@ def list_network_container_nodes(db: Session, skip: int = 0, limit: int = 100) -
 def list_network_container_nodes_by_network(db: Session, network_id: int) -> List[NetworkContainerNode]:
     return db.query(NetworkContainerNode).filter(NetworkContainerNode.network_id == network_id).all()
 
+def list_network_container_nodes_in_range(db: Session, cidr: str) -> List[NetworkContainerNode]:
+    """Attachments whose address is inside `cidr`, in address order, found through the address index."""
+    condition = ip_within(NetworkContainerNode.ip_address, cidr, db.get_bind().dialect.name)
+    return db.query(NetworkContainerNode).filter(condition).order_by(NetworkContainerNode.ip_address_key).all()
+
 def list_network_container_nodes_by_container_node(db: Session, container_node_id: int) -> List[NetworkContainerNode]:
     return db.query(NetworkContainerNode).filter(NetworkContainerNode.container_node_id == container_node_id).all()
 
@@ -69,6 +78,13 @@ def update_network_container_node(
     container_node_id: Optional[int] = None,
     ip_address: Optional[str] = None
 ) -> NetworkContainerNode:
+    if network_id is not None or ip_address is not None:
+        ip_address = ipam.attachment_address(
+            db,
+            network_id if network_id is not None else attachment.network_id,
+            ip_address if ip_address is not None else attachment.ip_address,
+            current=(attachment.network_id, attachment.ip_address)
+        )
     if network_id is not None:
         attachment.network_id = network_id
     if container_node_id is not None:
@@ -31,6 +31,8 @@
 
 # app/repositories/network_gateway_repo.py
 from sqlalchemy.orm import Session
+from ..helper import ipam
+from ..models.types import ip_within
 from ..models.network_gateway import NetworkGateway, NetworkDirection
 from typing import Optional, List
 
@@ -38,9 +40,11 @@ def create_network_gateway(
     db: Session,
     network_id: int,
     gateway_id: int,
-    ip_address: str,
+    ip_address: Optional[str] = None,
     direction: NetworkDirection = NetworkDirection.UPSTREAM
 ) -> NetworkGateway:
+    # Validated against the network, or the lowest free address of the network when omitted
+    ip_address = ipam.attachment_address(db, network_id, ip_address)
     attachment = NetworkGateway(
         network_id=network_id,
         gateway_id=gateway_id,
@@ -61,6 +65,11 @@ def list_network_gateways(db: Session, skip: int = 0, limit: int = 100) -> List[
 def list_network_gateways_by_network(db: Session, network_id: int) -> List[NetworkGateway]:
     return db.query(NetworkGateway).filter(NetworkGateway.network_id == network_id).all()
 
+def list_network_gateways_in_range(db: Session, cidr: str) -> List[NetworkGateway]:
+    """Attachments whose address is inside `cidr`, in address order, found through the address index."""
+    condition = ip_within(NetworkGateway.ip_address, cidr, db.get_bind().dialect.name)
+    return db.query(NetworkGateway).filter(condition).order_by(NetworkGateway.ip_address_key).all()
+
 def list_network_gateways_by_gateway(db: Session, gateway_id: int) -> List[NetworkGateway]:
     return db.query(NetworkGateway).filter(NetworkGateway.gateway_id == gateway_id).all()
 
@@ -72,6 +81,13 @@ def update_network_gateway(
     ip_address: Optional[str] = None,
     direction: Optional[NetworkDirection] = None
 ) -> NetworkGateway:
+    if network_id is not None or ip_address is not None:
+        ip_address = ipam.attachment_address(
+            db,
+            network_id if network_id is not None else attachment.network_id,
+            ip_address if ip_address is not None else attachment.ip_address,
+            current=(attachment.network_id, attachment.ip_address)
+        )
     if network_id is not None:
         attachment.network_id = network_id
     if gateway_id is not None:
@@ -31,6 +31,8 @@
 
 # app/repositories/network_physical_host_repo.py
 from sqlalchemy.orm import Session
+from ..helper import ipam
+from ..models.types import ip_within
 from ..models.network_physical_host import NetworkPhysicalHost
 from typing import Optional, List
 
@@ -38,8 +40,10 @@ def create_network_physical_host(
     db: Session,
     network_id: int,
     physical_host_id: int,
-    ip_address: str
+    ip_address: Optional[str] = None
 ) -> NetworkPhysicalHost:
+    # Validated against the network, or the lowest free address of the network when omitted
+    ip_address = ipam.attachment_address(db, network_id, ip_address)
     attachment = NetworkPhysicalHost(
         network_id=network_id,
         physical_host_id=physical_host_id,
@@ -59,6 +63,11 @@ def list_network_physical_hosts(db: Session, skip: int = 0, limit: int = 100) ->
 def list_network_physical_hosts_by_network(db: Session, network_id: int) -> List[NetworkPhysicalHost]:
     return db.query(NetworkPhysicalHost).filter(NetworkPhysicalHost.network_id == network_id).all()
 
+def list_network_physical_hosts_in_range(db: Session, cidr: str) -> List[NetworkPhysicalHost]:
+    """Attachments whose address is inside `cidr`, in address order, found through the address index."""
+    condition = ip_within(NetworkPhysicalHost.ip_address, cidr, db.get_bind().dialect.name)
+    return db.query(NetworkPhysicalHost).filter(condition).order_by(NetworkPhysicalHost.ip_address_key).all()
+
 def list_network_physical_hosts_by_physical_host(db: Session, physical_host_id: int) -> List[NetworkPhysicalHost]:
     return db.query(NetworkPhysicalHost).filter(NetworkPhysicalHost.physical_host_id == physical_host_id).all()
 
@@ -69,6 +78,13 @@ def update_network_physical_host(
     physical_host_id: Optional[int] = None,
     ip_address: Optional[str] = None
 ) -> NetworkPhysicalHost:
+    if network_id is not None or ip_address is not None:
+        ip_address = ipam.attachment_address(
+            db,
+            network_id if network_id is not None else attachment.network_id,
+            ip_address if ip_address is not None else attachment.ip_address,
+            current=(attachment.network_id, attachment.ip_address)
+        )
     if network_id is not None:
         attachment.network_id = network_id
     if physical_host_id is not None:
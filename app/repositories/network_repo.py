@@ -31,7 +31,9 @@
 
 # app/repositories/network_repo.py
 from sqlalchemy.orm import Session
+from ..helper import ipam
 from ..models.network import Network, NetworkType
+from ..models.types import ip_containing, ip_within
 from typing import Optional, List
 
 def create_network(
@@ -42,6 +44,7 @@ def create_network(
     environment_scoped: bool = False,
     element_id: int = None
 ) -> Network:
+    cidr = str(ipam.parse_network(cidr))
     network = Network(
         cidr=cidr,
         vlan=vlan,
@@ -82,7 +85,7 @@ def update_network(
     element_id: Optional[int] = None
 ) -> Network:
     if cidr is not None:
-        network.cidr = cidr
+        network.cidr = str(ipam.parse_network(cidr))
     if vlan is not None:
         network.vlan = vlan
     if type is not None:
@@ -96,6 +99,32 @@ def update_network(
     db.refresh(network)
     return network
 
+def list_overlapping_networks(db: Session, cidr: str) -> List[Network]:
+    """Networks containing `cidr` or contained in it, found in the IPAM trie."""
+    network_ids = ipam.registry.overlapping(db, cidr)
+    if not network_ids:
+        return []
+    return db.query(Network).filter(Network.id.in_(network_ids)).order_by(Network.id).all()
+
+def list_networks_containing(db: Session, ip: str) -> List[Network]:
+    """Networks containing the address `ip`, narrowest first."""
+    condition = ip_containing(Network.cidr, ip, db.get_bind().dialect.name)
+    networks = db.query(Network).filter(condition).all()
+    return sorted(networks, key=lambda network: ipam.parse_network(network.cidr).prefixlen, reverse=True)
+
+def list_networks_within(db: Session, cidr: str) -> List[Network]:
+    """Networks inside `cidr`, `cidr` itself included, in address order."""
+    condition = ip_within(Network.cidr, cidr, db.get_bind().dialect.name)
+    return db.query(Network).filter(condition).order_by(Network.cidr_start, Network.cidr_end.desc()).all()
+
+def find_free_subnet(db: Session, parent_cidr: str, prefix_length: int) -> str:
+    """The lowest /prefix_length of `parent_cidr` that no network overlaps; raises ValueError if there is none."""
+    return ipam.registry.allocate_subnet(db, parent_cidr, prefix_length)
+
+def network_usage(db: Session, network: Network) -> dict:
+    """Size, used and free addresses of a network."""
+    return ipam.registry.usage(db, network.id)
+
 def delete_network(db: Session, network: Network) -> None:
     db.delete(network)
     db.commit()
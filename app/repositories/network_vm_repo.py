@@ -31,6 +31,8 @@
 
 # app/repositories/network_vm_repo.py
 from sqlalchemy.orm import Session
+from ..helper import ipam
+from ..models.types import ip_within
 from ..models.network_vm import NetworkVM
 from typing import Optional, List
 
@@ -38,8 +40,10 @@ def create_network_vm(
     db: Session,
     network_id: int,
     vm_id: int,
-    ip_address: str
+    ip_address: Optional[str] = None
 ) -> NetworkVM:
+    # Validated against the network, or the lowest free address of the network when omitted
+    ip_address = ipam.attachment_address(db, network_id, ip_address)
     attachment = NetworkVM(
         network_id=network_id,
         vm_id=vm_id,
@@ -59,6 +63,11 @@ def list_network_vms(db: Session, skip: int = 0, limit: int = 100) -> List[Netwo
 def list_network_vms_by_network(db: Session, network_id: int) -> List[NetworkVM]:
     return db.query(NetworkVM).filter(NetworkVM.network_id == network_id).all()
 
+def list_network_vms_in_range(db: Session, cidr: str) -> List[NetworkVM]:
+    """Attachments whose address is inside `cidr`, in address order, found through the address index."""
+    condition = ip_within(NetworkVM.ip_address, cidr, db.get_bind().dialect.name)
+    return db.query(NetworkVM).filter(condition).order_by(NetworkVM.ip_address_key).all()
+
 def list_network_vms_by_vm(db: Session, vm_id: int) -> List[NetworkVM]:
     return db.query(NetworkVM).filter(NetworkVM.vm_id == vm_id).all()
 
@@ -69,6 +78,13 @@ def update_network_vm(
     vm_id: Optional[int] = None,
     ip_address: Optional[str] = None
 ) -> NetworkVM:
+    if network_id is not None or ip_address is not None:
+        ip_address = ipam.attachment_address(
+            db,
+            network_id if network_id is not None else attachment.network_id,
+            ip_address if ip_address is not None else attachment.ip_address,
+            current=(attachment.network_id, attachment.ip_address)
+        )
     if network_id is not None:
         attachment.network_id = network_id
     if vm_id is not None:
@@ -34,6 +34,7 @@ from sqlalchemy.orm import Session
 from typing import List
 from ..models.storage_pool import StoragePool, StoragePoolType, StoragePoolScope
 from ..models.volume import Volume
+from ..models.types import json_attribute
 
 
 def create_storage_pool(
@@ -112,24 +113,8 @@ def list_storage_pools_by_environment(db: Session, environment_id: int):
 
 def list_storage_pools_by_host(db: Session, host_id: int):
     """List storage pools that are local to a specific host"""
-    from ..database.session import DATABASE_URL
-    import json
-
-    # Different approach based on database type
-    if "postgresql" in DATABASE_URL:
-        # PostgreSQL approach using JSONB contains
-        host_json = {"host_id": host_id}
-        return db.query(StoragePool).filter(
-            StoragePool.parameters.contains(host_json)
-        ).all()
-    else:
-        # SQLite approach - fetch all and filter in Python
-        # This is less efficient but works with SQLite
-        all_pools = db.query(StoragePool).all()
-        return [
-            pool for pool in all_pools
-            if pool.parameters and 'host_id' in pool.parameters and pool.parameters['host_id'] == host_id
-        ]
+    # Index seek on parameters.host_id on both PostgreSQL and SQLite
+    return db.query(StoragePool).filter(json_attribute(StoragePool.parameters, "host_id") == host_id).all()
 
 
 def create_storage_pool_from_volumes(
@@ -1,6 +1,6 @@
 # app/schema/element.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from .rule import RuleOut  # si on veut les inclure
 from .user import UserOut
@@ -26,6 +26,29 @@ class ElementCreate(BaseModel):
     subcomponent_type: str
     subcomponent_data: Dict[str, Any]
 
+class ElementBulkItem(BaseModel):
+    name: Optional[str] = None  # Codename généré si absent
+    description: Optional[str] = None
+    subcomponent_type: str
+    subcomponent_data: Dict[str, Any]
+
+class ElementBulkCreate(BaseModel):
+    elements: List[ElementBulkItem] = Field(..., min_length=1, max_length=1000)
+    # Si vrai, rien n'est créé dès qu'un élément est invalide
+    atomic: bool = False
+
+class ElementBulkResult(BaseModel):
+    index: int
+    status: str  # "created", "error" ou "skipped"
+    id: Optional[int] = None
+    name: Optional[str] = None
+    error: Optional[str] = None
+
+class ElementBulkOut(BaseModel):
+    created: int
+    failed: int
+    results: List[ElementBulkResult]
+
 class ElementUpdate(BaseModel):
     name: Optional[str]
     description: Optional[str]
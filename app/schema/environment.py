@@ -26,6 +26,10 @@ class EnvironmentBase(BaseModel):
     description: Optional[str]
     organization_id: int
 
+    model_config = {
+        "from_attributes": True
+    }
+
 class EnvironmentOut(EnvironmentBase):
 
     # Ajouts relationnels
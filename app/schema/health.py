@@ -33,19 +33,50 @@ from pydantic import BaseModel
 from typing import Optional
 from .auth import BaseResponse
 
+class PoolMetrics(BaseModel):
+    """Database connection pool metrics"""
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    checkout_wait_count: int = 0
+    checkout_wait_total_seconds: float = 0.0
+    checkout_wait_max_seconds: float = 0.0
+
+class HashingMetrics(BaseModel):
+    """Password hashing pool metrics"""
+    workers: int
+    queue_max: int
+    in_flight: int = 0
+    rejected: int = 0
+    completed: int = 0
+    queue_wait_total_seconds: float = 0.0
+    queue_wait_max_seconds: float = 0.0
+    hash_total_seconds: float = 0.0
+    hash_max_seconds: float = 0.0
+
 class ComponentHealth(BaseModel):
     """Health status of a system component"""
     status: str
     details: Optional[str] = None
+    pool: Optional[PoolMetrics] = None
+    hashing: Optional[HashingMetrics] = None
 
 class HealthComponents(BaseModel):
     """Collection of system component health statuses"""
     database: ComponentHealth
+    password_hashing: Optional[ComponentHealth] = None
+
+class StartupMetrics(BaseModel):
+    """Worker startup metrics"""
+    seconds: float
+    bootstrap_seconds: float
+    bootstrap_applied: bool
 
 class HealthData(BaseModel):
     """Health check data structure"""
     status: str
     components: HealthComponents
+    startup: Optional[StartupMetrics] = None
 
 class HealthResponse(BaseResponse[HealthData]):
     """Response schema for health check endpoint"""
@@ -44,3 +44,15 @@ class NetworkOut(NetworkBase):
     model_config = {
         "from_attributes": True
     }
+
+class NetworkAttachmentOut(BaseModel):
+    network_id: int
+    kind: str  # physical_host, vm, container_node, application ou gateway
+    attachment_id: int
+    target_id: int
+    ip_address: str
+    direction: Optional[str] = None  # Passerelles uniquement
+
+    model_config = {
+        "from_attributes": True
+    }
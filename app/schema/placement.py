@@ -0,0 +1,55 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/schema/placement.py
+
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+
+class PlacementShape(BaseModel):
+    vcpu: int = Field(..., ge=1)
+    ram_mb: int = Field(..., ge=1)
+    count: int = Field(1, ge=1, le=1000)  # Nombre de VMs de cette taille
+
+class PlacementPlanRequest(BaseModel):
+    vms: List[PlacementShape] = Field(..., min_length=1, max_length=100)
+    strategy: Literal["best_fit", "spread"] = "best_fit"
+
+class PlacementAssignment(BaseModel):
+    index: int  # Position de la VM dans la demande, les tailles dépliées selon count
+    vcpu: int
+    ram_mb: int
+    host_id: Optional[int] = None  # Aucun hôte n'a la capacité si absent
+
+class PlacementPlanOut(BaseModel):
+    placed: int
+    unplaced: int
+    assignments: List[PlacementAssignment]
@@ -0,0 +1,64 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/schema/topology.py
+
+from pydantic import BaseModel
+from typing import Optional, List
+
+class TopologyNode(BaseModel):
+    key: str  # "<kind>:<id>"
+    kind: str  # physical_host, vm, container_node, application, network ou gateway
+    id: int
+    label: Optional[str] = None
+
+class TopologyEdge(BaseModel):
+    source: str
+    target: str
+    relation: str  # attached (vers un réseau) ou runs_on (vers l'hôte)
+
+class TopologyOut(BaseModel):
+    nodes: List[TopologyNode]
+    edges: List[TopologyEdge]
+
+class TopologyReach(BaseModel):
+    node: TopologyNode
+    network_id: int  # Réseau auquel le nœud est attaché
+    via: List[int]  # Passerelles traversées, dans l'ordre
+
+class NetworkDegradation(BaseModel):
+    network_id: int
+    reachable_before: int
+    reachable_after: int
+
+class TopologyImpact(BaseModel):
+    failed: List[TopologyNode]
+    degraded_networks: List[NetworkDegradation]
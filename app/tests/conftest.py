@@ -3,22 +3,37 @@
 import os
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
 
-# Supprime la base de données de test avant et après les tests (si SQLite est utilisée)
+# Supprime la base de données de test avant la création du moteur, qui resterait sinon sur un
+# fichier supprimé (lecture seule)
+db_path = "test.db"
+# Fichiers annexes du mode WAL
+db_files = (db_path, db_path + "-wal", db_path + "-shm")
+for path in db_files:
+    if os.path.exists(path):
+        os.remove(path)
+
+from app.main import create_app
+from app.core import auth
+from app.models.organization import Organization
+from app.repositories import environment_repo
+
+app = create_app()
+
+# Démarre l'application (création du schéma et seeding) pour toute la session de tests,
+# puis supprime la base de données de test (si SQLite est utilisée)
 @pytest.fixture(scope="session", autouse=True)
 def setup_and_teardown():
-    db_path = "test.db"
-    if os.path.exists(db_path):
-        os.remove(db_path)
-    yield
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    with TestClient(app) as client:
+        yield client
+    for path in db_files:
+        if os.path.exists(path):
+            os.remove(path)
 
 # Client de test accessible à tous les tests
 @pytest.fixture(scope="session")
-def test_client() -> TestClient:
-    return TestClient(app)
+def test_client(setup_and_teardown) -> TestClient:
+    return setup_and_teardown
 
 # Un objet pour stocker des données globales durant les tests
 class TestData:
@@ -30,3 +45,18 @@ class TestData:
 @pytest.fixture(scope="session")
 def test_data() -> TestData:
     return TestData()
+
+# En-têtes d'authentification de l'administrateur créé par le seeding
+@pytest.fixture
+def auth_headers() -> dict:
+    return {"Authorization": f"Bearer {auth.create_token(data={'sub': '1'})}"}
+
+# Crée une organisation « <name>-org » et son environnement « <name> » dans la session donnée
+@pytest.fixture(scope="session")
+def make_environment():
+    def make(db, name: str):
+        org = Organization(name=f"{name}-org")
+        db.add(org)
+        db.commit()
+        return environment_repo.create_environment(db, name=name, organization_id=org.id)
+    return make
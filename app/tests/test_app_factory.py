@@ -0,0 +1,97 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import replace
+
+import pytest
+
+from app.core.settings import Settings, get_settings
+from app.main import create_app
+
+# Budget of `import app.main`, in seconds (FastAPI itself accounts for most of it)
+IMPORT_BUDGET_SECONDS = float(os.getenv("APP_IMPORT_BUDGET_SECONDS", 1.5))
+
+_PROBE = """
+import importlib, json, os, sys, time
+started = time.perf_counter()
+main = importlib.import_module("app.main")
+imported = time.perf_counter() - started
+loaded = sorted(name for name in sys.modules if name.startswith("app."))
+application = main.create_app()
+print(json.dumps({
+    "import_seconds": imported,
+    "loaded_on_import": loaded,
+    "routes": sorted(route.path for route in application.routes),
+    "database_created": os.path.exists(os.environ["PROBE_DB"]),
+}))
+"""
+
+
+def test_import_and_factory_are_side_effect_free(tmp_path):
+    """Importing app.main and creating the app neither loads the routers early nor touches the database"""
+    database = tmp_path / "probe.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}", "PROBE_DB": str(database)}
+    output = subprocess.run([sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    probe = json.loads(output.stdout.strip().splitlines()[-1])
+
+    assert probe["import_seconds"] < IMPORT_BUDGET_SECONDS
+    assert not any(name.startswith(("app.api", "app.database", "app.models")) for name in probe["loaded_on_import"])
+    assert "/health/" in probe["routes"] and "/login" in probe["routes"]
+    assert not probe["database_created"]
+
+
+def test_settings_from_env():
+    """Settings are parsed once from the given variables, with defaults"""
+    settings = Settings.from_env({
+        "DATABASE_URL": "sqlite://", "SMTP_PORT": "587", "SMTP_USE_TLS": "true",
+        "CORS_ORIGINS": "https://a.example, https://b.example", "STARTUP_BOOTSTRAP": "false"
+    })
+    assert settings.database_url == "sqlite://"
+    assert settings.smtp_port == 587 and settings.smtp_use_tls and not settings.smtp_use_ssl
+    assert settings.cors_origins == ("https://a.example", "https://b.example")
+    assert not settings.bootstrap_on_startup
+    assert settings.db_pool_size == Settings(database_url="").db_pool_size
+
+
+def test_factory_rejects_process_wide_settings():
+    """Settings the factory cannot apply (database, secret key) are rejected instead of ignored"""
+    application = create_app(replace(get_settings(), cors_origins=("https://c.example",), bootstrap_on_startup=False))
+    assert application.state.settings.cors_origins == ("https://c.example",)
+    with pytest.raises(ValueError, match="database_url"):
+        create_app(replace(get_settings(), database_url="sqlite:///elsewhere.db"))
@@ -0,0 +1,68 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import auth
+from app.database.async_session import async_database_url, dispose_async_engine
+
+
+def test_async_database_url():
+    """The async driver is derived from the configured database URL"""
+    assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert async_database_url("postgresql://user:secret@db:5432/app") == "postgresql+asyncpg://user:secret@db:5432/app"
+    assert async_database_url("postgresql+psycopg2://db/app") == "postgresql+asyncpg://db/app"
+
+
+def test_async_read_endpoints(test_client):
+    """The async endpoints answer like their sync counterparts"""
+    pytest.importorskip("aiosqlite")
+    from fastapi import FastAPI
+    from app.api import async_reads
+
+    app = FastAPI()
+    app.include_router(async_reads.router)
+    headers = {"Authorization": f"Bearer {auth.create_token(data={'sub': '1'})}"}
+    try:
+        with TestClient(app) as client:
+            for path in ("/me", "/environments", "/audit-logs/"):
+                async_resp = client.get(path, headers=headers)
+                sync_resp = test_client.get(path, headers=headers)
+                assert async_resp.status_code == 200, path
+                assert async_resp.json()["data"] == sync_resp.json()["data"], path
+            assert client.get("/elements/999999", headers=headers).status_code == 404
+    finally:
+        asyncio.run(dispose_async_engine())
@@ -0,0 +1,82 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.database.session import SessionLocal
+from app.helper import audit_export
+from app.models.audit_log import AuditLog
+
+
+def test_audit_logs_export_streams_ndjson_and_csv(test_client, monkeypatch, auth_headers):
+    """Exports contain every matching row, oldest first, across several chunks"""
+    monkeypatch.setattr(audit_export, "CHUNK_ROWS", 7)
+    db = SessionLocal()
+    base = datetime(2021, 3, 1, tzinfo=timezone.utc)
+    db.add_all([
+        AuditLog(user_id=1 if i % 2 else None, action="export:test", details=f"row, {i}",
+                 timestamp=base + timedelta(seconds=i))
+        for i in range(30)
+    ])
+    db.commit()
+    db.close()
+    params = {"action": "export:test", "since": base.isoformat(), "until": (base + timedelta(seconds=20)).isoformat()}
+
+    response = test_client.get("/audit-logs/export", headers=auth_headers, params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["details"] for row in rows] == [f"row, {i}" for i in range(20)]
+    assert datetime.fromisoformat(rows[0]["timestamp"]) == base
+
+    response = test_client.get("/audit-logs/export", headers=auth_headers, params={**params, "user_id": 1, "format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["details"] for row in rows] == [f"row, {i}" for i in range(1, 20, 2)]
+
+    response = test_client.get("/audit-logs/export", headers=auth_headers, params={**params, "gzip": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    lines = gzip.GzipFile(fileobj=io.BytesIO(response.content)).read().decode("utf-8").splitlines()
+    assert len(lines) == 20
+
+
+def test_audit_logs_export_requires_superadmin(test_client):
+    """Only authenticated superadmins can export"""
+    response = test_client.get("/audit-logs/export")
+    assert response.status_code == 401
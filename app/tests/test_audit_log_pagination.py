@@ -0,0 +1,79 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+from datetime import datetime, timedelta, timezone
+
+from app.database.session import SessionLocal
+from app.models.audit_log import AuditLog
+
+
+def test_audit_logs_keyset_pagination_and_filters(test_client, auth_headers):
+    """Cursor pages cover every log once, ties on the timestamp included"""
+    db = SessionLocal()
+    base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    # Three logs share each timestamp: the id breaks the ties
+    db.add_all([
+        AuditLog(user_id=None, action=f"keyset:{'even' if i % 2 == 0 else 'odd'}", details=str(i),
+                 timestamp=base + timedelta(minutes=i // 3))
+        for i in range(25)
+    ])
+    db.commit()
+    db.close()
+
+    seen, cursor = [], None
+    while True:
+        params = {"action_prefix": "keyset:", "limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        resp = test_client.get("/audit-logs/", params=params, headers=auth_headers)
+        assert resp.status_code == 200
+        seen += [log["details"] for log in resp.json()["data"]]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert sorted(seen, key=int) == [str(i) for i in range(25)]
+    assert len(seen) == 25
+    # Newest first
+    assert seen[0] in {"24", "23", "22"}
+
+    resp = test_client.get("/audit-logs/", params={"action": "keyset:odd"}, headers=auth_headers)
+    assert {log["details"] for log in resp.json()["data"]} == {str(i) for i in range(1, 25, 2)}
+
+    resp = test_client.get("/audit-logs/", params={
+        "action_prefix": "keyset", "since": (base + timedelta(minutes=7)).isoformat(),
+        "until": (base + timedelta(minutes=8)).isoformat()
+    }, headers=auth_headers)
+    assert sorted(log["details"] for log in resp.json()["data"]) == ["21", "22", "23"]
+
+    resp = test_client.get("/audit-logs/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert resp.status_code == 400
@@ -0,0 +1,127 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from app.core import auth
+from app.database.session import SessionLocal, engine
+from app.helper import audit_retention
+from app.models.audit_log import AuditLog
+
+
+def test_audit_retention_moves_months_to_files_then_archive(tmp_path, monkeypatch, test_client):
+    """Old months leave the hot table for month files, then for the compressed archive, and stay queryable"""
+    monkeypatch.setattr(audit_retention, "AUDIT_PARTITION_DIR", str(tmp_path / "partitions"))
+    monkeypatch.setattr(audit_retention, "AUDIT_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(audit_retention, "AUDIT_HOT_MONTHS", 3)
+    monkeypatch.setattr(audit_retention, "AUDIT_RETENTION_MONTHS", 12)
+
+    db = SessionLocal()
+    db.add_all([
+        AuditLog(action="retention:cold", details="1", timestamp=datetime(1999, 12, 10, tzinfo=timezone.utc)),
+        AuditLog(action="retention:warm", details="2", timestamp=datetime(2000, 10, 5, tzinfo=timezone.utc)),
+        AuditLog(action="retention:hot", details="3", timestamp=datetime(2001, 5, 1, tzinfo=timezone.utc)),
+    ])
+    db.commit()
+
+    def hot_actions():
+        db.expire_all()
+        return {log.action for log in db.query(AuditLog).filter(AuditLog.action.like("retention:%"))}
+
+    stats = audit_retention.rotate(engine, now=datetime(2001, 6, 15, tzinfo=timezone.utc))
+    assert stats == {"partitioned": 1, "archived": 1}
+    assert hot_actions() == {"retention:hot"}
+    assert os.listdir(tmp_path / "partitions") == ["audit_logs_2000_10.db"]
+
+    index = audit_retention.load_archive_index()
+    assert list(index) == ["audit_logs_1999_12.jsonl.gz"]
+    assert index["audit_logs_1999_12.jsonl.gz"][0]["count"] == 1
+    with gzip.open(tmp_path / "archive" / "audit_logs_1999_12.jsonl.gz", "rt") as archive:
+        assert [json.loads(line)["action"] for line in archive] == ["retention:cold"]
+
+    # Running again with the same reference time changes nothing
+    assert audit_retention.rotate(engine, now=datetime(2001, 6, 15, tzinfo=timezone.utc)) == {"partitioned": 0, "archived": 0}
+
+    # Later on, the month file expires and the hot month becomes a month file
+    stats = audit_retention.rotate(engine, now=datetime(2002, 1, 15, tzinfo=timezone.utc))
+    assert stats == {"partitioned": 1, "archived": 1}
+    assert hot_actions() == set()
+    assert os.listdir(tmp_path / "partitions") == ["audit_logs_2001_05.db"]
+    assert sorted(audit_retention.load_archive_index()) == ["audit_logs_1999_12.jsonl.gz", "audit_logs_2000_10.jsonl.gz"]
+    db.close()
+
+    logs = audit_retention.read_archived(engine, datetime(1999, 1, 1), datetime(2002, 1, 1), action_prefix="retention:")
+    assert [log["action"] for log in logs] == ["retention:hot", "retention:warm", "retention:cold"]
+    assert all(log["timestamp"].tzinfo is not None for log in logs)
+
+    headers = {"Authorization": f"Bearer {auth.create_token(data={'sub': '1'})}"}
+    response = test_client.get("/audit-logs/archive", headers=headers, params={
+        "since": "2000-01-01T00:00:00+00:00", "until": "2002-01-01T00:00:00+00:00", "action_prefix": "retention:"
+    })
+    assert response.status_code == 200
+    assert [log["details"] for log in response.json()["data"]] == ["3", "2"]
+
+    response = test_client.get("/audit-logs/archive", headers=headers, params={
+        "since": "2002-01-01T00:00:00+00:00", "until": "2000-01-01T00:00:00+00:00"
+    })
+    assert response.status_code == 400
+
+
+def test_audit_retention_recovers_interrupted_passes(tmp_path, monkeypatch):
+    """A pending chunk is published only if its rows left the database, so nothing is archived twice"""
+    monkeypatch.setattr(audit_retention, "AUDIT_PARTITION_DIR", str(tmp_path / "partitions"))
+    monkeypatch.setattr(audit_retention, "AUDIT_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(audit_retention, "AUDIT_HOT_MONTHS", 3)
+    monkeypatch.setattr(audit_retention, "AUDIT_RETENTION_MONTHS", 12)
+
+    db = SessionLocal()
+    log = AuditLog(action="recovery:stored", timestamp=datetime(1998, 3, 10, tzinfo=timezone.utc))
+    db.add(log)
+    db.commit()
+    stored = {"id": log.id, "user_id": None, "action": log.action, "details": None, "timestamp": log.timestamp}
+    db.close()
+    removed = {**stored, "id": stored["id"] + 10 ** 6, "action": "recovery:removed"}
+
+    # Interrupted before the removal was committed, then after it
+    audit_retention._stage("1998_03", [stored])
+    audit_retention._stage("1998_03", [removed])
+
+    assert audit_retention.rotate(engine, now=datetime(2001, 6, 15, tzinfo=timezone.utc))["archived"] == 2
+    assert not [name for name in os.listdir(tmp_path / "archive") if name.endswith(".pending.gz")]
+    with gzip.open(tmp_path / "archive" / "audit_logs_1998_03.jsonl.gz", "rt") as archive:
+        assert sorted(json.loads(line)["action"] for line in archive) == ["recovery:removed", "recovery:stored"]
+    assert sum(chunk["count"] for chunk in audit_retention.load_archive_index()["audit_logs_1998_03.jsonl.gz"]) == 2
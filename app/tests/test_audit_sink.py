@@ -0,0 +1,121 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+import time
+
+from app.database.session import SessionLocal
+from app.helper import audit
+from app.helper.audit_sink import AuditSink
+from app.models.audit_log import AuditLog
+
+
+def _count(db, action):
+    return db.query(AuditLog).filter(AuditLog.action == action).count()
+
+
+def test_audit_sink_batches_entries():
+    """Entries are queued, then written together on size threshold or on stop"""
+    db = SessionLocal()
+    sink = AuditSink(batch_size=5, flush_interval=3600)
+    for i in range(3):
+        sink.enqueue(None, "sink-batch", f"entry {i}")
+    assert sink.pending() == 3
+    assert _count(db, "sink-batch") == 0
+
+    # Reaching the batch size wakes the flusher
+    sink.enqueue(None, "sink-batch", "entry 3")
+    sink.enqueue(None, "sink-batch", "entry 4")
+    deadline = time.monotonic() + 5
+    while sink.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _count(db, "sink-batch") == 5
+
+    sink.enqueue(None, "sink-batch", "entry 5")
+    sink.stop()
+    assert _count(db, "sink-batch") == 6
+    logs = db.query(AuditLog).filter(AuditLog.action == "sink-batch").order_by(AuditLog.id).all()
+    assert [log.details for log in logs] == [f"entry {i}" for i in range(6)]
+    assert all(log.timestamp is not None for log in logs)
+    db.close()
+
+
+def test_log_action_sync_mode_writes_immediately():
+    """Compliance-critical actions bypass the queue"""
+    db = SessionLocal()
+    audit.log_action(db, None, "sink-sync", "written now", sync=True)
+    assert _count(db, "sink-sync") == 1
+    db.close()
+
+
+def test_audit_sink_flushes_in_background():
+    """The background thread writes the queue once the flush interval has elapsed"""
+    db = SessionLocal()
+    sink = AuditSink(batch_size=1000, flush_interval=0.05)
+    sink.enqueue(None, "sink-timer", "background")
+    deadline = time.monotonic() + 5
+    while sink.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sink.stop()
+    assert _count(db, "sink-timer") == 1
+    db.close()
+
+
+def test_audit_sink_drops_entries_when_full():
+    """A full queue drops new entries instead of writing from the caller"""
+    db = SessionLocal()
+    sink = AuditSink(batch_size=1000, flush_interval=3600, max_pending=2)
+    with sink._flush_lock:
+        for i in range(3):
+            sink.enqueue(None, "sink-full", f"entry {i}")
+        assert (sink.pending(), sink.dropped) == (2, 1)
+    sink.stop()
+    assert _count(db, "sink-full") == 2
+    db.close()
+
+
+def test_audit_sink_drops_rejected_entries():
+    """An entry the database rejects is dropped, the rest of its batch and later entries are written"""
+    db = SessionLocal()
+    sink = AuditSink(batch_size=1000, flush_interval=3600)
+    sink.enqueue(None, "sink-rejected", "before")
+    sink.enqueue(None, "sink-rejected", {"not": "text"})
+    sink.enqueue(None, "sink-rejected", "after")
+    assert sink.flush() == 2
+    assert (sink.pending(), sink.dropped) == (0, 1)
+
+    sink.enqueue(None, "sink-rejected", "later")
+    assert sink.flush() == 1
+    sink.stop()
+    logs = db.query(AuditLog).filter(AuditLog.action == "sink-rejected").order_by(AuditLog.id).all()
+    assert [log.details for log in logs] == ["before", "after", "later"]
+    db.close()
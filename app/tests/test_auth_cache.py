@@ -0,0 +1,68 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+from app.api.auth import get_current_user
+from app.core import auth
+from app.database.session import SessionLocal
+from app.helper import auth_cache, security
+from app.repositories import user_repo
+
+
+def test_auth_cache_reuses_snapshot_until_user_changes():
+    """The authenticated user is served from the cache until the user is modified"""
+    db = SessionLocal()
+    user = user_repo.create_user(db, email="auth-cache@example.com", username="auth-cache",
+                                 first_name="Auth", last_name="Cache", password="password123")
+    token = auth.create_token(data={"sub": str(user.id)})
+
+    # get_current_user runs on its own session
+    auth_db = SessionLocal()
+    first = get_current_user(token, auth_db)
+    assert first.id == user.id
+    assert get_current_user(token, auth_db) is first
+    assert auth_cache.get(token).claims["sub"] == str(user.id)
+    # Relationships are loaded before the snapshot is detached
+    assert first.groups == [] and first.tags == []
+
+    user.hashed_password = security.get_password_hash("another-password")
+    db.commit()
+    assert auth_cache.get(token) is None
+    assert get_current_user(token, auth_db) is not first
+    auth_db.close()
+    db.close()
+
+
+def test_auth_cache_respects_token_expiry():
+    """Nothing is cached past the exp claim of the token"""
+    auth_cache.put("expired-token", {"sub": "1", "exp": 0}, None, auth_cache.generation())
+    assert auth_cache.get("expired-token") is None
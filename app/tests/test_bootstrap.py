@@ -0,0 +1,118 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+
+from sqlalchemy import create_engine, event, func, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import bootstrap, seed
+from app.models.function import Function
+from app.models.group import Group
+from app.models.policy import Policy
+from app.models.rule import Rule
+from app.models.user import User
+
+
+def _counts(session_factory):
+    db = session_factory()
+    counts = {model.__name__: db.execute(select(func.count()).select_from(model)).scalar()
+              for model in (Function, Group, Policy, Rule)}
+    admin = db.query(User).filter(User.is_superadmin == True).one()
+    counts["admin_links"] = (len(admin.organizations), [group.name for group in admin.groups])
+    db.close()
+    return counts
+
+
+def test_bootstrap_seeds_once_then_skips(tmp_path):
+    """The first startup creates and seeds, the next ones stop at the fingerprint check"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'bootstrap.db'}")
+    session_factory = sessionmaker(bind=engine)
+
+    report = bootstrap.bootstrap(engine, session_factory, force=False)
+    assert report["applied"]
+    expected = {
+        "Function": len({function["name"] for function in seed.DEFAULT_FUNCTIONS}),
+        "Group": len(seed.DEFAULT_GROUPS),
+        "Policy": len(seed.DEFAULT_POLICIES),
+        "Rule": sum(len(policy["functions"]) for policy in seed.DEFAULT_POLICIES),
+        "admin_links": (1, ["Administrators"]),
+    }
+    assert _counts(session_factory) == expected
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    report = bootstrap.bootstrap(engine, session_factory, force=False)
+    assert not report["applied"]
+    assert len(statements) == 1
+
+    # A forced or changed bootstrap leaves the seeded data as is
+    report = bootstrap.bootstrap(engine, session_factory, force=True)
+    assert report["applied"]
+    assert _counts(session_factory) == expected
+    engine.dispose()
+
+
+def test_fingerprint_follows_seed_definition(monkeypatch):
+    """Changing the seed changes the fingerprint"""
+    engine = create_engine("sqlite://")
+    before = bootstrap.fingerprint(engine)
+    assert bootstrap.fingerprint(engine) == before
+    monkeypatch.setattr(seed, "DEFAULT_GROUPS", seed.DEFAULT_GROUPS + [{"name": "Auditors", "description": None}])
+    assert bootstrap.fingerprint(engine) != before
+
+
+def _name_index_is_unique(engine):
+    return next(index for index in inspect(engine).get_indexes("elements") if index["name"] == "ix_elements_name")["unique"]
+
+
+def test_unique_index_over_duplicates_is_reported(tmp_path, caplog):
+    """A database holding duplicate element names still starts, and gets the unique index once they are resolved"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'duplicates.db'}")
+    session_factory = sessionmaker(bind=engine)
+    bootstrap.bootstrap(engine, session_factory, force=False)
+    with engine.begin() as conn:
+        # As left by a version without the unique index
+        conn.exec_driver_sql("DROP INDEX ix_elements_name")
+        conn.exec_driver_sql("CREATE INDEX ix_elements_name ON elements (name)")
+        conn.exec_driver_sql("INSERT INTO environments (id, name, organization_id) VALUES (900, 'dup-env', 1)")
+        conn.exec_driver_sql("INSERT INTO elements (name, environment_id) VALUES ('dup', 900), ('dup', 900)")
+
+    assert bootstrap.bootstrap(engine, session_factory, force=True)["applied"]
+    assert "ix_elements_name not created" in caplog.text
+    assert not _name_index_is_unique(engine)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE elements SET name = 'dup-2' WHERE id = (SELECT MAX(id) FROM elements)")
+    bootstrap.bootstrap(engine, session_factory, force=True)
+    assert _name_index_is_unique(engine)
+    engine.dispose()
@@ -0,0 +1,142 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+
+import itertools
+
+import pytest
+
+from app.database.session import SessionLocal
+from app.helper import codename_allocator
+from app.helper.codename_allocator import CodenameAllocator
+from app.models.organization import Organization
+
+
+def _cycle(*names):
+    candidates = itertools.cycle(names)
+    return lambda **options: next(candidates)
+
+
+def test_allocator_suffixes_names_that_keep_colliding():
+    """Once every candidate is taken, names get a suffix instead of failing"""
+    db = SessionLocal()
+    db.add(Organization(name="alloc-taken"))
+    db.commit()
+    allocator = CodenameAllocator(Organization, _cycle("alloc-taken", "alloc-free"))
+
+    names = allocator.allocate(db, 3)
+    assert len(set(names)) == 3
+    assert "alloc-taken" not in names
+    assert names[0] == "alloc-free"
+    assert all(name.startswith("alloc-") for name in names)
+    # Reserved names are not handed out twice
+    assert not set(allocator.allocate(db, 2)) & set(names)
+    db.close()
+
+
+def test_allocator_rechecks_names_created_after_warm_up():
+    """Names inserted by another worker after the warm-up are skipped"""
+    db = SessionLocal()
+    allocator = CodenameAllocator(Organization, _cycle("alloc-late", "alloc-other"))
+    allocator.warm(db)
+    # Written behind the allocator's back, as another worker would
+    db.execute(Organization.__table__.insert(), [{"name": "alloc-late"}])
+    db.commit()
+    assert allocator.allocate(db, 1) == ["alloc-other"]
+    assert allocator.is_known("alloc-late")
+    with pytest.raises(ValueError):
+        allocator.allocate(db, codename_allocator.MAX_BULK + 1)
+    db.close()
+
+
+def test_names_are_released_on_commit_only():
+    """A deleted or renamed organization frees its name once committed, never on a rolled back flush"""
+    allocator = codename_allocator.organizations
+    db = SessionLocal()
+    deleted, renamed = Organization(name="alloc-deleted"), Organization(name="alloc-renamed")
+    db.add_all([deleted, renamed])
+    db.commit()
+    allocator.warm(db)
+
+    db.delete(deleted)
+    renamed.name = "alloc-renamed-2"
+    db.flush()
+    assert allocator.is_known("alloc-deleted") and allocator.is_known("alloc-renamed")
+    db.rollback()
+    assert allocator.is_known("alloc-deleted") and allocator.is_known("alloc-renamed")
+
+    assert renamed.name == "alloc-renamed"
+    db.delete(deleted)
+    renamed.name = "alloc-renamed-2"
+    db.commit()
+    assert not allocator.is_known("alloc-deleted") and not allocator.is_known("alloc-renamed")
+    assert allocator.is_known("alloc-renamed-2")
+    db.close()
+
+
+def test_generate_names_endpoint(test_client):
+    """Bulk generation returns distinct names, unused by the requested table"""
+    from app.core import auth
+    headers = {"Authorization": f"Bearer {auth.create_token(data={'sub': '1'})}"}
+    response = test_client.get("/environments/generate-names", headers=headers,
+                               params={"count": 50, "kind": "organization", "suffix_length": 2})
+    assert response.status_code == 200
+    names = response.json()["data"]
+    assert len(names) == len(set(names)) == 50
+
+    response = test_client.get("/environments/generate-name", headers=headers)
+    assert response.status_code == 200
+    assert isinstance(response.json()["data"], str)
+
+
+def test_rename_to_a_used_element_name_is_rejected(test_client):
+    """Element names are unique: a rename onto another element's name is a 400, not a database error"""
+    from app.core import auth
+    from app.models.element import Element
+    from app.repositories import environment_repo
+
+    db = SessionLocal()
+    org = Organization(name="rename-org")
+    db.add(org)
+    db.commit()
+    env = environment_repo.create_environment(db, name="rename-env", organization_id=org.id)
+    db.add_all([Element(name="rename-first", environment_id=env.id), Element(name="rename-second", environment_id=env.id)])
+    db.commit()
+    second_id = db.query(Element.id).filter(Element.name == "rename-second").scalar()
+    db.close()
+
+    headers = {"Authorization": f"Bearer {auth.create_token(data={'sub': '1'})}"}
+    response = test_client.put(f"/elements/{second_id}", json={"name": "rename-first", "description": None},
+                               headers=headers)
+    assert response.status_code == 400
+    assert response.json()["message"] == "An element with this name already exists"
@@ -0,0 +1,84 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.helper.croniter import (
+    croniter, CronMask, CroniterUnsupportedSyntaxError,
+    croniter_match_batch, croniter_window_batch, croniter_window_times,
+)
+from app.helper.permissions import is_in_cron_interval
+
+WINDOWS = [
+    ("0 9 * * 1-5", "0 17 * * 1-5"),
+    ("*/30 * * * *", "15,45 * * * *"),
+    ("0 0 1 * *", "0 0 2 * *"),
+    ("0 22 * * 5", "0 6 * * 1"),
+    ("0 6 * * 2#3", "0 18 * * 2#3"),
+    ("0 12 l * *", "0 13 * * *"),
+]
+
+
+def test_window_batch_matches_is_in_cron_interval():
+    random.seed(7)
+    origin = datetime(2024, 1, 1)
+    times = [origin + timedelta(seconds=random.randint(0, 86400 * 400)) for _ in range(150)]
+    for start, end in WINDOWS:
+        expected = [is_in_cron_interval(t, start, end) for t in times]
+        assert croniter_window_times(start, end, times) == expected, (start, end)
+
+    at = times[0]
+    assert croniter_window_batch(WINDOWS, at) == [is_in_cron_interval(at, s, e) for s, e in WINDOWS]
+
+
+def test_match_batch_matches_croniter():
+    expressions = ["* * * * *", "0 9 * * 1-5", "*/5 * 13 * 5", "0 0 l * *", "30 2 * * 0#1"]
+    origin = datetime(2024, 1, 1)
+    for minutes in range(0, 60 * 24 * 120, 397):
+        at = origin + timedelta(minutes=minutes)
+        assert croniter_match_batch(expressions, at) == [croniter.match(e, at) for e in expressions]
+
+
+def test_window_boundaries_are_half_open():
+    start, end = "0 9 * * *", "0 17 * * *"
+    day = datetime(2024, 5, 14)
+    assert croniter_window_times(start, end, [
+        day.replace(hour=8, minute=59), day.replace(hour=9), day.replace(hour=16, minute=59), day.replace(hour=17)
+    ]) == [False, True, True, False]
+
+
+def test_second_fields_are_rejected():
+    with pytest.raises(CroniterUnsupportedSyntaxError):
+        CronMask("* * * * * */15")
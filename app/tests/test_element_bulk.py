@@ -0,0 +1,113 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+
+from sqlalchemy import event
+
+from app.database.session import SessionLocal, engine
+from app.models.audit_log import AuditLog
+from app.models.domain import Domain
+from app.models.element import Element
+
+
+def test_bulk_create_elements(test_client, make_environment, auth_headers):
+    """Valid items are inserted with one INSERT per table, invalid ones are reported"""
+    with SessionLocal() as db:
+        env_id = make_environment(db, "bulk-env").id
+    elements = [{"name": f"bulk-net-{i}", "subcomponent_type": "network",
+                 "subcomponent_data": {"cidr": f"10.0.{i}.0/24", "type": "overlay"}} for i in range(20)]
+    elements += [
+        {"subcomponent_type": "domain", "subcomponent_data": {"fqdn": "a.bulk.example"}},
+        {"subcomponent_type": "domain", "subcomponent_data": {"fqdn": "b.bulk.example"}},
+        {"name": "bulk-net-0", "subcomponent_type": "stack", "subcomponent_data": {"name": "dup"}},
+        {"name": "bulk-bad", "subcomponent_type": "rack", "subcomponent_data": {}},
+        {"name": "bulk-missing", "subcomponent_type": "network", "subcomponent_data": {"cidr": "10.1.0.0/24"}},
+    ]
+
+    inserts = []
+    listener = lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = test_client.post(f"/environments/{env_id}/elements", headers=auth_headers, json={"elements": elements})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert (data["created"], data["failed"]) == (22, 3)
+    assert [result["status"] for result in data["results"][20:]] == ["created", "created", "error", "error", "error"]
+    assert "already exists" in data["results"][22]["error"]
+    # Elements, networks, domains and the audit entry
+    assert len([statement for statement in inserts if "audit_logs" not in statement]) == 3
+
+    db = SessionLocal()
+    assert db.query(Element).filter(Element.environment_id == env_id).count() == 22
+    generated = [result["name"] for result in data["results"][20:22]]
+    assert all(generated) and len(set(generated)) == 2
+    domain = db.query(Domain).filter(Domain.fqdn == "a.bulk.example").one()
+    assert domain.element_id == data["results"][20]["id"]
+    db.close()
+
+
+def test_bulk_create_atomic_rejects_whole_batch(test_client, make_environment, auth_headers):
+    """With atomic, one invalid item leaves the environment untouched"""
+    with SessionLocal() as db:
+        env_id = make_environment(db, "bulk-atomic-env").id
+    response = test_client.post(f"/environments/{env_id}/elements", headers=auth_headers, json={"atomic": True, "elements": [
+        {"name": "atomic-ok", "subcomponent_type": "stack", "subcomponent_data": {"name": "ok"}},
+        {"name": "atomic-bad", "subcomponent_type": "stack", "subcomponent_data": {}},
+    ]})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["created"] == 0
+    assert [result["status"] for result in data["results"]] == ["skipped", "error"]
+    db = SessionLocal()
+    assert db.query(Element).filter(Element.environment_id == env_id).count() == 0
+    db.close()
+
+
+def test_bulk_create_reports_missing_references(test_client, make_environment, auth_headers):
+    """Unknown foreign keys fail their item only, without leaking the driver message"""
+    with SessionLocal() as db:
+        env_id = make_environment(db, "bulk-refs-env").id
+    response = test_client.post(f"/environments/{env_id}/elements", headers=auth_headers, json={"elements": [
+        {"name": "refs-volume", "subcomponent_type": "volume",
+         "subcomponent_data": {"pool_id": 999999, "size_gb": 10, "mode": "rwo"}},
+        {"name": "refs-cluster", "subcomponent_type": "container_cluster",
+         "subcomponent_data": {"mode": "k8s", "version": "1.30", "endpoint": "https://k8s", "stack_id": "x"}},
+        {"name": "refs-stack", "subcomponent_type": "stack", "subcomponent_data": {"name": "ok"}},
+    ]})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [result["status"] for result in data["results"]] == ["error", "error", "created"]
+    assert data["results"][0]["error"] == "StoragePool 999999 referenced by 'pool_id' not found"
+    assert data["results"][1]["error"] == "'stack_id' must be an integer"
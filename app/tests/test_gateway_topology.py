@@ -0,0 +1,100 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/tests/test_gateway_topology.py
+from sqlalchemy import event
+
+from app.database.session import SessionLocal, engine
+from app.helper import gateway_topology
+from app.models.element import Element
+from app.models.gateway import Gateway, GatewayKind
+from app.models.network import NetworkType
+from app.models.network_gateway import NetworkDirection
+from app.models.organization import Organization
+from app.models.stack import Stack
+from app.repositories import environment_repo, gateway_repo, loader_profiles, network_gateway_repo, network_repo
+
+
+def _setup(db):
+    org = Organization(name="topology-org")
+    db.add(org)
+    db.commit()
+    env = environment_repo.create_environment(db, name="topology-env", organization_id=org.id)
+    elements = [Element(name=f"topology-el-{i}", environment_id=env.id) for i in range(4)]
+    db.add_all(elements)
+    db.commit()
+    public, front, back = (network_repo.create_network(db, cidr=cidr, type=NetworkType.PHYSICAL, element_id=element.id)
+                           for cidr, element in zip(("10.250.0.0/24", "10.250.1.0/24", "10.250.2.0/24"), elements))
+    stack = Stack(name="topology-stack", element_id=elements[3].id)
+    db.add(stack)
+    db.commit()
+    edge, inner = Gateway(kind=GatewayKind.TRAEFIK, stack_id=stack.id), Gateway(kind=GatewayKind.NGINX)
+    db.add_all([edge, inner])
+    db.commit()
+    network_gateway_repo.create_network_gateway(db, public.id, edge.id, direction=NetworkDirection.UPSTREAM)
+    network_gateway_repo.create_network_gateway(db, front.id, edge.id, direction=NetworkDirection.DOWNSTREAM)
+    network_gateway_repo.create_network_gateway(db, front.id, inner.id, direction=NetworkDirection.UPSTREAM)
+    return env, stack, (public, front, back), (edge, inner)
+
+
+def test_gateway_networks_are_batch_loaded_relationships():
+    db = SessionLocal()
+    try:
+        env, stack, (public, front, back), (edge, inner) = _setup(db)
+        db.expire_all()
+        selects = []
+        listener = lambda conn, cursor, statement, *args: selects.append(statement) if statement.startswith("SELECT") else None
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            gateways = gateway_repo.list_gateways(db, options=loader_profiles.gateway_networks())
+            networks = {g.id: ([n.id for n in g.upstream_networks], [n.id for n in g.downstream_networks])
+                        for g in gateways}
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert networks[edge.id] == ([public.id], [front.id])
+        assert networks[inner.id] == ([front.id], [])
+        # Gateways, then upstream and downstream networks, whatever the number of gateways
+        assert len(selects) == 3
+
+        topology = gateway_topology.for_environment(db, env.id)
+        assert topology.gateway_ids == [edge.id, inner.id]
+        assert topology.routes() == [(public.id, edge.id, front.id)]
+        assert topology.gateways_of(front.id) == [edge.id, inner.id]
+        assert topology.gateways_of(front.id, NetworkDirection.UPSTREAM) == [inner.id]
+        assert gateway_topology.for_environment(db, env.id) is topology
+        assert gateway_topology.for_stack(db, stack.id).gateway_ids == [edge.id]
+
+        # A new attachment drops the cached topologies
+        network_gateway_repo.create_network_gateway(db, back.id, inner.id, direction=NetworkDirection.DOWNSTREAM)
+        assert gateway_topology.for_environment(db, env.id).routes() == [(public.id, edge.id, front.id),
+                                                                        (front.id, inner.id, back.id)]
+    finally:
+        db.close()
@@ -0,0 +1,190 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+import json
+import sqlite3
+import sys
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database.session import SessionLocal, engine
+from app.helper import inventory_import
+from app.models.dns_record import DNSRecord
+from app.models.network_physical_host import NetworkPhysicalHost
+from app.models.network_vm import NetworkVM
+from app.models.physical_host import PhysicalHost
+from app.models.vm import VM
+
+
+def _inventory(prefix, hosts=3, vms_per_host=2):
+    # VMs come before the hosts and networks they reference: the second pass resolves them
+    records = []
+    for h in range(hosts):
+        for v in range(vms_per_host):
+            records.append({"kind": "vm", "name": f"{prefix}-vm{h}-{v}", "host": f"{prefix}-hv{h}.dc", "vcpu": 2,
+                            "ram_mb": 2048, "disk_gb": 20, "os_image": "debian-12",
+                            "networks": [{"cidr": "10.77.0.0/24", "ip": f"10.77.0.{100 + h * 10 + v}"}]})
+    for h in range(hosts):
+        records.append({"kind": "host", "fqdn": f"{prefix}-hv{h}.dc", "ip_mgmt": f"10.77.0.{h + 1}",
+                        "cpu_threads": 32, "ram_mb": 65536, "hypervisor_type": "libvirt",
+                        "networks": [{"cidr": "10.77.0.0/24", "ip": f"10.77.0.{h + 1}"}]})
+    records.append({"kind": "network", "cidr": "10.77.0.0/24", "vlan": 77, "type": "physical"})
+    records.append({"kind": "domain", "fqdn": f"{prefix}.example.org"})
+    records.append({"kind": "dns_record", "domain": f"{prefix}.example.org", "type": "A", "name": "www",
+                    "value": "10.77.0.100"})
+    return records
+
+
+def _count(db, model, *criteria):
+    return db.execute(select(func.count()).select_from(model).where(*criteria)).scalar_one()
+
+
+def test_import_ndjson_is_idempotent(tmp_path, make_environment):
+    with SessionLocal() as db:
+        env_id = make_environment(db, "inventory-ndjson").id
+    records = _inventory("nd")
+    records.append({"kind": "vm", "name": "orphan", "host": "missing.dc", "vcpu": 1, "ram_mb": 512,
+                    "disk_gb": 5, "os_image": "x"})
+    records.append({"kind": "switch", "name": "sw1"})
+    path = tmp_path / "inventory.ndjson"
+    path.write_text("\n".join(json.dumps(record) for record in records))
+
+    db = SessionLocal()
+    try:
+        progress = []
+        report = inventory_import.import_inventory(db, str(path), environment_id=env_id, chunk_size=4,
+                                                   progress=lambda report: progress.append(report["records"]))
+        assert report["created"] == {"vm": 6, "host": 3, "network": 1, "domain": 1, "dns_record": 1,
+                                     "host_attachment": 3, "vm_attachment": 6}
+        assert report["errors"] == 2
+        assert {sample["kind"] for sample in report["error_samples"]} == {"vm", "switch"}
+        assert len(progress) > 2
+        assert not (tmp_path / "inventory.ndjson.import-state").exists()
+
+        host_ids = select(PhysicalHost.id).where(PhysicalHost.fqdn.like("nd-hv%"))
+        assert _count(db, PhysicalHost, PhysicalHost.id.in_(host_ids)) == 3
+        assert _count(db, VM, VM.host_id.in_(host_ids)) == 6
+        assert _count(db, NetworkPhysicalHost, NetworkPhysicalHost.physical_host_id.in_(host_ids)) == 3
+        vm_ids = select(VM.id).where(VM.host_id.in_(host_ids))
+        assert _count(db, NetworkVM, NetworkVM.vm_id.in_(vm_ids)) == 6
+        assert db.get(VM, db.execute(vm_ids.limit(1)).scalar_one()).element.environment_id == env_id
+        assert _count(db, DNSRecord, DNSRecord.name == "www", DNSRecord.value == "10.77.0.100") == 1
+
+        again = inventory_import.import_inventory(db, str(path), environment_id=env_id, chunk_size=4)
+        assert again["created"] == {}
+        assert again["skipped"] == {"vm": 6, "host": 3, "network": 1, "domain": 1, "dns_record": 1}
+        assert _count(db, VM, VM.host_id.in_(host_ids)) == 6
+    finally:
+        db.close()
+
+
+def test_import_json_resumes_from_checkpoint(tmp_path, make_environment):
+    with SessionLocal() as db:
+        env_id = make_environment(db, "inventory-json").id
+    path = tmp_path / "inventory.json"
+    path.write_text(json.dumps(_inventory("js", hosts=4, vms_per_host=3), indent=1))
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(report):
+        if report["phase"] == 2 and report["records"] >= 4:
+            raise Interrupted()
+
+    db = SessionLocal()
+    try:
+        with pytest.raises(Interrupted):
+            inventory_import.import_inventory(db, str(path), environment_id=env_id, chunk_size=4, progress=interrupt)
+        assert inventory_import.load_checkpoint(str(path))[0] == 1
+
+        report = inventory_import.import_inventory(db, str(path), environment_id=env_id, chunk_size=4)
+        assert report["resumed_from"]["phase"] == 2 and report["resumed_from"]["record"] > 0
+        assert report["errors"] == 0
+        host_ids = select(PhysicalHost.id).where(PhysicalHost.fqdn.like("js-hv%"))
+        assert _count(db, VM, VM.host_id.in_(host_ids)) == 12
+        vm_ids = select(VM.id).where(VM.host_id.in_(host_ids))
+        assert _count(db, NetworkVM, NetworkVM.vm_id.in_(vm_ids)) == 12
+    finally:
+        db.close()
+
+
+def test_import_yaml_sections(tmp_path, make_environment):
+    pytest.importorskip("yaml")
+    with SessionLocal() as db:
+        env_id = make_environment(db, "inventory-yaml").id
+    path = tmp_path / "inventory.yaml"
+    path.write_text(
+        "hosts:\n"
+        "  - {fqdn: ym-hv0.dc, ip_mgmt: 10.78.0.1, cpu_threads: 8, ram_mb: 16384}\n"
+        "vms:\n"
+        "  - {name: ym-vm0, host: ym-hv0.dc, vcpu: 1, ram_mb: 1024, disk_gb: 10, os_image: alpine}\n"
+        "---\n"
+        "- {kind: domain, fqdn: ym.example.org}\n"
+    )
+
+    db = SessionLocal()
+    try:
+        report = inventory_import.import_inventory(db, str(path), environment_id=env_id)
+        assert report["created"] == {"host": 1, "vm": 1, "domain": 1}
+    finally:
+        db.close()
+
+
+def test_yaml_without_pyyaml_is_reported(tmp_path, monkeypatch):
+    path = tmp_path / "inventory.yml"
+    path.write_text("- {kind: domain, fqdn: noyaml.example.org}\n")
+    monkeypatch.setitem(sys.modules, "yaml", None)
+    with pytest.raises(inventory_import.InventoryError, match="'import' extra"):
+        list(inventory_import.iter_records(str(path)))
+
+
+@pytest.mark.skipif(engine.dialect.name != "sqlite", reason="ids come from sequences elsewhere")
+def test_reserved_ids_hold_the_write_lock(make_environment):
+    """A concurrent writer waits until the chunk using the reserved ids commits"""
+    with SessionLocal() as db:
+        env_id = make_environment(db, "inventory-lock").id
+    db = SessionLocal()
+    other = sqlite3.connect(engine.url.database, timeout=0.1)
+    try:
+        importer = inventory_import.InventoryImporter(db, environment_id=env_id)
+        importer._load()
+        reserved = importer._next_id("physical_hosts")
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("INSERT INTO organizations (name) VALUES ('inventory-lock-race')")
+        db.rollback()
+        other.execute("INSERT INTO organizations (name) VALUES ('inventory-lock-race')")
+        other.commit()
+        assert reserved
+    finally:
+        other.close()
+        db.close()
@@ -0,0 +1,126 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/tests/test_ip_keys.py
+import ipaddress
+import random
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import bootstrap
+from app.database.session import SessionLocal
+from app.models.element import Element
+from app.models.network import NetworkType
+from app.models.organization import Organization
+from app.models.physical_host import PhysicalHost
+from app.models.types import ip_key
+from app.repositories import environment_repo, network_physical_host_repo, network_repo
+
+
+def test_keys_sort_in_address_order():
+    rng = random.Random(21)
+    addresses = [ipaddress.IPv4Address(rng.getrandbits(32)) for _ in range(500)]
+    addresses += [ipaddress.IPv6Address(rng.getrandbits(128)) for _ in range(500)]
+    # IPv4 sorts as its IPv4-mapped IPv6 address
+    mapped = lambda address: int(address) | 0xFFFF << 32 if address.version == 4 else int(address)
+    assert sorted(addresses, key=ip_key) == sorted(addresses, key=mapped)
+    assert ip_key("10.0.0.1") == bytes(10) + b"\xff\xff\x0a\x00\x00\x01"
+
+
+def _networks(db, *cidrs):
+    org = Organization(name=f"ip-keys-org-{cidrs[0]}")
+    db.add(org)
+    db.commit()
+    env = environment_repo.create_environment(db, name=f"ip-keys-{cidrs[0]}", organization_id=org.id)
+    networks = []
+    for cidr in cidrs:
+        element = Element(name=f"ip-keys-net-{cidr}", environment_id=env.id)
+        db.add(element)
+        db.commit()
+        networks.append(network_repo.create_network(db, cidr=cidr, type=NetworkType.PHYSICAL, element_id=element.id))
+    return networks
+
+
+def test_containment_and_range_queries():
+    db = SessionLocal()
+    try:
+        wide, narrow, other, v6 = _networks(db, "10.230.0.0/16", "10.230.4.0/22", "10.231.0.0/24", "fd00:230::/48")
+        assert [n.id for n in network_repo.list_networks_containing(db, "10.230.5.9")] == [narrow.id, wide.id]
+        assert [n.id for n in network_repo.list_networks_containing(db, "fd00:230::1")] == [v6.id]
+        assert [n.id for n in network_repo.list_networks_within(db, "10.230.0.0/15")] == [wide.id, narrow.id, other.id]
+
+        hosts = []
+        for i in range(3):
+            host = PhysicalHost(fqdn=f"ip-keys-hv{i}.test", ip_mgmt="192.0.2.1", cpu_threads=4, ram_mb=4096)
+            db.add(host)
+            db.commit()
+            hosts.append(host)
+        attached = [network_physical_host_repo.create_network_physical_host(db, narrow.id, hosts[0].id, "10.230.7.1"),
+                    network_physical_host_repo.create_network_physical_host(db, narrow.id, hosts[1].id, "10.230.4.20"),
+                    network_physical_host_repo.create_network_physical_host(db, other.id, hosts[2].id, "10.231.0.5")]
+        in_range = network_physical_host_repo.list_network_physical_hosts_in_range(db, "10.230.0.0/16")
+        assert [a.id for a in in_range] == [attached[1].id, attached[0].id]
+
+        # Updates move the keys with the value
+        network_physical_host_repo.update_network_physical_host(db, attached[2], network_id=narrow.id, ip_address="10.230.6.6")
+        network_repo.update_network(db, other, cidr="10.99.0.0/24")
+        in_range = network_physical_host_repo.list_network_physical_hosts_in_range(db, "10.230.6.0/23")
+        assert [a.id for a in in_range] == [attached[2].id, attached[0].id]
+        assert network_repo.list_networks_containing(db, "10.99.0.1") == [other]
+
+        plan = " ".join(row[-1] for row in db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM networks WHERE cidr_start IN (x'00', x'01') AND cidr_end >= x'00'")))
+        assert "ix_networks_cidr_start" in plan
+    finally:
+        db.close()
+
+
+def test_bootstrap_adds_and_backfills_the_key_columns(tmp_path):
+    """A database created before the key columns gets them, filled, on the next bootstrap"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    session_factory = sessionmaker(bind=engine)
+    bootstrap.bootstrap(engine, session_factory, force=True)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_networks_cidr_start")
+        conn.exec_driver_sql("ALTER TABLE networks DROP COLUMN cidr_start")
+        conn.exec_driver_sql("ALTER TABLE networks DROP COLUMN cidr_end")
+        conn.exec_driver_sql("INSERT INTO networks (cidr, type, environment_scoped, element_id) "
+                             "VALUES ('192.168.8.0/21', 'PHYSICAL', 0, 1)")
+
+    bootstrap.bootstrap(engine, session_factory, force=True)
+    assert {"cidr_start", "cidr_end"} <= {column["name"] for column in inspect(engine).get_columns("networks")}
+    db = session_factory()
+    try:
+        assert [n.cidr for n in network_repo.list_networks_containing(db, "192.168.15.255")] == ["192.168.8.0/21"]
+    finally:
+        db.close()
+    engine.dispose()
@@ -0,0 +1,152 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+import ipaddress
+import random
+
+import pytest
+
+from app.database.session import SessionLocal
+from app.helper import ipam
+from app.models.element import Element
+from app.models.network import NetworkType
+from app.models.organization import Organization
+from app.models.physical_host import PhysicalHost
+from app.repositories import environment_repo, network_physical_host_repo, network_repo
+
+
+def test_trie_finds_the_lowest_free_subnet():
+    base = ipaddress.ip_network("10.0.0.0/16")
+    rng = random.Random(7)
+    for _ in range(100):
+        trie, live = ipam.PrefixTrie(32), {}
+        for network_id in range(rng.randint(0, 30)):
+            subnet = rng.choice(list(base.subnets(new_prefix=rng.randint(17, 26))))
+            trie.add(subnet, network_id)
+            live[network_id] = subnet
+        for network_id in rng.sample(sorted(live), len(live) // 3):
+            trie.discard(live.pop(network_id), network_id)
+        prefixlen = rng.randint(17, 26)
+        expected = next((candidate for candidate in base.subnets(new_prefix=prefixlen)
+                         if not any(candidate.overlaps(subnet) for subnet in live.values())), None)
+        assert trie.first_free(base, prefixlen) == expected
+        probe = rng.choice(list(base.subnets(new_prefix=20)))
+        assert sorted(trie.overlapping(probe)) == sorted(i for i, s in live.items() if s.overlaps(probe))
+
+
+def test_bitmap_lowest_free_offset():
+    bitmap = ipam.AddressBitmap(1 << 64)  # An IPv6 /64 only stores what is used
+    for offset in range(5000):
+        bitmap.add(offset)
+    assert bitmap.first_free() == 5000
+    bitmap.discard(77)
+    assert bitmap.first_free() == 77
+
+    full = ipam.AddressBitmap(256)
+    for offset in range(256):
+        full.add(offset)
+    assert full.first_free() is None and full.count == 256
+
+
+def _network(db, cidr):
+    org = Organization(name=f"ipam-org-{cidr}")
+    db.add(org)
+    db.commit()
+    env = environment_repo.create_environment(db, name=f"ipam-{cidr}", organization_id=org.id)
+    element = Element(name=f"ipam-net-{cidr}", environment_id=env.id)
+    db.add(element)
+    db.commit()
+    return network_repo.create_network(db, cidr=cidr, type=NetworkType.PHYSICAL, element_id=element.id)
+
+
+def _host(db, fqdn):
+    host = PhysicalHost(fqdn=fqdn, ip_mgmt="192.0.2.1", cpu_threads=4, ram_mb=4096)
+    db.add(host)
+    db.commit()
+    return host
+
+
+def test_attachments_allocate_and_validate_addresses():
+    db = SessionLocal()
+    try:
+        network = _network(db, "172.31.5.7/29")
+        assert network.cidr == "172.31.5.0/29"
+        hosts = [_host(db, f"ipam-hv{i}.test") for i in range(8)]
+
+        first = network_physical_host_repo.create_network_physical_host(db, network.id, hosts[0].id)
+        second = network_physical_host_repo.create_network_physical_host(db, network.id, hosts[1].id)
+        assert (first.ip_address, second.ip_address) == ("172.31.5.1", "172.31.5.2")
+
+        for bad in ("172.31.5.2", "172.31.5.0", "172.31.5.7", "172.31.6.1", "not-an-ip"):
+            with pytest.raises(ValueError):
+                network_physical_host_repo.create_network_physical_host(db, network.id, hosts[2].id, bad)
+        db.rollback()
+
+        explicit = network_physical_host_repo.create_network_physical_host(db, network.id, hosts[2].id, "172.31.5.4")
+        assert explicit.ip_address == "172.31.5.4"
+        assert network_physical_host_repo.create_network_physical_host(db, network.id, hosts[3].id).ip_address == "172.31.5.3"
+        assert network_repo.network_usage(db, network) == {"size": 6, "used": 4, "free": 2}
+
+        # A deletion frees the address once committed
+        network_physical_host_repo.delete_network_physical_host(db, first)
+        assert network_physical_host_repo.create_network_physical_host(db, network.id, hosts[4].id).ip_address == "172.31.5.1"
+
+        # A reservation rolled back is released
+        assert ipam.registry.allocate_ip(db, network.id) == "172.31.5.5"
+        db.rollback()
+        assert ipam.registry.allocate_ip(db, network.id) == "172.31.5.5"
+        db.rollback()
+
+        updated = network_physical_host_repo.update_network_physical_host(db, explicit, ip_address="172.31.5.6")
+        assert updated.ip_address == "172.31.5.6"
+        assert ipam.registry.allocate_ip(db, network.id) == "172.31.5.4"
+        db.rollback()
+    finally:
+        db.close()
+
+
+def test_subnets_and_overlaps():
+    db = SessionLocal()
+    try:
+        parent = _network(db, "10.210.0.0/16")
+        child = _network(db, "10.210.0.0/24")
+        _network(db, "fd00:210::/48")
+
+        assert network_repo.find_free_subnet(db, parent.cidr, 24) == "10.210.1.0/24"
+        assert network_repo.find_free_subnet(db, parent.cidr, 23) == "10.210.2.0/23"
+        assert network_repo.find_free_subnet(db, "fd00:210::/48", 64) == "fd00:210::/64"
+        assert [n.id for n in network_repo.list_overlapping_networks(db, "10.210.0.128/25")] == [parent.id, child.id]
+        assert ipam.registry.containing(db, "10.210.0.9") == [parent.id, child.id]
+        with pytest.raises(ValueError):
+            network_repo.find_free_subnet(db, child.cidr, 16)
+    finally:
+        db.close()
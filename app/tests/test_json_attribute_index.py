@@ -0,0 +1,98 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.database.session import SessionLocal, engine
+from app.models.gateway import Gateway, GatewayKind
+from app.models.storage_pool import StoragePool, StoragePoolScope, StoragePoolType
+from app.models.types import json_attribute
+from app.repositories import gateway_repo, storage_pool_repo
+
+
+def _plan(statement):
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def test_host_local_pools_use_the_parameters_index():
+    db = SessionLocal()
+    try:
+        pools = [StoragePool(type=StoragePoolType.NFS, scope=StoragePoolScope.GLOBAL,
+                             parameters={"host_id": 9100 + i % 3, "path": f"/srv/{i}"}) for i in range(9)]
+        db.add_all(pools + [StoragePool(type=StoragePoolType.CEPH, scope=StoragePoolScope.GLOBAL, parameters=None)])
+        db.commit()
+
+        found = storage_pool_repo.list_storage_pools_by_host(db, 9101)
+        assert sorted(pool.parameters["path"] for pool in found) == ["/srv/1", "/srv/4", "/srv/7"]
+        assert storage_pool_repo.list_storage_pools_by_host(db, 9199) == []
+
+        by_host = select(StoragePool.id).where(json_attribute(StoragePool.parameters, "host_id") == 9101)
+        assert "USING INDEX ix_storage_pools_parameters_host_id" in _plan(by_host)
+    finally:
+        db.close()
+
+
+def test_gateway_entrypoint_lookup():
+    db = SessionLocal()
+    try:
+        db.add_all([Gateway(kind=GatewayKind.TRAEFIK, entrypoints={"web": ":8081", "websecure": ":8443"}),
+                    Gateway(kind=GatewayKind.NGINX, entrypoints={"web": ":80"})])
+        db.commit()
+        found = gateway_repo.list_gateways_by_entrypoint(db, "websecure", ":8443")
+        assert [gateway.kind for gateway in found] == [GatewayKind.TRAEFIK]
+
+        by_entrypoint = select(Gateway.id).where(json_attribute(Gateway.entrypoints, "web") == ":80")
+        assert "USING INDEX ix_gateways_entrypoints_web" in _plan(by_entrypoint)
+    finally:
+        db.close()
+
+
+def test_postgresql_expressions_match_their_index():
+    from sqlalchemy.schema import CreateIndex
+
+    index = next(index for index in StoragePool.__table__.indexes
+                 if index.name == "ix_storage_pools_parameters_host_id")
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert "((parameters ->> 'host_id'))" in ddl
+    assert "CAST" not in ddl
+
+    query = select(StoragePool.id).where(json_attribute(StoragePool.parameters, "host_id") == 1)
+    compiled = query.compile(dialect=postgresql.dialect())
+    assert "(storage_pools.parameters ->> 'host_id') =" in str(compiled)
+    # The integer is compared with the text the index holds
+    bind = compiled.binds["param_1"].type
+    assert bind.process_bind_param(1, postgresql.dialect()) == "1"
+    assert bind.process_result_value("1", postgresql.dialect()) == 1
+    assert bind.process_result_value("x", postgresql.dialect()) == "x"
@@ -0,0 +1,104 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.api import environments
+from app.database.session import SessionLocal, engine
+from app.models.function import Function
+from app.models.organization import Organization
+from app.repositories import element_repo, environment_repo, policy_repo, rule_repo, tag_repo, user_repo
+from app.schema.policy import PolicyCreate
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _populate(db, env, start, stop):
+    admin = db.query(Function).filter(Function.name == "admin").first()
+    policy = policy_repo.create_policy(db, PolicyCreate(name=f"profile-policy-{start}", organization_id=env.organization_id))
+    user = user_repo.create_user(db, email=f"profile-{start}@example.com", username=f"profile-{start}",
+                                 first_name="Profile", last_name="User", password="password123")
+    policy_repo.add_user(db, policy, user)
+    tag = tag_repo.create_tag(db, f"profile-tag-{start}")
+    for i in range(start, stop):
+        if i % 2:
+            element = element_repo.create_element_with_subcomponent(
+                db, env.id, f"profile-{env.id}-{i}", None, "domain", {"fqdn": f"e{i}.example.com"})
+        else:
+            element = element_repo.create_element_with_subcomponent(
+                db, env.id, f"profile-{env.id}-{i}", None, "stack", {"name": f"stack-{env.id}-{i}"})
+        element_repo.add_tag_to_element(db, element, tag)
+        rule_repo.create_rule(db, policy.id, admin.id, element_id=element.id)
+
+
+def _list_query_count(db, env, superadmin):
+    db.expire_all()
+    with count_queries() as statements:
+        result = environments.list_elements(env.id, current_user=superadmin, db=db, skip=0, limit=100,
+                                            name=None, element_type=None)
+    return len(result["data"]), len(statements)
+
+
+def test_element_list_query_count_does_not_grow_with_page_size():
+    """Listing elements issues a fixed number of queries thanks to the element_out profile"""
+    db = SessionLocal()
+    superadmin = user_repo.get_user(db, 1)
+    org = Organization(name="profile-org", description="Loader profile test")
+    db.add(org)
+    db.commit()
+    env = environment_repo.create_environment(db, "profile-env", org.id)
+
+    _populate(db, env, 0, 3)
+    size, small = _list_query_count(db, env, superadmin)
+    assert size == 3
+    _populate(db, env, 3, 20)
+    size, large = _list_query_count(db, env, superadmin)
+    assert size == 20
+    assert large == small
+    # Elements, environment, tags, rules, policies, policy users/groups and their tags, sub-components
+    assert large <= 25
+    db.close()
@@ -0,0 +1,88 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/tests/test_network_attachments.py
+from sqlalchemy import event
+
+from app.database.session import SessionLocal, engine
+from app.models.element import Element
+from app.models.gateway import Gateway, GatewayKind
+from app.models.network import NetworkType
+from app.models.network_gateway import NetworkDirection
+from app.models.physical_host import PhysicalHost
+from app.models.vm import VM
+from app.repositories import network_gateway_repo, network_physical_host_repo, network_repo, network_vm_repo
+
+
+def test_network_attachments_in_one_query(test_client, make_environment, auth_headers):
+    db = SessionLocal()
+    env = make_environment(db, "attachments-env")
+    net_element = Element(name="attachments-net", environment_id=env.id)
+    vm_element = Element(name="attachments-vm", environment_id=env.id)
+    db.add_all([net_element, vm_element])
+    db.commit()
+    network = network_repo.create_network(db, cidr="10.240.0.0/24", type=NetworkType.PHYSICAL, element_id=net_element.id)
+    host = PhysicalHost(fqdn="attachments-hv.test", ip_mgmt="192.0.2.1", cpu_threads=4, ram_mb=4096)
+    gateway = Gateway(kind=GatewayKind.TRAEFIK)
+    db.add_all([host, gateway])
+    db.commit()
+    vm = VM(host_id=host.id, name="attachments-vm", vcpu=1, ram_mb=512, disk_gb=5, os_image="debian",
+            element_id=vm_element.id)
+    db.add(vm)
+    db.commit()
+    network_physical_host_repo.create_network_physical_host(db, network.id, host.id, "10.240.0.9")
+    network_vm_repo.create_network_vm(db, network.id, vm.id, "10.240.0.20")
+    network_vm_repo.create_network_vm(db, network.id, vm.id, "10.240.0.3")
+    network_gateway_repo.create_network_gateway(db, network.id, gateway.id, "10.240.0.1", NetworkDirection.DOWNSTREAM)
+    expected = [
+        ("gateway", gateway.id, "10.240.0.1", "downstream"),
+        ("physical_host", host.id, "10.240.0.9", None),
+        ("vm", vm.id, "10.240.0.3", None),
+        ("vm", vm.id, "10.240.0.20", None),
+    ]
+    element_id = net_element.id
+    db.close()
+
+    selects = []
+    listener = lambda conn, cursor, statement, *args: selects.append(statement) if "UNION ALL" in statement else None
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = test_client.get(f"/elements/{element_id}/network/attachments", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [(a["kind"], a["target_id"], a["ip_address"], a["direction"]) for a in data] == expected
+    assert len(selects) == 1
+
+    response = test_client.get(f"/elements/{element_id}/network/attachments?kind=vm", headers=auth_headers)
+    assert [a["ip_address"] for a in response.json()["data"]] == ["10.240.0.3", "10.240.0.20"]
+    assert test_client.get(f"/elements/{element_id}/network/attachments?kind=rack", headers=auth_headers).status_code == 400
@@ -0,0 +1,96 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+
+import threading
+
+import bcrypt
+import pytest
+
+from app.database.session import SessionLocal
+from app.helper import security
+from app.models.user import User
+
+
+def test_password_hasher_rejects_when_saturated():
+    """Beyond the workers and the queue, requests are rejected without waiting"""
+    hasher = security.PasswordHasher(workers=1, queue_max=0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(hasher.run(slow)))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(security.PasswordHashingBusy):
+        hasher.run(slow)
+    release.set()
+    worker.join(5)
+
+    assert results == ["done"]
+    stats = hasher.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["hash_max_seconds"] > 0
+
+
+def test_login_upgrades_weak_hash_and_maps_saturation_to_429(test_client, monkeypatch):
+    """A successful login rehashes with the configured cost, a saturated pool answers 429"""
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 5)
+    db = SessionLocal()
+    user = User(email="rehash@example.com", username="rehash", first_name="Re", last_name="Hash",
+                hashed_password=bcrypt.hashpw(b"secret-password", bcrypt.gensalt(4)).decode())
+    db.add(user)
+    db.commit()
+    assert security.needs_rehash(user.hashed_password)
+
+    response = test_client.post("/login", data={"username": "rehash@example.com", "password": "secret-password"})
+    assert response.status_code == 200
+    db.refresh(user)
+    assert user.hashed_password.startswith("$2b$05$")
+    assert not security.needs_rehash(user.hashed_password)
+    assert security.verify_password("secret-password", user.hashed_password)
+    db.close()
+
+    def busy(*args):
+        raise security.PasswordHashingBusy("Too many password operations in progress")
+
+    monkeypatch.setattr(security.hasher, "run", busy)
+    response = test_client.post("/login", data={"username": "rehash@example.com", "password": "secret-password"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
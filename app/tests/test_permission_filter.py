@@ -0,0 +1,118 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+import json
+
+from app.database.session import SessionLocal
+from app.helper.permissions import check_permission, permission_filter
+from app.models.element import Element
+from app.models.environment import Environment
+from app.models.function import Function
+from app.models.organization import Organization
+from app.repositories import policy_repo, rule_repo, user_repo
+from app.schema.policy import PolicyCreate
+
+
+def _function(db, name):
+    return db.query(Function).filter(Function.name == name).first()
+
+
+def test_permission_filter_limits_rows_in_sql():
+    """Rows are filtered by the rule graph in the database, before pagination"""
+    db = SessionLocal()
+    org = Organization(name="perm-filter-org")
+    other_org = Organization(name="perm-filter-other-org")
+    db.add_all([org, other_org])
+    db.commit()
+
+    readable = Environment(name="perm-filter-readable", organization_id=org.id)
+    hidden = Environment(name="perm-filter-hidden", organization_id=org.id)
+    foreign = Environment(name="perm-filter-foreign", organization_id=other_org.id)
+    db.add_all([readable, hidden, foreign])
+    db.commit()
+    element = Element(name="perm-filter-element", environment_id=hidden.id)
+    db.add(element)
+    db.commit()
+
+    user = user_repo.create_user(db, email="perm-filter@example.com", username="perm-filter",
+                                 first_name="Perm", last_name="Filter", password="password123")
+    user_repo.add_user_to_organization(db, user, org)
+    policy = policy_repo.create_policy(db, PolicyCreate(name="perm-filter-policy", organization_id=org.id))
+    policy_repo.add_user(db, policy, user)
+    rule_repo.create_rule(db, policy.id, _function(db, "env:read").id, environment_id=readable.id)
+    rule_repo.create_rule(db, policy.id, _function(db, "element:read").id, element_id=element.id)
+    # One-minute window once a year: the rule does not grant anything the rest of the time
+    rule_repo.create_rule(db, policy.id, _function(db, "env:read").id, environment_id=hidden.id,
+                          access_schedule=json.dumps({"start": "0 0 1 1 *", "end": "1 0 1 1 *"}))
+
+    def environments(permission):
+        listed = {env.name for env in db.query(Environment).filter(
+            Environment.name.like("perm-filter-%"),
+            permission_filter(db, user, permission, organization_id=Environment.organization_id,
+                              environment_id=Environment.id)
+        )}
+        # Detail routes check each target with the same semantics as the list filter
+        checked = {env.name for env in (readable, hidden, foreign) if check_permission(
+            db, user, permission, organization_id=env.organization_id, environment_id=env.id
+        )}
+        assert checked == listed
+        return listed
+
+    assert environments("env:read") == {"perm-filter-readable"}
+    assert environments("env:delete") == set()
+
+    elements = db.query(Element).join(Environment).filter(
+        permission_filter(db, user, "element:read", organization_id=Environment.organization_id,
+                          environment_id=Element.environment_id, element_id=Element.id)
+    ).all()
+    assert [el.id for el in elements] == [element.id]
+    assert check_permission(db, user, "element:read", organization_id=org.id, environment_id=hidden.id,
+                            element_id=element.id)
+    assert not check_permission(db, user, "element:read", organization_id=org.id, environment_id=hidden.id)
+
+    # A rule of an organization does not grant a global check, such as managing every user
+    rule_repo.create_rule(db, policy.id, _function(db, "user:list").id)
+    assert not check_permission(db, user, "user:list")
+
+    # An unscoped admin rule opens every environment of the policy's organization only
+    rule_repo.create_rule(db, policy.id, _function(db, "admin").id)
+    assert environments("env:delete") == {"perm-filter-readable", "perm-filter-hidden"}
+    assert check_permission(db, user, "user:list")
+
+    policy_repo.delete_policy(db, policy)
+    user_repo.delete_user(db, user)
+    db.delete(element)
+    db.commit()
+    for obj in (readable, hidden, foreign, org, other_org):
+        db.delete(obj)
+    db.commit()
+    db.close()
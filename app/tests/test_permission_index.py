@@ -0,0 +1,127 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+from app.database.session import SessionLocal
+from app.helper import permission_index
+from app.helper.permissions import has_permission
+from app.models.function import Function
+from app.models.organization import Organization
+from app.models.rule import Rule
+from app.repositories import group_repo, policy_repo, rule_repo, user_repo
+from app.schema.policy import PolicyCreate
+
+
+def _function(db, name):
+    return db.query(Function).filter(Function.name == name).first()
+
+
+def test_permission_index_grants_and_invalidation():
+    """The compiled index follows rule and membership changes made through the repositories"""
+    db = SessionLocal()
+    org = Organization(name="perm-index-org", description="Permission index test")
+    db.add(org)
+    db.commit()
+    db.refresh(org)
+
+    user = user_repo.create_user(db, email="perm-index@example.com", username="perm-index",
+                                 first_name="Perm", last_name="Index", password="password123")
+    user_repo.add_user_to_organization(db, user, org)
+    group = group_repo.create_group(db, organization_id=org.id, name="perm-index-group")
+    policy = policy_repo.create_policy(db, PolicyCreate(name="perm-index-policy", organization_id=org.id))
+    policy_repo.add_group(db, policy, group)
+
+    # No membership yet: nothing is granted
+    assert not has_permission(db, user, None, None, "env:read")
+
+    group_repo.add_user_to_group(db, group, user)
+    rule_repo.create_rule(db, policy.id, _function(db, "env:read").id, environment_id=42)
+    assert has_permission(db, user, 42, None, "env:read")
+    assert not has_permission(db, user, 43, None, "env:read")
+    assert not has_permission(db, user, 42, None, "env:delete")
+
+    # The index is compiled once and reused until something changes
+    index = permission_index.get_permission_index(db, user.id)
+    assert permission_index.get_permission_index(db, user.id) is index
+    assert ("env:read", 42, None, org.id) in index.entries
+
+    # Admin rule acts as a wildcard on every function
+    rule_repo.create_rule(db, policy.id, _function(db, "admin").id)
+    assert permission_index.get_permission_index(db, user.id) is not index
+    assert has_permission(db, user, None, None, "env:delete")
+
+    group_repo.remove_user_from_group(db, group, user)
+    assert not has_permission(db, user, 42, None, "env:read")
+
+    policy_repo.delete_policy(db, policy)
+    group_repo.delete_group(db, group)
+    user_repo.delete_user(db, user)
+    db.delete(org)
+    db.commit()
+    db.close()
+
+
+def test_permission_index_drops_rolled_back_rules():
+    """An index compiled from a flushed rule does not outlive its rollback"""
+    db = SessionLocal()
+    org = Organization(name="perm-rollback-org")
+    db.add(org)
+    db.commit()
+    user = user_repo.create_user(db, email="perm-rollback@example.com", username="perm-rollback",
+                                 first_name="Perm", last_name="Rollback", password="password123")
+    user_repo.add_user_to_organization(db, user, org)
+    policy = policy_repo.create_policy(db, PolicyCreate(name="perm-rollback-policy", organization_id=org.id))
+    policy_repo.add_user(db, policy, user)
+    assert not has_permission(db, user, 42, None, "env:read")
+
+    db.add(Rule(policy_id=policy.id, function_id=_function(db, "env:read").id, environment_id=42))
+    db.flush()
+    # The flushing session sees its own rule, cached under the current generation
+    assert has_permission(db, user, 42, None, "env:read")
+    db.rollback()
+    assert not has_permission(db, user, 42, None, "env:read")
+    db.close()
+
+
+def test_permission_index_matches_element_targets():
+    index = permission_index.PermissionIndex(1, [
+        (1, "element:read", None, 7, 1, None),
+        (2, "element:update", 3, None, 1, None),
+    ])
+
+    class Target:
+        id = 7
+        environment_id = 3
+
+    assert index.allows(["element:read"], None, Target())
+    assert index.allows(["element:update"], None, Target())
+    assert not index.allows(["element:update"], 4, None)
+    assert not index.allows(["element:delete"], None, Target())
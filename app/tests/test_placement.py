@@ -0,0 +1,162 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/tests/test_placement.py
+import logging
+import random
+from bisect import insort
+
+import pytest
+
+from app.database.session import SessionLocal
+from app.helper import placement
+from app.models.physical_host import AllocationMode, PhysicalHost
+from app.repositories import element_repo, environment_repo
+
+
+def _environment(db, env):
+    """small (8 threads, 8 GB) and large (8 threads, 16 GB) dedicated to the environment, off not schedulable."""
+    name = env.name
+    other = environment_repo.create_environment(db, name=f"{name}-other", organization_id=env.organization_id)
+    hosts = [
+        PhysicalHost(fqdn=f"{name}-{label}.test", ip_mgmt="192.0.2.10", cpu_threads=8, ram_mb=ram_mb,
+                     allocation_mode=AllocationMode.DEDICATED, dedicated_environment_id=environment_id,
+                     is_schedulable=schedulable)
+        for label, ram_mb, environment_id, schedulable in (
+            ("small", 8192, env.id, True), ("large", 16384, env.id, True),
+            ("off", 65536, env.id, False), ("foreign", 65536, other.id, True),
+        )
+    ]
+    db.add_all(hosts)
+    db.commit()
+    return env, other, {host.fqdn.split("-")[-1][:-5]: host.id for host in hosts}
+
+
+def test_strategies_and_constraints(make_environment):
+    db = SessionLocal()
+    try:
+        env, other, hosts = _environment(db, make_environment(db, "placement-strategies"))
+        engine = placement.PlacementEngine()
+        engine.warm(db)
+        assert engine.plan(db, env.id, [(2, 2048)], "best_fit") == [hosts["small"]]
+        assert engine.plan(db, env.id, [(2, 2048)], "spread") == [hosts["large"]]
+        # Largest first: the 12 GB VM takes the large host, the 6 GB ones fill the small one
+        assert engine.plan(db, env.id, [(1, 6144), (1, 12288)], "best_fit") == [hosts["small"], hosts["large"]]
+        # Not enough vCPUs on the dedicated hosts: falls back to the shared pool, never to the hosts left out
+        assert engine.plan(db, env.id, [(64, 1024)]) not in ([hosts["off"]], [hosts["foreign"]])
+        assert engine.plan(db, other.id, [(2, 2048)], "spread") == [hosts["foreign"]]
+        # A dry run reserves nothing
+        assert engine.capacity(db, hosts["small"])["free_ram_mb"] == 8192
+        assert engine.capacity(db, hosts["off"]) is None
+        with pytest.raises(ValueError):
+            engine.plan(db, env.id, [(1, 1024)], "random")
+    finally:
+        db.close()
+
+
+def test_vm_creation_uses_and_checks_capacity(make_environment, caplog):
+    db = SessionLocal()
+    try:
+        env, other, hosts = _environment(db, make_environment(db, "placement-vms"))
+        placement.engine.reset()
+        element = element_repo.create_element_with_subcomponent(
+            db, env.id, "placement-vm-1", subcomponent_type="vm",
+            subcomponent_data={"name": "placement-vm-1", "vcpu": 4, "ram_mb": 6144}
+        )
+        assert element.vm.host_id == hosts["small"]
+        assert placement.engine.capacity(db, hosts["small"]) == {"cpu": 8, "free_cpu": 4, "ram_mb": 8192,
+                                                                   "free_ram_mb": 2048}
+        # A host given by hand overrides the engine: the over-commit is logged and counted
+        with caplog.at_level(logging.WARNING, logger=placement.__name__):
+            forced = element_repo.create_element_with_subcomponent(
+                db, env.id, "placement-vm-2", subcomponent_type="vm",
+                subcomponent_data={"name": "placement-vm-2", "host_id": hosts["small"], "vcpu": 2, "ram_mb": 4096}
+            )
+            for host, warning in (("off", "not schedulable"), ("foreign", "dedicated to environment")):
+                assert placement.host_for_vm(db, env.id, 1, 1024, hosts[host]) == hosts[host]
+        assert forced.vm.host_id == hosts["small"]
+        assert placement.engine.capacity(db, hosts["small"])["free_ram_mb"] == -2048
+        messages = " ".join(record.getMessage() for record in caplog.records)
+        assert all(warning in messages for warning in ("over-committed", "not schedulable", "dedicated to environment"))
+        with pytest.raises(ValueError, match="not found"):
+            placement.host_for_vm(db, env.id, 1, 1024, 10 ** 9)
+        db.delete(forced.vm)
+        db.delete(forced)
+        db.commit()
+        # A VM deleted gives its capacity back
+        assert placement.engine.capacity(db, hosts["small"])["free_ram_mb"] == 2048
+        db.delete(element.vm)
+        db.commit()
+        assert placement.engine.capacity(db, hosts["small"])["free_ram_mb"] == 8192
+    finally:
+        db.close()
+
+
+def test_plan_endpoint(test_client, make_environment, auth_headers):
+    db = SessionLocal()
+    try:
+        env, _, hosts = _environment(db, make_environment(db, "placement-api"))
+        env_id = env.id
+    finally:
+        db.close()
+    placement.engine.reset()
+    body = {"vms": [{"vcpu": 4, "ram_mb": 8192, "count": 2}, {"vcpu": 1, "ram_mb": 10 ** 9}]}
+    response = test_client.post(f"/environments/{env_id}/placement/plan", json=body, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert (data["placed"], data["unplaced"]) == (2, 1)
+    assert sorted(a["host_id"] for a in data["assignments"][:2]) == sorted([hosts["small"], hosts["large"]])
+    assert data["assignments"][2]["host_id"] is None
+
+    response = test_client.post(f"/environments/{env_id}/placement/plan", json={"vms": []}, headers=auth_headers)
+    assert response.status_code == 422
+
+    # The engine stays locked for the whole plan, so its size is capped
+    too_many = {"vms": [{"vcpu": 1, "ram_mb": 1, "count": 1000}, {"vcpu": 1, "ram_mb": 1}]}
+    response = test_client.post(f"/environments/{env_id}/placement/plan", json=too_many, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_capacity_index_matches_a_sorted_scan():
+    index, keys = placement.CapacityIndex(), []
+    generator = random.Random(7)
+    for host_id in range(400):
+        key = (generator.randint(0, 64) * 1024, generator.randint(0, 32), host_id)
+        index.add(key)
+        insort(keys, key)
+        if host_id % 3 == 0:
+            removed = keys.pop(generator.randrange(len(keys)))
+            index.remove(removed)
+        vcpu, ram = generator.randint(1, 33), generator.randint(0, 65) * 1024
+        fitting = [key for key in keys if key[0] >= ram and key[1] >= vcpu]
+        assert index.best_fit(vcpu, ram) == (fitting[0][2] if fitting else None)
+        assert index.spread(vcpu, ram) == (fitting[-1][2] if fitting else None)
+    assert len(index) == len(keys)
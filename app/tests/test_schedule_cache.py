@@ -0,0 +1,80 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+import json
+from datetime import datetime, timedelta
+
+from app.helper import schedule_cache
+from app.helper.permissions import is_in_cron_interval
+
+BUSINESS_HOURS = json.dumps({"start": "0 9 * * 1-5", "end": "0 17 * * 1-5"})
+
+
+def test_cached_window_matches_cron_interval():
+    """The cached decision is the one is_in_cron_interval computes, minute after minute"""
+    schedule_cache.clear()
+    at = datetime(2024, 1, 1, 0, 0, 0)  # Monday
+    for _ in range(7 * 24 * 4):
+        expected = is_in_cron_interval(at, "0 9 * * 1-5", "0 17 * * 1-5")
+        assert schedule_cache.is_open(BUSINESS_HOURS, at) == expected, at
+        at += timedelta(minutes=15)
+
+    stats = schedule_cache.stats()
+    assert stats["misses"] == 1
+    # Windows are only recomputed at their boundaries
+    assert stats["refreshes"] < 20
+    assert stats["hits"] > 600
+
+
+def test_window_boundaries():
+    schedule_cache.clear()
+    tuesday = datetime(2024, 1, 2)
+    assert schedule_cache.is_open(BUSINESS_HOURS, tuesday.replace(hour=9))
+    assert schedule_cache.is_open(BUSINESS_HOURS, tuesday.replace(hour=16, minute=59))
+    assert not schedule_cache.is_open(BUSINESS_HOURS, tuesday.replace(hour=17))
+    assert not schedule_cache.is_open(BUSINESS_HOURS, datetime(2024, 1, 6, 14))  # Saturday
+
+
+def test_invalid_schedules_allow_access():
+    schedule_cache.clear()
+    assert schedule_cache.is_open(None)
+    assert schedule_cache.is_open("invalid json")
+    assert schedule_cache.is_open(json.dumps({"start": "0 9 * * 1-5"}))
+    assert schedule_cache.is_open({"start": "not a cron", "end": "0 17 * * *"})
+
+
+def test_cache_is_bounded(monkeypatch):
+    schedule_cache.clear()
+    monkeypatch.setattr(schedule_cache, "SCHEDULE_CACHE_SIZE", 3)
+    for minute in range(10):
+        schedule_cache.is_open(json.dumps({"start": f"{minute} 9 * * *", "end": "0 17 * * *"}))
+    assert schedule_cache.stats()["size"] == 3
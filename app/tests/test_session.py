@@ -0,0 +1,57 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+
+
+from sqlalchemy import text
+
+from app.database.session import get_db, pool_stats
+
+
+def test_sqlite_pragmas_and_pool_metrics():
+    """Connections come from the shared provider with the SQLite pragmas applied"""
+    provider = get_db()
+    db = next(provider)
+    assert db.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    assert db.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    stats = pool_stats()
+    assert stats["checked_out"] >= 1
+    assert stats["checkout_wait_count"] >= 1
+    provider.close()
+
+
+def test_health_reports_pool_metrics(test_client):
+    """The health check exposes the connection pool metrics"""
+    resp = test_client.get("/health/")
+    assert resp.status_code == 200
+    pool = resp.json()["data"]["components"]["database"]["pool"]
+    assert pool["size"] >= 1
+    assert pool["checkout_wait_max_seconds"] >= 0
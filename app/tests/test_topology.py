@@ -0,0 +1,137 @@
+#  Copyright (c) 2025.  VesselHarbor
+#
+#  ____   ____                          .__    ___ ___             ___.
+#  \   \ /   /____   ______ ______ ____ |  |  /   |   \_____ ______\_ |__   ___________
+#   \   Y   // __ \ /  ___//  ___// __ \|  | /    ~    \__  \\_  __ \ __ \ /  _ \_  __ \
+#    \     /\  ___/ \___ \ \___ \\  ___/|  |_\    Y    // __ \|  | \/ \_\ (  <_> )  | \/
+#     \___/  \___  >____  >____  >\___  >____/\___|_  /(____  /__|  |___  /\____/|__|
+#                \/     \/     \/     \/            \/      \/          \/
+#
+#
+#  MIT License
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#  SOFTWARE.
+#
+
+# app/tests/test_topology.py
+from app.database.session import SessionLocal
+from app.helper import topology
+from app.models.application import Application, ApplicationType
+from app.models.element import Element
+from app.models.gateway import Gateway, GatewayKind
+from app.models.network import NetworkType
+from app.models.network_gateway import NetworkDirection
+from app.models.physical_host import PhysicalHost
+from app.models.vm import VM
+from app.repositories import network_gateway_repo, network_physical_host_repo, network_repo, network_vm_repo
+
+
+def _environment(db, env, prefix):
+    """
+    public (<prefix>.0.0/24) <- edge gateway -> front (<prefix>.1.0/24), back (<prefix>.2.0/24) unrouted.
+    hv1 runs vm, which runs app, which deploys the edge gateway. hv2 is on public, vm on front.
+    """
+    name = env.name
+    elements = [Element(name=f"{name}-el-{i}", environment_id=env.id) for i in range(5)]
+    db.add_all(elements)
+    db.commit()
+    public, front, back = (network_repo.create_network(db, cidr=cidr, type=NetworkType.PHYSICAL, element_id=element.id)
+                           for cidr, element in zip((f"{prefix}.{i}.0/24" for i in range(3)), elements))
+    hv1 = PhysicalHost(fqdn=f"{name}-hv1.test", ip_mgmt="192.0.2.1", cpu_threads=8, ram_mb=8192,
+                       dedicated_environment_id=env.id)
+    hv2 = PhysicalHost(fqdn=f"{name}-hv2.test", ip_mgmt="192.0.2.2", cpu_threads=8, ram_mb=8192)
+    db.add_all([hv1, hv2])
+    db.commit()
+    vm = VM(host_id=hv1.id, name="graph-vm", vcpu=2, ram_mb=2048, disk_gb=20, os_image="debian", element_id=elements[3].id)
+    db.add(vm)
+    db.commit()
+    app = Application(name="graph-proxy", plugin_name="traefik", plugin_version="3.0",
+                      application_type=ApplicationType.VM, element_id=elements[4].id, vm_id=vm.id)
+    db.add(app)
+    db.commit()
+    edge = Gateway(kind=GatewayKind.TRAEFIK, deployment_application_id=app.id)
+    db.add(edge)
+    db.commit()
+    network_gateway_repo.create_network_gateway(db, public.id, edge.id, direction=NetworkDirection.UPSTREAM)
+    network_gateway_repo.create_network_gateway(db, front.id, edge.id, direction=NetworkDirection.DOWNSTREAM)
+    network_physical_host_repo.create_network_physical_host(db, public.id, hv2.id)
+    network_vm_repo.create_network_vm(db, front.id, vm.id)
+    return env, (public, front, back), (hv1, hv2, vm, app, edge)
+
+
+def test_reachability_impact_and_incremental_updates(make_environment):
+    db = SessionLocal()
+    try:
+        env, (public, front, back), (hv1, hv2, vm, app, edge) = _environment(db, make_environment(db, "graph"), "10.251")
+        graph = topology.get_topology(db, env.id)
+
+        reached = {(r["node"]["key"], r["network_id"], tuple(r["via"])) for r in graph.reachability(public.id)}
+        assert reached == {(f"physical_host:{hv2.id}", public.id, ()), (f"vm:{vm.id}", front.id, (edge.id,))}
+        assert graph.reachability(back.id) == []
+
+        impact = graph.impact("physical_host", hv1.id)
+        assert {node["key"] for node in impact["failed"]} == {
+            f"physical_host:{hv1.id}", f"vm:{vm.id}", f"application:{app.id}", f"gateway:{edge.id}"}
+        assert sorted((d["network_id"], d["reachable_before"], d["reachable_after"])
+                      for d in impact["degraded_networks"]) == [(public.id, 1, 0), (front.id, 1, 0)]
+        assert graph.impact("physical_host", hv2.id)["degraded_networks"] == []
+
+        # Attachments are applied to the cached graph, without a reload
+        attachment = network_vm_repo.create_network_vm(db, back.id, vm.id)
+        assert topology.get_topology(db, env.id) is graph
+        assert [r["node"]["key"] for r in graph.reachability(back.id)] == [f"vm:{vm.id}"]
+        network_vm_repo.delete_network_vm(db, attachment)
+        assert graph.reachability(back.id) == []
+
+        # Past the overlay limit the arrays are rebuilt, nodes added since included
+        base_nodes = graph._base_nodes
+        for vm_id in range(10_000, 10_100):
+            graph.apply_attachment("vm", vm_id, back.id, 1)
+        assert graph._base_nodes > base_nodes
+        for vm_id in range(10_000, 10_099):
+            graph.apply_attachment("vm", vm_id, back.id, -1)
+        assert [r["node"]["id"] for r in graph.reachability(back.id)] == [10_099]
+
+        # Other changes drop the graph
+        vm.name = "graph-vm-renamed"
+        db.commit()
+        assert topology.get_topology(db, env.id) is not graph
+    finally:
+        db.close()
+
+
+def test_topology_endpoints(test_client, make_environment, auth_headers):
+    db = SessionLocal()
+    try:
+        env, (public, front, back), (hv1, hv2, vm, app, edge) = _environment(db, make_environment(db, "graph-api"), "10.252")
+        env_id, public_id, hv1_id, vm_id = env.id, public.id, hv1.id, vm.id
+    finally:
+        db.close()
+
+    data = test_client.get(f"/environments/{env_id}/topology", headers=auth_headers).json()["data"]
+    kinds = sorted(node["kind"] for node in data["nodes"])
+    assert kinds == ["application", "gateway", "network", "network", "network", "physical_host", "physical_host", "vm"]
+    assert {"source": f"vm:{vm_id}", "target": f"physical_host:{hv1_id}", "relation": "runs_on"} in data["edges"]
+
+    response = test_client.get(f"/environments/{env_id}/topology/reachability?network_id={public_id}", headers=auth_headers)
+    assert len(response.json()["data"]) == 2
+    response = test_client.get(f"/environments/{env_id}/topology/impact?kind=physical_host&id={hv1_id}", headers=auth_headers)
+    assert len(response.json()["data"]["failed"]) == 4
+    assert test_client.get(f"/environments/{env_id}/topology/impact?kind=rack&id=1", headers=auth_headers).status_code == 400
+    assert test_client.get(f"/environments/{env_id}/topology/reachability?network_id=0", headers=auth_headers).status_code == 404
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+#  Copyright (c) 2024  stefapi
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+Benchmark of the bitmask cron window API against permissions.is_in_cron_interval.
+
+Usage (from the repository root):
+    python dev/scripts/bench_cron_windows.py [--windows 2000] [--times 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from app.helper.croniter import croniter_window_batch, croniter_window_times  # noqa: E402
+from app.helper.permissions import is_in_cron_interval  # noqa: E402
+
+SCHEDULES = [
+    ("0 9 * * 1-5", "0 17 * * 1-5"),
+    ("0 8 * * *", "0 20 * * *"),
+    ("*/30 * * * *", "15,45 * * * *"),
+    ("0 0 1 * *", "0 0 2 * *"),
+    ("0 22 * * 5", "0 6 * * 1"),
+    ("0 6 * * 2#3", "0 18 * * 2#3"),
+]
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<45} {elapsed * 1000:10.1f} ms")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", type=int, default=2000, help="windows evaluated against one timestamp")
+    parser.add_argument("--times", type=int, default=2000, help="timestamps evaluated against one window")
+    args = parser.parse_args()
+
+    random.seed(42)
+    now = datetime(2025, 3, 12, 14, 37)
+    windows = [random.choice(SCHEDULES) for _ in range(args.windows)]
+    times = [now + timedelta(minutes=random.randint(0, 60 * 24 * 90)) for _ in range(args.times)]
+
+    print(f"{len(windows)} windows x 1 timestamp")
+    reference, ref_time = timed("is_in_cron_interval", lambda: [is_in_cron_interval(now, s, e) for s, e in windows])
+    batch, batch_time = timed("croniter_window_batch", lambda: croniter_window_batch(windows, now))
+    assert reference == batch, "results differ"
+    print(f"{'speedup':<45} {ref_time / batch_time:10.1f} x\n")
+
+    start, end = SCHEDULES[0]
+    print(f"1 window x {len(times)} timestamps")
+    reference, ref_time = timed("is_in_cron_interval", lambda: [is_in_cron_interval(t, start, end) for t in times])
+    batch, batch_time = timed("croniter_window_times", lambda: croniter_window_times(start, end, times))
+    assert reference == batch, "results differ"
+    print(f"{'speedup':<45} {ref_time / batch_time:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,10 @@ CWD = Path(__file__).parent
 PROJECT_ROOT = CWD / ".." / ".."
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from app.main import app
+from app.main import create_app
+
+# Routes only: the lifespan (database bootstrap) never runs
+app = create_app()
 
 # Output to frontend/src/api instead of dev/scripts/output/javascriptAPI
 TS_DIR = PROJECT_ROOT / "frontend" / "src" / "api"
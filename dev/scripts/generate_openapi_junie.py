@@ -49,7 +49,10 @@ CWD = Path(__file__).parent
 PROJECT_ROOT = CWD / ".." / ".."
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from app.main import app
+from app.main import create_app
+
+# Routes only: the lifespan (database bootstrap) never runs
+app = create_app()
 
 # Output directory
 JUNIE_DIR = PROJECT_ROOT / ".junie"